@@ -11,62 +11,66 @@ import csv
 import time
 import json
 import random
-import pandas as pd
-import requests
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from flask import (
     Flask, render_template, url_for, request, redirect, flash, jsonify,
-    Blueprint, send_from_directory, session
+    Blueprint, send_from_directory, send_file, session, make_response
 )
 from flask_mail import Mail, Message
 from flask_moment import Moment
 from werkzeug.utils import secure_filename
 from markupsafe import Markup
 from dotenv import load_dotenv
-from transformers import pipeline
 from abc import ABC, abstractmethod
 
 # Import models and services
 from models.admin import Admin
-from models.analytics_backend import plot_employee_statuses, plot_vehicles_deployed
 from models.vehicle_database import VehicleDatabase, Vehicle
 from models.employee_database import EmployeeDatabase, Employee
 from models.hexaboxes_database import HexaBoxesDatabase, Order
 from models.user_login_database import init_db, load_users_from_csv, authenticate_user
-from models.admin_database import init_admin_db, get_db_session, Admin, get_default_admin
-from models.utilities_database import UtilitiesDatabase
+from models.admin_database import init_admin_db, get_db_session, release_db_session, Admin, get_default_admin
+from models.utilities_database import get_utilities_db
 from models.salary_database import SalaryDatabase, EmployeeSalary
 from models.products_database import ProductsDatabase, Product
 from models.sales_database import SalesDatabase
 from services.hexabot import hexabot_bp
+from services.model_registry import model_registry, QA_MODEL
+from services.inference_sidecar import sidecar_socket_path
+from services.geocoder import ReverseGeocoder
+from services.chart_renderer import chart_renderer
+from services.report_jobs import report_jobs
+from services.service_registry import ServiceRegistry
 from models.activity_database import ActivityDatabase
 from models.customers_database import CustomerDatabase
+from models.tracking_read_model import TrackingReadModel
+from models.activity_feed import ActivityFeed, DEFAULT_PAGE_SIZE
+from models import mysql_pool
+from models.session_manager import session_manager
+from models.sqlite_engine import engine_stats
+from utils.lazy_import import lazy_import
 
-import mysql.connector
+pd = lazy_import('pandas')
 
 # Load environment variables from .env file
 load_dotenv()
 
 def get_mysql_connection():
     """
-    Create and return a MySQL connection for hh_user_login_db table access using .env credentials.
+    Check out a pooled MySQL connection using .env credentials.
+    Calling close() on it returns it to the process-wide pool, and any
+    connection still held when the request ends is returned by the
+    teardown hook registered in HexaHaulApp.__init__.
     """
-    return mysql.connector.connect(
-        host=os.getenv("MYSQL_HOST"),
-        user=os.getenv("MYSQL_USER"),
-        password=os.getenv("MYSQL_PASSWORD"),
-        database=os.getenv("MYSQL_DATABASE"),
-        port=int(os.getenv("MYSQL_PORT"))
-    )
+    return mysql_pool.get_connection()
 
 def get_qa_pipeline():
     """
-    Lazily load and cache the QA pipeline to avoid OOM on startup.
+    Return the process-wide QA pipeline shared with HexaBot, loading it on
+    first use if the warmup thread has not finished yet.
     """
-    if not hasattr(get_qa_pipeline, "_pipeline"):
-        get_qa_pipeline._pipeline = pipeline("question-answering", model="distilbert-base-uncased-distilled-squad")
-    return get_qa_pipeline._pipeline
+    return model_registry.get(QA_MODEL)
 
 class BaseManager(ABC):
     """
@@ -205,56 +209,177 @@ class HexaHaulApp:
     """
     Main HexaHaul Flask Application class.
     Encapsulates all app logic, routes, and configuration.
+
+    Building it only registers routes and blueprints; databases, mail, the
+    geocoder and the QA model are services started on first use (or by
+    start_services() after a worker forks), so importing the app stays cheap.
     """
-    def __init__(self):
+    def __init__(self, config=None):
+        self.services = ServiceRegistry()
+
         # Set up Flask app with custom template and static folders
-        template_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
-        self.app = Flask(
-            __name__,
-            static_url_path='',
-            static_folder='static',
-            template_folder=template_dir
-        )
-        self.app.secret_key = "your_secret_key"
-        self.configure_mail()
-        self.user_password_reset_manager = UserPasswordResetManager(self.mail)
-        self.admin_password_reset_manager = AdminPasswordResetManager(self.mail)
-
-        # Initialize databases and models
+        with self.services.boot_phase('flask'):
+            template_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+            self.app = Flask(
+                __name__,
+                static_url_path='',
+                static_folder='static',
+                template_folder=template_dir
+            )
+            self.app.secret_key = "your_secret_key"
+            self.configure_mail()
+            self.app.config.update(config or {})
+            self.app.extensions['hexahaul'] = self
+        with self.services.boot_phase('mysql_pool'):
+            mysql_pool.init_app(self.app)
+            session_manager.init_app(self.app)
+
+        with self.services.boot_phase('services'):
+            self.register_services()
+
+        # Register routes, blueprints, and template filters
+        with self.services.boot_phase('routes'):
+            self.register_routes()
+        with self.services.boot_phase('blueprints'):
+            self.register_blueprints()
+            self.register_template_filters()
+            self.moment = Moment(self.app)
+
+    def register_services(self):
+        """
+        Register the lazily started services. Eager ones are started after
+        fork by start_services(); everything else on first use.
+        """
+        services = self.services
+        services.register('mail', lambda: Mail(self.app))
+        services.register('user_password_reset_manager', lambda: UserPasswordResetManager(self.mail))
+        services.register('admin_password_reset_manager', lambda: AdminPasswordResetManager(self.mail))
+        services.register('admin_db', self._start_admin_db, eager=True)
+        services.register('user_login_db', self._start_user_login_db, eager=True)
+        services.register('vehicle_db', VehicleDatabase)
+        services.register('employee_db', EmployeeDatabase)
+        services.register('hexabox_db', HexaBoxesDatabase)
+        services.register('salary_db', SalaryDatabase)
+        services.register('product_db', ProductsDatabase)
+        services.register('sales_db', SalesDatabase)
+        services.register('activity_db', ActivityDatabase)
+        services.register('activity_feed', lambda: ActivityFeed(get_mysql_connection, self.activity_db.csv_path,
+                                                                    self.activity_db.archive))
+        services.register('tracking_read_model', lambda: TrackingReadModel(get_mysql_connection))
+        services.register('geocoder', self._start_geocoder)
+
+        # Load the HexaBot QA model in the background once a worker starts;
+        # with an inference sidecar configured the workers leave the model to it
+        qa_warmup = self.app.config.get('QA_WARMUP', os.getenv("QA_WARMUP", "1") == "1")
+        services.register('qa_model', self._start_qa_model, eager=qa_warmup and not sidecar_socket_path())
+
+        eager = self.app.config.get('EAGER_SERVICES', os.getenv("EAGER_SERVICES", ""))
+        if isinstance(eager, str):
+            eager = [name.strip() for name in eager.split(',') if name.strip()]
+        for name in eager:
+            if not services.set_eager(name):
+                print(f"Unknown service in EAGER_SERVICES: {name}")
+
+    def _start_admin_db(self):
         init_admin_db()
-        self.admin_account = get_default_admin()
-        self.vehicle_db = VehicleDatabase()
-        self.employee_db = EmployeeDatabase()
-        self.hexabox_db = HexaBoxesDatabase()
-        self.salary_db = SalaryDatabase()
-        self.product_db = ProductsDatabase()
-        self.activity_db = ActivityDatabase()
-
-        # Print template folder info for debugging
-        print(f"Template folder: {template_dir}")
-        print(f"Template folder exists: {os.path.exists(template_dir)}")
-
-        # Initialize user login DB and load users
+        return get_default_admin()
+
+    def _start_user_login_db(self):
         with self.app.app_context():
             init_db()
             load_users_from_csv()
+        return True
 
-        # Register routes, blueprints, and template filters
-        self.register_routes()
-        self.register_blueprints()
-        self.register_template_filters()
-        self.moment = Moment(self.app)
+    def _start_geocoder(self):
+        geocoder = ReverseGeocoder()
+        if os.getenv("GEOCODE_PREWARM", "0") == "1":
+            geocoder.start_prewarm(get_mysql_connection)
+        return geocoder
+
+    def _start_qa_model(self):
+        model_registry.warmup(QA_MODEL)
+        return model_registry
+
+    def start_services(self):
+        """
+        Start the eager services in this process. Called from the gunicorn
+        post_worker_init hook and before the development server runs.
+        """
+        started = self.services.start_eager()
+        if started:
+            print(f"Started services: {', '.join(started)}")
+        return started
+
+    def startup_timings(self):
+        return self.services.timings()
+
+    # Encapsulation: services are reached through properties so routes start them on first use
+    @property
+    def mail(self):
+        return self.services.get('mail')
+
+    @property
+    def user_password_reset_manager(self):
+        return self.services.get('user_password_reset_manager')
+
+    @property
+    def admin_password_reset_manager(self):
+        return self.services.get('admin_password_reset_manager')
+
+    @property
+    def admin_account(self):
+        return self.services.get('admin_db')
+
+    @property
+    def vehicle_db(self):
+        return self.services.get('vehicle_db')
+
+    @property
+    def employee_db(self):
+        return self.services.get('employee_db')
+
+    @property
+    def hexabox_db(self):
+        return self.services.get('hexabox_db')
+
+    @property
+    def salary_db(self):
+        return self.services.get('salary_db')
+
+    @property
+    def product_db(self):
+        return self.services.get('product_db')
+
+    @property
+    def sales_db(self):
+        return self.services.get('sales_db')
+
+    @property
+    def activity_db(self):
+        return self.services.get('activity_db')
+
+    @property
+    def activity_feed(self):
+        return self.services.get('activity_feed')
+
+    @property
+    def tracking_read_model(self):
+        return self.services.get('tracking_read_model')
+
+    @property
+    def geocoder(self):
+        return self.services.get('geocoder')
 
     def configure_mail(self):
         """
         Configure Flask-Mail for sending emails.
+        Flask-Mail itself is initialized by the 'mail' service on first use.
         """
         self.app.config['MAIL_SERVER'] = 'smtp.gmail.com'
         self.app.config['MAIL_PORT'] = 587
         self.app.config['MAIL_USE_TLS'] = True
         self.app.config['MAIL_USERNAME'] = 'hexahaulprojects@gmail.com'
         self.app.config['MAIL_PASSWORD'] = 'ikai nagb zyna hjoc'
-        self.mail = Mail(self.app)
 
     def register_template_filters(self):
         """
@@ -273,10 +398,6 @@ class HexaHaulApp:
         """
 
         app = self.app
-        user_password_reset_manager = self.user_password_reset_manager
-        admin_password_reset_manager = self.admin_password_reset_manager
-        admin_account = self.admin_account
-        vehicle_db = self.vehicle_db
 
         @app.route("/user-login", methods=["GET", "POST"])
         @app.route("/user-login.html", methods=["GET", "POST"])
@@ -362,7 +483,7 @@ class HexaHaulApp:
 
         @app.route("/api/user-activities")
         def get_user_activities():
-            """API endpoint to get user activities for the sidebar"""
+            """API endpoint to get user activities for the sidebar, newest first; pass ?before=<next_cursor> for older pages"""
             if "logged_in" not in session or not session["logged_in"]:
                 return jsonify({"error": "Not logged in"}), 401
             
@@ -372,116 +493,15 @@ class HexaHaulApp:
             if not username and not email:
                 return jsonify({"error": "No user identifier found"}), 400
             
-            # Try MySQL hh_activity table first
-            activities = []
             try:
-                conn = get_mysql_connection()
-                cursor = conn.cursor(dictionary=True)
-                
-                # Query hh_activity table for user activities
-                query = """
-                    SELECT id, Username, Email, Activity_Type, Activity_Description, 
-                           Timestamp, IP_Address, User_Agent
-                    FROM hh_activity 
-                    WHERE (Username = %s OR Email = %s)
-                    ORDER BY STR_TO_DATE(Timestamp, '%m/%d/%Y %H:%i') DESC
-                    LIMIT 20
-                """
-                cursor.execute(query, (username, email))
-                mysql_activities = cursor.fetchall()
-                
-                # Format MySQL activities
-                for activity in mysql_activities:
-                    try:
-                        # Parse timestamp - handle different formats
-                        timestamp_str = activity.get('Timestamp', '')
-                        if '/' in timestamp_str:
-                            # Format: 5/26/2025 15:18
-                            timestamp = datetime.strptime(timestamp_str, '%m/%d/%Y %H:%M')
-                        else:
-                            # Format: 2025-06-08 23:32:58
-                            timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
-                        
-                        formatted_activity = {
-                            'id': activity.get('id'),
-                            'username': activity.get('Username', ''),
-                            'email': activity.get('Email', ''),
-                            'activity_type': activity.get('Activity_Type', ''),
-                            'description': activity.get('Activity_Description', ''),
-                            'timestamp': timestamp_str,
-                            'date': timestamp.strftime('%Y-%m-%d'),
-                            'time': timestamp.strftime('%H:%M:%S'),
-                            'full_timestamp': timestamp.isoformat(),
-                            'ip_address': activity.get('IP_Address', ''),
-                            'user_agent': activity.get('User_Agent', ''),
-                            'source': 'mysql'
-                        }
-                        activities.append(formatted_activity)
-                    except Exception as e:
-                        print(f"Error parsing MySQL activity: {e}")
-                        continue
-                
-                cursor.close()
-                conn.close()
-                print(f"Found {len(activities)} activities from MySQL")
-                
-            except Exception as e:
-                print(f"Error fetching from MySQL hh_activity table: {e}")
-                activities = []
-            
-            # Fallback to CSV if MySQL failed or returned no results
-            if not activities:
-                try:
-                    csv_path = os.path.join('hexahaul_db', 'hh_activity.csv')
-                    if os.path.exists(csv_path):
-                        with open(csv_path, 'r', encoding='utf-8') as file:
-                            reader = csv.DictReader(file)
-                            csv_activities = []
-                            
-                            for row in reader:
-                                # Filter by username or email
-                                if (row.get('Username') == username or 
-                                    row.get('Email') == email):
-                                    
-                                    try:
-                                        # Parse timestamp from CSV
-                                        timestamp_str = row.get('Timestamp', '')
-                                        if timestamp_str:
-                                            if '/' in timestamp_str:
-                                                timestamp = datetime.strptime(timestamp_str, '%m/%d/%Y %H:%M')
-                                            else:
-                                                timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
-                                        else:
-                                            timestamp = datetime.now()
-                                        
-                                        formatted_activity = {
-                                            'id': row.get('id', ''),
-                                            'username': row.get('Username', ''),
-                                            'email': row.get('Email', ''),
-                                            'activity_type': row.get('Activity_Type', ''),
-                                            'description': row.get('Activity_Description', ''),
-                                            'timestamp': timestamp_str,
-                                            'date': timestamp.strftime('%Y-%m-%d'),
-                                            'time': timestamp.strftime('%H:%M:%S'),
-                                            'full_timestamp': timestamp.isoformat(),
-                                            'ip_address': row.get('IP_Address', ''),
-                                            'user_agent': row.get('User_Agent', ''),
-                                            'source': 'csv'
-                                        }
-                                        csv_activities.append(formatted_activity)
-                                    except Exception as e:
-                                        print(f"Error parsing CSV activity: {e}")
-                                        continue
-                            
-                            # Sort by timestamp and take most recent 20
-                            csv_activities.sort(key=lambda x: x['full_timestamp'], reverse=True)
-                            activities = csv_activities[:20]
-                            print(f"Found {len(activities)} activities from CSV fallback")
-                            
-                except Exception as e:
-                    print(f"Error reading CSV fallback: {e}")
-            
-            return jsonify({"activities": activities})
+                limit = int(request.args.get("limit", DEFAULT_PAGE_SIZE))
+                activities, next_cursor = self.activity_feed.page(
+                    username, email, cursor=request.args.get("before"), limit=limit
+                )
+            except ValueError:
+                return jsonify({"error": "Invalid before cursor or limit"}), 400
+
+            return jsonify({"activities": activities, "next_cursor": next_cursor})
 
         @app.route("/user-dashboard")
         def user_dashboard():
@@ -513,15 +533,9 @@ class HexaHaulApp:
             error_message = None
             if request.method == "POST":
                 order_item_id = request.form.get("tracking_id", "").strip()
-                # Validate order_item_id in MySQL
+                # Validate order_item_id through the cached tracking read model
                 try:
-                    conn = get_mysql_connection()
-                    cursor = conn.cursor()
-                    query = "SELECT 1 FROM hh_order WHERE order_item_id = %s LIMIT 1"
-                    cursor.execute(query, (order_item_id,))
-                    exists = cursor.fetchone() is not None
-                    cursor.close()
-                    conn.close()
+                    exists = self.tracking_read_model.exists(order_item_id)
                 except Exception as e:
                     print(f"Error validating order_item_id in MySQL: {e}")
                     exists = False
@@ -537,13 +551,7 @@ class HexaHaulApp:
             order_item_id = data.get("order_item_id", "").strip()
             exists = False
             try:
-                conn = get_mysql_connection()
-                cursor = conn.cursor()
-                query = "SELECT 1 FROM hh_order WHERE order_item_id = %s LIMIT 1"
-                cursor.execute(query, (order_item_id,))
-                exists = cursor.fetchone() is not None
-                cursor.close()
-                conn.close()
+                exists = self.tracking_read_model.exists(order_item_id)
             except Exception as e:
                 print(f"Error validating order_item_id in MySQL: {e}")
             return jsonify({"exists": exists})
@@ -583,6 +591,7 @@ class HexaHaulApp:
                     return redirect(url_for('admin_dashboard'))
                 else:
                     # Fallback to SQLAlchemy authentication if not found in MySQL
+                    self.services.get('admin_db')
                     db_session = get_db_session()
                     try:
                         admin = Admin.authenticate(db_session, username, password)
@@ -594,7 +603,7 @@ class HexaHaulApp:
                         else:
                             flash('Invalid username or password', 'error')
                     finally:
-                        db_session.close()
+                        release_db_session(db_session)
 
             return render_template('admin-login.html')
 
@@ -666,8 +675,8 @@ class HexaHaulApp:
             
             if email_found:
                 # Generate and send OTP
-                otp = admin_password_reset_manager.generate_otp(email)
-                admin_password_reset_manager.send_otp(email, otp)
+                otp = self.admin_password_reset_manager.generate_otp(email)
+                self.admin_password_reset_manager.send_otp(email, otp)
                 return redirect(url_for('admin_verification_code', email=email))
             else:
                 # Email not found
@@ -720,8 +729,8 @@ class HexaHaulApp:
                     return render_template("forgot-password.html", error="Email not found in user records")
                 
                 # If email is found, proceed with OTP generation and sending
-                otp = user_password_reset_manager.generate_otp(email)
-                user_password_reset_manager.send_otp(email, otp)
+                otp = self.user_password_reset_manager.generate_otp(email)
+                self.user_password_reset_manager.send_otp(email, otp)
                 flash("OTP sent to your email. Please check your inbox.")
                 return redirect(url_for("verify_otp", email=email))
                 
@@ -740,8 +749,8 @@ class HexaHaulApp:
                     request.form.get('otp6', ''),
                 ])
                 new_password = request.form.get("new_password")
-                if user_password_reset_manager.verify_otp(email, otp):
-                    user_password_reset_manager.clear_otp(email)
+                if self.user_password_reset_manager.verify_otp(email, otp):
+                    self.user_password_reset_manager.clear_otp(email)
                     return redirect(url_for("change_password", email=email))
                 else:
                     flash("Invalid OTP. Please try again.")
@@ -757,8 +766,8 @@ class HexaHaulApp:
             email = request.values.get('email')
             if request.method == 'POST':
                 otp = ''.join([request.form.get(f'otp{i}', '') for i in range(1, 7)])
-                if admin_password_reset_manager.verify_otp(email, otp):
-                    admin_password_reset_manager.clear_otp(email)
+                if self.admin_password_reset_manager.verify_otp(email, otp):
+                    self.admin_password_reset_manager.clear_otp(email)
                     return redirect(url_for('admin_new_password', email=email))
                 else:
                     flash("Invalid verification code. Please try again.")
@@ -800,8 +809,8 @@ class HexaHaulApp:
         def admin_resend_otp():
             email = request.form.get('email')
             if email:
-                otp = admin_password_reset_manager.generate_otp(email)
-                admin_password_reset_manager.send_otp(email, otp)
+                otp = self.admin_password_reset_manager.generate_otp(email)
+                self.admin_password_reset_manager.send_otp(email, otp)
                 return jsonify({'success': True, 'message': 'Verification code resent.'})
             return jsonify({'success': False, 'message': 'Email not found.'}), 400
 
@@ -858,32 +867,6 @@ class HexaHaulApp:
             tracking_id = request.args.get("tracking_id", "")
             return render_template("parcel-tracker.html", tracking_id=tracking_id)
 
-        def reverse_geocode(lat, lon):
-            """Reverse geocode using Nominatim (OpenStreetMap)"""
-            try:
-                url = f"https://nominatim.openstreetmap.org/reverse"
-                params = {
-                    "lat": lat,
-                    "lon": lon,
-                    "format": "json",
-                    "zoom": 12,
-                    "addressdetails": 1
-                }
-                headers = {
-                    "User-Agent": "HexaHaulParcelTracker/1.0"
-                }
-                resp = requests.get(url, params=params, headers=headers, timeout=5)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    address = data.get("address", {})
-                    for key in ("city", "town", "village", "municipality", "county"):
-                        if key in address:
-                            return address[key]
-                    return data.get("display_name", "Unknown Location")
-            except Exception as e:
-                print(f"Reverse geocoding failed: {e}")
-            return "Unknown Location"
-
         @app.route("/parceltracking")
         def parceltracking():
             tracking_id = request.args.get("tracking_id", "")
@@ -891,89 +874,18 @@ class HexaHaulApp:
             order_data = None
             
             if tracking_id:
-                # Get order data from MySQL instead of CSV
+                # Order, product and courier come from one joined query,
+                # cached per tracking ID by the tracking read model
                 try:
-                    conn = get_mysql_connection()
-                    cursor = conn.cursor(dictionary=True)
-                    
-                    # Get product name from hh_product_info table
-                    product_name = None
-                    product_query = "SELECT `product_name` FROM hh_product_info WHERE `order_item_id` = %s LIMIT 1"
-                    cursor.execute(product_query, (tracking_id,))
-                    product_row = cursor.fetchone()
-                    if product_row:
-                        product_name = product_row['product_name'].strip()
-                    
-                    # Get order info from hh_order table
-                    order_query = """
-                        SELECT `order_item_id`, `delivery_status`, `origin_branch`, 
-                        `branch_latitude`, `branch_longitude`, `customer_latitude`, `customer_longitude`,
-                        `driver_id`, `order date (DateOrders)` 
-                        FROM hh_order
-                        WHERE `order_item_id` = %s
-                        LIMIT 1
-                    """
-                    cursor.execute(order_query, (tracking_id,))
-                    row = cursor.fetchone()
-                    
-                    if row:
-                        driver_id = int(row['driver_id']) if row['driver_id'] else None
-                        order_date_str = row['order date (DateOrders)']
-                        try:
-                            order_date = datetime.strptime(order_date_str, "%Y-%m-%d")
-                        except Exception:
-                            order_date = None
-                        offset_days = 5
-                        expected_delivery_date = order_date + timedelta(days=offset_days) if order_date else None
-                        expected_delivery_str = expected_delivery_date.strftime("%Y-%m-%d") if expected_delivery_date else "Unknown"
-                        cust_lat = float(row['customer_latitude'])
-                        cust_lon = float(row['customer_longitude'])
-                        branch_lat = float(row['branch_latitude'])
-                        branch_lon = float(row['branch_longitude'])
-                        # reverse geocode
-                        customer_place = reverse_geocode(cust_lat, cust_lon)
-                        branch_place = reverse_geocode(branch_lat, branch_lon)
-                        
-                        order_data = {
-                            'orderItemId': row['order_item_id'],
-                            'deliveryStatus': row['delivery_status'],
-                            'originBranch': row['origin_branch'],
-                            'branchLatitude': branch_lat,
-                            'branchLongitude': branch_lon,
-                            'customerLatitude': cust_lat,
-                            'customerLongitude': cust_lon,
-                            'orderDate': order_date_str,
-                            'expectedDeliveryDate': expected_delivery_str,
-                            'customerPlace': customer_place,
-                            'branchPlace': branch_place,
-                            'driverId': driver_id,
-                            'productName': product_name
-                        }
-                        
-                        # Get courier (driver) info if driver_id is available
-                        if driver_id:
-                            courier_query = """
-                                SELECT `employee_id`, `first_name`, `last_name`, `gender`, 
-                                `age`, `birth_date`, `contact_number` 
-                                FROM hh_employee_biography 
-                                WHERE `employee_id` = %s
-                                LIMIT 1
-                            """
-                            cursor.execute(courier_query, (driver_id,))
-                            courier_row = cursor.fetchone()
-                            if courier_row:
-                                courier = {
-                                    'employee_id': int(courier_row['employee_id']),
-                                    'first_name': courier_row['first_name'],
-                                    'last_name': courier_row['last_name'],
-                                    'gender': courier_row['gender'],
-                                    'age': int(courier_row['age']),
-                                    'birthdate': courier_row['birth_date'],
-                                    'contact_number': courier_row['contact_number']
-                                }
-                    
-                    cursor.close()
-                    conn.close()
+                    view = self.tracking_read_model.get(tracking_id)
+                    if view:
+                        order_data = dict(view['order'])
+                        courier = view['courier']
+                        # reverse geocode (offline locality index, Nominatim only if configured)
+                        order_data['customerPlace'], order_data['branchPlace'] = self.geocoder.reverse_geocode_many([
+                            (order_data['customerLatitude'], order_data['customerLongitude']),
+                            (order_data['branchLatitude'], order_data['branchLongitude'])
+                        ])
                 except Exception as e:
                     print(f"Error fetching order data from MySQL: {e}")
 
@@ -1269,6 +1181,7 @@ class HexaHaulApp:
             # Get available vehicles from SQLAlchemy as before
             session2 = self.vehicle_db.connect()
             available_vehicles = session2.query(Vehicle).filter_by(status='Available').all()
+            self.vehicle_db.disconnect(session2)
 
             # Get admin name from Flask session
             admin_name = session.get('admin_name', 'Admin User')
@@ -1417,6 +1330,12 @@ class HexaHaulApp:
             
             return redirect(url_for('admin_hexaboxes'))
 
+        def invalidate_tracking(tracking_id):
+            """Drop cached tracking views for a HexaBox package (HX- ID and its order_item_id)."""
+            order = self.hexabox_db.get_order_by_tracking_id(tracking_id)
+            order_item_id = order.order_item_id if order else None
+            self.tracking_read_model.invalidate(tracking_id, order_item_id)
+
         @app.route('/admin/hexaboxes/update', methods=['POST'])
         def update_package():
             tracking_id = request.form.get('tracking_id')
@@ -1449,6 +1368,7 @@ class HexaHaulApp:
                 data['delivery_status'] = 'Shipping canceled'
             
             self.hexabox_db.update_order(tracking_id, **data)
+            invalidate_tracking(tracking_id)
             
             return redirect(url_for('admin_hexaboxes'))
 
@@ -1456,6 +1376,7 @@ class HexaHaulApp:
         def delete_package():
             tracking_id = request.form.get('tracking_id')
             
+            invalidate_tracking(tracking_id)
             self.hexabox_db.delete_order(tracking_id)
             
             return redirect(url_for('admin_hexaboxes'))
@@ -1469,12 +1390,8 @@ class HexaHaulApp:
             # Get admin name from session
             admin_name = session.get('admin_name', 'Admin')
             
-            # Use an absolute path for the database
-            db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database', 'hexahaul.db')
-            os.makedirs(os.path.dirname(db_path), exist_ok=True)
-            
-            # Initialize utilities database
-            utilities_db = UtilitiesDatabase(db_path)
+            # Shared for the app's lifetime: pooled connections, tables and indexes set up once
+            utilities_db = get_utilities_db()
             
             # Get dashboard stats
             dashboard_stats = utilities_db.get_dashboard_stats()
@@ -1485,10 +1402,11 @@ class HexaHaulApp:
             employee_performance_data = utilities_db.get_employee_performance_data()
             customer_growth_data = utilities_db.get_customer_growth_data()
             
-            # Get table data
-            sales_detail = utilities_db.get_sales_detail_data()
-            vehicle_detail = utilities_db.get_vehicle_detail_data()
-            employee_detail = utilities_db.get_employee_detail_data()
+            # Get the first page of each table; "Load more" fetches the rest by cursor
+            detail_pages = {table: utilities_db.get_detail_page(table) for table in ('sales', 'vehicles', 'employees')}
+            sales_detail = detail_pages['sales']['rows']
+            vehicle_detail = detail_pages['vehicles']['rows']
+            employee_detail = detail_pages['employees']['rows']
             
             # Convert chart data to JSON for JavaScript
             chart_data = {
@@ -1505,7 +1423,8 @@ class HexaHaulApp:
                 chart_data=json.dumps(chart_data),
                 sales_detail=sales_detail,
                 vehicle_detail=vehicle_detail,
-                employee_detail=employee_detail
+                employee_detail=employee_detail,
+                detail_cursors={table: page['next_cursor'] for table, page in detail_pages.items()}
             )
 
         @app.route('/api/utilities/chart-data')
@@ -1517,11 +1436,7 @@ class HexaHaulApp:
             chart_type = request.args.get('type', 'sales')
             time_range = request.args.get('timeRange', 'month')
             
-            # Use an absolute path for the database
-            db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database', 'hexahaul.db')
-            
-            # Initialize utilities database
-            utilities_db = UtilitiesDatabase(db_path)
+            utilities_db = get_utilities_db()
             
             if chart_type == 'sales':
                 data = utilities_db.get_sales_data(time_range)
@@ -1536,6 +1451,23 @@ class HexaHaulApp:
             
             return jsonify(data)
 
+        @app.route('/api/utilities/detail/<table>')
+        def utilities_detail(table):
+            # Check if user is logged in as admin
+            if 'admin_id' not in session:
+                return jsonify({'error': 'Unauthorized'}), 401
+
+            try:
+                page = get_utilities_db().get_detail_page(
+                    table,
+                    limit=request.args.get('limit', 20, type=int),
+                    cursor=request.args.get('cursor') or None,
+                    time_range=request.args.get('timeRange', 'month')
+                )
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            return jsonify(page)
+
         @app.route('/api/utilities/generate-report', methods=['POST'])
         def generate_report():
             # Check if user is logged in as admin
@@ -1546,14 +1478,125 @@ class HexaHaulApp:
             time_range = request.form.get('reportTimeRange')
             report_format = request.form.get('reportFormat')
             
-            # Use an absolute path for the database
-            db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database', 'hexahaul.db')
-            
-            # Initialize utilities database
-            utilities_db = UtilitiesDatabase(db_path)
-            result = utilities_db.generate_report(report_type, time_range, report_format)
-            
-            return jsonify(result)
+            # Queued on the report worker pool; the browser polls status_link, then downloads
+            try:
+                job = report_jobs.submit(report_type, time_range, report_format,
+                                         request.form.get('startDate'), request.form.get('endDate'))
+            except ValueError as e:
+                return jsonify({'status': 'error', 'message': str(e)}), 400
+            
+            return jsonify({
+                'status': 'success',
+                'message': f"{report_type.capitalize()} report for {time_range} period is being generated in {job.extension.upper()} format.",
+                'job': job.to_dict(),
+                'status_link': url_for('report_status', job_id=job.id),
+                'download_link': url_for('download_report', job_id=job.id)
+            }), 202
+
+        @app.route('/api/utilities/reports/<job_id>')
+        def report_status(job_id):
+            # Check if user is logged in as admin
+            if 'admin_id' not in session:
+                return jsonify({'error': 'Unauthorized'}), 401
+
+            job = report_jobs.get(job_id)
+            if job is None:
+                return jsonify({'error': 'Report not found or expired'}), 404
+            return jsonify(job.to_dict())
+
+        @app.route('/reports/<job_id>')
+        def download_report(job_id):
+            # Check if user is logged in as admin
+            if 'admin_id' not in session:
+                return redirect(url_for('admin_login'))
+
+            job = report_jobs.get(job_id)
+            if job is None or (job.state == 'done' and not os.path.exists(report_jobs.path_for(job))):
+                return jsonify({'error': 'Report not found or expired'}), 404
+            if job.state != 'done':
+                return jsonify(job.to_dict()), 409
+            # conditional=True answers Range and If-None-Match requests from the file on disk
+            return send_file(report_jobs.path_for(job), mimetype=job.mimetype, as_attachment=True,
+                             download_name=job.filename, conditional=True)
+
+        @app.route('/api/utilities/report-stats')
+        def report_stats():
+            # Check if user is logged in as admin
+            if 'admin_id' not in session:
+                return jsonify({'error': 'Unauthorized'}), 401
+
+            return jsonify(report_jobs.stats())
+
+        @app.route('/api/utilities/mysql-pool-stats')
+        def mysql_pool_stats():
+            # Check if user is logged in as admin
+            if 'admin_id' not in session:
+                return jsonify({'error': 'Unauthorized'}), 401
+
+            try:
+                return jsonify(mysql_pool.get_pool().stats())
+            except Exception as e:
+                return jsonify({'error': str(e)}), 500
+
+        @app.route('/api/utilities/sqlite-pool-stats')
+        def sqlite_pool_stats():
+            # Check if user is logged in as admin
+            if 'admin_id' not in session:
+                return jsonify({'error': 'Unauthorized'}), 401
+
+            return jsonify({**get_utilities_db().stats(), 'engines': engine_stats()})
+
+        @app.route('/api/admin/startup-timings')
+        def startup_timings():
+            # Check if user is logged in as admin
+            if 'admin_id' not in session:
+                return jsonify({'error': 'Unauthorized'}), 401
+
+            return jsonify(self.startup_timings())
+
+        @app.route('/api/admin/session-stats')
+        def session_stats():
+            # Check if user is logged in as admin
+            if 'admin_id' not in session:
+                return jsonify({'error': 'Unauthorized'}), 401
+
+            return jsonify(session_manager.stats())
+
+        @app.route('/api/utilities/activity-writer-stats')
+        def activity_writer_stats():
+            # Check if user is logged in as admin
+            if 'admin_id' not in session:
+                return jsonify({'error': 'Unauthorized'}), 401
+
+            return jsonify(self.activity_db.writer_stats())
+
+        @app.route('/api/utilities/activity-compact', methods=['POST'])
+        def activity_compact():
+            # Check if user is logged in as admin
+            if 'admin_id' not in session:
+                return jsonify({'error': 'Unauthorized'}), 401
+
+            try:
+                self.activity_db.flush()
+                return jsonify(self.activity_db.compact())
+            except Exception as e:
+                return jsonify({'error': str(e)}), 500
+
+        @app.route('/api/utilities/geocode-prewarm', methods=['GET', 'POST'])
+        def geocode_prewarm():
+            # Check if user is logged in as admin
+            if 'admin_id' not in session:
+                return jsonify({'error': 'Unauthorized'}), 401
+
+            started = False
+            if request.method == 'POST':
+                rate_limit = request.json.get('rate_limit', 1.0) if request.is_json else 1.0
+                try:
+                    rate_limit = self.geocoder.check_rate_limit(rate_limit)
+                except (TypeError, ValueError):
+                    return jsonify({'error': 'rate_limit must be a number greater than 0 (capped at 1 request/second)'}), 400
+                started = self.geocoder.start_prewarm(get_mysql_connection, rate_limit=rate_limit)
+            return jsonify({'started': started, **self.geocoder.stats()})
 
         def generate_order_id(vehicle_type=None):
             """
@@ -1696,6 +1739,7 @@ class HexaHaulApp:
                     conn.commit()
                     cursor.close()
                     conn.close()
+                    self.tracking_read_model.invalidate(order_item_id)
                     print(f"Order inserted successfully: {order_item_id}")
                 except Exception as e:
                     print(f"Error inserting order into hh_order: {e}")
@@ -2155,12 +2199,11 @@ class HexaHaulApp:
             if 'admin_id' not in session:
                 flash('Please login to access the admin dashboard', 'error')
                 return redirect(url_for('admin_login'))
-            # Initialize sales database and get sales data
-            sales_db = SalesDatabase()
-            sales = sales_db.get_all_sales()
+            # Get sales data
+            sales = self.sales_db.get_all_sales()
             
             # Get sales statistics
-            stats = sales_db.get_sales_stats()
+            stats = self.sales_db.get_sales_stats()
             
             # Get admin name from Flask session
             admin_name = session.get('admin_name', 'Admin User')
@@ -2281,7 +2324,10 @@ class HexaHaulApp:
         
         @app.route('/admin/sales/add', methods=['POST'])
         def admin_add_sale():
-            
+            # Check if admin is logged in
+            if 'admin_id' not in session:
+                flash('Please login to access the admin dashboard', 'error')
+                return redirect(url_for('admin_login'))
             try:
                 data = {
                     'order_item_id': request.form.get('order_item_id'),
@@ -2299,11 +2345,8 @@ class HexaHaulApp:
                     'order_date': request.form.get('order_date'),
                 }
                 
-                # Initialize sales database
-                sales_db = SalesDatabase()
-                
                 # Add new sale
-                sales_db.add_sale(**data)
+                self.sales_db.add_sale(**data)
                 
                 flash('Sale added successfully', 'success')
                 
@@ -2314,6 +2357,10 @@ class HexaHaulApp:
         
         @app.route('/admin/sales/update', methods=['POST'])
         def admin_update_sale():
+            # Check if admin is logged in
+            if 'admin_id' not in session:
+                flash('Please login to access the admin dashboard', 'error')
+                return redirect(url_for('admin_login'))
             try:
                 sale_id = int(request.form.get('sale_id'))
                 
@@ -2333,11 +2380,8 @@ class HexaHaulApp:
                 data['order_item_total'] = data['sales'] * (1 - data['order_item_discount_rate'])
                 data['order_profit_per_order'] = data['order_item_total'] * data['order_item_profit_ratio']
                 
-                # Initialize sales database
-                sales_db = SalesDatabase()
-                
                 # Update sale
-                sales_db.update_sale(sale_id, **data)
+                self.sales_db.update_sale(sale_id, **data)
                 
                 flash('Sale updated successfully', 'success')
                 
@@ -2347,15 +2391,16 @@ class HexaHaulApp:
             return redirect(url_for('admin_sales'))
         
         @app.route('/admin/sales/delete', methods=['POST'])
-        def admin_delete_sale():    
+        def admin_delete_sale():
+            # Check if admin is logged in
+            if 'admin_id' not in session:
+                flash('Please login to access the admin dashboard', 'error')
+                return redirect(url_for('admin_login'))
             try:
                 sale_id = int(request.form.get('sale_id'))
                 
-                # Initialize sales database
-                sales_db = SalesDatabase()
-                
                 # Delete sale
-                sales_db.delete_sale(sale_id)
+                self.sales_db.delete_sale(sale_id)
                 
                 
                 flash('Sale deleted successfully', 'success')
@@ -2751,31 +2796,55 @@ Admin Reply:
 # Blueprint for analytics routes (graphs)
 analytics_bp = Blueprint('analytics', __name__)
 
+def chart_response(name):
+    """
+    Serve a cached chart PNG with ETag/Last-Modified so browsers revalidate
+    instead of downloading it again.
+    """
+    chart = chart_renderer.get(name)
+    response = make_response(chart.png)
+    response.mimetype = 'image/png'
+    response.set_etag(chart.etag)
+    response.last_modified = datetime.fromtimestamp(chart.last_modified, tz=timezone.utc)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
 @analytics_bp.route('/analytics/employee_statuses.png')
 def employee_statuses_graph():
     """
     Serve the employee statuses graph as a PNG image.
     """
-    save_path = os.path.join('static', 'graphs', 'employee_statuses.png')
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    plot_employee_statuses(save_path)
-    return send_from_directory('static/graphs', 'employee_statuses.png')
+    return chart_response('employee_statuses')
 
 @analytics_bp.route('/analytics/vehicles_deployed.png')
 def vehicles_deployed_graph():
     """
     Serve the vehicles deployed graph as a PNG image.
     """
-    save_path = os.path.join('static', 'graphs', 'vehicles_deployed.png')
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    plot_vehicles_deployed(save_path)
-    return send_from_directory('static/graphs', 'vehicles_deployed.png')
+    return chart_response('vehicles_deployed')
+
+@analytics_bp.route('/analytics/charts/status')
+def chart_render_status():
+    return jsonify(chart_renderer.stats())
+
+def create_app(config=None):
+    """
+    Build the HexaHaul Flask app. `config` is applied to app.config before
+    services are registered (e.g. {'QA_WARMUP': False, 'EAGER_SERVICES': ['vehicle_db']}).
+    The HexaHaulApp instance is kept in app.extensions['hexahaul'].
+    """
+    started = time.perf_counter()
+    app_instance = HexaHaulApp(config)
+    timings = app_instance.startup_timings()
+    print(f"App built in {time.perf_counter() - started:.3f}s "
+          f"({', '.join(f'{name} {seconds:.3f}s' for name, seconds in timings['boot'].items())})")
+    return app_instance.app
+
+# Built once at import; this allows Gunicorn to find 'app' when running 'gunicorn app:app'
+app = create_app()
+app_instance = app.extensions['hexahaul']
 
 if __name__ == "__main__":
     # Entry point for running the Flask app directly
-    app_instance = HexaHaulApp()
+    app_instance.start_services()
     app_instance.run()
-
-# This allows Gunicorn to find 'app' when running 'gunicorn app:app'
-app_instance = HexaHaulApp()
-app = app_instance.app
\ No newline at end of file
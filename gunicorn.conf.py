@@ -0,0 +1,12 @@
+"""
+Gunicorn settings for `gunicorn app:app` (picked up from the working directory).
+
+Importing the app only registers routes; each worker starts the eager
+services (admin/user databases, the QA model warmup) once it has forked.
+"""
+
+
+def post_worker_init(worker):
+    from app import app_instance
+    app_instance.start_services()
+    worker.log.info("Startup timings: %s", app_instance.startup_timings())
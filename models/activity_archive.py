@@ -0,0 +1,219 @@
+import csv
+import gzip
+import json
+import os
+import threading
+from datetime import datetime
+
+from filelock import FileLock
+
+from models.activity_feed import parse_activity_timestamp, to_epoch
+from utils.bloom import BloomFilter
+from utils.cache import TTLCache, MISSING
+
+SEGMENT_COLUMNS = ['id', 'Username', 'Email', 'Activity_Type', 'Activity_Description', 'Timestamp', 'IP_Address', 'User_Agent']
+
+def parse_activity_line(header, line):
+    """Parse one raw CSV line of the activity log into a dict keyed by `header`."""
+    if isinstance(line, bytes):
+        line = line.decode('utf-8', errors='replace')
+    values = next(csv.reader([line.rstrip('\r\n')]), None)
+    if not values:
+        return None
+    # log_activity appends rows without the leading id column
+    if header[:1] == ['id'] and len(values) != len(header):
+        header = header[1:]
+    return dict(zip(header, values))
+
+def month_key(timestamp):
+    return timestamp.strftime('%Y-%m')
+
+def months_before(month, count):
+    """The 'YYYY-MM' key `count` months before `month`."""
+    year, mon = (int(part) for part in month.split('-'))
+    index = year * 12 + (mon - 1) - count
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+class ActivityArchive:
+    """
+    Cold storage for hh_activity.csv: one gzip-compressed, column-oriented
+    segment per completed month, described by manifest.json.
+
+    The manifest keeps each segment's row count, min/max epoch timestamp
+    and a Bloom filter of the usernames and emails it contains, so readers
+    open only the segments that overlap the requested window and may hold
+    the requested user.
+    """
+    def __init__(self, archive_dir=None, retention_months=None):
+        if archive_dir is None:
+            archive_dir = os.path.join('hexahaul_db', 'activity_archive')
+        self.archive_dir = archive_dir
+        if retention_months is None:
+            retention_months = int(os.getenv("ACTIVITY_RETENTION_MONTHS", 0))
+        # 0 keeps archived months forever
+        self.retention_months = retention_months
+        self.manifest_path = os.path.join(archive_dir, 'manifest.json')
+        self._manifest = None
+        self._manifest_mtime = None
+        self._lock = threading.Lock()
+        self._segments = TTLCache(maxsize=int(os.getenv("ACTIVITY_SEGMENT_CACHE", 4)))
+
+    def manifest(self):
+        """Return {'segments': [...]} sorted oldest first, reloading it if it changed on disk."""
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return {'segments': []}
+        with self._lock:
+            if mtime != self._manifest_mtime:
+                with open(self.manifest_path, 'r', encoding='utf-8') as file:
+                    manifest = json.load(file)
+                for segment in manifest['segments']:
+                    segment['_bloom'] = BloomFilter.from_dict(segment['bloom'])
+                self._manifest = manifest
+                self._manifest_mtime = mtime
+            return self._manifest
+
+    def _save_manifest(self, segments):
+        segments = sorted(segments, key=lambda segment: segment['month'])
+        data = {'segments': [{k: v for k, v in segment.items() if not k.startswith('_')} for segment in segments]}
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(data, file, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _segment_path(self, month):
+        return os.path.join(self.archive_dir, f"activity-{month}.json.gz")
+
+    def load_segment(self, segment):
+        """Decode a segment into {'ts': [...ascending], column: [...]}; recently used segments stay in memory."""
+        path = os.path.join(self.archive_dir, segment['file'])
+        key = (path, segment['max_ts'], segment['rows'])
+        columns = self._segments.get(key)
+        if columns is MISSING:
+            with gzip.open(path, 'rt', encoding='utf-8') as file:
+                columns = json.load(file)
+            self._segments.set(key, columns)
+        return columns
+
+    def _write_segment(self, month, rows):
+        """Write (ts, row) pairs for one month as a segment; returns its manifest entry."""
+        rows.sort(key=lambda item: item[0])
+        columns = {'ts': [ts for ts, _ in rows]}
+        for column in SEGMENT_COLUMNS:
+            columns[column] = [row.get(column, '') for _, row in rows]
+
+        bloom = BloomFilter.for_capacity(2 * len(rows))
+        for _, row in rows:
+            for value in (row.get('Username'), row.get('Email')):
+                if value:
+                    bloom.add(value)
+
+        file_name = os.path.basename(self._segment_path(month))
+        tmp_path = self._segment_path(month) + '.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as file:
+            json.dump(columns, file, separators=(',', ':'))
+        os.replace(tmp_path, self._segment_path(month))
+        return {
+            'month': month,
+            'file': file_name,
+            'rows': len(rows),
+            'min_ts': columns['ts'][0],
+            'max_ts': columns['ts'][-1],
+            'bloom': bloom.to_dict(),
+            '_bloom': bloom
+        }
+
+    def iter_rows(self, username=None, email=None, since=None, until=None):
+        """
+        Yield archived rows newest first, skipping segments outside
+        [since, until) or whose Bloom filter rules the user out.
+        """
+        since_ts = to_epoch(since) if since else None
+        until_ts = to_epoch(until) if until else None
+        for segment in reversed(self.manifest()['segments']):
+            if since_ts is not None and segment['max_ts'] < since_ts:
+                break
+            if until_ts is not None and segment['min_ts'] >= until_ts:
+                continue
+            if (username or email) and not any(value and value in segment['_bloom'] for value in (username, email)):
+                continue
+
+            columns = self.load_segment(segment)
+            usernames, emails, stamps = columns['Username'], columns['Email'], columns['ts']
+            for i in range(len(stamps) - 1, -1, -1):
+                if since_ts is not None and stamps[i] < since_ts:
+                    return
+                if until_ts is not None and stamps[i] >= until_ts:
+                    continue
+                if username or email:
+                    if not ((username and usernames[i] == username) or (email and emails[i] == email)):
+                        continue
+                yield {column: columns[column][i] for column in SEGMENT_COLUMNS}
+
+    def compact(self, csv_path, now=None):
+        """
+        Move every row from a completed month out of `csv_path` into that
+        month's segment, then drop segments past the retention window.
+        Holds the activity log's file lock throughout, so queued writes
+        from ActivityWriter wait rather than interleave.
+        """
+        now = now or datetime.now()
+        current_month = month_key(now)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        summary = {'archived_rows': 0, 'hot_rows': 0, 'segments_written': [], 'segments_dropped': []}
+
+        with FileLock(csv_path + ".lock", timeout=60):
+            if not os.path.exists(csv_path):
+                return summary
+            with open(csv_path, 'r', newline='', encoding='utf-8') as file:
+                lines = file.readlines()
+            if not lines:
+                return summary
+            header_line = lines[0]
+            header = next(csv.reader([header_line.rstrip('\r\n')]))
+
+            by_month, hot_lines = {}, []
+            for line in lines[1:]:
+                row = parse_activity_line(header, line)
+                timestamp = parse_activity_timestamp(row.get('Timestamp')) if row else None
+                if timestamp is None or month_key(timestamp) >= current_month:
+                    hot_lines.append(line)
+                    continue
+                by_month.setdefault(month_key(timestamp), []).append((to_epoch(timestamp), row))
+
+            segments = {segment['month']: segment for segment in self.manifest()['segments']}
+            for month, rows in by_month.items():
+                summary['archived_rows'] += len(rows)
+                if month in segments:
+                    # Re-compacting a month merges with what is already archived
+                    existing = self.load_segment(segments[month])
+                    rows.extend((existing['ts'][i], {column: existing[column][i] for column in SEGMENT_COLUMNS})
+                                for i in range(len(existing['ts'])))
+                segments[month] = self._write_segment(month, rows)
+                summary['segments_written'].append(month)
+
+            if self.retention_months > 0:
+                oldest_kept = months_before(current_month, self.retention_months)
+                for month in [month for month in segments if month < oldest_kept]:
+                    segment = segments.pop(month)
+                    try:
+                        os.remove(os.path.join(self.archive_dir, segment['file']))
+                    except FileNotFoundError:
+                        pass
+                    summary['segments_dropped'].append(month)
+
+            self._save_manifest(segments.values())
+
+            if by_month:
+                tmp_path = csv_path + '.compact'
+                with open(tmp_path, 'w', newline='', encoding='utf-8') as file:
+                    file.write(header_line)
+                    file.writelines(hot_lines)
+                os.replace(tmp_path, csv_path)
+            summary['hot_rows'] = len(hot_lines)
+        return summary
+
+if __name__ == '__main__':
+    archive = ActivityArchive()
+    print(archive.compact(os.path.join('hexahaul_db', 'hh_activity.csv')))
@@ -1,14 +1,340 @@
+import atexit
 import csv
+import mmap
 import os
-from datetime import datetime
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 
+from filelock import FileLock
+
+from models.activity_feed import parse_activity_timestamp
+from models.activity_archive import ActivityArchive, parse_activity_line
+
+class ActivityWriter:
+    """
+    Write-behind appender for hh_activity.csv.
+
+    Rows are queued in memory and a background thread appends them in
+    batches under a cross-process file lock, so login/logout requests never
+    wait on disk I/O and concurrent gunicorn workers cannot interleave
+    partial lines. A batch is written once it reaches `batch_size` rows or
+    `flush_interval` seconds after its first row, and everything still
+    queued is written at interpreter exit. When the queue is full new rows
+    are dropped and counted rather than blocking the request.
+    """
+    _STOP = object()
+
+    def __init__(self, csv_path: str, batch_size: int = None, flush_interval: float = None, max_queue: int = None):
+        self.csv_path = csv_path
+        self.batch_size = batch_size or int(os.getenv("ACTIVITY_BATCH_SIZE", 100))
+        self.flush_interval = flush_interval or float(os.getenv("ACTIVITY_FLUSH_INTERVAL", 0.5))
+        self.max_queue = max_queue or int(os.getenv("ACTIVITY_QUEUE_SIZE", 10000))
+        self.file_lock = FileLock(csv_path + ".lock", timeout=10)
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        self._enqueued = 0
+        self._written = 0
+        self._dropped = 0
+        self._batches = 0
+        self._write_errors = 0
+        self._last_flush_ms = 0.0
+        atexit.register(self.close)
+
+    def _ensure_started(self):
+        # Threads do not survive fork, so each worker starts its own drainer
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.max_queue)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="activity-writer", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, row: list) -> bool:
+        """Queue one CSV row; returns False if it was dropped."""
+        if self._closed:
+            return False
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self._dropped += 1
+            return False
+        self._enqueued += 1
+        return True
+
+    def _run(self):
+        batch = []
+        deadline = None
+        waiters = []
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            stop = item is self._STOP
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+            elif item is not None and not stop:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            due = deadline is not None and time.monotonic() >= deadline
+            if batch and (len(batch) >= self.batch_size or due or waiters or stop):
+                batch = self._write(batch)
+                deadline = time.monotonic() + self.flush_interval if batch else None
+            elif not batch:
+                deadline = None
+
+            for waiter in waiters:
+                waiter.set()
+            waiters = []
+            if stop:
+                return
+
+    def _write(self, batch: list) -> list:
+        """Append a batch under the file lock; returns the rows still pending after a failure."""
+        started = time.perf_counter()
+        try:
+            with self.file_lock:
+                with open(self.csv_path, 'a', newline='', encoding='utf-8') as csvfile:
+                    csv.writer(csvfile).writerows(batch)
+        except Exception as e:
+            self._write_errors += 1
+            print(f"Error writing activity batch: {e}")
+            # Keep the rows for the next attempt, within the queue budget
+            overflow = len(batch) - self.max_queue
+            if overflow > 0:
+                self._dropped += overflow
+                batch = batch[overflow:]
+            return batch
+        self._written += len(batch)
+        self._batches += 1
+        self._last_flush_ms = round((time.perf_counter() - started) * 1000, 3)
+        return []
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything queued so far has been written (or timeout)."""
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            return self._queue.empty()
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0):
+        """Flush and stop the drainer thread; later rows are dropped."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            try:
+                self._queue.put(self._STOP, timeout=timeout)
+            except queue.Full:
+                return
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict:
+        return {
+            'queue_depth': self._queue.qsize(),
+            'max_queue': self.max_queue,
+            'enqueued': self._enqueued,
+            'written': self._written,
+            'dropped': self._dropped,
+            'batches': self._batches,
+            'write_errors': self._write_errors,
+            'last_flush_ms': self._last_flush_ms,
+            'batch_size': self.batch_size,
+            'flush_interval': self.flush_interval
+        }
+
+class ActivityTailReader:
+    """
+    Newest-first reader for the append-only activity CSV.
+
+    The file is memory-mapped and scanned backwards from the last complete
+    line, so "most recent N" queries stop after N matches instead of
+    reading the whole log. Byte offsets of each user's lines are remembered
+    together with how far back the scan has reached (`covered_from`); later
+    queries read those lines directly, pick up newly appended lines from the
+    tail, and only scan further back when the remembered rows run out.
+    Assumes one record per line, which holds for everything log_activity
+    writes.
+    """
+    def __init__(self, csv_path: str):
+        self.csv_path = csv_path
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, identity):
+        self._identity = identity
+        self._header = None
+        self._data_start = 0
+        self._indexed_end = 0
+        # (username, email) -> {'offsets': [...ascending], 'covered_from': int}
+        self._index = {}
+
+    def _parse(self, line: bytes) -> Optional[Dict]:
+        return parse_activity_line(self._header, line)
+
+    @staticmethod
+    def _matches(row: Dict, username: str = None, email: str = None) -> bool:
+        if not username and not email:
+            return True
+        return bool((username and row.get('Username') == username) or
+                    (email and row.get('Email') == email))
+
+    @staticmethod
+    def _lines_backward(mm, end: int, start: int):
+        """Yield (offset, line) from `end` back to `start`; `end` must follow a newline."""
+        pos = end
+        while pos > start:
+            newline = mm.rfind(b'\n', start, pos - 1)
+            line_start = newline + 1 if newline >= 0 else start
+            yield line_start, mm[line_start:pos]
+            pos = line_start
+
+    @staticmethod
+    def _line_at(mm, offset: int) -> bytes:
+        end = mm.find(b'\n', offset)
+        return mm[offset:end + 1 if end >= 0 else len(mm)]
+
+    def _sync(self, mm, identity):
+        """Reset on truncation/rotation and index lines appended since the last query."""
+        size = len(mm)
+        if identity[0] != (self._identity or (None,))[0] or size < self._indexed_end:
+            self._reset(identity)
+        self._identity = identity
+        if self._header is None:
+            header_end = mm.find(b'\n')
+            if header_end < 0:
+                return
+            self._header = next(csv.reader([mm[:header_end].decode('utf-8').rstrip('\r')]))
+            self._data_start = self._indexed_end = header_end + 1
+
+        complete_end = mm.rfind(b'\n', self._indexed_end) + 1
+        if complete_end <= self._indexed_end:
+            return
+        if self._index:
+            appended = list(self._lines_backward(mm, complete_end, self._indexed_end))
+            for offset, line in reversed(appended):
+                row = self._parse(line)
+                if row is None:
+                    continue
+                for (username, email), entry in self._index.items():
+                    if self._matches(row, username, email):
+                        entry['offsets'].append(offset)
+        self._indexed_end = complete_end
+
+    def _iter_rows(self, username: str = None, email: str = None, stop_before: datetime = None):
+        """
+        Yield matching rows newest first. With `stop_before`, scanning stops
+        at the first row (of any user) older than it, which for an
+        append-only log means everything after is older too.
+        """
+        if not os.path.exists(self.csv_path) or os.path.getsize(self.csv_path) == 0:
+            return
+        with self._lock, open(self.csv_path, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                stat = os.fstat(file.fileno())
+                self._sync(mm, (stat.st_ino,))
+                if self._header is None:
+                    return
+
+                if not username and not email:
+                    for _, line in self._lines_backward(mm, self._indexed_end, self._data_start):
+                        row = self._parse(line)
+                        if row is None:
+                            continue
+                        if stop_before and self._older_than(row, stop_before):
+                            return
+                        yield row
+                    return
+
+                key = (username, email)
+                entry = self._index.setdefault(key, {'offsets': [], 'covered_from': self._indexed_end})
+                for offset in reversed(list(entry['offsets'])):
+                    row = self._parse(self._line_at(mm, offset))
+                    if row is None:
+                        continue
+                    if stop_before and self._older_than(row, stop_before):
+                        return
+                    yield row
+
+                needles = [value.encode('utf-8') for value in key if value]
+                found = []
+                try:
+                    for offset, line in self._lines_backward(mm, entry['covered_from'], self._data_start):
+                        row = None
+                        if any(needle in line for needle in needles):
+                            row = self._parse(line)
+                            if row is not None and not self._matches(row, username, email):
+                                row = None
+                        if stop_before:
+                            probe = row if row is not None else self._parse(line)
+                            if probe is not None and self._older_than(probe, stop_before):
+                                return
+                        entry['covered_from'] = offset
+                        if row is not None:
+                            found.append(offset)
+                            yield row
+                finally:
+                    entry['offsets'][:0] = reversed(found)
+
+    @staticmethod
+    def _older_than(row: Dict, cutoff: datetime) -> bool:
+        timestamp = parse_activity_timestamp(row.get('Timestamp'))
+        return timestamp is not None and timestamp < cutoff
+
+    def recent(self, username: str = None, email: str = None, limit: int = 50,
+               activity_type: str = None, since: datetime = None) -> List[Dict]:
+        rows = []
+        if limit <= 0:
+            return rows
+        iterator = self._iter_rows(username, email, stop_before=since)
+        try:
+            for row in iterator:
+                if activity_type and row.get('Activity_Type') != activity_type:
+                    continue
+                rows.append(row)
+                if len(rows) >= limit:
+                    break
+        finally:
+            iterator.close()
+        return rows
+
+    def stats(self) -> Dict:
+        return {
+            'indexed_users': len(self._index),
+            'indexed_offsets': sum(len(entry['offsets']) for entry in self._index.values()),
+            'indexed_end': self._indexed_end
+        }
+
 class ActivityDatabase:
-    def __init__(self, csv_path: str = None):
+    def __init__(self, csv_path: str = None, write_behind: bool = None):
         if csv_path is None:
             csv_path = os.path.join('hexahaul_db', 'hh_activity.csv')
         self.csv_path = csv_path
         self._ensure_csv_exists()
+        if write_behind is None:
+            write_behind = os.getenv("ACTIVITY_WRITE_BEHIND", "1") == "1"
+        self.writer = ActivityWriter(csv_path) if write_behind else None
+        self.reader = ActivityTailReader(csv_path)
+        self.archive = ActivityArchive(os.path.join(os.path.dirname(csv_path), 'activity_archive'))
     
     def _ensure_csv_exists(self):
         """Ensure the CSV file exists with proper headers"""
@@ -20,70 +346,72 @@ class ActivityDatabase:
                 writer.writerow(['Username', 'Email', 'Activity_Type', 'Activity_Description', 'Timestamp', 'IP_Address', 'User_Agent'])
     
     def log_activity(self, username: str, email: str, activity_type: str, description: str, ip_address: str = '', user_agent: str = ''):
-        """Log a user activity to the CSV file"""
+        """Log a user activity to the CSV file (queued for the background writer when enabled)"""
         try:
             timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            row = [username, email, activity_type, description, timestamp, ip_address, user_agent]
             
-            with open(self.csv_path, 'a', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow([username, email, activity_type, description, timestamp, ip_address, user_agent])
+            if self.writer is not None:
+                return self.writer.enqueue(row)
+            
+            with FileLock(self.csv_path + ".lock", timeout=10):
+                with open(self.csv_path, 'a', newline='', encoding='utf-8') as csvfile:
+                    writer = csv.writer(csvfile)
+                    writer.writerow(row)
             
             return True
         except Exception as e:
             print(f"Error logging activity: {e}")
             return False
     
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Write any queued activities now"""
+        return self.writer.flush(timeout) if self.writer is not None else True
+    
+    def writer_stats(self) -> Dict:
+        return self.writer.stats() if self.writer is not None else {'write_behind': False}
+    
+    def _recent(self, username: str = None, email: str = None, limit: int = 50,
+                activity_type: str = None, since: datetime = None) -> List[Dict]:
+        """Newest-first rows from the hot CSV, continuing into archived months only if needed"""
+        rows = self.reader.recent(username, email, limit=limit, activity_type=activity_type, since=since)
+        if len(rows) < limit:
+            for row in self.archive.iter_rows(username, email, since=since):
+                if activity_type and row.get('Activity_Type') != activity_type:
+                    continue
+                rows.append(row)
+                if len(rows) >= limit:
+                    break
+        return rows
+    
+    def compact(self, now: datetime = None) -> Dict:
+        """Roll completed months into the archive and apply the retention policy"""
+        return self.archive.compact(self.csv_path, now=now)
+    
     def get_user_activities(self, username: str = None, email: str = None, limit: int = 50) -> List[Dict]:
-        """Get activities for a specific user"""
-        activities = []
-        
+        """Get activities for a specific user, newest first"""
         try:
-            with open(self.csv_path, 'r', newline='', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    # Filter by username or email
-                    if username and row['Username'] == username:
-                        activities.append(row)
-                    elif email and row['Email'] == email:
-                        activities.append(row)
-                    elif not username and not email:
-                        activities.append(row)
-        except FileNotFoundError:
-            return []
+            return self._recent(username, email, limit)
         except Exception as e:
             print(f"Error reading activities: {e}")
             return []
-        
-        # Sort by timestamp (newest first) and limit results
-        activities.sort(key=lambda x: x['Timestamp'], reverse=True)
-        return activities[:limit]
     
     def get_login_history(self, username: str = None, email: str = None, limit: int = 10) -> List[Dict]:
         """Get login history for a specific user"""
-        all_activities = self.get_user_activities(username, email)
-        login_activities = [
-            activity for activity in all_activities 
-            if activity['Activity_Type'] == 'LOGIN'
-        ]
-        return login_activities[:limit]
+        try:
+            return self._recent(username, email, limit, activity_type='LOGIN')
+        except Exception as e:
+            print(f"Error reading login history: {e}")
+            return []
     
     def get_recent_activities(self, username: str = None, email: str = None, days: int = 30, limit: int = 20) -> List[Dict]:
         """Get recent activities for a user within specified days"""
-        from datetime import datetime, timedelta
-        
         cutoff_date = datetime.now() - timedelta(days=days)
-        all_activities = self.get_user_activities(username, email)
-        
-        recent_activities = []
-        for activity in all_activities:
-            try:
-                activity_date = datetime.strptime(activity['Timestamp'], '%Y-%m-%d %H:%M:%S')
-                if activity_date >= cutoff_date:
-                    recent_activities.append(activity)
-            except ValueError:
-                continue
-        
-        return recent_activities[:limit]
+        try:
+            return self._recent(username, email, limit, since=cutoff_date)
+        except Exception as e:
+            print(f"Error reading recent activities: {e}")
+            return []
     
     def format_activity_for_display(self, activity: Dict) -> Dict:
         """Format activity data for display in the frontend"""
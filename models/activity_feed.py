@@ -0,0 +1,372 @@
+import bisect
+import calendar
+import csv
+import os
+import threading
+from datetime import datetime, timezone
+
+from utils.cache import TTLCache, MISSING
+
+# hh_activity holds two timestamp layouts: the original import uses
+# '5/26/2025 15:18' and ActivityDatabase.log_activity writes '2025-06-08 23:32:58'.
+TIMESTAMP_FORMATS = ('%m/%d/%Y %H:%M', '%Y-%m-%d %H:%M:%S')
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+ACTIVITY_COLUMNS = "id, Username, Email, Activity_Type, Activity_Description, Timestamp, ts, IP_Address, User_Agent"
+
+# Both layouts as seconds since the epoch in SQL, NULL when neither matches.
+# The patterns keep STR_TO_DATE from raising on bad values in strict mode, and
+# '%T' stands in for '%H:%i:%s' since mysql.connector treats '%s' as a parameter.
+TS_SQL = (
+    "TIMESTAMPDIFF(SECOND, '1970-01-01', CASE "
+    "WHEN {column} REGEXP '^[0-9]{{1,2}}/[0-9]{{1,2}}/[0-9]{{4}} [0-9]{{1,2}}:[0-9]{{2}}$' "
+    "THEN STR_TO_DATE({column}, '%c/%e/%Y %H:%i') "
+    "WHEN {column} REGEXP '^[0-9]{{4}}-[0-9]{{2}}-[0-9]{{2}} [0-9]{{2}}:[0-9]{{2}}:[0-9]{{2}}$' "
+    "THEN STR_TO_DATE({column}, '%Y-%m-%d %T') END)"
+)
+
+# Fill ts for rows written without it (imports, other writers), so they show in the feed
+TS_TRIGGERS = {
+    'hh_activity_ts_insert': "BEFORE INSERT ON hh_activity FOR EACH ROW "
+                             "SET NEW.ts = COALESCE(NEW.ts, " + TS_SQL.format(column='NEW.Timestamp') + ")",
+    'hh_activity_ts_update': "BEFORE UPDATE ON hh_activity FOR EACH ROW "
+                             "SET NEW.ts = IF(NEW.Timestamp <=> OLD.Timestamp, NEW.ts, "
+                             + TS_SQL.format(column='NEW.Timestamp') + ")"
+}
+
+def parse_activity_timestamp(value):
+    """Parse either hh_activity timestamp format; returns None if neither matches."""
+    value = (value or '').strip()
+    for fmt in TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+def to_epoch(timestamp):
+    """
+    Seconds since the epoch for a naive wall-clock timestamp. The stored
+    timestamps carry no zone, so they are treated as UTC; only the ordering
+    matters to the feed.
+    """
+    return calendar.timegm(timestamp.timetuple())
+
+def encode_cursor(source, ts, row_id):
+    return f"{source}:{ts}:{row_id}"
+
+def decode_cursor(cursor):
+    """Return (source, ts, row_id) for a cursor from encode_cursor(); raises ValueError otherwise."""
+    source, ts, row_id = cursor.split(':')
+    if source not in ('m', 'c'):
+        raise ValueError(f"Unknown cursor source: {source}")
+    return source, int(ts), int(row_id)
+
+def format_activity(row, timestamp, source):
+    """Shape one activity row the way static/sidebar.js expects it."""
+    return {
+        'id': row.get('id', ''),
+        'username': row.get('Username', ''),
+        'email': row.get('Email', ''),
+        'activity_type': row.get('Activity_Type', ''),
+        'description': row.get('Activity_Description', ''),
+        'timestamp': row.get('Timestamp', ''),
+        'date': timestamp.strftime('%Y-%m-%d'),
+        'time': timestamp.strftime('%H:%M:%S'),
+        'full_timestamp': timestamp.isoformat(),
+        'ip_address': row.get('IP_Address', ''),
+        'user_agent': row.get('User_Agent', ''),
+        'source': source
+    }
+
+class MySQLActivityFeed:
+    """
+    Keyset-paginated reads over hh_activity using the epoch `ts` column and
+    the (Username, ts) / (Email, ts) indexes added by migrate().
+
+    Each identifier is read from its own index range and the two ranges are
+    merged with UNION, so MySQL never sorts more than 2 * (limit + 1) rows,
+    however large the table grows.
+
+    Whether `ts` exists is checked once. Until migrate() has run, the same
+    pages are served by parsing Timestamp in the query, without the indexes.
+    """
+    def __init__(self, connection_factory):
+        self.connection_factory = connection_factory
+        self.has_ts = None
+
+    @staticmethod
+    def _branch(column, before, has_ts=True):
+        if has_ts:
+            clause = f"SELECT {ACTIVITY_COLUMNS} FROM hh_activity WHERE {column} = %s AND ts IS NOT NULL"
+            if before:
+                clause += " AND (ts < %s OR (ts = %s AND id < %s))"
+        else:
+            # HAVING can filter on the computed ts alias
+            columns = ACTIVITY_COLUMNS.replace(' ts,', ' ' + TS_SQL.format(column='Timestamp') + ' AS ts,')
+            clause = f"SELECT {columns} FROM hh_activity WHERE {column} = %s HAVING ts IS NOT NULL"
+            if before:
+                clause += " AND (ts < %s OR (ts = %s AND id < %s))"
+        return f"({clause} ORDER BY ts DESC, id DESC LIMIT %s)"
+
+    def _check_ts(self, cursor):
+        if self.has_ts is None:
+            cursor.execute("""
+                SELECT COUNT(*) AS found FROM information_schema.COLUMNS
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'hh_activity' AND COLUMN_NAME = 'ts'
+            """)
+            self.has_ts = bool(cursor.fetchone()['found'])
+            if not self.has_ts:
+                print("hh_activity has no ts column yet; run python -m models.activity_feed to add its indexes")
+        return self.has_ts
+
+    def page(self, username=None, email=None, before=None, limit=DEFAULT_PAGE_SIZE):
+        """
+        Return (activities, next_cursor). `before` is the (ts, id) of the last
+        row already shown, or None for the first page.
+        """
+        identifiers = [(column, value) for column, value in (('Username', username), ('Email', email)) if value]
+        if not identifiers:
+            return [], None
+
+        conn = self.connection_factory()
+        try:
+            cursor = conn.cursor(dictionary=True)
+            has_ts = self._check_ts(cursor)
+            branches, params = [], []
+            for column, value in identifiers:
+                branches.append(self._branch(column, before, has_ts))
+                params.append(value)
+                if before:
+                    params.extend([before[0], before[0], before[1]])
+                params.append(limit + 1)
+            query = " UNION ".join(branches) + " ORDER BY ts DESC, id DESC LIMIT %s"
+            params.append(limit + 1)
+            cursor.execute(query, tuple(params))
+            rows = cursor.fetchall()
+            cursor.close()
+        finally:
+            conn.close()
+
+        activities = []
+        for row in rows[:limit]:
+            timestamp = datetime.fromtimestamp(row['ts'], timezone.utc).replace(tzinfo=None)
+            activities.append(format_activity(row, timestamp, 'mysql'))
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor('m', last['ts'], last['id'])
+        return activities, next_cursor
+
+class CsvActivityFeed:
+    """
+    Fallback feed over hh_activity.csv. The file is parsed once into per-user
+    lists sorted newest first and only re-read when its size or mtime
+    changes, so a page is a bisect rather than a full scan.
+
+    Months moved out of the CSV by ActivityArchive.compact() are read from
+    the archive once the CSV runs out for a user, like ActivityDatabase does.
+    Archived rows get negative row numbers in the cursor, numbered newest
+    first, so they sort after every hot row with the same timestamp.
+    """
+    def __init__(self, csv_path=None, archive=None):
+        if csv_path is None:
+            csv_path = os.path.join('hexahaul_db', 'hh_activity.csv')
+        self.csv_path = csv_path
+        if archive is None:
+            # activity_archive imports this module
+            from models.activity_archive import ActivityArchive
+            archive = ActivityArchive(os.path.join(os.path.dirname(csv_path), 'activity_archive'))
+        self.archive = archive
+        self._lock = threading.Lock()
+        self._signature = None
+        self._by_user = {}
+        self._archived = TTLCache(maxsize=int(os.getenv("ACTIVITY_ARCHIVE_FEED_CACHE", 256)))
+
+    def _refresh(self):
+        stat = os.stat(self.csv_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return
+        with self._lock:
+            if signature == self._signature:
+                return
+            by_user = {}
+            with open(self.csv_path, 'r', newline='', encoding='utf-8') as file:
+                reader = csv.reader(file)
+                header = next(reader, None) or []
+                with_id = header[:1] == ['id']
+                for row_no, values in enumerate(reader, start=1):
+                    # log_activity appends rows without the leading id column
+                    if with_id and len(values) == len(header):
+                        row = dict(zip(header, values))
+                    else:
+                        row = dict(zip([h for h in header if h != 'id'], values))
+                    timestamp = parse_activity_timestamp(row.get('Timestamp'))
+                    if timestamp is None:
+                        continue
+                    # Stored negated so each list is ascending and bisect-able
+                    entry = ((-to_epoch(timestamp), -row_no), row, timestamp)
+                    for key in {('u', row.get('Username')), ('e', row.get('Email'))}:
+                        if key[1]:
+                            by_user.setdefault(key, []).append(entry)
+            for entries in by_user.values():
+                entries.sort(key=lambda entry: entry[0])
+            self._by_user = by_user
+            self._signature = signature
+
+    def _archived_entries(self, username, email):
+        """Archived rows of one user as sorted entries, rebuilt when the manifest changes."""
+        manifest = self.archive.manifest()
+        if not manifest['segments']:
+            return []
+        key = (username, email)
+        cached = self._archived.get(key)
+        if cached is not MISSING and cached[0] is manifest:
+            return cached[1]
+        entries = []
+        for row in self.archive.iter_rows(username, email):
+            timestamp = parse_activity_timestamp(row.get('Timestamp'))
+            if timestamp is not None:
+                entries.append(((-to_epoch(timestamp), len(entries) + 1), row, timestamp))
+        entries.sort(key=lambda entry: entry[0])
+        self._archived.set(key, (manifest, entries))
+        return entries
+
+    def page(self, username=None, email=None, before=None, limit=DEFAULT_PAGE_SIZE):
+        start_key = (-before[0], -before[1]) if before else None
+
+        def after_cursor(entries):
+            start = bisect.bisect_right(entries, start_key, key=lambda entry: entry[0]) if start_key else 0
+            return entries[start:start + limit + 1]
+
+        candidates = {}
+        if os.path.exists(self.csv_path):
+            self._refresh()
+            for key in (('u', username), ('e', email)):
+                for entry in after_cursor(self._by_user.get(key, []) if key[1] else []):
+                    candidates[entry[0]] = entry
+        if len(candidates) <= limit and (username or email):
+            for entry in after_cursor(self._archived_entries(username, email)):
+                candidates[entry[0]] = entry
+        ordered = [candidates[key] for key in sorted(candidates)][:limit + 1]
+
+        activities = [format_activity(row, timestamp, 'csv') for _, row, timestamp in ordered[:limit]]
+        next_cursor = None
+        if len(ordered) > limit:
+            (neg_ts, neg_row), _, _ = ordered[limit - 1]
+            next_cursor = encode_cursor('c', -neg_ts, -neg_row)
+        return activities, next_cursor
+
+class ActivityFeed:
+    """Sidebar activity feed: MySQL first, hh_activity.csv (and its archive) when MySQL is unavailable or empty."""
+    def __init__(self, connection_factory, csv_path=None, archive=None):
+        self.mysql = MySQLActivityFeed(connection_factory)
+        self.csv = CsvActivityFeed(csv_path, archive)
+
+    def page(self, username=None, email=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Return (activities, next_cursor); raises ValueError for a malformed cursor."""
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        source, before = None, None
+        if cursor:
+            source, ts, row_id = decode_cursor(cursor)
+            before = (ts, row_id)
+
+        if source != 'c':
+            try:
+                activities, next_cursor = self.mysql.page(username, email, before, limit)
+                if activities or source == 'm':
+                    return activities, next_cursor
+            except Exception as e:
+                print(f"Error fetching from MySQL hh_activity table: {e}")
+                if source == 'm':
+                    return [], None
+            before = None
+
+        try:
+            return self.csv.page(username, email, before, limit)
+        except Exception as e:
+            print(f"Error reading CSV fallback: {e}")
+            return [], None
+
+def migrate(connection_factory, batch_size=1000):
+    """
+    Add the epoch `ts` column and its composite indexes to hh_activity,
+    install the triggers that fill it for new rows, and backfill it from
+    both Timestamp formats. Safe to re-run. Rows whose Timestamp cannot be
+    parsed keep ts NULL and stay out of the feed, as they do in the CSV.
+    """
+    conn = connection_factory()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT COLUMN_NAME, DATA_TYPE FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'hh_activity'
+        """)
+        columns = {name: data_type.lower() for name, data_type in cursor.fetchall()}
+        if 'ts' not in columns:
+            cursor.execute("ALTER TABLE hh_activity ADD COLUMN ts BIGINT NULL")
+            print("Added hh_activity.ts")
+
+        cursor.execute("""
+            SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'hh_activity'
+        """)
+        indexes = {row[0] for row in cursor.fetchall()}
+        for index_name, column in (('idx_hh_activity_username_ts', 'Username'),
+                                   ('idx_hh_activity_email_ts', 'Email')):
+            if index_name in indexes:
+                continue
+            # TEXT columns can only be indexed by prefix
+            prefix = "(191)" if 'text' in columns.get(column, '') or 'blob' in columns.get(column, '') else ""
+            cursor.execute(f"CREATE INDEX {index_name} ON hh_activity ({column}{prefix}, ts)")
+            print(f"Created index {index_name}")
+
+        cursor.execute("""
+            SELECT TRIGGER_NAME FROM information_schema.TRIGGERS
+            WHERE TRIGGER_SCHEMA = DATABASE() AND EVENT_OBJECT_TABLE = 'hh_activity'
+        """)
+        triggers = {row[0] for row in cursor.fetchall()}
+        for trigger_name, body in TS_TRIGGERS.items():
+            if trigger_name not in triggers:
+                cursor.execute(f"CREATE TRIGGER {trigger_name} {body}")
+                print(f"Created trigger {trigger_name}")
+
+        # Earlier runs stored 0 for unparseable timestamps, which the feed showed as 1970
+        cursor.execute("UPDATE hh_activity SET ts = NULL WHERE ts = 0")
+        conn.commit()
+
+        updated = 0
+        last_id = -1
+        while True:
+            cursor.execute(
+                "SELECT id, Timestamp FROM hh_activity WHERE ts IS NULL AND id > %s ORDER BY id LIMIT %s",
+                (last_id, batch_size)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            values = []
+            for row_id, timestamp_str in rows:
+                timestamp = parse_activity_timestamp(timestamp_str)
+                if timestamp:
+                    values.append((to_epoch(timestamp), row_id))
+            if values:
+                cursor.executemany("UPDATE hh_activity SET ts = %s WHERE id = %s", values)
+                conn.commit()
+            updated += len(values)
+            last_id = rows[-1][0]
+        cursor.close()
+        print(f"Backfilled ts for {updated} hh_activity rows")
+        return updated
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    from dotenv import load_dotenv
+    from models import mysql_pool
+
+    load_dotenv()
+    migrate(mysql_pool.get_connection)
@@ -1,11 +1,15 @@
 import os
-import pandas as pd
-from sqlalchemy import create_engine, Column, String, Integer
+from sqlalchemy import Column, String, Integer
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import hashlib
 import secrets
 import werkzeug.security
+from models.sqlite_engine import create_sqlite_engine, create_tables
+from models.session_manager import session_manager
+from utils.lazy_import import lazy_import
+
+pd = lazy_import('pandas')
 
 # Create a SQLite database for the application
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -13,7 +17,7 @@ CSV_PATH = os.path.join(BASE_DIR, 'hexahaul_db', 'hh_admins.csv')
 DB_PATH = os.path.join(BASE_DIR, 'hexahaul_db', 'hexahaul.db')
 
 # Create SQLAlchemy engine
-engine = create_engine(f'sqlite:///{DB_PATH}', echo=False)
+engine = create_sqlite_engine(DB_PATH)
 Base = declarative_base()
 
 # Define Admin model
@@ -117,29 +121,35 @@ class Admin(Base):
             return False
 
 # Create tables
-Base.metadata.create_all(engine)
+create_tables(Base.metadata, engine)
 
 # Create session
 Session = sessionmaker(bind=engine)
+SESSION_NAME = session_manager.register(f"admins:{os.path.abspath(DB_PATH)}", Session)
 
 def init_admin_db():
     """Initialize admin database by loading data from CSV"""
-    session = Session()
-    success = Admin.load_from_csv(session)
-    session.close()
-    return success
+    session = get_db_session()
+    try:
+        return Admin.load_from_csv(session)
+    finally:
+        release_db_session(session)
 
 def get_db_session():
-    """Get a new database session"""
-    return Session()
+    """Get the admin database session for this request (or thread)"""
+    return session_manager.connect(SESSION_NAME)
+
+def release_db_session(session=None):
+    """Give back a session from get_db_session()"""
+    session_manager.disconnect(SESSION_NAME, session)
 
 def get_default_admin():
     """Get or create a default admin account"""
-    session = Session()
+    session = get_db_session()
     try:
         admin = session.query(Admin).filter_by(admin_username="admin").first()
         if not admin:
             admin = Admin.create_default_admin(session)
         return admin
     finally:
-        session.close()
+        release_db_session(session)
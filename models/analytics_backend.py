@@ -1,28 +1,125 @@
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+import csv
+import io
 import os
-import random
-
-def plot_employee_statuses(save_path):
-    labels = ["Working", "Paid_Leave", "AWOL", "Day_off"]
-    sizes = [random.randint(5, 20) for _ in labels]
-    colors = ['#03335e', '#1579c0', '#b2dbf8', '#598cb8']
-
-    plt.figure(figsize=(5, 4))
-    plt.pie(sizes, labels=labels, autopct='%1.1f%%', colors=colors, startangle=140)
-    plt.title('Employee Statuses')
-    plt.tight_layout()
-    plt.savefig(save_path)
-    plt.close()
-
-def plot_vehicles_deployed(save_path):
-    deployed = random.randint(5, 15)
-    total = deployed + random.randint(2, 10)
-    plt.figure(figsize=(5, 4))
-    plt.bar(['Deployed', 'Available'], [deployed, total - deployed], color=['#1579c0', '#b2dbf8'])
-    plt.title('Vehicles Deployment')
-    plt.ylabel('Count')
-    plt.tight_layout()
-    plt.savefig(save_path)
-    plt.close()
\ No newline at end of file
+from collections import Counter
+
+EMPLOYEE_BIOGRAPHY_CSV = os.path.join('hexahaul_db', 'hh_employee_biography.csv')
+VEHICLE_CSV = os.path.join('hexahaul_db', 'hh_vehicle.csv')
+STATUS_LABELS = ["Working", "Paid_Leave", "AWOL", "Day_off"]
+COLORS = ['#03335e', '#1579c0', '#b2dbf8', '#598cb8', '#0b4f8a', '#7fb3dc']
+
+def _read_rows(csv_path):
+    with open(csv_path, 'r', newline='', encoding='utf-8') as file:
+        return list(csv.DictReader(file))
+
+def employee_status_counts(biography_csv=EMPLOYEE_BIOGRAPHY_CSV):
+    """
+    (title, labels, sizes) for the employee chart. Uses the biography's
+    Status column when it has one; the current export does not, so the
+    roster is broken down by department instead.
+    """
+    rows = _read_rows(biography_csv)
+    if rows and 'Status' in rows[0]:
+        counts = Counter((row.get('Status') or 'Working').strip() for row in rows)
+        labels = [label for label in STATUS_LABELS if counts.get(label)] + sorted(set(counts) - set(STATUS_LABELS))
+        return 'Employee Statuses', labels, [counts[label] for label in labels]
+
+    return _department_breakdown(Counter((row.get('Department') or 'Unassigned').strip() for row in rows))
+
+def vehicle_deployment_counts(vehicle_csv=VEHICLE_CSV, biography_csv=EMPLOYEE_BIOGRAPHY_CSV):
+    """(deployed, available): a vehicle is deployed when its Employee Id is a delivery driver on the roster"""
+    drivers = {row['Employee Id'] for row in _read_rows(biography_csv) if 'driver' in (row.get('Job Title') or '').lower()}
+    vehicles = _read_rows(vehicle_csv)
+    deployed = sum(1 for row in vehicles if row.get('Employee Id') in drivers)
+    return deployed, len(vehicles) - deployed
+
+def _department_breakdown(counts):
+    top = counts.most_common(5)
+    other = sum(counts.values()) - sum(size for _, size in top)
+    labels = [label for label, _ in top] + (['Other'] if other else [])
+    sizes = [size for _, size in top] + ([other] if other else [])
+    return 'Employees by Department', labels, sizes
+
+def _query(connection_factory, sql):
+    conn = connection_factory()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(sql)
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+    finally:
+        conn.close()
+
+def employee_chart_data(connection_factory, biography_csv=EMPLOYEE_BIOGRAPHY_CSV):
+    """
+    (title, labels, sizes) from the live hh_employee_biography table, which
+    the admin employee pages write to; falls back to the seed CSV when
+    MySQL is unavailable.
+    """
+    try:
+        rows = _query(connection_factory, "SELECT department, COUNT(*) FROM hh_employee_biography GROUP BY department")
+    except Exception as e:
+        print(f"Error reading hh_employee_biography for the chart, using the seed CSV: {e}")
+        return employee_status_counts(biography_csv)
+    counts = Counter()
+    for department, count in rows:
+        counts[(department or 'Unassigned').strip()] += int(count)
+    return _department_breakdown(counts)
+
+def vehicle_chart_data(connection_factory, vehicle_csv=VEHICLE_CSV, biography_csv=EMPLOYEE_BIOGRAPHY_CSV):
+    """
+    (deployed, available) from the live hh_vehicle and hh_employee_biography
+    tables, which the admin vehicle pages write to; falls back to the seed
+    CSVs when MySQL is unavailable.
+    """
+    try:
+        rows = _query(connection_factory, """
+            SELECT COUNT(*), COUNT(b.employee_id)
+            FROM hh_vehicle v
+            LEFT JOIN hh_employee_biography b
+              ON b.employee_id = v.employee_id AND LOWER(b.job_title) LIKE '%driver%'
+        """)
+    except Exception as e:
+        print(f"Error reading hh_vehicle for the chart, using the seed CSVs: {e}")
+        return vehicle_deployment_counts(vehicle_csv, biography_csv)
+    total, deployed = (int(value or 0) for value in rows[0])
+    return deployed, total - deployed
+
+def _new_figure():
+    # matplotlib is imported by the render process, not by the web app
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.figure import Figure
+    return Figure(figsize=(5, 4))
+
+def _save(figure, save_path=None):
+    """Write the figure to `save_path` (a path or file object), or return the PNG bytes"""
+    figure.tight_layout()
+    if save_path is not None:
+        figure.savefig(save_path, format='png')
+        return None
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+def plot_employee_statuses(save_path=None, biography_csv=EMPLOYEE_BIOGRAPHY_CSV, data=None):
+    """Draw `data` from employee_chart_data(), or the counts from `biography_csv`"""
+    title, labels, sizes = data or employee_status_counts(biography_csv)
+
+    # A Figure per call instead of pyplot's global state, so renders can run concurrently
+    figure = _new_figure()
+    axes = figure.subplots()
+    axes.pie(sizes, labels=labels, autopct='%1.1f%%', colors=COLORS[:len(labels)], startangle=140)
+    axes.set_title(title)
+    return _save(figure, save_path)
+
+def plot_vehicles_deployed(save_path=None, vehicle_csv=VEHICLE_CSV, biography_csv=EMPLOYEE_BIOGRAPHY_CSV, data=None):
+    """Draw `data` from vehicle_chart_data(), or the counts from the CSVs"""
+    deployed, available = data or vehicle_deployment_counts(vehicle_csv, biography_csv)
+    figure = _new_figure()
+    axes = figure.subplots()
+    axes.bar(['Deployed', 'Available'], [deployed, available], color=['#1579c0', '#b2dbf8'])
+    axes.set_title('Vehicles Deployment')
+    axes.set_ylabel('Count')
+    return _save(figure, save_path)
@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from sqlalchemy import select
+from utils.lazy_import import lazy_import
+
+pd = lazy_import('pandas')
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MANIFEST = os.path.join(PROJECT_ROOT, 'hexahaul_db', 'seed_manifest.json')
+DEFAULT_CHUNKSIZE = 50000
+
+_manifest_lock = threading.Lock()
+
+
+def file_checksum(path, block_size=1 << 20):
+    """SHA-256 of a file, read a block at a time"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def first_column(df, *names, default=None):
+    """The first of `names` present in `df`, as a Series; `default` everywhere when none is"""
+    for name in names:
+        if name in df.columns:
+            return df[name]
+    return pd.Series(default, index=df.index, dtype=object)
+
+
+def to_records(df):
+    """DataFrame rows as dicts with NaN/NaT turned into None, ready for executemany"""
+    return df.astype(object).where(pd.notnull(df), None).to_dict('records')
+
+
+class BulkCsvLoader:
+    """
+    Seeds a table from a CSV in constant memory.
+
+    The CSV is read `chunksize` rows at a time with explicit dtypes, each
+    chunk is turned into table rows by a vectorized `transform(chunk)`
+    returning a DataFrame, and the rows are inserted with one Core
+    executemany per chunk, each chunk in its own transaction.
+
+    A JSON manifest records the checksum of every seed once it is fully
+    loaded. On restart a non-empty table is only skipped when its entry is
+    complete and matches the seed (the file is only hashed again when its
+    size or mtime changed). An entry still marked incomplete means a load
+    was interrupted between chunks, so the table is reloaded from scratch.
+    A changed seed, or rows the manifest knows nothing about, are reported
+    and left alone, never recorded as loaded; load(replace=True) reloads.
+    """
+    def __init__(self, engine, manifest_path=None, chunksize=None):
+        self.engine = engine
+        self.manifest_path = manifest_path or os.getenv("SEED_MANIFEST", DEFAULT_MANIFEST)
+        self.chunksize = chunksize or int(os.getenv("SEED_CHUNKSIZE", DEFAULT_CHUNKSIZE))
+
+    def __read_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as manifest:
+                return json.load(manifest)
+        except (OSError, ValueError):
+            return {}
+
+    def __record(self, key, entry):
+        with _manifest_lock:
+            manifest = self.__read_manifest()
+            manifest[key] = entry
+            # Forget databases that have since been deleted (e.g. temporary test copies)
+            manifest = {name: value for name, value in manifest.items()
+                        if name.startswith(':memory:') or os.path.exists(name.rsplit('::', 1)[0])}
+            os.makedirs(os.path.dirname(os.path.abspath(self.manifest_path)), exist_ok=True)
+            temp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(manifest, file, indent=2, sort_keys=True)
+            os.replace(temp_path, self.manifest_path)
+
+    @staticmethod
+    def __checksum(csv_path, stat, entry):
+        if entry and entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+            return entry['sha256']
+        return file_checksum(csv_path)
+
+    def manifest_key(self, table):
+        database = self.engine.url.database
+        return f"{os.path.abspath(database) if database else ':memory:'}::{table.name}"
+
+    def manifest_entry(self, table):
+        return self.__read_manifest().get(self.manifest_key(table))
+
+    def has_rows(self, table):
+        with self.engine.connect() as conn:
+            return conn.execute(select(1).select_from(table).limit(1)).first() is not None
+
+    def load(self, table, csv_path, transform, dtype=None, replace=False, **read_options):
+        """
+        Load `csv_path` into `table`
+
+        Returns the number of rows inserted, 0 when the seed was skipped,
+        or None when the CSV does not exist.
+        """
+        if not os.path.exists(csv_path):
+            return None
+        stat = os.stat(csv_path)
+        key = self.manifest_key(table)
+        entry = self.__read_manifest().get(key)
+
+        if not replace and self.has_rows(table):
+            if entry is not None and entry.get('complete') is False:
+                print(f"Warning: the last seed of {table.name} did not finish; reloading it")
+                replace = True
+            elif entry is None or entry.get('rows') is None:
+                # No record of loading these rows (e.g. cut short before the manifest tracked it)
+                print(f"Warning: {table.name} has rows the seed manifest has no complete load for; "
+                      f"not seeding it from {os.path.basename(csv_path)} (load with replace=True to reseed)")
+                return 0
+            elif entry['sha256'] == self.__checksum(csv_path, stat, entry):
+                return 0
+            else:
+                print(f"Warning: {os.path.basename(csv_path)} changed since {table.name} was seeded; "
+                      f"keeping the current rows (load with replace=True to reseed)")
+                return 0
+
+        checksum = self.__checksum(csv_path, stat, entry)
+        # Marked incomplete until the last chunk is in, so a crash in between is caught on restart
+        self.__record(key, {'sha256': checksum, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                            'rows': None, 'complete': False, 'loaded_at': time.time(),
+                            'csv': os.path.abspath(csv_path)})
+        started = time.perf_counter()
+        inserted = 0
+        columns = {column.name for column in table.columns}
+        if replace:
+            with self.engine.begin() as conn:
+                conn.execute(table.delete())
+        for chunk in pd.read_csv(csv_path, dtype=dtype, chunksize=self.chunksize, **read_options):
+            rows = transform(chunk)
+            if rows is None or rows.empty:
+                continue
+            rows = rows[[name for name in rows.columns if name in columns]]
+            with self.engine.begin() as conn:
+                # OR IGNORE: rows clashing with a unique key are skipped, as the row-by-row loaders did
+                result = conn.execute(table.insert().prefix_with("OR IGNORE"), to_records(rows))
+            inserted += result.rowcount if result.rowcount >= 0 else len(rows)
+
+        self.__record(key, {'sha256': checksum, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                            'rows': inserted, 'complete': True, 'loaded_at': time.time(),
+                            'csv': os.path.abspath(csv_path)})
+        print(f"Seeded {table.name} with {inserted} rows from {os.path.basename(csv_path)} "
+              f"in {time.perf_counter() - started:.2f}s")
+        return inserted
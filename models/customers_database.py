@@ -1,10 +1,15 @@
 import os
 import csv
-import pandas as pd
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, Float, String, DateTime, func
+from sqlalchemy import Column, Integer, Float, String, DateTime, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from models.sqlite_engine import create_sqlite_engine, create_tables
+from models.bulk_loader import BulkCsvLoader
+from models.session_manager import session_manager
+from utils.lazy_import import lazy_import
+
+pd = lazy_import('pandas')
 
 Base = declarative_base()
 
@@ -36,6 +41,31 @@ class Customer(Base):
             'segment': self.segment
         }
 
+CUSTOMER_CSV_COLUMNS = [
+    'Order Item Id', 'Customer Fname', 'Customer Lname',
+    'Customer Id', 'Customer City', 'Customer Country', 'Customer Segment'
+]
+
+def customer_rows():
+    """Transform for hh_customer_info.csv chunks that keeps the first row per Customer Id across the whole file"""
+    seen = set()
+
+    def transform(chunk):
+        chunk = chunk.drop_duplicates('Customer Id')
+        chunk = chunk[~chunk['Customer Id'].isin(seen)]
+        seen.update(chunk['Customer Id'])
+        return pd.DataFrame({
+            'customer_id': chunk['Customer Id'],
+            'order_item_id': chunk['Order Item Id'],
+            'first_name': chunk['Customer Fname'],
+            'last_name': chunk['Customer Lname'],
+            'city': chunk['Customer City'],
+            'country': chunk['Customer Country'],
+            'segment': chunk['Customer Segment']
+        }, index=chunk.index)
+
+    return transform
+
 class CustomerDatabase:
     def __init__(self, db_path=None):
         if db_path is None:
@@ -49,18 +79,22 @@ class CustomerDatabase:
         # Check if database file exists
         db_exists = os.path.exists(db_path) and os.path.getsize(db_path) > 0
         
-        # Create engine with echo for debugging
-        self.engine = create_engine(f'sqlite:///{db_path}', echo=True)
+        # Shared, tuned engine; set SQLITE_ECHO=1 to log its SQL
+        self.engine = create_sqlite_engine(db_path)
         
         # Create all tables
-        Base.metadata.create_all(self.engine)
+        create_tables(Base.metadata, self.engine)
         self.Session = sessionmaker(bind=self.engine)
+        self.session_name = session_manager.register(f"customers:{os.path.abspath(db_path)}", self.Session)
         
-        # Initialize with CSV data if the table is empty
-        session = self.Session()
-        if session.query(Customer).count() == 0:
-            self._load_csv_data()
-        session.close()
+        # Initialize with CSV data if the table is empty; an unchanged seed is skipped via the manifest
+        self._load_csv_data()
+    
+    def connect(self):
+        return session_manager.connect(self.session_name)
+    
+    def disconnect(self, session=None):
+        session_manager.disconnect(self.session_name, session)
     
     def _load_csv_data(self):
         try:
@@ -72,74 +106,24 @@ class CustomerDatabase:
                 print(f"CSV file not found: {csv_path}")
                 return
             
-            # Read CSV file
-            df = pd.read_csv(csv_path)
-            print(f"Loaded CSV with columns: {df.columns.tolist()}")
-            
-            # Check for required columns
-            required_columns = [
-                'Order Item Id', 'Customer Fname', 'Customer Lname', 
-                'Customer Id', 'Customer City', 'Customer Country', 'Customer Segment'
-            ]
-            
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            if missing_columns:
-                print(f"Missing columns in CSV: {missing_columns}")
-                return
-            
-            # Convert DataFrame to list of dictionaries
-            customers_data = df.to_dict('records')
-            
-            # Insert into database
-            session = self.Session()
-            
-            # Clear existing data
-            session.query(Customer).delete()
-            session.commit()
-            
-            # Track processed customer IDs to avoid duplicates
-            processed_customer_ids = set()
-            
-            print(f"Loading {len(customers_data)} records into database")
-            for data in customers_data:
-                try:
-                    customer_id = str(data['Customer Id'])
-                    
-                    # Skip duplicates (based on customer_id)
-                    if customer_id in processed_customer_ids:
-                        continue
-                        
-                    customer = Customer(
-                        customer_id=customer_id,
-                        order_item_id=data['Order Item Id'],
-                        first_name=data['Customer Fname'],
-                        last_name=data['Customer Lname'],
-                        city=data['Customer City'],
-                        country=data['Customer Country'],
-                        segment=data['Customer Segment']
-                    )
-                    session.add(customer)
-                    processed_customer_ids.add(customer_id)
-                except Exception as e:
-                    print(f"Error adding customer record: {e}")
-            
-            session.commit()
-            session.close()
-            print(f"CSV data loaded successfully. Added {len(processed_customer_ids)} unique customers.")
+            loaded = BulkCsvLoader(self.engine).load(Customer.__table__, csv_path, customer_rows(), dtype=str,
+                                                     usecols=CUSTOMER_CSV_COLUMNS)
+            if loaded:
+                print(f"CSV data loaded successfully. Added {loaded} unique customers.")
             
         except Exception as e:
             print(f"Error loading CSV data: {e}")
     
     def get_all_customers(self):
         """Return all customers in the database"""
-        session = self.Session()
+        session = self.connect()
         customers = session.query(Customer).all()
-        session.close()
+        self.disconnect(session)
         return customers
         
     def get_customer_stats(self):
         """Return statistics about customers"""
-        session = self.Session()
+        session = self.connect()
         total_count = session.query(Customer).count()
         corporate_count = session.query(Customer).filter(Customer.segment == 'Corporate').count()
         consumer_count = session.query(Customer).filter(Customer.segment == 'Consumer').count()
@@ -152,7 +136,7 @@ class CustomerDatabase:
         
         top_city = city_counts[0][0] if city_counts else "N/A"
         
-        session.close()
+        self.disconnect(session)
         
         return {
             'total_count': total_count,
@@ -164,24 +148,24 @@ class CustomerDatabase:
 
     def get_customer_by_id(self, customer_id):
         """Get a customer by ID"""
-        session = self.Session()
+        session = self.connect()
         customer = session.query(Customer).filter_by(customer_id=customer_id).first()
-        session.close()
+        self.disconnect(session)
         return customer
 
     def add_customer(self, **kwargs):
         """Add a new customer"""
-        session = self.Session()
+        session = self.connect()
         customer = Customer(**kwargs)
         session.add(customer)
         session.commit()
         new_id = customer.id
-        session.close()
+        self.disconnect(session)
         return new_id
         
     def update_customer(self, customer_id, **kwargs):
         """Update a customer by ID"""
-        session = self.Session()
+        session = self.connect()
         customer = session.query(Customer).filter_by(customer_id=customer_id).first()
         if customer:
             for key, value in kwargs.items():
@@ -191,12 +175,12 @@ class CustomerDatabase:
             result = True
         else:
             result = False
-        session.close()
+        self.disconnect(session)
         return result
         
     def delete_customer(self, customer_id):
         """Delete a customer by ID"""
-        session = self.Session()
+        session = self.connect()
         customer = session.query(Customer).filter_by(customer_id=customer_id).first()
         if customer:
             session.delete(customer)
@@ -204,31 +188,31 @@ class CustomerDatabase:
             result = True
         else:
             result = False
-        session.close()
+        self.disconnect(session)
         return result
 
     def get_segment_data(self):
         """Get customer count by segment for chart displays"""
-        session = self.Session()
+        session = self.connect()
         segments = session.query(
             Customer.segment, 
             func.count(Customer.id).label('count')
         ).group_by(Customer.segment).all()
         
         result = {segment: count for segment, count in segments}
-        session.close()
+        self.disconnect(session)
         return result
 
     def get_city_data(self):
         """Get customer count by city for chart displays"""
-        session = self.Session()
+        session = self.connect()
         cities = session.query(
             Customer.city, 
             func.count(Customer.id).label('count')
         ).group_by(Customer.city).order_by(func.count(Customer.id).desc()).limit(10).all()
         
         result = {city: count for city, count in cities}
-        session.close()
+        self.disconnect(session)
         return result
 
 # Test function to verify database connection
@@ -1,9 +1,15 @@
 import os
 import datetime
-import pandas as pd
-from sqlalchemy import create_engine, Column, Integer, String, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.orm import sessionmaker
+from models.sqlite_engine import create_sqlite_engine, create_tables
+from models.bulk_loader import BulkCsvLoader, first_column
+from models.session_manager import session_manager
+from utils.lazy_import import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
 
 Base = declarative_base()
 
@@ -28,95 +34,76 @@ class Employee(Base):
     assigned_vehicle = Column(Integer)
     status = Column(String, default='Active')
 
+EMPLOYEE_CSV_DTYPES = {
+    'Employee Id': 'Int64', 'First Name': str, 'Last Name': str, 'Gender': str, 'Age': 'Int64',
+    'Birthdate': str, 'birth_date': str, 'Contact Number': str
+}
+
+def employee_rows(chunk):
+    """Map a chunk of hh_employee_biography.csv onto employees rows; role and department follow the ID ranges"""
+    employee_id = chunk['Employee Id']
+    first_name = chunk['First Name'].fillna('')
+    last_name = chunk['Last Name'].fillna('')
+    ranges = [employee_id.between(201, 240).fillna(False), employee_id.between(150, 200).fillna(False),
+              employee_id.between(100, 149).fillna(False)]
+    role = pd.Series(np.select(ranges, ['Driver', 'Dispatcher', 'Manager'], 'Admin'), index=chunk.index)
+    driver = role == 'Driver'
+    return pd.DataFrame({
+        'employee_id': employee_id,
+        'first_name': chunk['First Name'],
+        'last_name': chunk['Last Name'],
+        'full_name': first_name + ' ' + last_name,
+        'gender': chunk['Gender'],
+        'age': chunk['Age'],
+        'birthdate': first_column(chunk, 'Birthdate', 'birth_date'),
+        'contact_number': chunk['Contact Number'],
+        'email': first_name.str.lower() + '.' + last_name.str.lower() + '@hexahaul.com',
+        'department': np.select(ranges, ['Operations', 'Logistics', 'Management'], 'Admin'),
+        'role': role,
+        # In a real application, this would be actual data
+        'hire_date': '2020-01-01',
+        'license_number': ('LIC-' + employee_id.astype(str)).where(driver, None),
+        'license_expiry': pd.Series('2025-12-31', index=chunk.index).where(driver, None),
+        'assigned_vehicle': employee_id.where(driver, None),
+        'status': 'Active'
+    }, index=chunk.index)
+
 class EmployeeDatabase:
     def __init__(self, db_path="employees.db"):
         self.db_path = db_path
-        self.engine = create_engine(f'sqlite:///{db_path}')
+        self.engine = create_sqlite_engine(db_path)
         self.session_factory = sessionmaker(bind=self.engine)
-        self.Session = scoped_session(self.session_factory)
+        self.session_name = session_manager.register(f"employees:{os.path.abspath(db_path)}", self.session_factory)
         self.initialize_database()
         
     def connect(self):
-        return self.Session()
+        return session_manager.connect(self.session_name)
         
-    def disconnect(self):
-        self.Session.remove()
+    def disconnect(self, session=None):
+        session_manager.disconnect(self.session_name, session)
             
     def initialize_database(self):
-        Base.metadata.create_all(self.engine)
+        create_tables(Base.metadata, self.engine)
         
-        # Check if data already exists
-        session = self.connect()
-        count = session.query(Employee).count()
-        if count == 0:
-            self.populate_from_csv()
-        self.disconnect()
+        # Seeds an empty table; an unchanged seed is skipped via the manifest
+        self.populate_from_csv()
         
     def populate_from_csv(self):
         csv_path = os.path.join('hexahaul_db', 'hh_employee_biography.csv')
         
-        # Check if the CSV file exists
-        if not os.path.exists(csv_path):
-            # If CSV file is not found, use default data
-            self.populate_initial_data()
-            return
-            
-        # Read data from CSV file using pandas
         try:
-            df = pd.read_csv(csv_path)
-            session = self.connect()
-            
-            # Map CSV columns to our database schema
-            for _, row in df.iterrows():
-                # Determine role and department based on ID
-                employee_id = row['Employee Id']
-                if employee_id >= 201 and employee_id <= 240:
-                    role = "Driver"
-                    department = "Operations"
-                elif employee_id >= 150 and employee_id <= 200:
-                    role = "Dispatcher"
-                    department = "Logistics"
-                elif employee_id >= 100 and employee_id <= 149:
-                    role = "Manager"
-                    department = "Management"
-                else:
-                    role = "Admin"
-                    department = "Admin"
-                
-                # Generate email from name
-                email = f"{row['First Name'].lower()}.{row['Last Name'].lower()}@hexahaul.com"
-                
-                # Calculate hire date (use a random date in the past 5 years)
-                # In a real application, this would be actual data
-                hire_date = "2020-01-01"
-                
-                # Create new Employee object
-                employee = Employee(
-                    employee_id=employee_id,
-                    first_name=row['First Name'],
-                    last_name=row['Last Name'],
-                    full_name=f"{row['First Name']} {row['Last Name']}",
-                    gender=row['Gender'],
-                    age=row['Age'],
-                    birthdate=row['Birthdate'],
-                    contact_number=row['Contact Number'],
-                    email=email,
-                    department=department,
-                    role=role,
-                    hire_date=hire_date,
-                    license_number=None if role != "Driver" else f"LIC-{employee_id}",
-                    license_expiry=None if role != "Driver" else "2025-12-31",
-                    assigned_vehicle=None if role != "Driver" else employee_id,
-                    status="Active"
-                )
-                session.add(employee)
-            
-            session.commit()
-            self.disconnect()
+            loaded = BulkCsvLoader(self.engine).load(Employee.__table__, csv_path, employee_rows, dtype=EMPLOYEE_CSV_DTYPES)
         except Exception as e:
             print(f"Error loading data from CSV: {e}")
-            # Fallback to default data if CSV loading fails
-            self.populate_initial_data()
+            loaded = None
+        
+        # If the CSV is missing or unreadable, use default data
+        if loaded is None:
+            session = self.connect()
+            count = session.query(Employee).count()
+            self.disconnect()
+            if count == 0:
+                self.populate_initial_data()
     
     def populate_initial_data(self):
         session = self.connect()
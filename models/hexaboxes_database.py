@@ -1,13 +1,19 @@
 import os
 import datetime
-import pandas as pd
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, Date, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, Boolean, Date, ForeignKey, DateTime
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.orm import sessionmaker
 import random
 from datetime import datetime, timedelta
 import time
 from sqlalchemy.exc import IntegrityError
+from models.sqlite_engine import create_sqlite_engine, create_tables
+from models.bulk_loader import BulkCsvLoader, first_column
+from models.session_manager import session_manager
+from utils.lazy_import import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
 
 Base = declarative_base()
 
@@ -82,35 +88,103 @@ class Order(Base):
         }
         return status_mapping.get(self.delivery_status, "Pending")
 
+ORDER_CSV_DTYPES = {
+    'Order Id': 'Int64', 'Tracking ID': str, 'Order Item Id': str, 'Delivery Status': str,
+    'Late_delivery_risk': 'Int64', 'Origin Branch': str, 'Order City': str, 'Order Country': str,
+    'order date (DateOrders)': str, 'Days for shipment (scheduled)': 'Int64', 'driver_id': 'Int64', 'unit_name': str
+}
+
+# Generated names and package sizes for the HexaBox UI
+SENDER_FIRST_NAMES = ["John", "Jane", "Michael", "Emily", "Robert", "Sarah", "David", "Linda",
+                      "James", "Maria", "William", "Jennifer", "Richard", "Elizabeth", "Joseph",
+                      "Patricia", "Thomas", "Barbara", "Charles", "Susan"]
+SENDER_LAST_NAMES = ["Smith", "Johnson", "Brown", "Garcia", "Miller", "Davis", "Rodriguez",
+                     "Martinez", "Hernandez", "Lopez", "Wilson", "Anderson", "Taylor", "Thomas",
+                     "Moore", "Jackson", "Martin", "Lee", "Thompson", "White"]
+PACKAGE_SIZES = ["Small", "Medium", "Large", "Extra Large"]
+
+def order_rows(seed=None):
+    """
+    Transform for hh_order.csv chunks. Tracking IDs come from Order Id (or
+    the row id when the export has none); sender, recipient, size and weight
+    are generated for the UI. Columns missing from the export stay empty.
+    """
+    rng = np.random.default_rng(seed)
+
+    def names(count):
+        return pd.Series(rng.choice(SENDER_FIRST_NAMES, count)) + ' ' + pd.Series(rng.choice(SENDER_LAST_NAMES, count))
+
+    def transform(chunk):
+        count = len(chunk)
+        order_id = first_column(chunk, 'Order Id')
+        row_id = pd.to_numeric(first_column(chunk, 'Order Id', 'id'), errors='coerce')
+        row_id = row_id.fillna(pd.Series(rng.integers(1000000, 9999999, count), index=chunk.index)).astype('int64')
+        order_date = pd.to_datetime(chunk['order date (DateOrders)'], format='%Y-%m-%d', errors='coerce')
+        scheduled = pd.to_numeric(first_column(chunk, 'Days for shipment (scheduled)'), errors='coerce')
+        eta = order_date + pd.to_timedelta(scheduled, unit='D')
+        city = first_column(chunk, 'Order City')
+        country = first_column(chunk, 'Order Country')
+        unit_name = first_column(chunk, 'unit_name').fillna('Vehicle')
+        late = pd.to_numeric(chunk['Late_delivery_risk'], errors='coerce').fillna(0) == 1
+
+        rows = pd.DataFrame({
+            'tracking_id': 'HX-' + row_id.map('{:012d}'.format),
+            'order_id': pd.to_numeric(order_id, errors='coerce').fillna(0).astype('int64'),
+            # The CSV's own tracking reference is kept as order_item_id
+            'order_item_id': first_column(chunk, 'Tracking ID', 'Order Item Id').fillna('').astype(str).str.strip(),
+            'days_for_shipping_real': first_column(chunk, 'Days for shipping (real)'),
+            'days_for_shipment_scheduled': scheduled,
+            'delivery_status': chunk['Delivery Status'],
+            'late_delivery_risk': late,
+            'market': first_column(chunk, 'Market'),
+            'order_city': city,
+            'order_country': country,
+            'order_region': first_column(chunk, 'Order Region'),
+            'order_state': first_column(chunk, 'Order State'),
+            'order_status': first_column(chunk, 'Order Status'),
+            'origin_branch': chunk['Origin Branch'],
+            'branch_latitude': chunk['Branch Latitude'],
+            'branch_longitude': chunk['Branch Longitude'],
+            'customer_latitude': chunk['Customer Latitude'],
+            'customer_longitude': chunk['Customer Longitude'],
+            'order_date': chunk['order date (DateOrders)'],
+            'driver_id': chunk['driver_id'],
+            'unit_name': first_column(chunk, 'unit_name'),
+            'sender': names(count).values,
+            'recipient': names(count).values,
+            'origin': chunk['Origin Branch'] + ', Philippines',
+            'destination': (city + ', ' + country).where(city.notna() & country.notna(), None),
+            'package_size': rng.choice(PACKAGE_SIZES, count),
+            'weight': np.round(rng.uniform(0.5, 25.0, count), 2),
+            # Fallback dates where the order date cannot be parsed, as before
+            'date_shipped': order_date.dt.strftime('%Y-%m-%d').fillna('2023-01-01'),
+            'eta': eta.dt.strftime('%Y-%m-%d').fillna(order_date.dt.strftime('%Y-%m-%d')).fillna('2023-01-05'),
+            'assigned_vehicle': unit_name + ' (ID: ' + chunk['driver_id'].astype(str) + ')',
+            'notes': np.where(late, "This package has a high risk of late delivery. Please prioritize.", "")
+        }, index=chunk.index)
+        return rows.drop_duplicates('tracking_id')
+
+    return transform
+
 class HexaBoxesDatabase:
     def __init__(self, db_path="hexaboxes.db"):
         self.db_path = db_path
-        self.engine = create_engine(f'sqlite:///{db_path}')
+        self.engine = create_sqlite_engine(db_path)
         self.session_factory = sessionmaker(bind=self.engine)
-        self.Session = scoped_session(self.session_factory)
+        self.session_name = session_manager.register(f"orders:{os.path.abspath(db_path)}", self.session_factory)
         self.initialize_database()
         
     def connect(self):
-        return self.Session()
+        return session_manager.connect(self.session_name)
         
-    def disconnect(self):
-        self.Session.remove()
+    def disconnect(self, session=None):
+        session_manager.disconnect(self.session_name, session)
             
     def initialize_database(self):
-        Base.metadata.create_all(self.engine)
+        create_tables(Base.metadata, self.engine)
         
-        # Check if data already exists
-        session = self.connect()
-        try:
-            count = session.query(Order).count()
-            session.close()
-            if count == 0:
-                self.populate_from_csv()
-        except Exception as e:
-            session.rollback()
-            print(f"Error checking database: {e}")
-            session.close()
-            self.disconnect()
+        # Seeds an empty table; an unchanged seed is skipped via the manifest
+        self.populate_from_csv()
     
     def generate_unique_tracking_id(self, order_id):
         # Generate a unique tracking ID by combining order ID with timestamp
@@ -120,177 +194,21 @@ class HexaBoxesDatabase:
     def populate_from_csv(self):
         csv_path = os.path.join('hexahaul_db', 'hh_order.csv')
         
-        # Check if the CSV file exists
-        if not os.path.exists(csv_path):
-            # If CSV file is not found, use default data
-            self.populate_initial_data()
-            return
-            
-        # Read data from CSV file using pandas
         try:
-            df = pd.read_csv(csv_path)
-            session = self.connect()
-            
-            # Generate random names for senders and recipients
-            first_names = ["John", "Jane", "Michael", "Emily", "Robert", "Sarah", "David", "Linda", 
-                          "James", "Maria", "William", "Jennifer", "Richard", "Elizabeth", "Joseph", 
-                          "Patricia", "Thomas", "Barbara", "Charles", "Susan"]
-            last_names = ["Smith", "Johnson", "Brown", "Garcia", "Miller", "Davis", "Rodriguez", 
-                         "Martinez", "Hernandez", "Lopez", "Wilson", "Anderson", "Taylor", "Thomas", 
-                         "Moore", "Jackson", "Martin", "Lee", "Thompson", "White"]
-            
-            # Package sizes
-            sizes = ["Small", "Medium", "Large", "Extra Large"]
-            
-            # Process rows in batches to handle large CSV files
-            batch_size = 100
-            total_processed = 0
-            
-            for i in range(0, len(df), batch_size):
-                batch = df.iloc[i:i+batch_size]
-                
-                for _, row in batch.iterrows():
-                    try:
-                        # Format the tracking ID with HX- prefix to match UI format
-                        # If order_id is available, use it to create a tracking ID; otherwise create a random one
-                        if 'Order Id' in row and not pd.isna(row['Order Id']):
-                            order_id = int(row['Order Id'])
-                            tracking_id = f"HX-{order_id:012d}"  # Zero-pad to 12 digits
-                        else:
-                            # Generate a random order ID
-                            random_id = random.randint(1000000, 9999999)
-                            tracking_id = f"HX-{random_id:012d}"
-                        
-                        # If we have a Tracking ID column in the CSV, use its value instead of the generated value
-                        if 'Tracking ID' in row and not pd.isna(row['Tracking ID']):
-                            # Store the original tracking ID from CSV as order_item_id
-                            csv_tracking_id = str(row['Tracking ID']).strip()
-                        else:
-                            csv_tracking_id = ""
-                        
-                        # Generate random sender and recipient
-                        sender = f"{random.choice(first_names)} {random.choice(last_names)}"
-                        recipient = f"{random.choice(first_names)} {random.choice(last_names)}"
-                        
-                        # Generate origin and destination
-                        origin = f"{row['Origin Branch']}, Philippines"
-                        destination = f"{row['Order City']}, {row['Order Country']}"
-                        
-                        # Generate package size and weight
-                        package_size = random.choice(sizes)
-                        weight = round(random.uniform(0.5, 25.0), 2)
-                        
-                        # Parse date and calculate ETA
-                        try:
-                            order_date = datetime.strptime(row['order date (DateOrders)'], '%Y-%m-%d')
-                            date_shipped = order_date.strftime('%Y-%m-%d')
-                            eta_date = order_date + timedelta(days=row['Days for shipment (scheduled)'])
-                            eta = eta_date.strftime('%Y-%m-%d')
-                        except:
-                            # Fallback if date parsing fails
-                            date_shipped = "2023-01-01"
-                            eta = "2023-01-05"
-                        
-                        # Map delivery status to package status
-                        status_mapping = {
-                            "Shipping on time": "In Transit",
-                            "Advance shipping": "In Transit",
-                            "Late delivery": "In Transit",
-                            "Shipping canceled": "Returned"
-                        }
-                        
-                        # Map order status
-                        order_status_mapping = {
-                            "COMPLETE": "Delivered",
-                            "CLOSED": "Delivered",
-                            "PENDING": "Pending",
-                            "PROCESSING": "In Transit",
-                            "ON_HOLD": "Pending",
-                            "PAYMENT_REVIEW": "Pending",
-                            "PENDING_PAYMENT": "Pending",
-                            "SUSPECTED_FRAUD": "Returned",
-                            "CANCELED": "Returned"
-                        }
-                        
-                        # Determine final status based on both delivery status and order status
-                        package_status = status_mapping.get(row['Delivery Status'], "In Transit")
-                        if row['Order Status'] in ["COMPLETE", "CLOSED"]:
-                            package_status = "Delivered"
-                        elif row['Order Status'] in ["SUSPECTED_FRAUD", "CANCELED"]:
-                            package_status = "Returned"
-                        
-                        # Assigned vehicle info
-                        assigned_vehicle = f"{row['unit_name']} (ID: {row['driver_id']})"
-                        
-                        # Create notes (optional field)
-                        if row['Late_delivery_risk'] == 1:
-                            notes = "This package has a high risk of late delivery. Please prioritize."
-                        else:
-                            notes = ""
-                        
-                        # Create new Order object
-                        order = Order(
-                            tracking_id=tracking_id,
-                            order_id=int(row['Order Id']) if 'Order Id' in row and not pd.isna(row['Order Id']) else 0,
-                            order_item_id=csv_tracking_id,  # Store the original tracking ID from CSV
-                            days_for_shipping_real=row['Days for shipping (real)'],
-                            days_for_shipment_scheduled=row['Days for shipment (scheduled)'],
-                            delivery_status=row['Delivery Status'],
-                            late_delivery_risk=bool(row['Late_delivery_risk']),
-                            market=row['Market'],
-                            order_city=row['Order City'],
-                            order_country=row['Order Country'],
-                            order_region=row['Order Region'],
-                            order_state=row['Order State'],
-                            order_status=row['Order Status'],
-                            origin_branch=row['Origin Branch'],
-                            branch_latitude=row['Branch Latitude'],
-                            branch_longitude=row['Branch Longitude'],
-                            customer_latitude=row['Customer Latitude'],
-                            customer_longitude=row['Customer Longitude'],
-                            order_date=row['order date (DateOrders)'],
-                            driver_id=row['driver_id'],
-                            unit_name=row['unit_name'],
-                            
-                            # Additional fields for UI
-                            sender=sender,
-                            recipient=recipient,
-                            origin=origin,
-                            destination=destination,
-                            package_size=package_size,
-                            weight=weight,
-                            date_shipped=date_shipped,
-                            eta=eta,
-                            assigned_vehicle=assigned_vehicle,
-                            notes=notes
-                        )
-                        session.add(order)
-                        
-                        # Try to commit each record individually
-                        try:
-                            session.commit()
-                            total_processed += 1
-                        except IntegrityError:
-                            # Skip duplicates and continue
-                            session.rollback()
-                            print(f"Skipping duplicate tracking ID: {tracking_id}")
-                            
-                    except Exception as e:
-                        session.rollback()
-                        print(f"Error processing row {total_processed}: {e}")
-            
-            self.disconnect()
-            print(f"Successfully imported {total_processed} orders from CSV.")
+            loaded = BulkCsvLoader(self.engine).load(Order.__table__, csv_path, order_rows(), dtype=ORDER_CSV_DTYPES)
         except Exception as e:
             print(f"Error loading data from CSV: {e}")
-            # Make sure to close and roll back the session
-            try:
-                session.rollback()
-                session.close()
-            except:
-                pass
-            # Fallback to default data if CSV loading fails
-            self.populate_initial_data()
+            loaded = None
+        
+        if loaded:
+            print(f"Successfully imported {loaded} orders from CSV.")
+        elif loaded is None:
+            # If the CSV is missing or unreadable, use default data
+            session = self.connect()
+            count = session.query(Order).count()
+            self.disconnect()
+            if count == 0:
+                self.populate_initial_data()
     
     def populate_initial_data(self):
         session = self.connect()
@@ -407,7 +325,6 @@ class HexaBoxesDatabase:
             session.rollback()
             print(f"Error in populate_initial_data: {e}")
         finally:
-            session.close()
             self.disconnect()
     
     def get_all_orders(self):
@@ -473,5 +390,4 @@ class HexaBoxesDatabase:
             print(f"Error adding order: {e}")
             return None
         finally:
-            session.close()
             self.disconnect()
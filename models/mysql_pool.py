@@ -0,0 +1,305 @@
+import os
+import threading
+import time
+from collections import deque
+
+from flask import g, has_app_context
+from utils.lazy_import import lazy_import
+
+mysql = lazy_import('mysql')
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled MySQL connection became available in time."""
+
+
+# Encapsulation: a raw connection owned by the pool, reused across checkouts
+class _PoolEntry:
+    def __init__(self, raw_connection, generation):
+        self.raw = raw_connection
+        self.generation = generation
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class PooledConnection:
+    """
+    Thin proxy around a raw mysql.connector connection for one checkout.
+    Calling close() hands the connection back to its pool instead of
+    tearing down the TCP/TLS session, so existing route code keeps working.
+    Every checkout gets its own proxy: closing it again (a route and then
+    the request teardown) is a no-op, and a closed proxy refuses further
+    use, as its connection may already belong to another caller.
+    """
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+        self.checked_out = True
+
+    @property
+    def raw(self):
+        return self._entry.raw
+
+    @property
+    def generation(self):
+        return self._entry.generation
+
+    @property
+    def created_at(self):
+        return self._entry.created_at
+
+    def close(self):
+        self._pool.release(self)
+
+    def __getattr__(self, name):
+        if not self.__dict__.get('checked_out'):
+            raise RuntimeError(f"MySQL connection already returned to the pool (accessing {name})")
+        return getattr(self._entry.raw, name)
+
+
+class MySQLConnectionPool:
+    """
+    Process-wide pool of warm MySQL connections.
+
+    The pool keeps up to `pool_size` idle connections and allows
+    `max_overflow` extra connections under bursts. Connections older than
+    `recycle` seconds are replaced, and (optionally) pinged before being
+    handed out. After a fork (e.g. gunicorn workers) the child process
+    drops the inherited connections and starts with an empty pool.
+    """
+    def __init__(self, connect_kwargs, pool_size=5, max_overflow=10, timeout=30.0,
+                 recycle=1800, pre_ping=True):
+        self._connect_kwargs = dict(connect_kwargs)
+        self.pool_size = max(1, int(pool_size))
+        self.max_overflow = max(0, int(max_overflow))
+        self.timeout = float(timeout)
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._total = 0
+        self._checked_out = 0
+        self._pid = os.getpid()
+        self.generation = 0
+
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._timeouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._invalidated = 0
+
+    @classmethod
+    def from_env(cls):
+        """Build a pool from the MYSQL_* and MYSQL_POOL_* environment variables."""
+        connect_kwargs = {
+            'host': os.getenv("MYSQL_HOST"),
+            'user': os.getenv("MYSQL_USER"),
+            'password': os.getenv("MYSQL_PASSWORD"),
+            'database': os.getenv("MYSQL_DATABASE"),
+            'port': int(os.getenv("MYSQL_PORT")),
+        }
+        return cls(
+            connect_kwargs,
+            pool_size=int(os.getenv("MYSQL_POOL_SIZE", 5)),
+            max_overflow=int(os.getenv("MYSQL_POOL_MAX_OVERFLOW", 10)),
+            timeout=float(os.getenv("MYSQL_POOL_TIMEOUT", 30)),
+            recycle=int(os.getenv("MYSQL_POOL_RECYCLE", 1800)),
+            pre_ping=os.getenv("MYSQL_POOL_PRE_PING", "1").lower() not in ("0", "false", "no")
+        )
+
+    def _check_fork(self):
+        # Connections inherited from a parent process share its sockets;
+        # forget them without closing so the parent is not disturbed.
+        if self._pid != os.getpid():
+            self._reset_after_fork()
+
+    def _reset_after_fork(self):
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._total = 0
+        self._checked_out = 0
+        self._pid = os.getpid()
+        self.generation += 1
+
+    def _create(self):
+        raw = mysql.connector.connect(**self._connect_kwargs)
+        self._created += 1
+        return _PoolEntry(raw, self.generation)
+
+    def _is_usable(self, entry):
+        if self.recycle is not None and self.recycle >= 0 and \
+                time.monotonic() - entry.created_at > self.recycle:
+            self._recycled += 1
+            return False
+        if self.pre_ping:
+            try:
+                entry.raw.ping(reconnect=False)
+            except Exception:
+                self._invalidated += 1
+                return False
+        return True
+
+    def _discard(self, entry):
+        try:
+            entry.raw.close()
+        except Exception:
+            pass
+
+    def acquire(self):
+        """Check out a connection, waiting up to `timeout` seconds when the pool is exhausted."""
+        self._check_fork()
+        entry = None
+        waited_since = None
+        with self._cond:
+            while True:
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                if self._total < self.pool_size + self.max_overflow:
+                    self._total += 1
+                    break
+                if waited_since is None:
+                    waited_since = time.monotonic()
+                    self._waits += 1
+                remaining = self.timeout - (time.monotonic() - waited_since)
+                if remaining <= 0:
+                    self._timeouts += 1
+                    self._wait_time += time.monotonic() - waited_since
+                    raise PoolTimeoutError(
+                        f"No MySQL connection available after {self.timeout:.1f}s "
+                        f"(pool_size={self.pool_size}, max_overflow={self.max_overflow})"
+                    )
+                self._cond.wait(remaining)
+            if waited_since is not None:
+                self._wait_time += time.monotonic() - waited_since
+            self._checked_out += 1
+            self._checkouts += 1
+
+        try:
+            if entry is not None and not self._is_usable(entry):
+                self._discard(entry)
+                entry = None
+            if entry is None:
+                entry = self._create()
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._checked_out -= 1
+                self._cond.notify()
+            raise
+
+        entry.last_used = time.monotonic()
+        return PooledConnection(self, entry)
+
+    def release(self, conn):
+        """
+        Return a checkout to the pool, closing its connection if the pool is
+        already full. Releasing the same checkout twice does nothing.
+        """
+        with self._cond:
+            if not conn.checked_out:
+                return
+            conn.checked_out = False
+        entry = conn._entry
+        entry.last_used = time.monotonic()
+
+        self._check_fork()
+        if entry.generation != self.generation:
+            # Handed out before a fork; the child must not reuse it.
+            return
+
+        keep = True
+        try:
+            if entry.raw.in_transaction:
+                entry.raw.rollback()
+        except Exception:
+            keep = False
+
+        with self._cond:
+            self._checked_out -= 1
+            if keep and len(self._idle) < self.pool_size:
+                self._idle.append(entry)
+                entry = None
+            else:
+                self._total -= 1
+            self._cond.notify()
+
+        if entry is not None:
+            self._discard(entry)
+
+    def dispose(self):
+        """Close every idle connection; checked-out ones are closed when released."""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._total -= len(idle)
+        for entry in idle:
+            self._discard(entry)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'pid': self._pid,
+                'pool_size': self.pool_size,
+                'max_overflow': self.max_overflow,
+                'total': self._total,
+                'idle': len(self._idle),
+                'checked_out': self._checked_out,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'wait_time_ms': round(self._wait_time * 1000, 2),
+                'avg_wait_ms': round(self._wait_time * 1000 / self._waits, 2) if self._waits else 0.0,
+                'timeouts': self._timeouts,
+                'connections_created': self._created,
+                'recycled': self._recycled,
+                'invalidated': self._invalidated
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide pool, creating it from the environment on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = MySQLConnectionPool.from_env()
+    return _pool
+
+
+def get_connection():
+    """
+    Check out a pooled connection. Inside a Flask request the connection
+    is also tracked on `g`, so anything a route forgets to close is
+    returned by the teardown hook registered in init_app().
+    """
+    conn = get_pool().acquire()
+    if has_app_context():
+        g.setdefault('_mysql_connections', []).append(conn)
+    return conn
+
+
+def release_request_connections(exc=None):
+    """Teardown hook: return every connection checked out during the request."""
+    connections = g.pop('_mysql_connections', None) if has_app_context() else None
+    for conn in connections or []:
+        conn.close()
+
+
+def init_app(app):
+    app.teardown_appcontext(release_request_connections)
+
+
+def _reset_pool_after_fork():
+    if _pool is not None:
+        _pool._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pool_after_fork)
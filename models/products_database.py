@@ -1,10 +1,15 @@
 import os
-import pandas as pd
 import sqlalchemy as sa
-from sqlalchemy import create_engine, Column, Integer, String, Float
+from sqlalchemy import Column, Integer, String, Float
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from models.bulk_loader import BulkCsvLoader
+from models.sqlite_engine import create_sqlite_engine, create_tables, storage_path
+from models.session_manager import session_manager
 import logging
+from utils.lazy_import import lazy_import
+
+pd = lazy_import('pandas')
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
@@ -35,6 +40,21 @@ class Product(Base):
             'department_name': self.department_name
         }
 
+def _clean_columns(chunk):
+    return chunk.rename(columns=lambda col: col.strip('"').lower().replace(' ', '_'))
+
+def product_rows(chunk):
+    """Map a chunk of hh_product_info.csv onto products rows"""
+    chunk = _clean_columns(chunk)
+    return pd.DataFrame({
+        'product_name': chunk['product_name'],
+        'order_item_id': chunk['order_item_id'],
+        'product_category_id': pd.to_numeric(chunk['product_category_id'], errors='coerce').astype('Int64'),
+        'product_category_name': chunk['product_category_name'],
+        'department_id': pd.to_numeric(chunk['department_id'], errors='coerce').astype('Int64'),
+        'department_name': chunk['department_name']
+    }, index=chunk.index)
+
 class ProductsDatabase:
     def __init__(self, db_path=None):
         # Use a specific database file if none provided
@@ -47,19 +67,19 @@ class ProductsDatabase:
         # Create database directory if it doesn't exist
         os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
         
-        # Use absolute path for SQLite connection with explicit URI for better diagnostics
-        db_uri = f'sqlite:///{os.path.abspath(db_path)}'
-        logger.info(f"Connecting to database with URI: {db_uri}")
+        # Log the resolved file (the consolidated store when SQLITE_STORE is set)
+        logger.info(f"Connecting to database at {storage_path(db_path)}")
         
         try:
-            self.engine = create_engine(db_uri)
+            self.engine = create_sqlite_engine(db_path)
             
             # Create tables explicitly
             logger.info("Creating database tables...")
-            Base.metadata.create_all(self.engine)
+            create_tables(Base.metadata, self.engine)
             logger.info("Tables created successfully")
             
             self.Session = sessionmaker(bind=self.engine)
+            self.session_name = session_manager.register(f"products:{os.path.abspath(db_path)}", self.Session)
             
             # Check if tables were created properly
             inspector = sa.inspect(self.engine)
@@ -76,11 +96,10 @@ class ProductsDatabase:
             raise
     
     def connect(self):
-        return self.Session()
+        return session_manager.connect(self.session_name)
     
     def disconnect(self, session=None):
-        if session:
-            session.close()
+        session_manager.disconnect(self.session_name, session)
     
     def load_from_csv(self):
         try:
@@ -92,69 +111,12 @@ class ProductsDatabase:
                 logger.error(f"CSV file not found: {csv_path}")
                 return
             
-            logger.info(f"Found CSV file at: {csv_path}")
-            
-            # Read the CSV file
-            df = pd.read_csv(csv_path)
-            logger.info(f"CSV loaded with {len(df)} rows")
-            
-            # Clean column names
-            df.columns = [col.strip('"').lower().replace(' ', '_') for col in df.columns]
-            logger.info(f"Columns after cleaning: {df.columns.tolist()}")
-            
-            # Check if data already exists
-            session = self.connect()
-            try:
-                existing_count = session.query(Product).count()
-                logger.info(f"Found {existing_count} existing records in database")
-                
-                if existing_count == 0:
-                    logger.info(f"Loading product data from CSV: {csv_path}")
-                    # Convert DataFrame to list of dictionaries
-                    records = df.to_dict('records')
-                    
-                    # Insert records into the database
-                    for i, record in enumerate(records):
-                        try:
-                            # Handle any missing values
-                            for key, value in record.items():
-                                if pd.isna(value):
-                                    record[key] = None
-                            
-                            product = Product(
-                                product_name=record['product_name'],
-                                order_item_id=record['order_item_id'],
-                                product_category_id=int(record['product_category_id']),
-                                product_category_name=record['product_category_name'],
-                                department_id=int(record['department_id']),
-                                department_name=record['department_name']
-                            )
-                            session.add(product)
-                            
-                            # Commit in batches to avoid memory issues
-                            if i % 50 == 0:
-                                session.commit()
-                                logger.info(f"Committed batch of records (up to {i})")
-                                
-                        except Exception as e:
-                            logger.error(f"Error processing record {i}: {e}")
-                            logger.error(f"Record data: {record}")
-                    
-                    # Final commit
-                    session.commit()
-                    logger.info(f"Loaded {len(records)} product records from CSV")
-                    
-                    # Verify data was loaded
-                    count_after = session.query(Product).count()
-                    logger.info(f"After loading, database has {count_after} records")
-                else:
-                    logger.info(f"Database already contains {existing_count} product records")
-            except Exception as e:
-                logger.error(f"Error querying or loading data: {e}")
-                session.rollback()
-                raise
-            finally:
-                session.close()
+            # Seeds an empty table in chunks; an unchanged seed is skipped via the manifest
+            loaded = BulkCsvLoader(self.engine).load(Product.__table__, csv_path, product_rows, dtype=str)
+            if loaded:
+                logger.info(f"Loaded {loaded} product records from CSV")
+            else:
+                logger.info("Product seed unchanged or table already populated; skipped CSV load")
         except Exception as e:
             logger.error(f"Error loading CSV data: {e}")
             raise
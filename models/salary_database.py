@@ -1,11 +1,16 @@
 import os
-import pandas as pd
 import sqlalchemy as sa
-from sqlalchemy import create_engine, Column, Integer, String, Float, Date, Boolean
+from sqlalchemy import Column, Integer, String, Float, Date, Boolean
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from models.bulk_loader import BulkCsvLoader
+from models.sqlite_engine import create_sqlite_engine, create_tables, storage_path
+from models.session_manager import session_manager
 from datetime import datetime
 import logging
+from utils.lazy_import import lazy_import
+
+pd = lazy_import('pandas')
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
@@ -46,6 +51,35 @@ class EmployeeSalary(Base):
             'total_compensation': self.total_compensation
         }
 
+def _clean_columns(chunk):
+    return chunk.rename(columns=lambda col: col.strip('"').lower().replace(' ', '_'))
+
+def salary_rows(chunk):
+    """Map a chunk of hh_employee_salary.csv onto employee_salaries rows"""
+    chunk = _clean_columns(chunk)
+
+    def number(column):
+        return pd.to_numeric(chunk[column], errors='coerce')
+
+    if 'years_of_experience_(company)' in chunk.columns:
+        years_company = number('years_of_experience_(company)')
+    else:
+        logger.warning("Missing years_of_experience_(company) column; using 0.0")
+        years_company = 0.0
+    return pd.DataFrame({
+        'employee_id': number('employee_id').astype('Int64'),
+        'job_title': chunk['job_title'],
+        'department': chunk['department'],
+        'salary_yearly': number('salary_yearly'),
+        'salary_monthly': number('salary_monthly'),
+        'hire_date': chunk['hire_date'],
+        'years_of_experience': number('years_of_experience').astype('Int64'),
+        'years_of_experience_company': years_company,
+        'performance_rating': number('performance_rating').round().astype('Int64'),
+        'bonus_amount': number('bonus_amount'),
+        'total_compensation': number('total_compensation')
+    }, index=chunk.index)
+
 class SalaryDatabase:
     def __init__(self, db_path=None):
         # Use a specific database file if none provided
@@ -58,19 +92,19 @@ class SalaryDatabase:
         # Create database directory if it doesn't exist
         os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
         
-        # Use absolute path for SQLite connection with explicit URI for better diagnostics
-        db_uri = f'sqlite:///{os.path.abspath(db_path)}'
-        logger.info(f"Connecting to database with URI: {db_uri}")
+        # Log the resolved file (the consolidated store when SQLITE_STORE is set)
+        logger.info(f"Connecting to database at {storage_path(db_path)}")
         
         try:
-            self.engine = create_engine(db_uri, echo=True)
+            self.engine = create_sqlite_engine(db_path)
             
             # Create tables explicitly
             logger.info("Creating database tables...")
-            Base.metadata.create_all(self.engine)
+            create_tables(Base.metadata, self.engine)
             logger.info("Tables created successfully")
             
             self.Session = sessionmaker(bind=self.engine)
+            self.session_name = session_manager.register(f"employee_salaries:{os.path.abspath(db_path)}", self.Session)
             
             # Check if tables were created properly
             inspector = sa.inspect(self.engine)
@@ -87,11 +121,10 @@ class SalaryDatabase:
             raise
     
     def connect(self):
-        return self.Session()
+        return session_manager.connect(self.session_name)
     
     def disconnect(self, session=None):
-        if session:
-            session.close()
+        session_manager.disconnect(self.session_name, session)
     
     def load_from_csv(self):
         try:
@@ -103,82 +136,12 @@ class SalaryDatabase:
                 logger.error(f"CSV file not found: {csv_path}")
                 return
             
-            logger.info(f"Found CSV file at: {csv_path}")
-            
-            # Read the CSV file
-            df = pd.read_csv(csv_path)
-            logger.info(f"CSV loaded with {len(df)} rows")
-            
-            # Clean column names
-            df.columns = [col.strip('"').lower().replace(' ', '_') for col in df.columns]
-            logger.info(f"Columns after cleaning: {df.columns.tolist()}")
-            
-            # Check if data already exists
-            session = self.connect()
-            try:
-                existing_count = session.query(EmployeeSalary).count()
-                logger.info(f"Found {existing_count} existing records in database")
-                
-                if existing_count == 0:
-                    logger.info(f"Loading salary data from CSV: {csv_path}")
-                    # Convert DataFrame to list of dictionaries
-                    records = df.to_dict('records')
-                    
-                    # Insert records into the database
-                    for i, record in enumerate(records):
-                        try:
-                            # Handle any missing values
-                            if pd.isna(record.get('department')):
-                                record['department'] = None
-                            
-                            # Fix column name for years_of_experience_company
-                            company_exp_key = 'years_of_experience_(company)'
-                            if company_exp_key in record:
-                                years_company = record[company_exp_key]
-                            else:
-                                logger.warning(f"Missing years_of_experience_(company) in record {i}")
-                                years_company = 0.0
-                            
-                            # Create and add employee salary record
-                            salary = EmployeeSalary(
-                                employee_id=int(record['employee_id']),
-                                job_title=record['job_title'],
-                                department=record['department'],
-                                salary_yearly=float(record['salary_yearly']),
-                                salary_monthly=float(record['salary_monthly']),
-                                hire_date=record['hire_date'],
-                                years_of_experience=int(record['years_of_experience']),
-                                years_of_experience_company=float(years_company),
-                                performance_rating=int(record['performance_rating']),
-                                bonus_amount=float(record['bonus_amount']),
-                                total_compensation=float(record['total_compensation'])
-                            )
-                            session.add(salary)
-                            
-                            # Commit in batches to avoid memory issues
-                            if i % 50 == 0:
-                                session.commit()
-                                logger.info(f"Committed batch of records (up to {i})")
-                                
-                        except Exception as e:
-                            logger.error(f"Error processing record {i}: {e}")
-                            logger.error(f"Record data: {record}")
-                    
-                    # Final commit
-                    session.commit()
-                    logger.info(f"Loaded {len(records)} salary records from CSV")
-                    
-                    # Verify data was loaded
-                    count_after = session.query(EmployeeSalary).count()
-                    logger.info(f"After loading, database has {count_after} records")
-                else:
-                    logger.info(f"Database already contains {existing_count} salary records")
-            except Exception as e:
-                logger.error(f"Error querying or loading data: {e}")
-                session.rollback()
-                raise
-            finally:
-                session.close()
+            # Seeds an empty table in chunks; an unchanged seed is skipped via the manifest
+            loaded = BulkCsvLoader(self.engine).load(EmployeeSalary.__table__, csv_path, salary_rows, dtype=str)
+            if loaded:
+                logger.info(f"Loaded {loaded} salary records from CSV")
+            else:
+                logger.info("Salary seed unchanged or table already populated; skipped CSV load")
         except Exception as e:
             logger.error(f"Error loading CSV data: {e}")
             raise
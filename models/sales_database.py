@@ -1,9 +1,15 @@
 import os
-import pandas as pd
-from sqlalchemy import create_engine, Column, Integer, Float, String, Date, func
+from sqlalchemy import Column, Integer, Float, String, Date, func, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
+from models.sqlite_engine import create_sqlite_engine, create_tables
+from models.sales_rollup import SalesRollup
+from models.bulk_loader import BulkCsvLoader
+from models.session_manager import session_manager
+from utils.lazy_import import lazy_import
+
+pd = lazy_import('pandas')
 
 Base = declarative_base()
 
@@ -30,56 +36,138 @@ class Sale(Base):
             'order_profit_per_order': self.order_profit_per_order
         }
 
+SALES_CSV_DTYPES = {
+    'Order Item Id': str, 'Type': str, 'Product Price': float, 'Order Item Quantity': 'Int64',
+    'Order Item Total': float, 'Order Profit Per Order': float, 'order date (DateOrders)': str
+}
+
+def sale_rows(chunk):
+    """Map a chunk of hh_sales.csv onto sales rows"""
+    return pd.DataFrame({
+        'order_item_id': chunk['Order Item Id'].fillna(''),
+        'payment_type': chunk['Type'].fillna(''),
+        'order_date': pd.to_datetime(chunk['order date (DateOrders)'], format='%Y-%m-%d', errors='coerce').dt.date,
+        'product_price': chunk['Product Price'].fillna(0),
+        'order_item_quantity': chunk['Order Item Quantity'].fillna(0),
+        'order_item_total': chunk['Order Item Total'].fillna(0),
+        'order_profit_per_order': chunk['Order Profit Per Order'].fillna(0)
+    }, index=chunk.index)
+
 class SalesDatabase:
     def __init__(self, db_path=None):
         if db_path is None:
             db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'database', 'hexahaul_sales.db')
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        self.engine = create_engine(f'sqlite:///{db_path}', echo=False)
-        Base.metadata.create_all(self.engine)
+        self.engine = create_sqlite_engine(db_path)
+        create_tables(Base.metadata, self.engine)
         self.Session = sessionmaker(bind=self.engine)
+        self.session_name = session_manager.register(f"sales:{os.path.abspath(db_path)}", self.Session)
+        self.rollup = SalesRollup()
         self._load_csv_to_db()
+        self._sync_rollups()
 
-    def _load_csv_to_db(self):
-        session = self.Session()
-        # Only load if table is empty
-        if session.query(Sale).count() == 0:
-            csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'hexahaul_db', 'hh_sales.csv')
-            if not os.path.exists(csv_path):
-                session.close()
-                return
-            df = pd.read_csv(csv_path)
-            for idx, row in df.iterrows():
-                try:
-                    sale = Sale(
-                        order_item_id=row.get('Order Item Id', ''),
-                        payment_type=row.get('Type', ''),
-                        order_date=datetime.strptime(str(row.get('order date (DateOrders)', '')), '%Y-%m-%d').date() if pd.notnull(row.get('order date (DateOrders)', '')) else None,
-                        product_price=float(row.get('Product Price', 0)) if pd.notnull(row.get('Product Price', 0)) else 0,
-                        order_item_quantity=int(row.get('Order Item Quantity', 0)) if pd.notnull(row.get('Order Item Quantity', 0)) else 0,
-                        order_item_total=float(row.get('Order Item Total', 0)) if pd.notnull(row.get('Order Item Total', 0)) else 0,
-                        order_profit_per_order=float(row.get('Order Profit Per Order', 0)) if pd.notnull(row.get('Order Profit Per Order', 0)) else 0
-                    )
-                    session.add(sale)
-                except Exception as e:
-                    print(f"Error loading row {idx}: {e}")
+    def connect(self):
+        return session_manager.connect(self.session_name)
+
+    def disconnect(self, session=None):
+        session_manager.disconnect(self.session_name, session)
+
+    @staticmethod
+    def _executor(session):
+        # SalesRollup issues plain SQL with named parameters
+        return lambda sql, params: session.execute(text(sql), params)
+
+    def _sync_rollups(self):
+        session = self.connect()
+        try:
+            if self.rollup.ensure(self._executor(session)):
+                print("Rebuilt sales rollups")
             session.commit()
-        session.close()
+        except Exception as e:
+            session.rollback()
+            print(f"Error syncing sales rollups: {e}")
+        finally:
+            self.disconnect(session)
+
+    def _load_csv_to_db(self):
+        # Seeds an empty table; an unchanged seed is skipped via the manifest
+        csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'hexahaul_db', 'hh_sales.csv')
+        try:
+            BulkCsvLoader(self.engine).load(Sale.__table__, csv_path, sale_rows, dtype=SALES_CSV_DTYPES)
+        except Exception as e:
+            print(f"Error loading sales from CSV: {e}")
 
     def get_all_sales(self):
-        session = self.Session()
+        session = self.connect()
         sales = session.query(Sale).all()
-        session.close()
+        self.disconnect(session)
         return sales
 
     def get_sales_stats(self):
-        session = self.Session()
+        session = self.connect()
         total_sales = session.query(func.count(Sale.id)).scalar() or 0
         total_revenue = session.query(func.sum(Sale.order_item_total)).scalar() or 0
         total_profit = session.query(func.sum(Sale.order_profit_per_order)).scalar() or 0
-        session.close()
+        self.disconnect(session)
         return {
             'total_sales': total_sales,
             'total_revenue': total_revenue,
             'total_profit': total_profit
         }
+
+    @staticmethod
+    def _sale_fields(data):
+        # The admin forms also post fields this table does not store
+        fields = {key: value for key, value in data.items() if key in Sale.__table__.columns.keys() and key != 'id'}
+        if isinstance(fields.get('order_date'), str):
+            fields['order_date'] = datetime.strptime(fields['order_date'], '%Y-%m-%d').date() if fields['order_date'] else None
+        return fields
+
+    def add_sale(self, **data):
+        session = self.connect()
+        try:
+            sale = Sale(**self._sale_fields(data))
+            session.add(sale)
+            session.flush()
+            # Same transaction as the sale, so the rollups never drift from it
+            self.rollup.apply(self._executor(session), sale.order_date, sale.order_item_total, sale.order_profit_per_order)
+            session.commit()
+            return sale.id
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            self.disconnect(session)
+
+    def update_sale(self, sale_id, **data):
+        session = self.connect()
+        try:
+            sale = session.get(Sale, sale_id)
+            if sale is None:
+                raise ValueError(f"Sale {sale_id} not found")
+            execute = self._executor(session)
+            self.rollup.apply(execute, sale.order_date, sale.order_item_total, sale.order_profit_per_order, sign=-1)
+            for key, value in self._sale_fields(data).items():
+                setattr(sale, key, value)
+            self.rollup.apply(execute, sale.order_date, sale.order_item_total, sale.order_profit_per_order)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            self.disconnect(session)
+
+    def delete_sale(self, sale_id):
+        session = self.connect()
+        try:
+            sale = session.get(Sale, sale_id)
+            if sale is None:
+                raise ValueError(f"Sale {sale_id} not found")
+            self.rollup.apply(self._executor(session), sale.order_date, sale.order_item_total, sale.order_profit_per_order, sign=-1)
+            session.delete(sale)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            self.disconnect(session)
@@ -0,0 +1,155 @@
+from datetime import date, datetime, timedelta
+
+# Grain -> SQL expression bucketing sales.order_date; weeks start on Monday
+GRAINS = {
+    'day': "date(order_date)",
+    'week': "date(order_date, 'weekday 0', '-6 days')",
+    'month': "strftime('%Y-%m', order_date)"
+}
+
+# Chart time range -> (grain, number of buckets, label format)
+TIME_RANGES = {
+    'week': ('day', 7, '%a'),
+    'month': ('day', 30, '%d %b'),
+    'quarter': ('week', 13, '%d %b'),
+    'year': ('month', 12, '%b %Y')
+}
+
+
+def bucket_for(order_date, grain):
+    """Python twin of GRAINS: the bucket key `order_date` falls into"""
+    if isinstance(order_date, str):
+        order_date = datetime.strptime(order_date[:10], '%Y-%m-%d').date()
+    elif isinstance(order_date, datetime):
+        order_date = order_date.date()
+    if grain == 'day':
+        return order_date.isoformat()
+    if grain == 'week':
+        return (order_date - timedelta(days=order_date.weekday())).isoformat()
+    return order_date.strftime('%Y-%m')
+
+
+def _previous_bucket(bucket, grain):
+    if grain == 'day':
+        return (date.fromisoformat(bucket) - timedelta(days=1)).isoformat()
+    if grain == 'week':
+        return (date.fromisoformat(bucket) - timedelta(days=7)).isoformat()
+    year, month = map(int, bucket.split('-'))
+    return f"{year - 1}-12" if month == 1 else f"{year}-{month - 1:02d}"
+
+
+def _label(bucket, grain, label_format):
+    value = datetime.strptime(bucket, '%Y-%m' if grain == 'month' else '%Y-%m-%d')
+    return value.strftime(label_format)
+
+
+class SalesRollup:
+    """
+    Daily, weekly and monthly pre-aggregates (revenue, cost, profit, count)
+    of the sales table, kept in a sales_rollups table next to it.
+
+    Writers call apply() in the same transaction as the sale they insert,
+    update or delete, so a chart reads a few dozen rollup rows instead of
+    scanning every sale. ensure() rebuilds the rollups from scratch when
+    they are missing or no longer match the sales table (e.g. after a bulk
+    import). Every method takes `execute(sql, params)`, so the same SQL runs
+    on a SQLAlchemy session or a plain sqlite3 connection; `schema` is the
+    ATTACH alias prefix (e.g. "sales_db.") when the sales database is attached.
+    """
+    def __init__(self, schema=''):
+        self.schema = schema
+        self.table = f"{schema}sales_rollups"
+
+    def create_table(self, execute):
+        execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                grain TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                revenue REAL NOT NULL DEFAULT 0,
+                cost REAL NOT NULL DEFAULT 0,
+                profit REAL NOT NULL DEFAULT 0,
+                sale_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (grain, bucket)
+            ) WITHOUT ROWID
+        """, {})
+
+    def rebuild(self, execute):
+        """Recompute every bucket from the sales table"""
+        execute(f"DELETE FROM {self.table}", {})
+        for grain, bucket_sql in GRAINS.items():
+            execute(f"""
+                INSERT INTO {self.table} (grain, bucket, revenue, cost, profit, sale_count)
+                SELECT :grain, {bucket_sql},
+                       SUM(COALESCE(order_item_total, 0)),
+                       SUM(COALESCE(order_item_total, 0) - COALESCE(order_profit_per_order, 0)),
+                       SUM(COALESCE(order_profit_per_order, 0)),
+                       COUNT(*)
+                FROM {self.schema}sales
+                WHERE order_date IS NOT NULL
+                GROUP BY 2
+            """, {'grain': grain})
+
+    def ensure(self, execute):
+        """Create the rollups and rebuild them if they disagree with the sales table; True if rebuilt"""
+        self.create_table(execute)
+        sales = execute(f"SELECT COUNT(*) FROM {self.schema}sales WHERE order_date IS NOT NULL", {}).fetchone()[0]
+        rolled = execute(f"SELECT COALESCE(SUM(sale_count), 0) FROM {self.table} WHERE grain = 'day'", {}).fetchone()[0]
+        if sales == rolled:
+            return False
+        self.rebuild(execute)
+        return True
+
+    def apply(self, execute, order_date, revenue, profit, sign=1):
+        """Add (sign=1) or remove (sign=-1) one sale's totals in each of its buckets"""
+        if not order_date:
+            return
+        revenue = revenue or 0
+        profit = profit or 0
+        for grain in GRAINS:
+            execute(f"""
+                INSERT INTO {self.table} (grain, bucket, revenue, cost, profit, sale_count)
+                VALUES (:grain, :bucket, :revenue, :cost, :profit, :count)
+                ON CONFLICT (grain, bucket) DO UPDATE SET
+                    revenue = revenue + excluded.revenue,
+                    cost = cost + excluded.cost,
+                    profit = profit + excluded.profit,
+                    sale_count = sale_count + excluded.sale_count
+            """, {
+                'grain': grain,
+                'bucket': bucket_for(order_date, grain),
+                'revenue': sign * revenue,
+                'cost': sign * (revenue - profit),
+                'profit': sign * profit,
+                'count': sign
+            })
+        execute(f"DELETE FROM {self.table} WHERE sale_count <= 0", {})
+
+    def series(self, execute, time_range='month'):
+        """
+        (labels, revenue, cost, profit) for a chart time range, ending at
+        the bucket of the newest sale; empty buckets are zero-filled.
+        """
+        grain, size, label_format = TIME_RANGES.get(time_range, TIME_RANGES['month'])
+        latest = execute(f"SELECT MAX(bucket) FROM {self.table} WHERE grain = :grain", {'grain': grain}).fetchone()[0]
+        if latest is None:
+            return [], [], [], []
+
+        buckets = [latest]
+        while len(buckets) < size:
+            buckets.append(_previous_bucket(buckets[-1], grain))
+        buckets.reverse()
+
+        rows = execute(f"""
+            SELECT bucket, revenue, cost, profit FROM {self.table}
+            WHERE grain = :grain AND bucket BETWEEN :first AND :last
+        """, {'grain': grain, 'first': buckets[0], 'last': buckets[-1]}).fetchall()
+        totals = {row[0]: row[1:] for row in rows}
+
+        labels, revenue, cost, profit = [], [], [], []
+        for bucket in buckets:
+            rev, cst, prof = totals.get(bucket, (0, 0, 0))
+            labels.append(_label(bucket, grain, label_format))
+            revenue.append(round(rev))
+            cost.append(round(cst))
+            profit.append(round(prof))
+        return labels, revenue, cost, profit
@@ -0,0 +1,123 @@
+import threading
+from collections import Counter
+
+from flask import g, has_app_context
+
+
+# Encapsulation: a checked-out session and how many callers still hold it
+class _Checkout:
+    def __init__(self, session):
+        self.session = session
+        self.refs = 0
+
+
+class SessionManager:
+    """
+    Hands out SQLAlchemy sessions for every local SQLite database.
+
+    Each *Database registers its sessionmaker under a name. connect()
+    returns one session per database per request (stored on `g`), or per
+    thread outside a request, however many times it is called; each
+    connect() is paired with a disconnect(), and the session is closed,
+    giving its connection back to the engine's pool, when the last holder
+    disconnects. The teardown hook registered by init_app() closes anything
+    still checked out when the app context ends and counts it as a leak, so
+    a route that forgets to disconnect costs one connection for one request
+    instead of holding it open indefinitely.
+    """
+    def __init__(self):
+        self._factories = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = 0
+        self._checkouts = 0
+        self._leaks = Counter()
+        self._uncommitted = Counter()
+
+    def register(self, name, session_factory):
+        """Register (or re-point) the sessionmaker for `name`; returns the name."""
+        with self._lock:
+            self._factories[name] = session_factory
+        return name
+
+    def _checkouts_here(self):
+        if has_app_context():
+            if '_db_sessions' not in g:
+                g._db_sessions = {}
+            return g._db_sessions
+        if not hasattr(self._local, 'sessions'):
+            self._local.sessions = {}
+        return self._local.sessions
+
+    def connect(self, name):
+        """The current request's (or thread's) session for `name`."""
+        checkouts = self._checkouts_here()
+        checkout = checkouts.get(name)
+        if checkout is None:
+            checkout = checkouts[name] = _Checkout(self._factories[name]())
+            with self._lock:
+                self._opened += 1
+        checkout.refs += 1
+        with self._lock:
+            self._checkouts += 1
+        return checkout.session
+
+    def disconnect(self, name, session=None):
+        """
+        Give back a session from connect(); closes it once nobody holds it.
+        A session that did not come from connect() is simply closed.
+        """
+        checkouts = self._checkouts_here()
+        checkout = checkouts.get(name)
+        if checkout is None or (session is not None and session is not checkout.session):
+            if session is not None:
+                session.close()
+            return
+        checkout.refs -= 1
+        if checkout.refs <= 0:
+            del checkouts[name]
+            self._close(name, checkout.session)
+
+    def _close(self, name, session):
+        if session.new or session.dirty or session.deleted:
+            with self._lock:
+                self._uncommitted[name] += 1
+            print(f"Rolling back uncommitted changes in {name} session")
+        try:
+            session.close()
+        finally:
+            with self._lock:
+                self._closed += 1
+
+    def teardown(self, exc=None):
+        """Teardown hook: close every session still checked out in this app context."""
+        checkouts = g.pop('_db_sessions', None) if has_app_context() else None
+        for name, checkout in (checkouts or {}).items():
+            with self._lock:
+                self._leaks[name] += 1
+            print(f"Session leak: {name} still held by {checkout.refs} caller(s) at teardown")
+            try:
+                self._close(name, checkout.session)
+            except Exception as e:
+                print(f"Error closing {name} session: {e}")
+
+    def init_app(self, app):
+        app.teardown_appcontext(self.teardown)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'databases': sorted(self._factories),
+                'opened': self._opened,
+                'closed': self._closed,
+                'open': self._opened - self._closed,
+                'checkouts': self._checkouts,
+                'leaks': sum(self._leaks.values()),
+                'leaks_by_database': dict(self._leaks),
+                'uncommitted_at_close': dict(self._uncommitted)
+            }
+
+
+# Shared by every *Database and torn down per request by HexaHaulApp
+session_manager = SessionManager()
@@ -0,0 +1,172 @@
+import os
+import re
+import threading
+
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.pool import QueuePool
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+class SQLiteSchemaError(Exception):
+    """Raised when a table would be created over one of the same name with other columns."""
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def store_path():
+    """The consolidated store file when SQLITE_STORE is set, else None"""
+    path = os.getenv("SQLITE_STORE", "").strip()
+    if not path:
+        return None
+    return path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+
+
+def storage_path(db_path):
+    """
+    Where the tables of `db_path` actually live: the file itself, or the
+    consolidated store when one is configured. Sharing one file relies on
+    the models using distinct table names; create_tables() and
+    tools/consolidate_sqlite.py raise SQLiteSchemaError when two of them
+    clash instead of silently keeping whichever came first.
+    """
+    return os.path.abspath(store_path() or db_path)
+
+
+def main_schema_aliases(db_path, attach):
+    """The aliases in `attach` whose file is `db_path`'s own (all of them under SQLITE_STORE)"""
+    main = storage_path(db_path)
+    return {alias for alias, path in attach.items() if storage_path(path) == main}
+
+
+def in_main_schema(sql, aliases):
+    """`sql` with its `alias.` qualifiers for `aliases` pointed at the main schema instead"""
+    if not aliases:
+        return sql
+    return re.sub(r"\b(" + "|".join(re.escape(alias) for alias in sorted(aliases)) + r")\.", "main.", sql)
+
+
+def check_columns(table, expected, existing):
+    """Raise SQLiteSchemaError unless every `expected` column is among the `existing` ones"""
+    missing = [column for column in expected if column not in existing]
+    if existing and missing:
+        raise SQLiteSchemaError(
+            f"Table {table} already exists with columns {sorted(existing)}, missing {missing}; "
+            f"two tables named {table} would share one SQLite file"
+        )
+
+
+def create_tables(metadata, engine):
+    """
+    metadata.create_all(engine), after checking that no table of the same
+    name is already there with other columns (create_all would skip it and
+    the model would fail later, at query time).
+    """
+    inspector = inspect(engine)
+    for table in metadata.sorted_tables:
+        if inspector.has_table(table.name):
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            check_columns(table.name, [column.name for column in table.columns], existing)
+    metadata.create_all(engine)
+
+
+def apply_pragmas(conn, schemas=('main',), wal=True, busy_timeout_ms=None):
+    """
+    Tune a DB-API sqlite3 connection: busy timeout instead of immediate
+    "database is locked", WAL so readers and the writer do not block each
+    other, synchronous=NORMAL (durable at checkpoints, safe with WAL), and
+    a larger page cache and memory map. Journal mode, cache and mmap are
+    per schema, so attached databases are listed in `schemas`.
+    """
+    if busy_timeout_ms is None:
+        busy_timeout_ms = _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000)
+    conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    for schema in schemas:
+        if wal:
+            conn.execute(f"PRAGMA {schema}.journal_mode = WAL")
+            conn.execute(f"PRAGMA {schema}.synchronous = NORMAL")
+        # Negative cache_size is in KiB rather than pages
+        conn.execute(f"PRAGMA {schema}.cache_size = -{_env_int('SQLITE_CACHE_SIZE_KB', 16384)}")
+        conn.execute(f"PRAGMA {schema}.mmap_size = {_env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)}")
+
+
+def attach_databases(conn, attach, wal=True):
+    """ATTACH each alias -> path in `attach`, with the same tuning as the main file"""
+    if not attach:
+        return
+    for alias, path in attach.items():
+        conn.execute("ATTACH DATABASE ? AS " + alias, (storage_path(path),))
+    apply_pragmas(conn, schemas=tuple(attach), wal=wal)
+
+
+def create_sqlite_engine(db_path, echo=None, attach=None):
+    """
+    The process-wide SQLAlchemy engine for the SQLite file at `db_path`.
+
+    Engines are shared per file, so databases constructed per request reuse
+    one pool instead of opening a new engine each time. Pooled connections
+    are tuned by apply_pragmas() when they are opened and handed out LIFO,
+    so a thread going through the session manager keeps reusing the same
+    warm connection (and its page cache). `attach` maps aliases to further
+    files that every connection ATTACHes.
+    """
+    path = storage_path(db_path)
+    attach = dict(attach or {})
+    key = (path, tuple(sorted(attach.items())))
+    engine = _engines.get(key)
+    if engine is not None:
+        return engine
+
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            engine = create_engine(
+                f"sqlite:///{path}",
+                echo=os.getenv("SQLITE_ECHO", "0") == "1" if echo is None else echo,
+                poolclass=QueuePool,
+                pool_size=_env_int("SQLITE_POOL_SIZE", 5),
+                max_overflow=_env_int("SQLITE_MAX_OVERFLOW", 10),
+                pool_use_lifo=True,
+                connect_args={'check_same_thread': False,
+                              'timeout': _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000) / 1000}
+            )
+
+            @event.listens_for(engine, "connect")
+            def _tune(dbapi_connection, connection_record):
+                apply_pragmas(dbapi_connection)
+                attach_databases(dbapi_connection, attach)
+
+            _engines[key] = engine
+    return engine
+
+
+def engine_stats():
+    """Pool status of every engine created in this process"""
+    with _engines_lock:
+        engines = list(_engines.items())
+    return {
+        path + (f" (+{', '.join(alias for alias, _ in attach)})" if attach else ''): {
+            'pool_size': engine.pool.size(),
+            'checked_out': engine.pool.checkedout(),
+            'idle': engine.pool.checkedin(),
+            'overflow': engine.pool.overflow()
+        }
+        for (path, attach), engine in engines
+    }
+
+
+def _dispose_after_fork():
+    # Connections opened by the parent must not be used (or closed) by the child
+    for engine in list(_engines.values()):
+        engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_after_fork)
@@ -0,0 +1,170 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from models.sqlite_engine import apply_pragmas, attach_databases, storage_path
+
+
+class SQLitePoolTimeoutError(Exception):
+    """Raised when no pooled SQLite connection became available in time."""
+
+
+class PooledSQLiteConnection:
+    """
+    Proxy around a sqlite3 connection whose close() returns it to the pool,
+    so code written as connect / use / close keeps working unchanged.
+    """
+    def __init__(self, pool, raw_connection):
+        self._pool = pool
+        self._raw = raw_connection
+        self.generation = pool.generation
+        self.checked_out = False
+
+    @property
+    def raw(self):
+        return self._raw
+
+    def close(self):
+        if self.checked_out:
+            self._pool.release(self)
+
+    def __enter__(self):
+        self._raw.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Commits or rolls back like a plain sqlite3 connection; does not release
+        return self._raw.__exit__(exc_type, exc, tb)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class SQLiteConnectionPool:
+    """
+    Process-wide pool of open SQLite connections to one database file.
+
+    Connections are opened in WAL mode with a busy timeout, keep sqlite3's
+    per-connection statement cache warm across requests, and optionally
+    ATTACH other database files under fixed aliases so one connection can
+    query across them. After a fork the child starts with an empty pool.
+    """
+    def __init__(self, db_path, pool_size=4, timeout=30.0, attach=None, wal=True, cached_statements=256):
+        self.db_path = storage_path(db_path)
+        self.pool_size = max(1, int(pool_size))
+        self.timeout = float(timeout)
+        self.attach = dict(attach or {})
+        self.wal = wal
+        self.cached_statements = cached_statements
+
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._total = 0
+        self._pid = os.getpid()
+        self.generation = 0
+
+        self._checkouts = 0
+        self._waits = 0
+        self._created = 0
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            self._cond = threading.Condition()
+            self._idle = deque()
+            self._total = 0
+            self._pid = os.getpid()
+            self.generation += 1
+
+    def _create(self):
+        raw = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False,
+                              cached_statements=self.cached_statements)
+        # Same tuning as the SQLAlchemy engines: readers no longer block the writer (and vice versa)
+        apply_pragmas(raw, wal=self.wal, busy_timeout_ms=self.timeout * 1000)
+        attach_databases(raw, self.attach, wal=self.wal)
+        self._created += 1
+        return PooledSQLiteConnection(self, raw)
+
+    def acquire(self):
+        """Check out a connection, waiting up to `timeout` seconds when all are in use."""
+        self._check_fork()
+        conn = None
+        waited_since = None
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._total < self.pool_size:
+                    self._total += 1
+                    break
+                if waited_since is None:
+                    waited_since = time.monotonic()
+                    self._waits += 1
+                remaining = self.timeout - (time.monotonic() - waited_since)
+                if remaining <= 0:
+                    raise SQLitePoolTimeoutError(
+                        f"No SQLite connection to {self.db_path} available after {self.timeout:.1f}s"
+                    )
+                self._cond.wait(remaining)
+            self._checkouts += 1
+
+        if conn is None:
+            try:
+                conn = self._create()
+            except Exception:
+                with self._cond:
+                    self._total -= 1
+                    self._cond.notify()
+                raise
+        conn.checked_out = True
+        return conn
+
+    def release(self, conn):
+        if not conn.checked_out:
+            return
+        conn.checked_out = False
+        self._check_fork()
+        if conn.generation != self.generation:
+            return
+        try:
+            if conn.raw.in_transaction:
+                conn.raw.rollback()
+            keep = True
+        except Exception:
+            keep = False
+        with self._cond:
+            if keep:
+                self._idle.append(conn)
+            else:
+                self._total -= 1
+                try:
+                    conn.raw.close()
+                except Exception:
+                    pass
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            while self._idle:
+                conn = self._idle.pop()
+                self._total -= 1
+                try:
+                    conn.raw.close()
+                except Exception:
+                    pass
+
+    def stats(self):
+        with self._cond:
+            return {
+                'db_path': self.db_path,
+                'pool_size': self.pool_size,
+                'open': self._total,
+                'idle': len(self._idle),
+                'in_use': self._total - len(self._idle),
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'created': self._created,
+                'attached': sorted(self.attach)
+            }
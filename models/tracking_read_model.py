@@ -0,0 +1,120 @@
+import os
+from datetime import datetime, timedelta
+
+from utils.cache import TTLCache, MISSING
+
+# One round trip for everything the parcel tracking page needs
+TRACKING_QUERY = """
+    SELECT o.`order_item_id`, o.`delivery_status`, o.`origin_branch`,
+           o.`branch_latitude`, o.`branch_longitude`,
+           o.`customer_latitude`, o.`customer_longitude`,
+           o.`driver_id`, o.`order date (DateOrders)` AS order_date,
+           p.`product_name`,
+           e.`employee_id`, e.`first_name`, e.`last_name`, e.`gender`,
+           e.`age`, e.`birth_date`, e.`contact_number`
+    FROM hh_order o
+    LEFT JOIN hh_product_info p ON p.`order_item_id` = o.`order_item_id`
+    LEFT JOIN hh_employee_biography e ON e.`employee_id` = o.`driver_id`
+    WHERE o.`order_item_id` = %s
+    LIMIT 1
+"""
+
+EXPECTED_DELIVERY_OFFSET_DAYS = 5
+
+class TrackingReadModel:
+    """
+    Read model for /parceltracking: one joined query per tracking ID
+    (order + product + courier), cached in-process by order_item_id.
+
+    Orders are cached for TRACKING_CACHE_TTL seconds (default 60) and
+    payment_wall calls invalidate() after inserting one. Unknown IDs are
+    only cached for TRACKING_MISS_TTL seconds (default 3): invalidate()
+    only reaches the worker that took the payment, so a new order must
+    not read as "not found" in the other workers for a full TTL.
+    """
+    def __init__(self, connection_factory, ttl=None, maxsize=None, miss_ttl=None):
+        self.connection_factory = connection_factory
+        if ttl is None:
+            ttl = float(os.getenv("TRACKING_CACHE_TTL", 60))
+        if maxsize is None:
+            maxsize = int(os.getenv("TRACKING_CACHE_SIZE", 2048))
+        if miss_ttl is None:
+            miss_ttl = float(os.getenv("TRACKING_MISS_TTL", 3))
+        self.miss_ttl = min(miss_ttl, ttl)
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, order_item_id):
+        """
+        Return {'order': {...}, 'courier': {...} or None} for the tracking ID,
+        or None if no such order exists. Database errors propagate and are
+        never cached.
+        """
+        view = self.cache.get(order_item_id)
+        if view is MISSING:
+            view = self._load(order_item_id)
+            self.cache.set(order_item_id, view, ttl=self.miss_ttl if view is None else None)
+        return view
+
+    def exists(self, order_item_id):
+        return self.get(order_item_id) is not None
+
+    def invalidate(self, *order_item_ids):
+        for order_item_id in order_item_ids:
+            if order_item_id:
+                self.cache.pop(order_item_id)
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self):
+        return self.cache.stats()
+
+    def _load(self, order_item_id):
+        conn = self.connection_factory()
+        try:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(TRACKING_QUERY, (order_item_id,))
+            row = cursor.fetchone()
+            cursor.close()
+        finally:
+            conn.close()
+        return self._build_view(row) if row else None
+
+    @staticmethod
+    def _build_view(row):
+        driver_id = int(row['driver_id']) if row['driver_id'] else None
+        order_date_str = row['order_date']
+        try:
+            order_date = datetime.strptime(order_date_str, "%Y-%m-%d")
+        except Exception:
+            order_date = None
+        expected_delivery_date = order_date + timedelta(days=EXPECTED_DELIVERY_OFFSET_DAYS) if order_date else None
+        product_name = row['product_name'].strip() if row.get('product_name') else None
+
+        order = {
+            'orderItemId': row['order_item_id'],
+            'deliveryStatus': row['delivery_status'],
+            'originBranch': row['origin_branch'],
+            'branchLatitude': float(row['branch_latitude']),
+            'branchLongitude': float(row['branch_longitude']),
+            'customerLatitude': float(row['customer_latitude']),
+            'customerLongitude': float(row['customer_longitude']),
+            'orderDate': order_date_str,
+            'expectedDeliveryDate': expected_delivery_date.strftime("%Y-%m-%d") if expected_delivery_date else "Unknown",
+            'driverId': driver_id,
+            'productName': product_name
+        }
+
+        courier = None
+        if driver_id and row.get('employee_id') is not None:
+            courier = {
+                'employee_id': int(row['employee_id']),
+                'first_name': row['first_name'],
+                'last_name': row['last_name'],
+                'gender': row['gender'],
+                'age': int(row['age']),
+                'birthdate': row['birth_date'],
+                'contact_number': row['contact_number']
+            }
+
+        return {'order': order, 'courier': courier}
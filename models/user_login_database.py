@@ -1,9 +1,14 @@
 import os
-import pandas as pd
-from sqlalchemy import create_engine, Column, Integer, String
+from sqlalchemy import Column, Integer, String
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from abc import ABC, abstractmethod
+from models.sqlite_engine import create_sqlite_engine, create_tables
+from models.bulk_loader import BulkCsvLoader, first_column
+from models.session_manager import session_manager
+from utils.lazy_import import lazy_import
+
+pd = lazy_import('pandas')
 
 Base = declarative_base()
 
@@ -20,9 +25,23 @@ class UserLogin(Base):
     def __repr__(self):
         return f"<UserLogin(username='{self.username}', customer_id={self.customer_id})>"
 
+def user_login_rows(chunk):
+    """
+    Map a chunk of hh_user-login.csv onto user_logins rows. Older exports
+    carry Customer Id/Fname/Lname; the current one has id and Full Name.
+    """
+    full_name = first_column(chunk, 'Full Name', default='').str.split(' ', n=1, expand=True).reindex(columns=[0, 1])
+    return pd.DataFrame({
+        'customer_id': pd.to_numeric(first_column(chunk, 'Customer Id', 'id'), errors='coerce').astype('Int64'),
+        'customer_fname': first_column(chunk, 'Customer Fname').fillna(full_name[0]),
+        'customer_lname': first_column(chunk, 'Customer Lname').fillna(full_name[1]).fillna(''),
+        'username': chunk['Username'],
+        'password': chunk['Password']
+    }, index=chunk.index)
+
 # Create database engine
 db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'hexahaul_db', 'hexahaul.db')
-engine = create_engine(f'sqlite:///{db_path}')
+engine = create_sqlite_engine(db_path)
 
 # Create session factory
 Session = sessionmaker(bind=engine)
@@ -42,50 +61,31 @@ class UserLoginManager(DataManager):
     def __init__(self, engine, session_factory):
         self.engine = engine
         self.Session = session_factory
+        self.session_name = session_manager.register(f"users:{os.path.abspath(engine.url.database)}", session_factory)
         
     def initialize_database(self):
         """Initialize the database tables"""
-        Base.metadata.create_all(self.engine)
+        create_tables(Base.metadata, self.engine)
         
     def load_data(self):
         """Load user data from CSV into the database"""
         # Get the path to the CSV file
         csv_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'hexahaul_db', 'hh_user-login.csv')
         
-        # Read the CSV file using pandas
-        df = pd.read_csv(csv_path)
-        
-        # Create a session
-        session = self.Session()
-        
         try:
-            # Check if data already exists
-            if session.query(UserLogin).count() == 0:
-                # Insert data from dataframe into database
-                for _, row in df.iterrows():
-                    user = UserLogin(
-                        customer_id=row['Customer Id'],
-                        customer_fname=row['Customer Fname'],
-                        customer_lname=row['Customer Lname'],
-                        username=row['Username'],
-                        password=row['Password']
-                    )
-                    session.add(user)
-                
-                # Commit the changes
-                session.commit()
-                print(f"Successfully loaded {len(df)} users from CSV")
+            # Seeds an empty table; an unchanged seed is skipped via the manifest
+            loaded = BulkCsvLoader(self.engine).load(UserLogin.__table__, csv_path, user_login_rows, dtype=str,
+                                                     keep_default_na=False)
+            if loaded:
+                print(f"Successfully loaded {loaded} users from CSV")
             else:
                 print("User data already exists in the database")
         except Exception as e:
-            session.rollback()
             print(f"Error loading user data: {e}")
-        finally:
-            session.close()
     
     def authenticate_user(self, username, password):
         """Authenticate a user based on username and password"""
-        session = self.Session()
+        session = session_manager.connect(self.session_name)
         try:
             # Query the user by username
             user = session.query(UserLogin).filter(UserLogin.username == username).first()
@@ -98,22 +98,22 @@ class UserLoginManager(DataManager):
             print(f"Authentication error: {e}")
             return None
         finally:
-            session.close()
+            session_manager.disconnect(self.session_name, session)
             
     def get_user_by_id(self, customer_id):
         """Get a user by their customer ID"""
-        session = self.Session()
+        session = session_manager.connect(self.session_name)
         try:
             return session.query(UserLogin).filter(UserLogin.customer_id == customer_id).first()
         except Exception as e:
             print(f"Error getting user: {e}")
             return None
         finally:
-            session.close()
+            session_manager.disconnect(self.session_name, session)
             
     def update_password(self, username, new_password):
         """Update a user's password"""
-        session = self.Session()
+        session = session_manager.connect(self.session_name)
         try:
             user = session.query(UserLogin).filter(UserLogin.username == username).first()
             if user:
@@ -126,7 +126,7 @@ class UserLoginManager(DataManager):
             print(f"Error updating password: {e}")
             return False
         finally:
-            session.close()
+            session_manager.disconnect(self.session_name, session)
 
 # Create a singleton instance of the user manager
 user_manager = UserLoginManager(engine, Session)
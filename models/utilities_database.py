@@ -1,23 +1,169 @@
 import sqlite3
 import json
 import os
+import threading
 from datetime import datetime, timedelta
 import random
+from models.sqlite_engine import storage_path, main_schema_aliases, in_main_schema, check_columns, SQLiteSchemaError
+from models.sqlite_pool import SQLiteConnectionPool
+from models.sales_rollup import SalesRollup
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Alias -> database file the detail tables read from; ATTACHed to every pooled connection
+DETAIL_SOURCES = {
+    'sales_db': os.path.join(PROJECT_ROOT, 'database', 'hexahaul_sales.db'),
+    'products_db': os.path.join(PROJECT_ROOT, 'database', 'products.db'),
+    'vehicles_db': os.path.join(PROJECT_ROOT, 'vehicles.db'),
+    'employees_db': os.path.join(PROJECT_ROOT, 'employees.db'),
+    'salary_db': os.path.join(PROJECT_ROOT, 'database', 'salary.db')
+}
+
+# Indexes backing the keyset pagination below, created on first start
+DETAIL_INDEXES = {
+    'sales_db': "CREATE INDEX IF NOT EXISTS sales_db.idx_sales_order_date_id ON sales (order_date, id)",
+    'products_db': "CREATE INDEX IF NOT EXISTS products_db.idx_products_order_item_id ON products (order_item_id)",
+    'salary_db': "CREATE INDEX IF NOT EXISTS salary_db.idx_employee_salaries_employee_id ON employee_salaries (employee_id)"
+}
+
+# The utilities' own sales table. It used to be created as "sales", which
+# clashes with SalesDatabase's table once both share a SQLITE_STORE file.
+UTILITIES_SALES_TABLE = 'utilities_sales'
+UTILITIES_SALES_COLUMNS = ('id', 'date', 'product_name', 'category', 'quantity', 'revenue', 'cost')
+
+TIME_RANGE_DAYS = {"week": 7, "month": 30, "quarter": 90, "year": 365}
+MAX_DETAIL_PAGE = 100
+
+# The SQL text is fixed so every pooled connection reuses its prepared statements.
+# Time ranges count back from the newest sale, so historical exports still show rows.
+SALES_DETAIL_SELECT = """
+    SELECT s.id, s.order_date, p.product_name, p.product_category_name, s.order_item_quantity,
+           CAST(ROUND(s.order_item_total) AS INTEGER),
+           CAST(ROUND(s.order_item_total - s.order_profit_per_order) AS INTEGER),
+           CAST(ROUND(s.order_profit_per_order) AS INTEGER)
+    FROM sales_db.sales s
+    LEFT JOIN products_db.products p
+        ON p.id = (SELECT MIN(id) FROM products_db.products WHERE order_item_id = s.order_item_id)
+    WHERE s.order_date >= date((SELECT MAX(order_date) FROM sales_db.sales), ?)
+"""
+SALES_DETAIL_FIRST_PAGE = SALES_DETAIL_SELECT + """
+    ORDER BY s.order_date DESC, s.id DESC
+    LIMIT ?
+"""
+SALES_DETAIL_NEXT_PAGE = SALES_DETAIL_SELECT + """
+      AND (s.order_date, s.id) < (?, ?)
+    ORDER BY s.order_date DESC, s.id DESC
+    LIMIT ?
+"""
+VEHICLE_DETAIL_PAGE = """
+    SELECT id, printf('V%03d', id), unit_type, unit_brand, unit_model, status, distance,
+           CASE
+               WHEN distance < 5000 THEN 'Excellent'
+               WHEN distance < 20000 THEN 'Good'
+               WHEN distance < 50000 THEN 'Fair'
+               ELSE 'Poor'
+           END
+    FROM vehicles_db.vehicles
+    WHERE id > ?
+    ORDER BY id
+    LIMIT ?
+"""
+EMPLOYEE_DETAIL_PAGE = """
+    SELECT e.employee_id, printf('E%03d', e.employee_id), e.full_name, e.role, e.department,
+           sal.performance_rating,
+           CASE
+               WHEN sal.performance_rating >= 4 THEN 'High'
+               WHEN sal.performance_rating = 3 THEN 'Medium'
+               ELSE 'Low'
+           END,
+           e.status
+    FROM employees_db.employees e
+    LEFT JOIN salary_db.employee_salaries sal
+        ON sal.id = (SELECT MIN(id) FROM salary_db.employee_salaries WHERE employee_id = e.employee_id)
+    WHERE e.employee_id > ?
+    ORDER BY e.employee_id
+    LIMIT ?
+"""
+
+# Report sections: title, column headings and the query streaming their rows.
+# :offset counts back from the newest sale ("-30 days"); :start/:end bound a custom range.
+SALES_REPORT_ROWS = """
+    SELECT s.order_date, s.order_item_id, p.product_name, p.product_category_name, s.payment_type,
+           s.order_item_quantity, ROUND(s.order_item_total, 2),
+           ROUND(s.order_item_total - s.order_profit_per_order, 2), ROUND(s.order_profit_per_order, 2)
+    FROM sales_db.sales s
+    LEFT JOIN products_db.products p
+        ON p.id = (SELECT MIN(id) FROM products_db.products WHERE order_item_id = s.order_item_id)
+    WHERE (:offset IS NULL OR s.order_date >= date((SELECT MAX(order_date) FROM sales_db.sales), :offset))
+      AND (:start IS NULL OR s.order_date >= :start)
+      AND (:end IS NULL OR s.order_date <= :end)
+    ORDER BY s.order_date DESC, s.id DESC
+"""
+VEHICLE_REPORT_ROWS = """
+    SELECT id, unit_type, unit_brand, unit_model, category, year, status, distance, driver_employee_id
+    FROM vehicles_db.vehicles
+    ORDER BY id
+"""
+EMPLOYEE_REPORT_ROWS = """
+    SELECT e.employee_id, e.full_name, e.role, e.department, e.hire_date, sal.performance_rating, e.status
+    FROM employees_db.employees e
+    LEFT JOIN salary_db.employee_salaries sal
+        ON sal.id = (SELECT MIN(id) FROM salary_db.employee_salaries WHERE employee_id = e.employee_id)
+    ORDER BY e.employee_id
+"""
+CUSTOMER_REPORT_ROWS = """
+    SELECT customer_id, first_name, last_name, city, country, segment, order_item_id
+    FROM main.customers
+    ORDER BY id
+"""
+REPORT_SECTIONS = {
+    'sales': ('Sales', ('Date', 'Order Item', 'Product', 'Category', 'Payment Type', 'Quantity', 'Revenue', 'Cost', 'Profit'),
+              SALES_REPORT_ROWS),
+    'vehicles': ('Vehicles', ('ID', 'Type', 'Brand', 'Model', 'Category', 'Year', 'Status', 'Distance (km)', 'Driver ID'),
+                 VEHICLE_REPORT_ROWS),
+    'employees': ('Employees', ('ID', 'Name', 'Position', 'Department', 'Hire Date', 'Performance (1-5)', 'Status'),
+                  EMPLOYEE_REPORT_ROWS),
+    'customers': ('Customers', ('Customer ID', 'First Name', 'Last Name', 'City', 'Country', 'Segment', 'Order Item'),
+                  CUSTOMER_REPORT_ROWS)
+}
+REPORT_TYPES = {
+    'sales': ('sales',),
+    'vehicles': ('vehicles',),
+    'employees': ('employees',),
+    'customers': ('customers',),
+    'comprehensive': ('sales', 'vehicles', 'employees', 'customers')
+}
 
 class UtilitiesDatabase:
-    def __init__(self, db_path):
+    def __init__(self, db_path, sources=None, pool_size=None):
         # Ensure the database directory exists
         self.db_path = db_path
         os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        # Only attach sources that exist; ATTACH would otherwise create empty files
+        sources = DETAIL_SOURCES if sources is None else sources
+        self.sources = {alias: path for alias, path in sources.items() if os.path.exists(storage_path(path))}
+        # Sources in this file itself (all of them under SQLITE_STORE) are read
+        # through main instead of attaching the same file again
+        self.main_aliases = main_schema_aliases(db_path, self.sources)
+        self.pool = SQLiteConnectionPool(
+            db_path,
+            pool_size=pool_size or int(os.getenv("UTILITIES_DB_POOL_SIZE", 4)),
+            attach={alias: path for alias, path in self.sources.items() if alias not in self.main_aliases}
+        )
+        self.sales_rollup = SalesRollup(self.sql('sales_db.'))
         
         # Create the database and tables if they don't exist
         self.initialize_database()
     
+    def sql(self, query):
+        """`query` with the qualifiers of sources that live in the main file pointed at main"""
+        return in_main_schema(query, self.main_aliases)
+
     def get_connection(self):
         try:
-            # Make sure we're using an absolute path for more reliable connections
-            abs_path = os.path.abspath(self.db_path)
-            return sqlite3.connect(abs_path)
+            # Pooled: close() hands the connection back instead of closing it
+            return self.pool.acquire()
         except sqlite3.OperationalError as e:
             print(f"Database connection error: {e}")
             print(f"Attempted to connect to: {os.path.abspath(self.db_path)}")
@@ -30,15 +176,17 @@ class UtilitiesDatabase:
             return sqlite3.connect(":memory:")
     
     def initialize_database(self):
-        """Create necessary tables if they don't exist"""
+        """Create necessary tables and the detail-table indexes if they don't exist"""
         conn = None
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
             
             # Create tables for utilities if they don't exist
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS sales (
+            check_columns(UTILITIES_SALES_TABLE, UTILITIES_SALES_COLUMNS,
+                          {row[1] for row in cursor.execute(f"PRAGMA main.table_info({UTILITIES_SALES_TABLE})")})
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {UTILITIES_SALES_TABLE} (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     date TEXT,
                     product_name TEXT,
@@ -49,15 +197,33 @@ class UtilitiesDatabase:
                 )
             """)
             
-            # Add more table creation statements as needed
+            for alias, statement in DETAIL_INDEXES.items():
+                if alias not in self.sources:
+                    continue
+                try:
+                    cursor.execute(self.sql(statement))
+                except sqlite3.Error as e:
+                    # A read-only source still works, just without the index
+                    print(f"Could not index {alias}: {e}")
+            
+            if 'sales_db' in self.sources:
+                try:
+                    self.sales_rollup.ensure(conn.execute)
+                except sqlite3.Error as e:
+                    print(f"Could not build sales rollups: {e}")
             
             conn.commit()
             print(f"Database initialized successfully at {self.db_path}")
+        except SQLiteSchemaError:
+            raise
         except Exception as e:
             print(f"Error initializing database: {e}")
         finally:
             if conn:
                 conn.close()
+
+    def stats(self):
+        return self.pool.stats()
     
     def get_dashboard_stats(self):
         """
@@ -98,118 +264,41 @@ class UtilitiesDatabase:
             time_range (str): The time range to get data for (week, month, quarter, year)
             
         Returns:
-            dict: Sales data formatted for Chart.js
+            dict: Sales data formatted for Chart.js, read from the sales rollups
         """
         try:
-            # Calculate start date based on time range
-            today = datetime.now()
-            if time_range == "week":
-                start_date = today - timedelta(days=7)
-                date_format = "%a"  # Day of week
-            elif time_range == "month":
-                start_date = today - timedelta(days=30)
-                date_format = "%d %b"  # Day and month
-            elif time_range == "quarter":
-                start_date = today - timedelta(days=90)
-                date_format = "%b"  # Month
-            elif time_range == "year":
-                start_date = today - timedelta(days=365)
-                date_format = "%b %Y"  # Month and year
-            else:
-                start_date = today - timedelta(days=30)  # Default to month
-                date_format = "%d %b"
-            
             conn = self.get_connection()
             try:
-                # In a real app, you would query your sales table
-                # For example:
-                '''
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT 
-                        strftime(?, date) as period,
-                        SUM(revenue) as revenue,
-                        SUM(cost) as cost,
-                        SUM(revenue - cost) as profit
-                    FROM sales
-                    WHERE date BETWEEN ? AND ?
-                    GROUP BY period
-                    ORDER BY date
-                """, (date_format, start_date.strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d")))
-                
-                results = cursor.fetchall()
-                
-                labels = []
-                revenue = []
-                costs = []
-                profit = []
-                
-                for row in results:
-                    labels.append(row[0])
-                    revenue.append(row[1])
-                    costs.append(row[2])
-                    profit.append(row[3])
-                '''
-                
-                # Mock data for demonstration
-                if time_range == "week":
-                    labels = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-                elif time_range == "month":
-                    labels = [f"{i} {(today - timedelta(days=30-i)).strftime('%b')}" for i in range(1, 31, 3)]
-                elif time_range == "quarter":
-                    labels = ["Jan", "Feb", "Mar"]
-                else:  # year
-                    labels = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", 
-                              "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-                
-                # Generate realistic looking sales data with upward trend
-                revenue = []
-                costs = []
-                profit = []
-                
-                base_revenue = 18000
-                growth_factor = 1.05
-                
-                for i in range(len(labels)):
-                    # Add some randomness but maintain growth trend
-                    rev = base_revenue * (growth_factor ** i) * (0.9 + random.random() * 0.2)
-                    rev = round(rev)
-                    cost = rev * (0.55 + random.random() * 0.1)  # Costs 55-65% of revenue
-                    cost = round(cost)
-                    prof = rev - cost
-                    
-                    revenue.append(rev)
-                    costs.append(cost)
-                    profit.append(prof)
-                
-                return {
-                    "labels": labels,
-                    "datasets": [
-                        {
-                            "label": "Revenue",
-                            "data": revenue,
-                            "borderColor": "#4361ee",
-                            "backgroundColor": "rgba(67, 97, 238, 0.1)",
-                            "tension": 0.3
-                        },
-                        {
-                            "label": "Costs",
-                            "data": costs,
-                            "borderColor": "#f44336",
-                            "backgroundColor": "rgba(244, 67, 54, 0.1)",
-                            "tension": 0.3
-                        },
-                        {
-                            "label": "Profit",
-                            "data": profit,
-                            "borderColor": "#4caf50",
-                            "backgroundColor": "rgba(76, 175, 80, 0.1)",
-                            "tension": 0.3
-                        }
-                    ]
-                }
+                labels, revenue, costs, profit = self.sales_rollup.series(conn.execute, time_range)
             finally:
                 conn.close()
+            
+            return {
+                "labels": labels,
+                "datasets": [
+                    {
+                        "label": "Revenue",
+                        "data": revenue,
+                        "borderColor": "#4361ee",
+                        "backgroundColor": "rgba(67, 97, 238, 0.1)",
+                        "tension": 0.3
+                    },
+                    {
+                        "label": "Costs",
+                        "data": costs,
+                        "borderColor": "#f44336",
+                        "backgroundColor": "rgba(244, 67, 54, 0.1)",
+                        "tension": 0.3
+                    },
+                    {
+                        "label": "Profit",
+                        "data": profit,
+                        "borderColor": "#4caf50",
+                        "backgroundColor": "rgba(76, 175, 80, 0.1)",
+                        "tension": 0.3
+                    }
+                ]
+            }
         except Exception as e:
             print(f"Error getting sales data: {e}")
             # Return fallback data in case of error
@@ -463,364 +552,166 @@ class UtilitiesDatabase:
                 "datasets": []
             }
     
-    def get_sales_detail_data(self, time_range="month", limit=20):
+    def get_detail_page(self, table, limit=20, cursor=None, time_range="month"):
         """
-        Get detailed sales data for table display
+        One page of a detail table, paginated by keyset
         
         Args:
-            time_range (str): The time range to get data for (week, month, quarter, year)
-            limit (int): Maximum number of rows to return
+            table (str): sales, vehicles or employees
+            limit (int): Maximum number of rows to return (capped at MAX_DETAIL_PAGE)
+            cursor (str): next_cursor of the previous page, or None for the first page
+            time_range (str): Sales only; week, month, quarter or year before the newest sale
             
         Returns:
-            list: List of sales data dictionaries
+            dict: {"rows": [...], "next_cursor": str or None}
+            
+        Raises:
+            ValueError: Unknown table or malformed cursor
         """
-        # Calculate start date based on time range
-        today = datetime.now()
-        if time_range == "week":
-            start_date = today - timedelta(days=7)
-        elif time_range == "month":
-            start_date = today - timedelta(days=30)
-        elif time_range == "quarter":
-            start_date = today - timedelta(days=90)
-        elif time_range == "year":
-            start_date = today - timedelta(days=365)
+        limit = max(1, min(int(limit), MAX_DETAIL_PAGE))
+        if table == "sales":
+            days = TIME_RANGE_DAYS.get(time_range, 30)
+            if cursor:
+                order_date, _, last_id = cursor.rpartition("|")
+                params = (f"-{days} days", order_date, int(last_id), limit)
+                query = SALES_DETAIL_NEXT_PAGE
+            else:
+                params = (f"-{days} days", limit)
+                query = SALES_DETAIL_FIRST_PAGE
+            columns = ("date", "product", "category", "quantity", "revenue", "cost", "profit")
+        elif table == "vehicles":
+            params = (int(cursor) if cursor else 0, limit)
+            query = VEHICLE_DETAIL_PAGE
+            columns = ("id", "type", "brand", "model", "status", "distance", "efficiency")
+        elif table == "employees":
+            params = (int(cursor) if cursor else 0, limit)
+            query = EMPLOYEE_DETAIL_PAGE
+            columns = ("id", "name", "position", "department", "performance", "efficiency", "status")
         else:
-            start_date = today - timedelta(days=30)  # Default to month
-        
+            raise ValueError(f"Unknown detail table: {table}")
+
         conn = self.get_connection()
         try:
-            # In a real app, you would query your sales table
-            # For example:
-            '''
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT 
-                    date,
-                    product_name,
-                    category,
-                    quantity,
-                    revenue,
-                    cost,
-                    (revenue - cost) as profit
-                FROM sales
-                WHERE date BETWEEN ? AND ?
-                ORDER BY date DESC
-                LIMIT ?
-            """, (start_date.strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d"), limit))
-            
-            results = cursor.fetchall()
-            
-            sales_data = []
-            for row in results:
-                sales_data.append({
-                    "date": row[0],
-                    "product": row[1],
-                    "category": row[2],
-                    "quantity": row[3],
-                    "revenue": row[4],
-                    "cost": row[5],
-                    "profit": row[6]
-                })
-            '''
-            
-            # Mock data for demonstration
-            products = [
-                {"name": "Express Delivery", "category": "Service"},
-                {"name": "Bulk Transport", "category": "Service"},
-                {"name": "HexaBox Rental", "category": "Product"},
-                {"name": "Warehouse Storage", "category": "Service"},
-                {"name": "International Shipping", "category": "Service"},
-                {"name": "Packaging Materials", "category": "Product"}
-            ]
-            
-            sales_data = []
-            
-            # Generate dates within the time range
-            date_range = (today - start_date).days
-            
-            for i in range(limit):
-                # Random date within range
-                days_ago = random.randint(0, date_range)
-                sale_date = today - timedelta(days=days_ago)
-                
-                # Random product
-                product = random.choice(products)
-                
-                # Random quantity between 1 and 200
-                quantity = random.randint(1, 200)
-                
-                # Calculate financials
-                unit_price = random.randint(20, 100)
-                revenue = quantity * unit_price
-                cost = revenue * (0.55 + random.random() * 0.1)  # Costs 55-65% of revenue
-                profit = revenue - cost
-                
-                sales_data.append({
-                    "date": sale_date.strftime("%Y-%m-%d"),
-                    "product": product["name"],
-                    "category": product["category"],
-                    "quantity": quantity,
-                    "revenue": round(revenue),
-                    "cost": round(cost),
-                    "profit": round(profit)
-                })
-            
-            # Sort by date (newest first)
-            sales_data.sort(key=lambda x: x["date"], reverse=True)
-            
-            return sales_data
+            results = conn.execute(self.sql(query), params).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error getting {table} detail data: {e}")
+            return {"rows": [], "next_cursor": None}
         finally:
             conn.close()
+
+        rows = []
+        for result in results:
+            # The first column is the sort key; the rest map onto the template's columns
+            row = dict(zip(columns, result[1:]))
+            if table == "vehicles":
+                # Not tracked in the fleet data yet
+                row["last_maintenance"] = "N/A"
+            elif table == "employees":
+                row["performance"] = f"{row['performance']}/5" if row["performance"] is not None else "N/A"
+                row["tasks_completed"] = "N/A"
+            rows.append(row)
+
+        next_cursor = None
+        if len(results) == limit:
+            last = results[-1]
+            next_cursor = f"{last[1]}|{last[0]}" if table == "sales" else str(last[0])
+        return {"rows": rows, "next_cursor": next_cursor}
+
+    def get_sales_detail_data(self, time_range="month", limit=20):
+        """
+        Get detailed sales data for table display
+        
+        Args:
+            time_range (str): The time range to get data for (week, month, quarter, year)
+            limit (int): Maximum number of rows to return
+            
+        Returns:
+            list: List of sales data dictionaries, newest first
+        """
+        return self.get_detail_page("sales", limit, time_range=time_range)["rows"]
     
-    def get_vehicle_detail_data(self):
+    def get_vehicle_detail_data(self, limit=20):
         """
         Get detailed vehicle data for table display
         
         Returns:
             list: List of vehicle data dictionaries
         """
-        try:
-            today = datetime.now()  # Add this line to define 'today'
-            conn = self.get_connection()
-            try:
-                # In a real app, you would query your vehicles table
-                # For example:
-                '''
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT 
-                        id,
-                        unit_type,
-                        unit_brand,
-                        unit_model,
-                        status,
-                        distance,
-                        CASE
-                            WHEN distance < 5000 THEN 'Excellent'
-                            WHEN distance < 20000 THEN 'Good'
-                            WHEN distance < 50000 THEN 'Fair'
-                            ELSE 'Poor'
-                        END as efficiency,
-                        last_maintenance_date
-                    FROM vehicles
-                    ORDER BY id
-                """)
-                
-                results = cursor.fetchall()
-                
-                vehicle_data = []
-                for row in results:
-                    vehicle_data.append({
-                        "id": row[0],
-                        "type": row[1],
-                        "brand": row[2],
-                        "model": row[3],
-                        "status": row[4],
-                        "distance": row[5],
-                        "efficiency": row[6],
-                        "last_maintenance": row[7]
-                    })
-                '''
-                
-                # Mock data for demonstration
-                types = ["Car", "Truck", "Motorcycle"]
-                brands = {
-                    "Car": ["Toyota", "Honda", "Nissan", "Ford", "Tesla"],
-                    "Truck": ["Volvo", "Mercedes", "Scania", "MAN", "Iveco"],
-                    "Motorcycle": ["Honda", "Yamaha", "Kawasaki", "Ducati", "Harley-Davidson"]
-                }
-                models = {
-                    "Toyota": ["Corolla", "Camry", "Prius", "RAV4"],
-                    "Honda": ["Civic", "Accord", "CR-V", "CB500"],
-                    "Nissan": ["Leaf", "Altima", "Rogue", "Sentra"],
-                    "Ford": ["F-150", "Focus", "Escape", "Mustang"],
-                    "Tesla": ["Model 3", "Model S", "Model X", "Model Y"],
-                    "Volvo": ["FH16", "FM", "FE", "FL"],
-                    "Mercedes": ["Actros", "Arocs", "Atego", "Axor"],
-                    "Scania": ["R Series", "S Series", "G Series", "P Series"],
-                    "MAN": ["TGX", "TGS", "TGM", "TGL"],
-                    "Iveco": ["S-Way", "Eurocargo", "Daily", "Stralis"],
-                    "Yamaha": ["MT-07", "R1", "R6", "YZF"],
-                    "Kawasaki": ["Ninja", "Z900", "Versys", "Vulcan"],
-                    "Ducati": ["Panigale", "Monster", "Multistrada", "Scrambler"],
-                    "Harley-Davidson": ["Sportster", "Softail", "Touring", "Street"]
-                }
-                statuses = ["Available", "In Use", "Maintenance"]
-                efficiency_ratings = ["Excellent", "Good", "Fair", "Poor"]
-                
-                vehicle_data = []
-                
-                for i in range(1, 16):
-                    # Random vehicle type
-                    v_type = random.choice(types)
-                    
-                    # Random brand based on type
-                    brand = random.choice(brands[v_type])
-                    
-                    # Random model based on brand
-                    model = random.choice(models[brand])
-                    
-                    # Random status
-                    status = random.choice(statuses)
-                    
-                    # Random distance
-                    distance = random.randint(1000, 50000)
-                    
-                    # Efficiency based on distance
-                    if distance < 5000:
-                        efficiency = "Excellent"
-                    elif distance < 20000:
-                        efficiency = "Good"
-                    elif distance < 50000:
-                        efficiency = "Fair"
-                    else:
-                        efficiency = "Poor"
-                    
-                    # Random maintenance date within last 6 months
-                    days_ago = random.randint(0, 180)
-                    maintenance_date = (today - timedelta(days=days_ago)).strftime("%Y-%m-%d")
-                    
-                    vehicle_data.append({
-                        "id": f"V{i:03d}",
-                        "type": v_type,
-                        "brand": brand,
-                        "model": model,
-                        "status": status,
-                        "distance": distance,
-                        "efficiency": efficiency,
-                        "last_maintenance": maintenance_date
-                    })
-                
-                return vehicle_data
-            finally:
-                conn.close()
-        except Exception as e:
-            print(f"Error getting vehicle detail data: {e}")
-            # Return fallback data in case of error
-            return []
+        return self.get_detail_page("vehicles", limit)["rows"]
     
-    def get_employee_detail_data(self):
+    def get_employee_detail_data(self, limit=20):
         """
         Get detailed employee data for table display
         
         Returns:
             list: List of employee data dictionaries
         """
-        conn = self.get_connection()
-        try:
-            # In a real app, you would query your employees table
-            # For example:
-            '''
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT 
-                    id,
-                    name,
-                    position,
-                    department,
-                    performance_score,
-                    tasks_completed,
-                    CASE
-                        WHEN performance_score >= 90 THEN 'High'
-                        WHEN performance_score >= 75 THEN 'Medium'
-                        ELSE 'Low'
-                    END as efficiency,
-                    status
-                FROM employees
-                ORDER BY id
-            """)
-            
-            results = cursor.fetchall()
-            
-            employee_data = []
-            for row in results:
-                employee_data.append({
-                    "id": row[0],
-                    "name": row[1],
-                    "position": row[2],
-                    "department": row[3],
-                    "performance": row[4],
-                    "tasks_completed": row[5],
-                    "efficiency": row[6],
-                    "status": row[7]
-                })
-            '''
-            
-            # Mock data for demonstration
-            first_names = ["John", "Jane", "Bob", "Alice", "Charlie", "David", "Emma", "Frank", "Grace", "Henry"]
-            last_names = ["Smith", "Johnson", "Williams", "Jones", "Brown", "Davis", "Miller", "Wilson", "Moore", "Taylor"]
-            positions = {
-                "Delivery": ["Driver", "Courier", "Fleet Manager"],
-                "Logistics": ["Warehouse Staff", "Inventory Manager", "Logistics Coordinator"],
-                "Operations": ["Manager", "Supervisor", "Analyst"],
-                "Support": ["Customer Service", "Technical Support", "IT Specialist"]
-            }
-            departments = ["Delivery", "Logistics", "Operations", "Support"]
-            statuses = ["Active", "On Leave", "Training"]
-            
-            employee_data = []
-            
-            for i in range(1, 16):
-                # Random name
-                first_name = random.choice(first_names)
-                last_name = random.choice(last_names)
-                name = f"{first_name} {last_name}"
-                
-                # Random department
-                department = random.choice(departments)
-                
-                # Random position based on department
-                position = random.choice(positions[department])
-                
-                # Random performance score
-                performance = random.randint(70, 98)
-                
-                # Random tasks completed
-                tasks = random.randint(50, 150)
-                
-                # Efficiency based on performance
-                if performance >= 90:
-                    efficiency = "High"
-                elif performance >= 75:
-                    efficiency = "Medium"
-                else:
-                    efficiency = "Low"
-                
-                # Random status
-                status = random.choice(statuses)
-                
-                employee_data.append({
-                    "id": f"E{i:03d}",
-                    "name": name,
-                    "position": position,
-                    "department": department,
-                    "performance": f"{performance}%",
-                    "tasks_completed": tasks,
-                    "efficiency": efficiency,
-                    "status": status
-                })
-            
-            return employee_data
-        finally:
-            conn.close()
+        return self.get_detail_page("employees", limit)["rows"]
     
-    def generate_report(self, report_type, time_range, report_format):
+    def report_sections(self, report_type):
         """
-        Generate a report based on specified parameters
+        The sections a report is made of
         
         Args:
-            report_type (str): Type of report to generate
-            time_range (str): Time range for the report
-            report_format (str): Format of the report (pdf, excel, csv)
+            report_type (str): sales, vehicles, employees, customers or comprehensive
             
         Returns:
-            dict: Report generation status
+            list: (title, columns) for each section, in order
+            
+        Raises:
+            ValueError: Unknown report type
         """
-        # In a real app, this would generate a file and return a download link
-        # For now, we'll just return a success message
+        if report_type not in REPORT_TYPES:
+            raise ValueError(f"Unknown report type: {report_type}")
+        return [(section,) + REPORT_SECTIONS[section][:2] for section in REPORT_TYPES[report_type]]
+    
+    @staticmethod
+    def _report_params(time_range, start_date=None, end_date=None):
+        if time_range == "custom":
+            return {"offset": None, "start": start_date or None, "end": end_date or None}
+        return {"offset": f"-{TIME_RANGE_DAYS.get(time_range, 30)} days", "start": None, "end": None}
+    
+    def count_report_rows(self, section, time_range="month", start_date=None, end_date=None):
+        """Number of rows iter_report_rows will yield for `section`, for progress reporting"""
+        conn = self.get_connection()
+        try:
+            query = self.sql(f"SELECT COUNT(*) FROM ({REPORT_SECTIONS[section][2]})")
+            return conn.execute(query, self._report_params(time_range, start_date, end_date)).fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Error counting {section} report rows: {e}")
+            return 0
+        finally:
+            conn.close()
+    
+    def iter_report_rows(self, section, time_range="month", start_date=None, end_date=None, batch_size=500):
+        """
+        Stream the rows of one report section
         
-        return {
-            "status": "success",
-            "message": f"{report_type.capitalize()} report for {time_range} period has been generated in {report_format.upper()} format.",
-            "download_link": f"/reports/{report_type}_{time_range}_{datetime.now().strftime('%Y%m%d%H%M%S')}.{report_format}"
-        }
+        Rows are fetched `batch_size` at a time from a pooled connection that
+        is held until the generator is exhausted or closed, so memory use
+        does not grow with the size of the report.
+        """
+        conn = self.get_connection()
+        try:
+            cursor = conn.execute(self.sql(REPORT_SECTIONS[section][2]), self._report_params(time_range, start_date, end_date))
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield from batch
+        finally:
+            conn.close()
+
+
+_utilities_db = None
+_utilities_db_lock = threading.Lock()
+
+
+def get_utilities_db(db_path=None):
+    """Return the process-wide UtilitiesDatabase, creating it on first use."""
+    global _utilities_db
+    if _utilities_db is None:
+        with _utilities_db_lock:
+            if _utilities_db is None:
+                _utilities_db = UtilitiesDatabase(db_path or os.path.join(PROJECT_ROOT, 'database', 'hexahaul.db'))
+    return _utilities_db
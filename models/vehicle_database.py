@@ -1,9 +1,15 @@
 import os
 import datetime
-import pandas as pd
-from sqlalchemy import create_engine, Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.orm import sessionmaker
+from models.sqlite_engine import create_sqlite_engine, create_tables
+from models.bulk_loader import BulkCsvLoader
+from models.session_manager import session_manager
+from utils.lazy_import import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
 
 Base = declarative_base()
 
@@ -24,80 +30,66 @@ class Vehicle(Base):
     status = Column(String, default='Available')
     year = Column(Integer)
 
+VEHICLE_CSV_DTYPES = {
+    'Employee Id': 'Int64', 'unit_name': str, 'unit_brand': str, 'year': 'Int64',
+    'km_driven': 'Int64', 'min_weight': float, 'max_weight': float
+}
+
+def vehicle_rows(chunk):
+    """Map a chunk of hh_vehicle.csv onto vehicles rows; category is inferred from the model name"""
+    name = chunk['unit_name'].fillna('')
+    brand = chunk['unit_brand'].fillna('')
+    motorcycle = name.str.contains('Mio|Click|NMAX')
+    car = ~motorcycle & name.str.contains('Vios|Civic|MG 5')
+    return pd.DataFrame({
+        'unit_brand': chunk['unit_brand'],
+        'unit_model': [unit_name.replace(unit_brand + ' ', '') for unit_name, unit_brand in zip(name, brand)],
+        'unit_type': np.select([motorcycle, car], ['Motorcycle', 'Sedan'], 'Truck'),
+        'category': np.select([motorcycle, car], ['Motorcycle', 'Car'], 'Truck'),
+        'distance': chunk['km_driven'],
+        'driver_employee_id': chunk['Employee Id'],
+        'max_weight': chunk['max_weight'],
+        'min_weight': chunk['min_weight'],
+        'status': 'Available',
+        'year': chunk['year']
+    }, index=chunk.index)
+
 class VehicleDatabase:
     def __init__(self, db_path="vehicles.db"):
         self.db_path = db_path
-        self.engine = create_engine(f'sqlite:///{db_path}')
+        self.engine = create_sqlite_engine(db_path)
         self.session_factory = sessionmaker(bind=self.engine)
-        self.Session = scoped_session(self.session_factory)
+        self.session_name = session_manager.register(f"vehicles:{os.path.abspath(db_path)}", self.session_factory)
         self.initialize_database()
         
     def connect(self):
-        return self.Session()
+        return session_manager.connect(self.session_name)
         
-    def disconnect(self):
-        self.Session.remove()
+    def disconnect(self, session=None):
+        session_manager.disconnect(self.session_name, session)
             
     def initialize_database(self):
-        Base.metadata.create_all(self.engine)
+        create_tables(Base.metadata, self.engine)
         
-        # Check if data already exists
-        session = self.connect()
-        count = session.query(Vehicle).count()
-        if count == 0:
-            self.populate_from_csv()
-        self.disconnect()
+        # Seeds an empty table; an unchanged seed is skipped via the manifest
+        self.populate_from_csv()
         
     def populate_from_csv(self):
         csv_path = os.path.join('hexahaul_db', 'hh_vehicle.csv')
         
-        # Check if the CSV file exists
-        if not os.path.exists(csv_path):
-            # If CSV file is not found, use default data
-            self.populate_initial_data()
-            return
-            
-        # Read data from CSV file using pandas
         try:
-            df = pd.read_csv(csv_path)
-            session = self.connect()
-            
-            # Map CSV columns to our database schema
-            for _, row in df.iterrows():
-                # Determine category based on model or weight
-                if 'Mio' in row['unit_name'] or 'Click' in row['unit_name'] or 'NMAX' in row['unit_name']:
-                    category = 'Motorcycle'
-                    unit_type = 'Motorcycle'
-                elif 'Vios' in row['unit_name'] or 'Civic' in row['unit_name'] or 'MG 5' in row['unit_name']:
-                    category = 'Car'
-                    unit_type = 'Sedan'
-                else:
-                    category = 'Truck'
-                    unit_type = 'Truck'
-                
-                # Create new Vehicle object
-                vehicle = Vehicle(
-                    unit_brand=row['unit_brand'],
-                    unit_model=row['unit_name'].replace(row['unit_brand'] + ' ', ''),
-                    unit_type=unit_type,
-                    category=category,
-                    distance=row['km_driven'],
-                    driver_employee_id=row['Employee Id'],
-                    license_expiration_date=None,
-                    order_id=None,
-                    max_weight=row['max_weight'],
-                    min_weight=row['min_weight'],
-                    status='Available',
-                    year=row['year']
-                )
-                session.add(vehicle)
-            
-            session.commit()
-            self.disconnect()
+            loaded = BulkCsvLoader(self.engine).load(Vehicle.__table__, csv_path, vehicle_rows, dtype=VEHICLE_CSV_DTYPES)
         except Exception as e:
             print(f"Error loading data from CSV: {e}")
-            # Fallback to default data if CSV loading fails
-            self.populate_initial_data()
+            loaded = None
+        
+        # If the CSV is missing or unreadable, use default data
+        if loaded is None:
+            session = self.connect()
+            count = session.query(Vehicle).count()
+            self.disconnect()
+            if count == 0:
+                self.populate_initial_data()
     
     def populate_initial_data(self):
         session = self.connect()
@@ -0,0 +1,165 @@
+import os
+import time
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from models import mysql_pool
+from utils.cache import TTLCache, MISSING
+from models.analytics_backend import plot_employee_statuses, plot_vehicles_deployed, employee_chart_data, vehicle_chart_data
+
+# Chart name -> (render function drawing `data` as PNG bytes, loader returning that data from a connection factory)
+CHARTS = {
+    'employee_statuses': (plot_employee_statuses, employee_chart_data),
+    'vehicles_deployed': (plot_vehicles_deployed, vehicle_chart_data)
+}
+
+# Encapsulation: one rendered PNG and the data version it was drawn from
+class RenderedChart:
+    def __init__(self, name, png, version, last_modified):
+        self.name = name
+        self.png = png
+        self.version = version
+        self.etag = f"{name}-{version[:16]}"
+        self.last_modified = last_modified
+        self.rendered_at = time.time()
+
+class ChartRenderer:
+    """
+    Serves analytics charts from memory.
+
+    The chart's small aggregate query runs against the live tables at most
+    once every `data_ttl` seconds (CHART_DATA_TTL, default 5), so requests
+    in between neither reach MySQL nor, when it is down, wait on it and
+    re-read the seed CSVs. The chart is cached under a hash of that result,
+    so edits made through the admin pages (in any worker) change the
+    version and the ETag within a few seconds. When the data changes, the cached PNG is still served
+    (stale-while-revalidate) while a background process renders the new
+    one; only the very first request for a chart waits for a render.
+    Renders receive the data and never touch the database or the
+    filesystem, so concurrent requests cannot clobber each other's output.
+    """
+    def __init__(self, charts=None, executor_factory=None, max_workers=None, connection_factory=None, data_ttl=None):
+        self.charts = charts or CHARTS
+        self.connection_factory = connection_factory or mysql_pool.get_connection
+        if data_ttl is None:
+            data_ttl = float(os.getenv("CHART_DATA_TTL", 5))
+        self.__data = TTLCache(maxsize=len(self.charts), ttl=data_ttl)
+        self.max_workers = max_workers or int(os.getenv("CHART_RENDER_WORKERS", 1))
+        if executor_factory is None:
+            # "thread" keeps renders in-process, e.g. where child processes are not allowed
+            executor_factory = self.__thread_pool if os.getenv("CHART_RENDER_POOL", "process") == "thread" else self.__process_pool
+        self.__executor_factory = executor_factory
+        self.__executor = None
+        self.__executor_pid = None
+        self.__lock = threading.Lock()
+        self.__cache = {}
+        self.__seen = {}
+        self.__pending = {}
+        self.__renders = 0
+        self.__stale_served = 0
+        self.__errors = 0
+
+    def __process_pool(self):
+        # spawn, not fork: the web process has threads (batcher, writers) that fork would copy mid-state
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def __thread_pool(self):
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="chart-render")
+
+    def __get_executor(self):
+        if self.__executor is None or self.__executor_pid != os.getpid():
+            self.__executor = self.__executor_factory()
+            self.__executor_pid = os.getpid()
+            self.__pending = {}
+        return self.__executor
+
+    def data_version(self, name):
+        """(version, last_modified, data) of chart `name`, from its loader's result of the last `data_ttl` seconds"""
+        loaded = self.__data.get(name)
+        if loaded is MISSING:
+            data = self.charts[name][1](self.connection_factory)
+            loaded = (hashlib.sha1(repr(data).encode("utf-8")).hexdigest(), data)
+            self.__data.set(name, loaded)
+        version, data = loaded
+        with self.__lock:
+            seen = self.__seen.get(name)
+            if seen is None or seen[0] != version:
+                # First time this process sees this data: that is when it last changed, as far as we know
+                seen = self.__seen[name] = (version, time.time())
+        return version, seen[1], data
+
+    def __schedule(self, name, version, last_modified, data):
+        """Start a render of `name` at `version` unless one is already running; returns its Future"""
+        with self.__lock:
+            pending = self.__pending.get(name)
+            if pending is not None and pending[0] == version:
+                return pending[1]
+            # Render functions are module-level, so they pickle into the pool by reference
+            future = self.__get_executor().submit(self.charts[name][0], data=data)
+            self.__pending[name] = (version, future)
+        future.add_done_callback(lambda done: self.__store(name, version, last_modified, done))
+        return future
+
+    def __store(self, name, version, last_modified, future):
+        """Cache a finished render; called from the done callback and by get(), whichever is first"""
+        with self.__lock:
+            if self.__pending.get(name, (None, None))[1] is future:
+                del self.__pending[name]
+                try:
+                    png = future.result()
+                except BrokenProcessPool as e:
+                    # Pool processes could not start (or died); render in threads from now on
+                    print(f"Chart render pool failed, rendering in-process instead: {e}")
+                    self.__errors += 1
+                    self.__executor_factory = self.__thread_pool
+                    self.__executor = None
+                    return
+                except Exception as e:
+                    self.__errors += 1
+                    print(f"Error rendering chart {name}: {e}")
+                    return
+                self.__cache[name] = RenderedChart(name, png, version, last_modified)
+                self.__renders += 1
+            return self.__cache.get(name)
+
+    def get(self, name, timeout=60):
+        """The freshest available RenderedChart for `name`, regenerating in the background if stale"""
+        version, last_modified, data = self.data_version(name)
+        cached = self.__cache.get(name)
+        if cached is not None and cached.version == version:
+            return cached
+        future = self.__schedule(name, version, last_modified, data)
+        if cached is not None:
+            with self.__lock:
+                self.__stale_served += 1
+            return cached
+        # Nothing to serve yet: wait for the first render
+        try:
+            future.result(timeout=timeout)
+        except BrokenProcessPool:
+            # __store has switched to a thread pool; render again there
+            self.__store(name, version, last_modified, future)
+            return self.get(name, timeout)
+        # None only if the data changed again mid-render; wait for that render instead
+        return self.__store(name, version, last_modified, future) or self.get(name, timeout)
+
+    def prewarm(self):
+        for name in self.charts:
+            self.__schedule(name, *self.data_version(name))
+
+    def stats(self):
+        with self.__lock:
+            return {
+                'charts': {name: {'etag': chart.etag, 'bytes': len(chart.png), 'rendered_at': chart.rendered_at}
+                           for name, chart in self.__cache.items()},
+                'renders': self.__renders,
+                'rendering': sorted(self.__pending),
+                'stale_served': self.__stale_served,
+                'errors': self.__errors
+            }
+
+# Shared by the analytics routes
+chart_renderer = ChartRenderer()
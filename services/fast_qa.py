@@ -0,0 +1,116 @@
+import os
+
+from utils.cache import TTLCache, MISSING
+
+def configure_torch_threads(threads=None):
+    """Bound intra-op threads per worker; with several gunicorn workers the default oversubscribes the CPU."""
+    import torch
+    if threads is None:
+        threads = os.getenv("QA_TORCH_THREADS")
+    if not threads:
+        return None
+    threads = max(1, int(threads))
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Can only be set once, before any inter-op work has started
+        pass
+    return threads
+
+class FastQAPipeline:
+    """
+    Drop-in replacement for the transformers question-answering pipeline,
+    specialised for HexaBot's case of a short, fixed FAQ context.
+
+    The context is tokenized once and cached with its character offsets;
+    each call only tokenizes the questions and stitches
+    [CLS] question [SEP] context [SEP] together. Contexts longer than
+    `max_seq_len` are truncated rather than split into strided windows.
+    Accepts a single question or lists, like the pipeline, and returns
+    {'score', 'start', 'end', 'answer'} dicts.
+    """
+    def __init__(self, model, tokenizer, max_seq_len=384, max_answer_len=15, context_cache_size=16):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_seq_len = max_seq_len
+        self.max_answer_len = max_answer_len
+        self._contexts = TTLCache(maxsize=context_cache_size)
+
+    def _encode_context(self, context):
+        encoded = self._contexts.get(context)
+        if encoded is MISSING:
+            tokens = self.tokenizer(context, add_special_tokens=False, return_offsets_mapping=True)
+            encoded = (tokens['input_ids'], tokens['offset_mapping'])
+            self._contexts.set(context, encoded)
+        return encoded
+
+    def __call__(self, question, context, batch_size=None, **kwargs):
+        single = isinstance(question, str)
+        questions = [question] if single else list(question)
+        contexts = [context] * len(questions) if isinstance(context, str) else list(context)
+        batch_size = batch_size or len(questions) or 1
+
+        results = []
+        for start in range(0, len(questions), batch_size):
+            results.extend(self._answer_batch(questions[start:start + batch_size], contexts[start:start + batch_size]))
+        return results[0] if single else results
+
+    def _answer_batch(self, questions, contexts):
+        import torch
+
+        tokenizer = self.tokenizer
+        question_ids = tokenizer(questions, add_special_tokens=False)['input_ids']
+        rows = []
+        for q_ids, context in zip(question_ids, contexts):
+            q_ids = q_ids[:self.max_seq_len // 2]
+            c_ids, c_offsets = self._encode_context(context)
+            budget = max(0, self.max_seq_len - len(q_ids) - 3)
+            c_ids, c_offsets = c_ids[:budget], c_offsets[:budget]
+            ids = [tokenizer.cls_token_id] + q_ids + [tokenizer.sep_token_id] + c_ids + [tokenizer.sep_token_id]
+            rows.append((ids, len(q_ids) + 2, c_offsets, context))
+
+        width = max(len(ids) for ids, _, _, _ in rows)
+        input_ids = torch.full((len(rows), width), tokenizer.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(rows), width), dtype=torch.long)
+        for i, (ids, _, _, _) in enumerate(rows):
+            input_ids[i, :len(ids)] = torch.tensor(ids, dtype=torch.long)
+            attention_mask[i, :len(ids)] = 1
+
+        with torch.inference_mode():
+            output = self.model(input_ids=input_ids, attention_mask=attention_mask)
+
+        results = []
+        for i, (_, ctx_start, c_offsets, context) in enumerate(rows):
+            n_ctx = len(c_offsets)
+            if n_ctx == 0:
+                results.append({'score': 0.0, 'start': 0, 'end': 0, 'answer': ''})
+                continue
+            start_probs = output.start_logits[i, ctx_start:ctx_start + n_ctx].float().softmax(-1)
+            end_probs = output.end_logits[i, ctx_start:ctx_start + n_ctx].float().softmax(-1)
+            # Spans must end after they start and be at most max_answer_len tokens long
+            scores = torch.outer(start_probs, end_probs).triu().tril(self.max_answer_len - 1)
+            best = int(scores.argmax())
+            start_token, end_token = divmod(best, n_ctx)
+            char_start, char_end = c_offsets[start_token][0], c_offsets[end_token][1]
+            results.append({
+                'score': float(scores.view(-1)[best]),
+                'start': char_start,
+                'end': char_end,
+                'answer': context[char_start:char_end]
+            })
+        return results
+
+def load_fast_qa_pipeline(model_name, quantize=True, threads=None):
+    """Load `model_name` as a FastQAPipeline, int8 dynamically quantized unless quantize=False."""
+    import torch
+    from transformers import AutoTokenizer, AutoModelForQuestionAnswering
+
+    configure_torch_threads(threads)
+    tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+    model = AutoModelForQuestionAnswering.from_pretrained(model_name)
+    model.eval()
+    if quantize:
+        # Weights of every Linear layer become int8; activations are quantized on the fly
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return FastQAPipeline(model, tokenizer)
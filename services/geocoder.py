@@ -0,0 +1,330 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from utils.cache import TTLCache, MISSING
+from services.locality_index import get_default_index
+from utils.lazy_import import lazy_import
+
+requests = lazy_import('requests')
+
+UNKNOWN_LOCATION = "Unknown Location"
+
+# Built-in gazetteer for the branch coordinates used by payment_wall
+BRANCH_GAZETTEER = {
+    (14.4793, 121.0198): "Parañaque",
+    (14.6507, 120.9667): "Caloocan",
+    (14.676, 121.0437): "Quezon City",
+    (14.5995, 120.9842): "Manila",
+}
+
+class ReverseGeocoder:
+    """
+    Reverse geocoding for the parcel tracker.
+
+    With the default GEOCODE_RESOLVER=offline, points resolve to the nearest
+    bundled PH locality (see services/locality_index.py) and no network is
+    used. Points further than GEOCODE_MAX_DISTANCE_KM from any locality go
+    to Nominatim only when GEOCODE_FALLBACK=nominatim.
+
+    The Nominatim path is layered: branch gazetteer -> in-memory LRU ->
+    persistent SQLite store -> HTTP. Coordinates are rounded to `precision`
+    decimals (3 = ~110 m, well below the city-level zoom we ask Nominatim
+    for) before lookup. Failed lookups are never persisted.
+    """
+    NOMINATIM_URL = "https://nominatim.openstreetmap.org/reverse"
+    USER_AGENT = "HexaHaulParcelTracker/1.0"
+    # Nominatim usage policy: at most one request per second
+    MAX_RATE_LIMIT = 1.0
+
+    def __init__(self, db_path=None, precision=None, timeout=5, memory_size=4096,
+                 resolver=None, fallback=None, max_distance_km=None, locality_index=None):
+        if db_path is None:
+            db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database', 'geocode_cache.db')
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.precision = int(os.getenv("GEOCODE_PRECISION", 3)) if precision is None else precision
+        self.timeout = timeout
+        self.resolver = (resolver or os.getenv("GEOCODE_RESOLVER", "offline")).lower()
+        self.fallback = (fallback or os.getenv("GEOCODE_FALLBACK", "none")).lower()
+        if max_distance_km is None:
+            max_distance_km = float(os.getenv("GEOCODE_MAX_DISTANCE_KM", 25))
+        self.max_distance_km = max_distance_km
+        self._locality_index = locality_index
+        self.memory = TTLCache(maxsize=memory_size)
+        self.gazetteer = {self._key(lat, lon): place for (lat, lon), place in BRANCH_GAZETTEER.items()}
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="geocode")
+        self._prewarm_thread = None
+        self._prewarm_status = {'state': 'idle', 'processed': 0, 'resolved': 0, 'total': 0}
+        self._initialize_store()
+
+    @property
+    def offline(self):
+        return self.resolver == "offline"
+
+    @property
+    def remote_enabled(self):
+        return self.resolver == "nominatim" or self.fallback == "nominatim"
+
+    @property
+    def locality_index(self):
+        if self._locality_index is None:
+            self._locality_index = get_default_index()
+        return self._locality_index
+
+    def resolve_offline(self, lat, lon):
+        """Nearest bundled locality, or None if it is beyond max_distance_km."""
+        try:
+            name, distance = self.locality_index.nearest(lat, lon)
+        except (TypeError, ValueError):
+            return None
+        return name if distance <= self.max_distance_km else None
+
+    def resolve_offline_many(self, coordinates):
+        lats = [self._as_float(lat) for lat, _ in coordinates]
+        lons = [self._as_float(lon) for _, lon in coordinates]
+        names, distances = self.locality_index.nearest_many(lats, lons)
+        # NaN distances (unparseable input) compare False and become misses
+        return [name if distance <= self.max_distance_km else None
+                for name, distance in zip(names, distances)]
+
+    @staticmethod
+    def _as_float(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return math.nan
+
+    def _key(self, lat, lon):
+        return (round(float(lat), self.precision), round(float(lon), self.precision))
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _initialize_store(self):
+        conn = self._connect()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS geocode_cache (
+                    lat_key REAL NOT NULL,
+                    lon_key REAL NOT NULL,
+                    place TEXT NOT NULL,
+                    updated_at TEXT,
+                    PRIMARY KEY (lat_key, lon_key)
+                )
+            """)
+            conn.commit()
+        except Exception as e:
+            print(f"Error initializing geocode cache: {e}")
+        finally:
+            conn.close()
+
+    def _load_persisted(self, key):
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT place FROM geocode_cache WHERE lat_key = ? AND lon_key = ?", key
+            ).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+
+    def _persist(self, key, place):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO geocode_cache (lat_key, lon_key, place, updated_at) VALUES (?, ?, ?, ?)",
+                (key[0], key[1], place, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def lookup_cached(self, lat, lon):
+        """Resolve from the gazetteer, memory or SQLite only; returns None on a miss."""
+        key = self._key(lat, lon)
+        if key in self.gazetteer:
+            return self.gazetteer[key]
+        place = self.memory.get(key)
+        if place is not MISSING:
+            return place
+        try:
+            place = self._load_persisted(key)
+        except Exception as e:
+            print(f"Error reading geocode cache: {e}")
+            place = None
+        if place:
+            self.memory.set(key, place)
+        return place
+
+    def fetch_remote(self, lat, lon):
+        """Reverse geocode using Nominatim (OpenStreetMap)"""
+        try:
+            params = {
+                "lat": lat,
+                "lon": lon,
+                "format": "json",
+                "zoom": 12,
+                "addressdetails": 1
+            }
+            headers = {
+                "User-Agent": self.USER_AGENT
+            }
+            resp = requests.get(self.NOMINATIM_URL, params=params, headers=headers, timeout=self.timeout)
+            if resp.status_code == 200:
+                data = resp.json()
+                address = data.get("address", {})
+                for key in ("city", "town", "village", "municipality", "county"):
+                    if key in address:
+                        return address[key]
+                return data.get("display_name") or None
+        except Exception as e:
+            print(f"Reverse geocoding failed: {e}")
+        return None
+
+    def store(self, lat, lon, place):
+        key = self._key(lat, lon)
+        self.memory.set(key, place)
+        try:
+            self._persist(key, place)
+        except Exception as e:
+            print(f"Error writing geocode cache: {e}")
+
+    def reverse_geocode(self, lat, lon):
+        if self.offline:
+            try:
+                place = self.gazetteer.get(self._key(lat, lon)) or self.resolve_offline(lat, lon)
+            except (TypeError, ValueError):
+                place = None
+            if place:
+                return place
+        if not self.remote_enabled:
+            return UNKNOWN_LOCATION
+        return self._reverse_geocode_remote(lat, lon)
+
+    def _reverse_geocode_remote(self, lat, lon):
+        place = self.lookup_cached(lat, lon)
+        if place:
+            return place
+        place = self.fetch_remote(lat, lon)
+        if not place:
+            return UNKNOWN_LOCATION
+        self.store(lat, lon, place)
+        return place
+
+    def reverse_geocode_many(self, coordinates):
+        """
+        Resolve several (lat, lon) pairs. Offline lookups run as one
+        vectorized batch; remote misses are fetched concurrently so two
+        misses cost one round trip, not two.
+        """
+        coordinates = list(coordinates)
+        if self.offline:
+            places = self.resolve_offline_many(coordinates) if coordinates else []
+        else:
+            places = [None] * len(coordinates)
+        if not self.remote_enabled:
+            return [place or UNKNOWN_LOCATION for place in places]
+
+        for i, (lat, lon) in enumerate(coordinates):
+            if not places[i]:
+                places[i] = self.lookup_cached(lat, lon)
+        misses = [i for i, place in enumerate(places) if not place]
+        if len(misses) == 1:
+            i = misses[0]
+            places[i] = self._reverse_geocode_remote(*coordinates[i])
+        elif misses:
+            futures = {i: self._executor.submit(self._reverse_geocode_remote, *coordinates[i]) for i in misses}
+            for i, future in futures.items():
+                places[i] = future.result()
+        return places
+
+    @classmethod
+    def check_rate_limit(cls, rate_limit):
+        """
+        Requests per second for a prewarm, capped at MAX_RATE_LIMIT. Raises
+        ValueError unless it is a positive number, as 0 would mean no delay.
+        """
+        rate_limit = float(rate_limit)
+        if not math.isfinite(rate_limit) or rate_limit <= 0:
+            raise ValueError("rate_limit must be a positive number of requests per second")
+        return min(rate_limit, cls.MAX_RATE_LIMIT)
+
+    def prewarm(self, coordinates, rate_limit=1.0):
+        """Fill the cache for every uncached coordinate, at most `rate_limit` requests per second."""
+        min_interval = 1.0 / self.check_rate_limit(rate_limit)
+        pending = []
+        seen = set()
+        for lat, lon in coordinates:
+            try:
+                key = self._key(lat, lon)
+            except (TypeError, ValueError):
+                continue
+            if key in seen or (self.offline and self.resolve_offline(lat, lon)):
+                continue
+            if not self.lookup_cached(lat, lon):
+                seen.add(key)
+                pending.append(key)
+
+        status = self._prewarm_status
+        status.update(state='running', processed=0, resolved=0, total=len(pending))
+        last_request = 0.0
+        for lat, lon in pending:
+            wait = min_interval - (time.monotonic() - last_request)
+            if wait > 0:
+                time.sleep(wait)
+            last_request = time.monotonic()
+            place = self.fetch_remote(lat, lon)
+            if place:
+                self.store(lat, lon, place)
+                status['resolved'] += 1
+            status['processed'] += 1
+        status['state'] = 'done'
+        return status
+
+    def prewarm_from_orders(self, connection_factory, rate_limit=1.0):
+        """Pre-warm from every distinct customer location in hh_order."""
+        conn = connection_factory()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT DISTINCT customer_latitude, customer_longitude FROM hh_order")
+            coordinates = cursor.fetchall()
+            cursor.close()
+        finally:
+            conn.close()
+        return self.prewarm(coordinates, rate_limit=rate_limit)
+
+    def start_prewarm(self, connection_factory, rate_limit=1.0):
+        """
+        Run prewarm_from_orders on a background thread. Returns False if
+        Nominatim is disabled or a prewarm is already running; raises
+        ValueError for an invalid rate_limit.
+        """
+        rate_limit = self.check_rate_limit(rate_limit)
+        if not self.remote_enabled:
+            return False
+        if self._prewarm_thread and self._prewarm_thread.is_alive():
+            return False
+
+        def run():
+            try:
+                self.prewarm_from_orders(connection_factory, rate_limit)
+            except Exception as e:
+                self._prewarm_status['state'] = 'failed'
+                print(f"Geocode prewarm failed: {e}")
+
+        self._prewarm_thread = threading.Thread(target=run, name="geocode-prewarm", daemon=True)
+        self._prewarm_thread.start()
+        return True
+
+    def stats(self):
+        return {
+            'resolver': self.resolver,
+            'fallback': self.fallback,
+            'memory': self.memory.stats(),
+            'prewarm': dict(self._prewarm_status)
+        }
@@ -1,22 +1,128 @@
 from flask import Blueprint, request, jsonify
+import os
 import re
-from transformers import pipeline
-import requests
+import math
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
 from abc import ABC, abstractmethod
+from services.model_registry import model_registry, ModelNotReady, QA_MODEL, qa_fast_inference_enabled
+from services.inference_sidecar import SidecarClient, SidecarUnavailable, sidecar_socket_path
+from utils.cache import TTLCache, MISSING
+from utils.lazy_import import lazy_import
+
+requests = lazy_import('requests')
 
 hexabot_bp = Blueprint("hexabot", __name__)
 
-# Initialize DistilBERT QA pipeline
-qa_pipeline = pipeline("question-answering", model="distilbert-base-uncased-distilled-squad")
+# The DistilBERT QA pipeline is loaded once per process by the model registry,
+# either by the warmup thread started in HexaHaulApp or on first use
+
+# Encapsulation: MessageAnalysis holds every keyword hit found in one pass over a message
+class MessageAnalysis:
+    def __init__(self, text, hits):
+        self.text = text
+        # (category, term, start) in the order they appear in the text
+        self.hits = hits
+        self.__categories = {category for category, _, _ in hits}
+
+    def has(self, category):
+        return category in self.__categories
+
+    def terms(self, category):
+        return [term for hit_category, term, _ in self.hits if hit_category == category]
+
+    def leading(self, categories):
+        """The first of `categories` matched at the very start of the text, else None"""
+        for category, _, start in self.hits:
+            if start > 0:
+                break
+            if category in categories:
+                return category
+        return None
+
+# Encapsulation: MessageAnalyzer finds every category's keywords with one compiled regex
+class MessageAnalyzer:
+    def __init__(self):
+        self.__terms = {}
+        self.__pattern = None
+
+    def add(self, category, terms, whole_word=True):
+        """
+        Register `terms` under `category`. Whole-word terms must end at a word
+        boundary; the others also match as the start of a longer word.
+        """
+        for term in terms:
+            self.__terms.setdefault(term.lower(), []).append((category, whole_word))
+        self.__pattern = None
+        return self
+
+    @classmethod
+    def __trie_pattern(cls, node):
+        # Terms sharing a prefix share one branch, so the regex never retries a common prefix
+        ends_here = "" in node
+        branches = []
+        for char in sorted(k for k in node if k):
+            piece = r"\s+" if char == " " else re.escape(char)
+            branches.append(piece + cls.__trie_pattern(node[char]))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy "?" still prefers the longer term ("tanginamo" over "tangina")
+        if ends_here:
+            return body + "?" if len(branches) == 1 and len(body) == 1 else "(?:" + body + ")?"
+        return body
+
+    def __compile(self):
+        trie = {}
+        for term in self.__terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[""] = True
+        return re.compile(r"\b" + self.__trie_pattern(trie))
+
+    def analyze(self, text):
+        if self.__pattern is None:
+            self.__pattern = self.__compile()
+        text = text.lower()
+        hits = []
+        for match in self.__pattern.finditer(text):
+            term = " ".join(match.group().split())
+            at_word_end = match.end() == len(text) or not (text[match.end()].isalnum() or text[match.end()] == "_")
+            for category, whole_word in self.__terms[term]:
+                if at_word_end or not whole_word:
+                    hits.append((category, term, match.start()))
+        return MessageAnalysis(text, hits)
 
 # Abstraction: Base abstract class for chatbot features
 class ChatBotFeature(ABC):
+    # Keyword category this feature contributes to the shared MessageAnalyzer, if any
+    category = None
+
     @abstractmethod
     def process(self, text, lang="en"):
         pass
 
+    def terms(self):
+        return []
+
+    def _analyze(self, text, analysis=None):
+        # Features used on their own build a one-category analyzer; ChatBot passes a shared analysis
+        if analysis is None:
+            if getattr(self, "_own_analyzer", None) is None:
+                self._own_analyzer = MessageAnalyzer().add(self.category, self.terms())
+            analysis = self._own_analyzer.analyze(text)
+        return analysis
+
 # Encapsulation: ProfanityFilter class encapsulates profanity detection logic
 class ProfanityFilter(ChatBotFeature):
+    category = "profanity"
+
     def __init__(self):
         self.__profanity_list = [
             "fuck", "shit", "bitch", "asshole", "bastard", "dick", "pussy", "motherfucker", "fucker", "cunt", "slut", "penis", "dimwit",
@@ -24,63 +130,567 @@ class ProfanityFilter(ChatBotFeature):
             "pakshet", "puta", "pukinginamo", "kinginamo",
         ]
     
-    def process(self, text, lang="en"):
-        has_profanity = self.__contains_profanity(text)
+    def terms(self):
+        return list(self.__profanity_list)
+    
+    def process(self, text, lang="en", analysis=None):
+        has_profanity = self.contains_profanity(text, analysis)
         if has_profanity:
             if lang == "tl":
                 return "Panatilihin nating magalang ang ating usapan. Iwasan po natin ang paggamit ng hindi angkop na wika."
             return "Let's keep our conversation respectful. Please avoid using inappropriate language."
         return None
     
-    def __contains_profanity(self, text):
-        text = text.lower()
-        for word in self.__profanity_list:
-            if re.search(rf"\b{re.escape(word)}\b", text):
-                return True
-        return False
+    def contains_profanity(self, text, analysis=None):
+        return self._analyze(text, analysis).has(self.category)
 
 # Encapsulation: LanguageDetector class encapsulates language detection
 class LanguageDetector(ChatBotFeature):
+    category = "tagalog"
+
     def __init__(self):
         self.__tagalog_keywords = [
             "kamusta", "kumusta", "ano", "paano", "saan", "kailan", "bakit", "ikaw", "ako", "siya", "tayo", 
             "kayo", "nila", "natin", "ng", "sa", "ang", "mga", "at", "hindi", "oo", "opo", "po", "hoy"
         ]
     
-    def process(self, text, lang="en"):
-        return self.detect_language(text)
+    def terms(self):
+        return list(self.__tagalog_keywords)
+    
+    def process(self, text, lang="en", analysis=None):
+        return self.detect_language(text, analysis)
         
-    def detect_language(self, text):
-        text = text.lower()
-        for word in self.__tagalog_keywords:
-            if word in text:
-                return "tl"
-        return "en"
+    def detect_language(self, text, analysis=None):
+        # Whole words only: as substrings "ng" and "at" would tag most English text as Tagalog
+        return "tl" if self._analyze(text, analysis).has(self.category) else "en"
+
+# Encapsulation: TranslationCache keeps translations keyed by (source, target, text hash)
+class TranslationCache:
+    def __init__(self, db_path=None, maxsize=None):
+        if db_path is None:
+            db_path = os.getenv("HEXABOT_TRANSLATION_DB", os.path.join("database", "translation_cache.db"))
+        if maxsize is None:
+            maxsize = int(os.getenv("HEXABOT_TRANSLATION_CACHE_SIZE", 4096))
+        # Translations do not go stale, so there is no TTL; an empty db_path keeps them in memory only
+        self.__cache = TTLCache(maxsize=maxsize)
+        self.__db_path = db_path or None
+        self.__db_lock = threading.Lock()
+        self.__catalog_entries = 0
+        if self.__db_path and os.path.exists(self.__db_path):
+            self.__load()
+
+    @staticmethod
+    def key(text, source, target):
+        return (source, target, hashlib.sha1(text.strip().encode("utf-8")).hexdigest())
+
+    def get(self, key):
+        translation = self.__cache.get(key)
+        return None if translation is MISSING else translation
+
+    def set(self, key, translation, persist=True):
+        self.__cache.set(key, translation)
+        if persist and self.__db_path:
+            self.__persist(key, translation)
+
+    def load_catalog(self, catalog_path):
+        """Preload a catalog written by tools/build_translation_catalog.py: {"en:tl": {text: translation}}"""
+        try:
+            with open(catalog_path, "r", encoding="utf-8") as file:
+                catalog = json.load(file)
+        except FileNotFoundError:
+            return 0
+        except Exception as e:
+            print(f"Error loading translation catalog: {e}")
+            return 0
+        loaded = 0
+        for pair, entries in catalog.items():
+            source, target = pair.split(":", 1)
+            for text, translation in entries.items():
+                self.set(self.key(text, source, target), translation, persist=False)
+                loaded += 1
+        self.__catalog_entries += loaded
+        return loaded
+
+    def stats(self):
+        stats = self.__cache.stats()
+        stats['persistent'] = bool(self.__db_path)
+        stats['catalog_entries'] = self.__catalog_entries
+        return stats
+
+    def __connect(self):
+        directory = os.path.dirname(self.__db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.__db_path, timeout=10)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS translations (
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (source, target, text_hash)
+            )
+        """)
+        return conn
+
+    def __load(self):
+        try:
+            with self.__db_lock:
+                conn = self.__connect()
+                try:
+                    rows = conn.execute(
+                        "SELECT source, target, text_hash, translation FROM translations ORDER BY created_at DESC LIMIT ?",
+                        (self.__cache.maxsize,)
+                    ).fetchall()
+                finally:
+                    conn.close()
+            for source, target, text_hash, translation in reversed(rows):
+                self.__cache.set((source, target, text_hash), translation)
+        except Exception as e:
+            print(f"Error loading translation cache: {e}")
+
+    def __persist(self, key, translation):
+        try:
+            with self.__db_lock:
+                conn = self.__connect()
+                try:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO translations (source, target, text_hash, translation, created_at) VALUES (?, ?, ?, ?, ?)",
+                        (key[0], key[1], key[2], translation, time.time())
+                    )
+                    conn.commit()
+                finally:
+                    conn.close()
+        except Exception as e:
+            print(f"Error saving translation: {e}")
 
 # Encapsulation: Translator class encapsulates translation functionality
 class Translator(ChatBotFeature):
+    def __init__(self, endpoint=None, cache=None, catalog_path=None, budget_ms=None):
+        # Point LIBRETRANSLATE_URL at a local LibreTranslate instance to avoid the public server
+        self.endpoint = endpoint or os.getenv("LIBRETRANSLATE_URL", "https://libretranslate.de/translate")
+        self.api_key = os.getenv("LIBRETRANSLATE_API_KEY")
+        self.timeout = float(os.getenv("LIBRETRANSLATE_TIMEOUT", 5))
+        self.budget_ms = float(os.getenv("HEXABOT_TRANSLATE_BUDGET_MS", 800)) if budget_ms is None else budget_ms
+        self.__cache = cache if cache is not None else TranslationCache()
+        if catalog_path is None:
+            catalog_path = os.getenv("HEXABOT_TRANSLATION_CATALOG", os.path.join("hexahaul_db", "translation_catalog.json"))
+        if catalog_path:
+            self.__cache.load_catalog(catalog_path)
+        self.__executor = None
+        self.__executor_pid = None
+        self.__pending = {}
+        # Reentrant: a future that is already done runs its callback inside __submit
+        self.__pending_lock = threading.RLock()
+        self.__requests = 0
+        self.__failures = 0
+        self.__budget_misses = 0
+
     def process(self, text, source="en", target="tl"):
         return self.translate(text, source, target)
         
     def translate(self, text, source, target):
-        if source == target:
+        """Blocking translation: cache, then the remote endpoint; falls back to `text`"""
+        if source == target or not text:
+            return text
+        key = self.__cache.key(text, source, target)
+        cached = self.__cache.get(key)
+        if cached is not None:
+            return cached
+        translated = self.__fetch(text, source, target)
+        if translated is None:
+            return text  # fallback
+        self.__cache.set(key, translated)
+        return translated
+
+    def translate_within(self, text, source, target, budget_ms=None):
+        """
+        Like translate(), but waits at most `budget_ms` for the remote endpoint.
+        On timeout the source text is returned and the request keeps running in
+        the background, so the translation is cached for the next asker.
+        """
+        if source == target or not text:
             return text
+        key = self.__cache.key(text, source, target)
+        cached = self.__cache.get(key)
+        if cached is not None:
+            return cached
+        budget_ms = self.budget_ms if budget_ms is None else budget_ms
         try:
-            resp = requests.post(
-                "https://libretranslate.de/translate",
-                data={
-                    "q": text,
-                    "source": source,
-                    "target": target,
-                    "format": "text"
-                },
-                timeout=5
-            )
+            return self.__submit(key, text, source, target).result(timeout=budget_ms / 1000)
+        except Exception:
+            with self.__pending_lock:
+                self.__budget_misses += 1
+            return text
+
+    def __submit(self, key, text, source, target):
+        with self.__pending_lock:
+            # The pool does not survive a fork, so each process creates its own
+            if self.__executor is None or self.__executor_pid != os.getpid():
+                self.__executor = ThreadPoolExecutor(max_workers=int(os.getenv("HEXABOT_TRANSLATE_WORKERS", 2)), thread_name_prefix="hexabot-translate")
+                self.__executor_pid = os.getpid()
+                self.__pending = {}
+            future = self.__pending.get(key)
+            if future is None:
+                # Concurrent askers of the same text share one request
+                future = self.__executor.submit(self.translate, text, source, target)
+                self.__pending[key] = future
+                future.add_done_callback(lambda _: self.__forget(key))
+            return future
+
+    def __forget(self, key):
+        with self.__pending_lock:
+            self.__pending.pop(key, None)
+
+    def __fetch(self, text, source, target):
+        data = {
+            "q": text,
+            "source": source,
+            "target": target,
+            "format": "text"
+        }
+        if self.api_key:
+            data["api_key"] = self.api_key
+        with self.__pending_lock:
+            self.__requests += 1
+        try:
+            resp = requests.post(self.endpoint, data=data, timeout=self.timeout)
             if resp.status_code == 200:
                 return resp.json()["translatedText"]
         except Exception:
             pass
-        return text  # fallback
+        with self.__pending_lock:
+            self.__failures += 1
+        return None
+
+    def stats(self):
+        with self.__pending_lock:
+            stats = {
+                'endpoint': self.endpoint,
+                'budget_ms': self.budget_ms,
+                'remote_requests': self.__requests,
+                'remote_failures': self.__failures,
+                'budget_misses': self.__budget_misses,
+                'in_flight': len(self.__pending)
+            }
+        stats['cache'] = self.__cache.stats()
+        return stats
+
+# Encapsulation: AnswerCache keeps QA answers keyed by (question, lang, context version)
+class AnswerCache:
+    def __init__(self, maxsize=None, ttl=None, db_path=None):
+        if maxsize is None:
+            maxsize = int(os.getenv("HEXABOT_ANSWER_CACHE_SIZE", 1024))
+        if ttl is None:
+            ttl = float(os.getenv("HEXABOT_ANSWER_CACHE_TTL", 86400))
+        if db_path is None:
+            # Persistence is opt-in: set HEXABOT_ANSWER_CACHE_DB to a SQLite file path
+            db_path = os.getenv("HEXABOT_ANSWER_CACHE_DB") or None
+        self.__cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.__db_path = db_path
+        self.__db_lock = threading.Lock()
+        if self.__db_path:
+            self.__load()
+
+    @staticmethod
+    def normalize(question):
+        """Lowercase, drop punctuation and collapse whitespace so trivial variants share a key"""
+        question = re.sub(r"[^\w\s]", " ", question.lower())
+        return " ".join(question.split())
+
+    def key(self, question, lang, context_version):
+        return (self.normalize(question), lang, context_version)
+
+    def get(self, key):
+        answer = self.__cache.get(key)
+        return None if answer is MISSING else answer
+
+    def set(self, key, answer):
+        self.__cache.set(key, answer)
+        if self.__db_path:
+            self.__persist(key, answer)
+
+    def clear(self):
+        self.__cache.clear()
+
+    def stats(self):
+        stats = self.__cache.stats()
+        stats['persistent'] = bool(self.__db_path)
+        return stats
+
+    def __connect(self):
+        conn = sqlite3.connect(self.__db_path, timeout=10)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS hexabot_answers (
+                question TEXT NOT NULL,
+                lang TEXT NOT NULL,
+                context_version TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (question, lang, context_version)
+            )
+        """)
+        return conn
+
+    def __load(self):
+        try:
+            with self.__db_lock:
+                conn = self.__connect()
+                try:
+                    cutoff = time.time() - self.__cache.ttl if self.__cache.ttl else 0
+                    rows = conn.execute(
+                        "SELECT question, lang, context_version, answer, created_at FROM hexabot_answers "
+                        "WHERE created_at >= ? ORDER BY created_at DESC LIMIT ?",
+                        (cutoff, self.__cache.maxsize)
+                    ).fetchall()
+                finally:
+                    conn.close()
+            # Oldest first so the newest answers end up most recently used
+            for question, lang, context_version, answer, created_at in reversed(rows):
+                ttl = self.__cache.ttl - (time.time() - created_at) if self.__cache.ttl else None
+                self.__cache.set((question, lang, context_version), answer, ttl=ttl)
+        except Exception as e:
+            print(f"Error loading HexaBot answer cache: {e}")
+
+    def __persist(self, key, answer):
+        try:
+            with self.__db_lock:
+                conn = self.__connect()
+                try:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO hexabot_answers (question, lang, context_version, answer, created_at) VALUES (?, ?, ?, ?, ?)",
+                        (key[0], key[1], key[2], answer, time.time())
+                    )
+                    conn.commit()
+                finally:
+                    conn.close()
+        except Exception as e:
+            print(f"Error saving HexaBot answer: {e}")
+
+# Encapsulation: IntentIndex matches questions to canned answers before the QA model runs
+class IntentIndex:
+    def __init__(self, threshold=None, margin=None, ngram_range=(3, 5)):
+        if threshold is None:
+            threshold = float(os.getenv("HEXABOT_INTENT_THRESHOLD", 0.75))
+        if margin is None:
+            margin = float(os.getenv("HEXABOT_INTENT_MARGIN", 0.15))
+        self.threshold = threshold
+        # How far the best intent must lead the best text of any other intent
+        self.margin = margin
+        self.__ngram_range = ngram_range
+        self.__entries = []
+        self.__vocabulary = {}
+        self.__idf = None
+        self.__matrix = None
+        self.__stats_lock = threading.Lock()
+        self.__lookups = 0
+        self.__hits = {}
+
+    def __ngrams(self, text):
+        """Character n-grams inside word boundaries, so word order and small typos matter little"""
+        grams = {}
+        low, high = self.__ngram_range
+        for word in re.findall(r"\w+", text.lower()):
+            word = f" {word} "
+            for n in range(low, high + 1):
+                for i in range(max(1, len(word) - n + 1)):
+                    gram = word[i:i + n]
+                    grams[gram] = grams.get(gram, 0) + 1
+        return grams
+
+    def add(self, kind, key, text):
+        """Register `text` as a way of asking for intent (kind, key); call build() afterwards"""
+        self.__entries.append((kind, key, text))
+
+    def build(self):
+        """Build the L2-normalised TF-IDF matrix, one row per registered text"""
+        import numpy as np
+        counts = [self.__ngrams(text) for _, _, text in self.__entries]
+        vocabulary = {}
+        for grams in counts:
+            for gram in grams:
+                vocabulary.setdefault(gram, len(vocabulary))
+        matrix = np.zeros((len(counts), len(vocabulary)), dtype=np.float32)
+        for row, grams in enumerate(counts):
+            for gram, count in grams.items():
+                matrix[row, vocabulary[gram]] = 1.0 + np.log(count)
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        self.__idf = (np.log((1.0 + len(counts)) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+        matrix *= self.__idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.__matrix = matrix / norms
+        self.__vocabulary = vocabulary
+
+    def scores(self, text):
+        """Cosine similarity of `text` against every registered text, in one matrix-vector product"""
+        import numpy as np
+        if self.__matrix is None:
+            return np.zeros(len(self.__entries), dtype=np.float32)
+        # The query stays sparse: only the columns of its own n-grams are touched
+        unseen_idf = math.log(1.0 + len(self.__entries)) + 1.0
+        columns, weights, norm = [], [], 0.0
+        for gram, count in self.__ngrams(text).items():
+            tf = 1.0 + math.log(count)
+            column = self.__vocabulary.get(gram)
+            if column is None:
+                # N-grams never seen at build time still lengthen the query vector
+                norm += (tf * unseen_idf) ** 2
+                continue
+            weight = tf * float(self.__idf[column])
+            columns.append(column)
+            weights.append(weight)
+            norm += weight ** 2
+        if not columns:
+            return np.zeros(len(self.__entries), dtype=np.float32)
+        weights = np.asarray(weights, dtype=np.float32) / math.sqrt(norm)
+        return self.__matrix[:, np.asarray(columns, dtype=np.intp)] @ weights
+
+    def match(self, text):
+        """
+        Return (kind, key, score) for the best intent if it reaches the
+        threshold and leads every other intent by the margin, else None
+        """
+        scores = self.scores(text)
+        best = int(scores.argmax()) if len(scores) else -1
+        matched = best >= 0 and scores[best] >= self.threshold
+        if matched:
+            intent = self.__entries[best][:2]
+            runner_up = max((float(score) for (kind, key, _), score in zip(self.__entries, scores)
+                             if (kind, key) != intent), default=0.0)
+            matched = scores[best] - runner_up >= self.margin
+        with self.__stats_lock:
+            self.__lookups += 1
+            if matched:
+                kind = self.__entries[best][0]
+                self.__hits[kind] = self.__hits.get(kind, 0) + 1
+        if not matched:
+            return None
+        kind, key, _ = self.__entries[best]
+        return kind, key, float(scores[best])
+
+    def stats(self):
+        with self.__stats_lock:
+            hits = sum(self.__hits.values())
+            return {
+                'entries': len(self.__entries),
+                'vocabulary': len(self.__vocabulary),
+                'threshold': self.threshold,
+                'margin': self.margin,
+                'lookups': self.__lookups,
+                'hits': hits,
+                'hits_by_kind': dict(self.__hits),
+                'hit_rate': round(hits / self.__lookups, 3) if self.__lookups else 0.0
+            }
+
+# Encapsulation: InferenceBatcher groups concurrent QA requests into one forward pass
+class InferenceBatcher:
+    def __init__(self, model_getter, max_batch_size=None, max_wait_ms=None):
+        self.__model_getter = model_getter
+        self.max_batch_size = max_batch_size or int(os.getenv("HEXABOT_BATCH_SIZE", 8))
+        self.max_wait_ms = float(os.getenv("HEXABOT_BATCH_WAIT_MS", 10)) if max_wait_ms is None else max_wait_ms
+        self.__queue = queue.Queue()
+        self.__start_lock = threading.Lock()
+        self.__stats_lock = threading.Lock()
+        self.__thread = None
+        self.__pid = None
+        self.__batches = 0
+        self.__items = 0
+        self.__errors = 0
+        self.__queue_wait_ms = 0.0
+        self.__max_queue_wait_ms = 0.0
+        self.__inference_ms = 0.0
+
+    def __ensure_started(self):
+        # The worker thread does not survive a fork, so each process starts its own
+        if self.__thread is not None and self.__pid == os.getpid() and self.__thread.is_alive():
+            return
+        with self.__start_lock:
+            if self.__thread is not None and self.__pid == os.getpid() and self.__thread.is_alive():
+                return
+            if self.__pid != os.getpid():
+                self.__queue = queue.Queue()
+            self.__pid = os.getpid()
+            self.__thread = threading.Thread(target=self.__run, name="hexabot-batcher", daemon=True)
+            self.__thread.start()
+
+    def submit(self, question, context):
+        """
+        Queue one (question, context) pair; the Future resolves to the pipeline's
+        answer dict. Fails fast (e.g. ModelNotReady) if the model is unavailable.
+        """
+        qa_pipeline = self.__model_getter()
+        self.__ensure_started()
+        future = Future()
+        self.__queue.put((question, context, qa_pipeline, future, time.perf_counter()))
+        return future
+
+    def infer(self, question, context, timeout=None):
+        if timeout is None:
+            timeout = float(os.getenv("HEXABOT_INFER_TIMEOUT", 30))
+        return self.submit(question, context).result(timeout=timeout)
+
+    def __collect(self):
+        batch = [self.__queue.get()]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.__queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def __run(self):
+        while True:
+            batch = self.__collect()
+            started = time.perf_counter()
+            waits = [(started - enqueued_at) * 1000 for _, _, _, _, enqueued_at in batch]
+            try:
+                # Every item carries the same process-wide pipeline
+                qa_pipeline = batch[0][2]
+                results = qa_pipeline(
+                    question=[question for question, _, _, _, _ in batch],
+                    context=[context for _, context, _, _, _ in batch],
+                    batch_size=len(batch)
+                )
+                # The pipeline unwraps single-example batches
+                if isinstance(results, dict):
+                    results = [results]
+                for (_, _, _, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                with self.__stats_lock:
+                    self.__errors += 1
+                for _, _, _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            with self.__stats_lock:
+                self.__batches += 1
+                self.__items += len(batch)
+                self.__queue_wait_ms += sum(waits)
+                self.__max_queue_wait_ms = max(self.__max_queue_wait_ms, max(waits))
+                self.__inference_ms += (time.perf_counter() - started) * 1000
+
+    def stats(self):
+        with self.__stats_lock:
+            batches, items = self.__batches, self.__items
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait_ms,
+                'queue_depth': self.__queue.qsize(),
+                'batches': batches,
+                'items': items,
+                'errors': self.__errors,
+                'avg_batch_size': round(items / batches, 2) if batches else 0.0,
+                'avg_batch_fill': round(items / (batches * self.max_batch_size), 3) if batches else 0.0,
+                'avg_queue_wait_ms': round(self.__queue_wait_ms / items, 3) if items else 0.0,
+                'max_queue_wait_ms': round(self.__max_queue_wait_ms, 3),
+                'avg_inference_ms': round(self.__inference_ms / batches, 3) if batches else 0.0
+            }
 
 # Base ChatBot class (parent)
 class ChatBot:
@@ -88,15 +698,29 @@ class ChatBot:
         self._lang_detector = LanguageDetector()
         self._profanity_filter = ProfanityFilter()
         self._translator = Translator()
+        self._analyzer = None
+    
+    # Child classes extend this with their own keyword categories
+    def _build_analyzer(self):
+        analyzer = MessageAnalyzer()
+        for feature in (self._profanity_filter, self._lang_detector):
+            analyzer.add(feature.category, feature.terms())
+        return analyzer
+    
+    def _analyze(self, text):
+        if self._analyzer is None:
+            self._analyzer = self._build_analyzer()
+        return self._analyzer.analyze(text)
         
-    def _detect_language(self, text):
-        return self._lang_detector.detect_language(text)
+    def _detect_language(self, text, analysis=None):
+        return self._lang_detector.detect_language(text, analysis)
         
-    def _check_profanity(self, text, lang="en"):
-        return self._profanity_filter.process(text, lang)
+    def _check_profanity(self, text, lang="en", analysis=None):
+        return self._profanity_filter.process(text, lang, analysis)
         
     def _translate(self, text, source="en", target="tl"):
-        return self._translator.translate(text, source, target)
+        # Never keeps the user waiting longer than the translation budget
+        return self._translator.translate_within(text, source, target)
     
     # Base method to be overridden by child classes
     def process_message(self, message, lang="en"):
@@ -147,6 +771,15 @@ class HexaBot(ChatBot):
             "how do i contact support?": "Para sa suporta, kontakin kami sa hexahaulprojects@gmail.com o tumawag sa 123-456-7890. Ang aming opisina ay bukas mula 9am hanggang 6pm, Lunes hanggang Sabado."
         }
         
+        # Other ways of asking the quick-reply questions, for the intent index
+        self.__quick_reply_examples = {
+            "about hexahaul": ["tell me about hexahaul", "what is hexahaul", "who runs hexahaul", "who founded hexahaul"],
+            "who are you?": ["what are you", "what is hexabot", "are you a bot"],
+            "what services do you offer?": ["what do you offer", "what services are available", "what kind of deliveries do you do"],
+            "how can i track my shipment?": ["track my package", "where is my parcel", "how do i track my order", "shipment tracking"],
+            "how do i contact support?": ["how can i reach customer service", "how do i get help", "talk to support"]
+        }
+        
         self.__faq_context = """
 HexaHaul is a logistics company founded and operated by a passionate team of six people: Jhered, Carl, Patricia, Kris, Sandrine, and CJ. We provide efficient and reliable transportation solutions for businesses and individuals.
 Our services include truck, motorcycle, and car logistics for deliveries of all sizes. You can track your shipment using the tracking page on our website by entering your tracking number.
@@ -159,23 +792,53 @@ HexaHaul is committed to safe, secure, and on-time delivery of your goods.
             "hexahaul", "service", "services", "track", "tracking", "shipment", "support", "contact", "delivery", "truck", "motorcycle", "car", "logistics", "booking", "book", "parcel",
             "serbisyo", "padala", "subaybayan", "suporta", "kontak", "trak", "motorsiklo", "kotse", "logistik"
         ]
+        self.__faq_sentences = [sentence.strip() for sentence in re.split(r"(?<=[.!?])\s+", self.__faq_context.strip()) if sentence.strip()]
+        # Cached answers are only valid for the FAQ context they were produced from
+        self.__context_version = hashlib.sha1(self.__faq_context.encode("utf-8")).hexdigest()[:12]
+        self.__answer_cache = AnswerCache()
+        self.__intent_index = self.__build_intent_index()
+        self._analyzer = self._build_analyzer()
+
+    # Polymorphism: HexaBot adds topic keywords and conversation openers to the shared analyzer
+    def _build_analyzer(self):
+        analyzer = super()._build_analyzer()
+        # Prefix match, so "tracking" and "deliveryman" count as on-topic
+        analyzer.add("allowed", self.__allowed_keywords, whole_word=False)
+        for pattern, keywords in self.__conversation_patterns.items():
+            analyzer.add(pattern, keywords)
+        analyzer.add("greetings", ["kamusta", "kumusta"])
+        return analyzer
+
+    def __build_intent_index(self):
+        index = IntentIndex()
+        for quick in self.__quick_reply_answers:
+            index.add("quick_reply", quick, quick)
+            for example in self.__quick_reply_examples.get(quick, []):
+                index.add("quick_reply", quick, example)
+        # Each FAQ sentence is its own canned answer
+        for sentence in self.__faq_sentences:
+            index.add("faq", sentence, sentence)
+        index.build()
+        return index
 
     # Polymorphism: Override the process_message method
     def process_message(self, message, lang="en"):
         if not message:
             return "Please provide a question."
             
+        # Process the message
+        normalized = message.lower().strip(" ?!.")
+        # One pass finds profanity, Tagalog cues, topic keywords and greetings
+        analysis = self._analyze(normalized)
+        
         # Check for profanity
-        profanity_response = self._check_profanity(message, lang)
+        profanity_response = self._check_profanity(normalized, lang, analysis)
         if profanity_response:
             return profanity_response
-            
-        # Process the message
-        normalized = message.lower().strip(" ?!.")
         
         # Auto-detect language if not specified
         if lang not in ["en", "tl"]:
-            lang = self._detect_language(normalized)
+            lang = self._detect_language(normalized, analysis)
             
         # Easter egg
         easter_egg_response = self.__check_easter_egg(normalized, lang)
@@ -183,7 +846,7 @@ HexaHaul is committed to safe, secure, and on-time delivery of your goods.
             return easter_egg_response
             
         # Check for conversation patterns
-        pattern_response = self.__check_conversation_patterns(normalized, lang)
+        pattern_response = self.__check_conversation_patterns(analysis, lang)
         if pattern_response:
             return pattern_response
             
@@ -192,8 +855,14 @@ HexaHaul is committed to safe, secure, and on-time delivery of your goods.
         if quick_reply:
             return quick_reply
             
+        # Paraphrases of known questions get their canned answer without running the QA model
+        intent = self.__intent_index.match(normalized)
+        if intent:
+            kind, key, _ = intent
+            return self.__intent_answer(kind, key, lang)
+            
         # Check if the question is about HexaHaul
-        if not self.__is_about_hexahaul(normalized):
+        if not self.__is_about_hexahaul(analysis):
             if lang == "tl":
                 return "Paumanhin, wala akong sagot diyan. Mangyaring magtanong tungkol sa mga serbisyo, tracking, o suporta ng HexaHaul."
             return "I'm sorry, I don't have an answer for that. Please ask about HexaHaul's services, tracking, or support."
@@ -209,22 +878,11 @@ HexaHaul is committed to safe, secure, and on-time delivery of your goods.
             return answer
         return None
         
-    def __check_conversation_patterns(self, normalized, lang):
-        # Support both English and Tagalog greetings
-        greetings_keywords = self.__conversation_patterns["greetings"] + ["kamusta", "kumusta"]
-        for pattern, keywords in self.__conversation_patterns.items():
-            if any(normalized.startswith(word) or normalized == word for word in keywords):
-                if pattern == "greetings" and (normalized in ["kamusta", "kumusta"] or normalized in keywords):
-                    answer = self.__conversation_responses_tl["greetings"] if lang == "tl" else self.__conversation_responses["greetings"]
-                else:
-                    answer = self.__conversation_responses_tl.get(pattern, self.__conversation_responses[pattern]) if lang == "tl" else self.__conversation_responses[pattern]
-                return answer
-                
-        # Also check for Tagalog greetings
-        if normalized in ["kamusta", "kumusta"]:
-            answer = self.__conversation_responses_tl["greetings"] if lang == "tl" else self.__conversation_responses["greetings"]
-            return answer
-            
+    def __check_conversation_patterns(self, analysis, lang):
+        # Only an opening greeting, thanks or goodbye counts, e.g. "thanks for the help"
+        pattern = analysis.leading(self.__conversation_patterns)
+        if pattern:
+            return self.__conversation_responses_tl.get(pattern, self.__conversation_responses[pattern]) if lang == "tl" else self.__conversation_responses[pattern]
         return None
         
     def __check_quick_replies(self, normalized, lang):
@@ -235,24 +893,97 @@ HexaHaul is committed to safe, secure, and on-time delivery of your goods.
                 return answer
         return None
         
-    def __is_about_hexahaul(self, normalized):
-        return any(word in normalized for word in self.__allowed_keywords)
+    def __intent_answer(self, kind, key, lang):
+        if kind == "quick_reply":
+            return self.__quick_reply_answers_tl.get(key) if lang == "tl" else self.__quick_reply_answers[key]
+        # FAQ sentences are their own answer
+        return self._translate(key, "en", "tl") if lang == "tl" else key
+        
+    def __is_about_hexahaul(self, analysis):
+        return analysis.has("allowed")
         
     def __get_qa_answer(self, question, lang):
-        result = qa_pipeline(question=question, context=self.__faq_context)
+        cache_key = self.__answer_cache.key(question, lang, self.__context_version)
+        cached = self.__answer_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Raises ModelNotReady while the model is still warming up
+        result = infer_qa(question, self.__faq_context)
         answer = result["answer"].strip()
+        cacheable = True
         
         if not answer or len(answer) < 5:
             answer = "I'm sorry, I don't have an answer for that. Please ask about HexaHaul's services, tracking, or support."
             if lang == "tl":
                 answer = "Paumanhin, wala akong sagot diyan. Mangyaring magtanong tungkol sa mga serbisyo, tracking, o suporta ng HexaHaul."
         elif lang == "tl":
+            english = answer
             answer = self._translate(answer, "en", "tl")
-            
+            # Translator falls back to the English text; don't pin that for Tagalog users
+            cacheable = answer != english
+        
+        if cacheable:
+            self.__answer_cache.set(cache_key, answer)
         return answer
+    
+    def cache_stats(self):
+        return self.__answer_cache.stats()
+    
+    def translation_stats(self):
+        return self._translator.stats()
+    
+    def translation_sources(self):
+        """
+        English texts HexaBot may translate, mapped to a hand-written Tagalog
+        version where one exists (None otherwise); used to build the catalog
+        """
+        sources = dict.fromkeys(self.__faq_sentences)
+        for quick, answer in self.__quick_reply_answers.items():
+            sources[answer] = self.__quick_reply_answers_tl.get(quick)
+        for pattern, answer in self.__conversation_responses.items():
+            sources[answer] = self.__conversation_responses_tl.get(pattern)
+        return sources
+    
+    def intent_stats(self):
+        return self.__intent_index.stats()
+    
+    @property
+    def faq_context(self):
+        return self.__faq_context
+    
+    @property
+    def quick_reply_questions(self):
+        return list(self.__quick_reply_answers.keys())
+
+# Shared by every HexaBot so concurrent requests land in the same batches
+qa_batcher = InferenceBatcher(lambda: model_registry.get(QA_MODEL, wait=False))
 
-# Create a singleton instance of HexaBot
-hexabot_instance = HexaBot()
+# Opt-in: with HEXABOT_SIDECAR_SOCKET set, services/inference_sidecar.py owns the model for every worker
+qa_sidecar = SidecarClient(sidecar_socket_path()) if sidecar_socket_path() else None
+
+def infer_qa(question, context):
+    """Answer through the sidecar when one is configured and reachable, else in this process"""
+    if qa_sidecar is not None:
+        try:
+            return qa_sidecar.infer(question, context)
+        except SidecarUnavailable:
+            # The client logs the outage once and skips the sidecar until its retry delay passes
+            pass
+    return qa_batcher.infer(question, context)
+
+# Process-wide HexaBot, built on the first chat request rather than at import
+_hexabot_instance = None
+_hexabot_lock = threading.Lock()
+
+def get_hexabot():
+    """Return the process-wide HexaBot, creating it on first use."""
+    global _hexabot_instance
+    if _hexabot_instance is None:
+        with _hexabot_lock:
+            if _hexabot_instance is None:
+                _hexabot_instance = HexaBot()
+    return _hexabot_instance
 
 @hexabot_bp.route("/hexabot", methods=["POST"])
 def faq_bot():
@@ -263,6 +994,31 @@ def faq_bot():
         return jsonify({"answer": "Please provide a question."}), 400
         
     # Process the message using our OOP approach
-    answer = hexabot_instance.process_message(user_question, lang)
+    try:
+        answer = get_hexabot().process_message(user_question, lang)
+    except ModelNotReady:
+        answer = "HexaBot is still warming up. Please try again in a few seconds."
+        if lang == "tl":
+            answer = "Naghahanda pa si HexaBot. Pakisubukan ulit pagkalipas ng ilang segundo."
+        response = jsonify({"answer": answer, "status": "warming_up"})
+        response.headers["Retry-After"] = "5"
+        return response, 503
     
-    return jsonify({"answer": answer})
\ No newline at end of file
+    return jsonify({"answer": answer, "status": "ready"})
+
+@hexabot_bp.route("/hexabot/status", methods=["GET"])
+def hexabot_status():
+    status = model_registry.status(QA_MODEL)
+    status["mode"] = "fast-int8" if qa_fast_inference_enabled() else "pipeline"
+    hexabot_instance = get_hexabot()
+    status["answer_cache"] = hexabot_instance.cache_stats()
+    status["batching"] = qa_batcher.stats()
+    if qa_sidecar is not None:
+        status["sidecar"] = qa_sidecar.stats()
+        try:
+            status["sidecar"]["health"] = qa_sidecar.health()
+        except SidecarUnavailable as e:
+            status["sidecar"]["health"] = {"error": str(e)}
+    status["intents"] = hexabot_instance.intent_stats()
+    status["translation"] = hexabot_instance.translation_stats()
+    return jsonify(status)
\ No newline at end of file
@@ -0,0 +1,271 @@
+import os
+import json
+import time
+import socket
+import struct
+import hashlib
+import threading
+import socketserver
+from collections import deque
+
+from services.model_registry import model_registry, ModelNotReady, QA_MODEL, current_rss_mb
+
+DEFAULT_SOCKET_PATH = "/tmp/hexabot-inference.sock"
+MAX_FRAME_BYTES = 1024 * 1024
+_HEADER = struct.Struct(">I")
+
+# Wire format: every message is a 4-byte big-endian length followed by a compact
+# JSON object. QA requests carry the context by hash ("h") and only send the text
+# ("c") when the sidecar answers {"err": "context"}, so the FAQ is sent once per
+# connection instead of with every question.
+
+def send_frame(sock, message):
+    payload = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError("inference sidecar closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+def recv_frame(sock):
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    if size > MAX_FRAME_BYTES:
+        raise ConnectionError(f"frame of {size} bytes exceeds the {MAX_FRAME_BYTES} byte limit")
+    return json.loads(_recv_exact(sock, size).decode("utf-8"))
+
+def context_hash(context):
+    return hashlib.sha1(context.encode("utf-8")).hexdigest()[:16]
+
+def sidecar_socket_path():
+    """The configured sidecar socket, or None when HexaBot should infer in-process"""
+    return os.getenv("HEXABOT_SIDECAR_SOCKET") or None
+
+class SidecarUnavailable(ConnectionError):
+    """Raised by SidecarClient when the sidecar cannot be reached; callers fall back to in-process inference."""
+    pass
+
+# Encapsulation: the threaded Unix socket server that owns the model and the batcher
+class _SidecarServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+class _SidecarHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        sidecar = self.server.sidecar
+        while True:
+            try:
+                message = recv_frame(self.request)
+            except (ConnectionError, OSError, ValueError):
+                return
+            send_frame(self.request, sidecar.handle(message))
+
+class InferenceSidecar:
+    """
+    Owns the single QA model for every gunicorn worker on the node.
+
+    Workers connect over a Unix domain socket (SidecarClient). Requests
+    from all connections go through one InferenceBatcher, so questions
+    from different workers share forward passes. The "health" op reports
+    model state, batching and request latency.
+    """
+    def __init__(self, socket_path=None, model_getter=None, latency_window=1024):
+        # Imported here: services.hexabot imports this module for SidecarClient
+        from services.hexabot import InferenceBatcher
+        self.socket_path = socket_path or sidecar_socket_path() or DEFAULT_SOCKET_PATH
+        self.__model_getter = model_getter or (lambda: model_registry.get(QA_MODEL, wait=False))
+        self.__batcher = InferenceBatcher(self.__model_getter)
+        self.__contexts = {}
+        self.__lock = threading.Lock()
+        self.__latencies_ms = deque(maxlen=latency_window)
+        self.__requests = 0
+        self.__errors = 0
+        self.__started_at = time.time()
+        self.__server = None
+
+    def handle(self, message):
+        op = message.get("op")
+        if op == "health":
+            return self.health()
+        if op != "qa":
+            return {"err": "op", "msg": f"unknown op {op!r}"}
+
+        started = time.perf_counter()
+        context = message.get("c")
+        with self.__lock:
+            if context is not None:
+                self.__contexts[message["h"]] = context
+            else:
+                context = self.__contexts.get(message.get("h"))
+        if context is None:
+            return {"err": "context"}
+        try:
+            result = self.__batcher.infer(message["q"], context)
+            reply = {"a": result["answer"], "s": result.get("score"), "b": result.get("start"), "e": result.get("end")}
+        except ModelNotReady:
+            reply = {"err": "warming_up"}
+        except Exception as e:
+            with self.__lock:
+                self.__errors += 1
+            reply = {"err": "failed", "msg": str(e)}
+        with self.__lock:
+            self.__requests += 1
+            self.__latencies_ms.append((time.perf_counter() - started) * 1000)
+        return reply
+
+    def health(self):
+        with self.__lock:
+            latencies = sorted(self.__latencies_ms)
+            requests, errors = self.__requests, self.__errors
+
+        def percentile(p):
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3) if latencies else None
+
+        return {
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.time() - self.__started_at, 1),
+            "rss_mb": current_rss_mb(),
+            "model": model_registry.status(QA_MODEL),
+            "batching": self.__batcher.stats(),
+            "requests": requests,
+            "errors": errors,
+            "latency_ms": {
+                "window": len(latencies),
+                "avg": round(sum(latencies) / len(latencies), 3) if latencies else None,
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99)
+            }
+        }
+
+    def serve_forever(self):
+        # A socket file left behind by a crashed sidecar would make bind() fail
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.__server = _SidecarServer(self.socket_path, _SidecarHandler)
+        self.__server.sidecar = self
+        os.chmod(self.socket_path, 0o660)
+        print(f"HexaBot inference sidecar listening on {self.socket_path}")
+        try:
+            self.__server.serve_forever()
+        finally:
+            self.__server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def start(self):
+        """Serve on a daemon thread; returns once the socket accepts connections"""
+        thread = threading.Thread(target=self.serve_forever, name="hexabot-sidecar", daemon=True)
+        thread.start()
+        deadline = time.time() + 5
+        while self.__server is None and time.time() < deadline:
+            time.sleep(0.01)
+        return thread
+
+    def shutdown(self):
+        if self.__server is not None:
+            self.__server.shutdown()
+
+# Encapsulation: SidecarClient keeps one connection per worker thread
+class SidecarClient:
+    def __init__(self, socket_path, timeout=None, retry_seconds=None):
+        self.socket_path = socket_path
+        self.timeout = float(os.getenv("HEXABOT_INFER_TIMEOUT", 30)) if timeout is None else timeout
+        # After a failed connect, workers infer in-process for this long before trying again
+        self.retry_seconds = float(os.getenv("HEXABOT_SIDECAR_RETRY_SECONDS", 5)) if retry_seconds is None else retry_seconds
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+        self.__down_until = 0.0
+        self.__requests = 0
+        self.__unavailable = 0
+
+    def __mark_down(self, error):
+        with self.__lock:
+            self.__down_until = time.time() + self.retry_seconds
+        print(f"Inference sidecar unavailable, using in-process inference for {self.retry_seconds:g}s: {error}")
+
+    def __connection(self):
+        conn = getattr(self.__local, "conn", None)
+        # Sockets inherited across a fork are shared with the parent, so reconnect
+        if conn is not None and self.__local.pid == os.getpid():
+            return conn
+        if time.time() < self.__down_until:
+            raise SidecarUnavailable(f"inference sidecar at {self.socket_path} was unreachable")
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.settimeout(self.timeout)
+        try:
+            conn.connect(self.socket_path)
+        except OSError as e:
+            conn.close()
+            self.__mark_down(e)
+            raise SidecarUnavailable(f"cannot connect to inference sidecar at {self.socket_path}: {e}")
+        self.__local.conn, self.__local.pid, self.__local.contexts = conn, os.getpid(), set()
+        return conn
+
+    def __drop_connection(self):
+        conn = getattr(self.__local, "conn", None)
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+        self.__local.conn = None
+
+    def __call(self, message):
+        try:
+            conn = self.__connection()
+            send_frame(conn, message)
+            return recv_frame(conn)
+        except SidecarUnavailable:
+            with self.__lock:
+                self.__unavailable += 1
+            raise
+        except (OSError, ValueError) as e:
+            self.__drop_connection()
+            with self.__lock:
+                self.__unavailable += 1
+            self.__mark_down(e)
+            raise SidecarUnavailable(f"inference sidecar request failed: {e}")
+
+    def infer(self, question, context):
+        """Answer like the QA pipeline: {'answer', 'score', 'start', 'end'}"""
+        with self.__lock:
+            self.__requests += 1
+        digest = context_hash(context)
+        message = {"op": "qa", "q": question, "h": digest}
+        known = getattr(self.__local, "contexts", set())
+        if digest not in known:
+            message["c"] = context
+        reply = self.__call(message)
+        if reply.get("err") == "context":
+            # The sidecar restarted and forgot the context; send it once more
+            message["c"] = context
+            reply = self.__call(message)
+        if "err" in reply:
+            if reply["err"] == "warming_up":
+                raise ModelNotReady(QA_MODEL)
+            raise RuntimeError(f"inference sidecar error: {reply.get('msg', reply['err'])}")
+        self.__local.contexts.add(digest)
+        return {"answer": reply["a"], "score": reply.get("s"), "start": reply.get("b"), "end": reply.get("e")}
+
+    def health(self):
+        return self.__call({"op": "health"})
+
+    def stats(self):
+        with self.__lock:
+            return {
+                "socket": self.socket_path,
+                "requests": self.__requests,
+                "unavailable": self.__unavailable,
+                "retry_in_seconds": round(max(0.0, self.__down_until - time.time()), 1)
+            }
+
+if __name__ == "__main__":
+    sidecar = InferenceSidecar()
+    # Load the model before taking requests; workers fall back in-process meanwhile
+    model_registry.warmup(QA_MODEL)
+    sidecar.serve_forever()
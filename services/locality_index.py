@@ -0,0 +1,129 @@
+import csv
+import math
+import os
+import threading
+
+from utils.lazy_import import lazy_import
+
+np = lazy_import('numpy')
+
+DEFAULT_DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'hexahaul_db', 'ph_localities.csv')
+
+# Coordinates are projected onto a flat plane before indexing: longitude is
+# scaled by cos(12°), the Philippines' mid-latitude, so one unit is roughly
+# one degree of latitude (~111.2 km) everywhere in the country.
+KM_PER_DEGREE = 111.195
+LON_SCALE = math.cos(math.radians(12.0))
+
+class LocalityIndex:
+    """
+    Offline nearest-locality lookup over a static set of centroids.
+
+    The k-d tree is implicit: points are stored in flat arrays ordered so
+    that the median of every [lo, hi) slice is the splitting node, with the
+    axis alternating by depth. No node objects or child pointers are kept.
+    """
+    def __init__(self, names, latitudes, longitudes, provinces=None):
+        if not (len(names) == len(latitudes) == len(longitudes)):
+            raise ValueError("names, latitudes and longitudes must have the same length")
+        if not names:
+            raise ValueError("LocalityIndex needs at least one locality")
+        xs = np.asarray(longitudes, dtype=np.float64) * LON_SCALE
+        ys = np.asarray(latitudes, dtype=np.float64)
+        order = np.empty(len(names), dtype=np.int64)
+        self._build(np.arange(len(names)), xs, ys, order, 0, 0)
+
+        self.names = [names[i] for i in order]
+        self.provinces = [provinces[i] for i in order] if provinces else None
+        self.xs = xs[order]
+        self.ys = ys[order]
+        # Plain lists are much faster than numpy scalars for the per-point walk
+        self._xs = self.xs.tolist()
+        self._ys = self.ys.tolist()
+
+    @classmethod
+    def from_csv(cls, path=DEFAULT_DATASET):
+        names, provinces, latitudes, longitudes = [], [], [], []
+        with open(path, mode='r', encoding='utf-8', newline='') as file:
+            for row in csv.DictReader(file):
+                names.append(row['name'])
+                provinces.append(row.get('province'))
+                latitudes.append(float(row['latitude']))
+                longitudes.append(float(row['longitude']))
+        return cls(names, latitudes, longitudes, provinces)
+
+    @staticmethod
+    def _build(indices, xs, ys, order, start, depth):
+        """Write `indices` into order[start:start+len] in implicit k-d tree layout."""
+        if len(indices) == 0:
+            return
+        keys = xs[indices] if depth % 2 == 0 else ys[indices]
+        indices = indices[np.argsort(keys, kind='stable')]
+        mid = len(indices) // 2
+        order[start + mid] = indices[mid]
+        LocalityIndex._build(indices[:mid], xs, ys, order, start, depth + 1)
+        LocalityIndex._build(indices[mid + 1:], xs, ys, order, start + mid + 1, depth + 1)
+
+    def __len__(self):
+        return len(self.names)
+
+    def nearest(self, lat, lon):
+        """Return (name, distance_km) of the closest locality."""
+        x = float(lon) * LON_SCALE
+        y = float(lat)
+        xs, ys = self._xs, self._ys
+        best_index = -1
+        best_dist = math.inf
+        # (lo, hi, depth, squared distance from the query to the slice's splitting plane)
+        stack = [(0, len(xs), 0, 0.0)]
+        while stack:
+            lo, hi, depth, bound = stack.pop()
+            if lo >= hi or bound >= best_dist:
+                continue
+            mid = (lo + hi) >> 1
+            dx = x - xs[mid]
+            dy = y - ys[mid]
+            dist = dx * dx + dy * dy
+            if dist < best_dist:
+                best_dist = dist
+                best_index = mid
+            diff = dx if depth % 2 == 0 else dy
+            if diff < 0:
+                near, far = (lo, mid), (mid + 1, hi)
+            else:
+                near, far = (mid + 1, hi), (lo, mid)
+            stack.append((far[0], far[1], depth + 1, diff * diff))
+            stack.append((near[0], near[1], depth + 1, 0.0))
+        return self.names[best_index], math.sqrt(best_dist) * KM_PER_DEGREE
+
+    def nearest_many(self, latitudes, longitudes, chunk_size=4096):
+        """
+        Resolve a batch of coordinates in one vectorized pass.
+        Returns (names, distances_km) with one entry per input point.
+        """
+        qx = np.asarray(longitudes, dtype=np.float64) * LON_SCALE
+        qy = np.asarray(latitudes, dtype=np.float64)
+        best = np.empty(len(qx), dtype=np.int64)
+        dists = np.empty(len(qx), dtype=np.float64)
+        # Brute force over the centroid arrays beats per-point tree walks
+        # in Python for a dataset of this size; chunking bounds memory.
+        for start in range(0, len(qx), chunk_size):
+            dx = qx[start:start + chunk_size, None] - self.xs[None, :]
+            dy = qy[start:start + chunk_size, None] - self.ys[None, :]
+            squared = dx * dx + dy * dy
+            idx = squared.argmin(axis=1)
+            best[start:start + chunk_size] = idx
+            dists[start:start + chunk_size] = squared[np.arange(len(idx)), idx]
+        return [self.names[i] for i in best], np.sqrt(dists) * KM_PER_DEGREE
+
+_default_index = None
+_default_lock = threading.Lock()
+
+def get_default_index():
+    """Load the bundled PH localities dataset once per process."""
+    global _default_index
+    if _default_index is None:
+        with _default_lock:
+            if _default_index is None:
+                _default_index = LocalityIndex.from_csv(DEFAULT_DATASET)
+    return _default_index
@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+
+QA_MODEL = "question-answering"
+QA_MODEL_NAME = os.getenv("QA_MODEL_NAME", "distilbert-base-uncased-distilled-squad")
+
+def current_rss_mb():
+    """Resident set size of this process in MB, or None where it cannot be read."""
+    try:
+        with open('/proc/self/status', 'r') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS and KB elsewhere; it is the peak, not current
+        return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    except Exception:
+        return None
+
+class ModelNotReady(Exception):
+    """Raised by ModelRegistry.get(wait=False) while the model is still loading."""
+    pass
+
+# Encapsulation: one loader, lock and status per registered model
+class _ModelEntry:
+    def __init__(self, loader):
+        self.loader = loader
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.reset()
+
+    def reset(self):
+        self.model = None
+        self.state = "cold"
+        self.error = None
+        self.pid = os.getpid()
+        self.thread = None
+        self.started_at = None
+        self.load_seconds = None
+        self.rss_before_mb = None
+        self.rss_after_mb = None
+        self.ready.clear()
+
+class ModelRegistry:
+    """
+    Process-wide registry of heavyweight models (the HexaBot QA pipeline).
+
+    Each model is loaded at most once per process, either on first use or
+    by a background warmup thread. Callers that must not block use
+    get(wait=False) and handle ModelNotReady. Entries are reset in a forked
+    child unless the parent had already finished loading, since loader
+    threads do not survive fork.
+    """
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = _ModelEntry(loader)
+
+    def _entry(self, name):
+        entry = self._entries[name]
+        if entry.pid != os.getpid():
+            with entry.lock:
+                if entry.pid != os.getpid():
+                    if entry.state == "ready":
+                        entry.pid = os.getpid()
+                    else:
+                        entry.reset()
+        return entry
+
+    def _load(self, name, entry):
+        entry.state = "loading"
+        entry.started_at = time.time()
+        entry.rss_before_mb = current_rss_mb()
+        started = time.perf_counter()
+        try:
+            entry.model = entry.loader()
+            entry.state = "ready"
+            entry.error = None
+        except Exception as e:
+            entry.state = "failed"
+            entry.error = str(e)
+            print(f"Error loading model {name}: {e}")
+        entry.load_seconds = round(time.perf_counter() - started, 3)
+        entry.rss_after_mb = current_rss_mb()
+        entry.ready.set()
+
+    def warmup(self, name):
+        """Start loading `name` on a daemon thread; no-op if it is loading or loaded."""
+        entry = self._entry(name)
+        with entry.lock:
+            if entry.state in ("loading", "ready"):
+                return False
+            entry.ready.clear()
+            entry.state = "loading"
+            entry.thread = threading.Thread(target=self._load, args=(name, entry), name=f"warmup-{name}", daemon=True)
+            entry.thread.start()
+        return True
+
+    def get(self, name, wait=True, timeout=None):
+        """
+        Return the loaded model. With wait=False, kick off a warmup if needed
+        and raise ModelNotReady instead of blocking.
+        """
+        entry = self._entry(name)
+        if entry.state == "ready":
+            return entry.model
+        if not wait:
+            self.warmup(name)
+            raise ModelNotReady(name)
+
+        with entry.lock:
+            load_here = entry.state in ("cold", "failed")
+            if load_here:
+                entry.ready.clear()
+                entry.state = "loading"
+        if load_here:
+            self._load(name, entry)
+        elif not entry.ready.wait(timeout):
+            raise ModelNotReady(name)
+
+        if entry.state != "ready":
+            raise RuntimeError(f"Model {name} failed to load: {entry.error}")
+        return entry.model
+
+    def is_ready(self, name):
+        return name in self._entries and self._entry(name).state == "ready"
+
+    def status(self, name=None):
+        """Load state, load time and RSS before/after loading, per model."""
+        names = [name] if name else list(self._entries)
+        report = {}
+        for model_name in names:
+            entry = self._entry(model_name)
+            report[model_name] = {
+                'state': entry.state,
+                'error': entry.error,
+                'load_seconds': entry.load_seconds,
+                'loading_for_seconds': round(time.time() - entry.started_at, 1) if entry.state == "loading" and entry.started_at else None,
+                'rss_before_mb': entry.rss_before_mb,
+                'rss_after_mb': entry.rss_after_mb,
+                'rss_now_mb': current_rss_mb(),
+                'pid': entry.pid
+            }
+        return report[name] if name else report
+
+def qa_fast_inference_enabled():
+    return os.getenv("QA_FAST_INFERENCE", "0") == "1"
+
+def _load_qa_pipeline():
+    # Imported here so that importing the app does not pull in torch/transformers
+    if qa_fast_inference_enabled():
+        # Opt-in: int8 dynamically quantized model with a cached FAQ context encoding
+        from services.fast_qa import load_fast_qa_pipeline
+        return load_fast_qa_pipeline(QA_MODEL_NAME, quantize=os.getenv("QA_QUANTIZE", "1") == "1")
+    from transformers import pipeline
+    from services.fast_qa import configure_torch_threads
+    configure_torch_threads()
+    return pipeline("question-answering", model=QA_MODEL_NAME)
+
+# Shared by HexaBot and app.get_qa_pipeline()
+model_registry = ModelRegistry()
+model_registry.register(QA_MODEL, _load_qa_pipeline)
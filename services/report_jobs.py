@@ -0,0 +1,363 @@
+import os
+import csv
+import json
+import time
+import uuid
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape
+
+from models.utilities_database import get_utilities_db
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class CsvReportWriter:
+    """Writes sections one after another; each after the first is preceded by a blank line and its title"""
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.sections = 0
+
+    def write_section(self, title, columns, rows):
+        if self.sections:
+            self.writer.writerow([])
+            self.writer.writerow([title])
+        self.sections += 1
+        self.writer.writerow(columns)
+        for row in rows:
+            self.writer.writerow(row)
+            yield
+
+    def close(self):
+        self.file.close()
+
+class XlsxReportWriter:
+    """
+    Minimal streaming XLSX writer: one worksheet per section, written row by
+    row straight into the zip entry, so a sheet is never held in memory.
+    Strings are stored inline, which every spreadsheet reader accepts.
+    """
+    def __init__(self, path):
+        self.zip = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED)
+        self.sheets = []
+
+    @staticmethod
+    def _column(index):
+        letters = ''
+        index += 1
+        while index:
+            index, remainder = divmod(index - 1, 26)
+            letters = chr(65 + remainder) + letters
+        return letters
+
+    def _row(self, number, values):
+        cells = []
+        for index, value in enumerate(values):
+            ref = f"{self._column(index)}{number}"
+            if value is None:
+                continue
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+            else:
+                cells.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{escape(str(value))}</t></is></c>')
+        return f'<row r="{number}">{"".join(cells)}</row>'
+
+    def write_section(self, title, columns, rows):
+        self.sheets.append(title[:31])
+        name = f"xl/worksheets/sheet{len(self.sheets)}.xml"
+        with self.zip.open(name, 'w', force_zip64=True) as sheet:
+            sheet.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                        b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+            sheet.write(self._row(1, columns).encode('utf-8'))
+            for number, row in enumerate(rows, start=2):
+                sheet.write(self._row(number, row).encode('utf-8'))
+                yield
+            sheet.write(b'</sheetData></worksheet>')
+
+    def close(self):
+        sheets = range(1, len(self.sheets) + 1)
+        titles = [escape(title, {'"': '&quot;'}) for title in self.sheets]
+        self.zip.writestr('[Content_Types].xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            + ''.join(f'<Override PartName="/xl/worksheets/sheet{n}.xml" '
+                      'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                      for n in sheets)
+            + '</Types>'))
+        self.zip.writestr('_rels/.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="xl/workbook.xml"/></Relationships>'))
+        self.zip.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>'
+            + ''.join(f'<sheet name="{title}" sheetId="{n}" r:id="rId{n}"/>'
+                      for n, title in zip(sheets, titles))
+            + '</sheets></workbook>'))
+        self.zip.writestr('xl/_rels/workbook.xml.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + ''.join(f'<Relationship Id="rId{n}" '
+                      'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                      f'Target="worksheets/sheet{n}.xml"/>' for n in sheets)
+            + '</Relationships>'))
+        self.zip.close()
+
+# Report format -> (writer, file extension, MIME type)
+REPORT_FORMATS = {
+    'csv': (CsvReportWriter, 'csv', 'text/csv'),
+    'excel': (XlsxReportWriter, 'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+}
+
+# Encapsulation: one report request, its progress and the file it produces
+class ReportJob:
+    def __init__(self, report_type, time_range, report_format, start_date=None, end_date=None, job_id=None):
+        self.id = job_id or uuid.uuid4().hex
+        self.report_type = report_type
+        self.time_range = time_range
+        self.report_format = report_format
+        self.start_date = start_date
+        self.end_date = end_date
+        self.state = "queued"
+        self.rows_written = 0
+        self.total_rows = None
+        self.error = None
+        self.size = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    @property
+    def extension(self):
+        return REPORT_FORMATS[self.report_format][1]
+
+    @property
+    def mimetype(self):
+        return REPORT_FORMATS[self.report_format][2]
+
+    @property
+    def filename(self):
+        stamp = time.strftime('%Y%m%d%H%M%S', time.localtime(self.created_at))
+        return f"{self.report_type}_{self.time_range}_{stamp}.{self.extension}"
+
+    def progress(self):
+        if self.state == "done":
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(99, int(self.rows_written * 100 / self.total_rows))
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'report_type': self.report_type,
+            'time_range': self.time_range,
+            'format': self.report_format,
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+            'state': self.state,
+            'rows_written': self.rows_written,
+            'total_rows': self.total_rows,
+            'progress': self.progress(),
+            'error': self.error,
+            'size': self.size,
+            'filename': self.filename,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        job = cls(data['report_type'], data['time_range'], data['format'], data.get('start_date'),
+                  data.get('end_date'), job_id=data['id'])
+        for key in ('state', 'rows_written', 'total_rows', 'error', 'size', 'created_at', 'finished_at'):
+            setattr(job, key, data.get(key))
+        return job
+
+class ReportJobManager:
+    """
+    Generates admin reports in the background.
+
+    submit() only records the job; a worker thread streams the rows from
+    UtilitiesDatabase through the CSV or XLSX writer into a file under
+    `report_dir`, updating progress as it goes. Each job's state is also
+    kept in a small JSON file beside the report, so any worker process can
+    answer status and download requests. Reports older than `ttl` seconds
+    are deleted when new jobs are submitted. A job another process left
+    queued or running for `stale_ttl` seconds (its worker died or was
+    restarted) is marked failed and its partial file removed.
+    """
+    def __init__(self, report_dir=None, source=None, max_workers=None, ttl=None, progress_every=1000,
+                 stale_ttl=None):
+        self.report_dir = report_dir or os.getenv("REPORTS_DIR", os.path.join(PROJECT_ROOT, 'reports'))
+        self.max_workers = max_workers or int(os.getenv("REPORT_WORKERS", 2))
+        self.ttl = ttl if ttl is not None else int(os.getenv("REPORT_TTL_SECONDS", 3600))
+        self.stale_ttl = stale_ttl if stale_ttl is not None else int(os.getenv("REPORT_STALE_SECONDS", 6 * 3600))
+        self.progress_every = progress_every
+        self.__source = source or get_utilities_db
+        self.__executor = None
+        self.__executor_pid = None
+        self.__lock = threading.Lock()
+        self.__jobs = {}
+        self.__completed = 0
+        self.__failed = 0
+        self.__expired = 0
+
+    def __get_executor(self):
+        if self.__executor is None or self.__executor_pid != os.getpid():
+            self.__executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="report-job")
+            self.__executor_pid = os.getpid()
+        return self.__executor
+
+    def path_for(self, job):
+        return os.path.join(self.report_dir, f"{job.id}.{job.extension}")
+
+    def __meta_path(self, job_id):
+        return os.path.join(self.report_dir, f"{job_id}.json")
+
+    def __save(self, job):
+        # Written to a temp file and renamed, so readers never see half a JSON document
+        temp_path = self.__meta_path(job.id) + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as meta:
+            json.dump(job.to_dict(), meta)
+        os.replace(temp_path, self.__meta_path(job.id))
+
+    def submit(self, report_type, time_range="month", report_format="csv", start_date=None, end_date=None):
+        """Queue a report and return its ReportJob; raises ValueError for unknown types or formats"""
+        if report_format not in REPORT_FORMATS:
+            raise ValueError(f"Unsupported report format: {report_format}")
+        self.__source().report_sections(report_type)
+        os.makedirs(self.report_dir, exist_ok=True)
+        self.expire()
+
+        job = ReportJob(report_type, time_range, report_format, start_date, end_date)
+        with self.__lock:
+            self.__jobs[job.id] = job
+        self.__save(job)
+        self.__get_executor().submit(self.__run, job)
+        return job
+
+    def __run(self, job):
+        source = self.__source()
+        job.state = "running"
+        try:
+            sections = source.report_sections(job.report_type)
+            job.total_rows = sum(source.count_report_rows(section, job.time_range, job.start_date, job.end_date)
+                                 for section, _, _ in sections)
+            self.__save(job)
+
+            writer_class = REPORT_FORMATS[job.report_format][0]
+            temp_path = self.path_for(job) + ".part"
+            writer = writer_class(temp_path)
+            try:
+                for section, title, columns in sections:
+                    rows = source.iter_report_rows(section, job.time_range, job.start_date, job.end_date)
+                    for _ in writer.write_section(title, columns, rows):
+                        job.rows_written += 1
+                        if job.rows_written % self.progress_every == 0:
+                            self.__save(job)
+            finally:
+                writer.close()
+            os.replace(temp_path, self.path_for(job))
+
+            job.size = os.path.getsize(self.path_for(job))
+            job.state = "done"
+            with self.__lock:
+                self.__completed += 1
+        except Exception as e:
+            print(f"Error generating report {job.id}: {e}")
+            job.state = "failed"
+            job.error = str(e)
+            with self.__lock:
+                self.__failed += 1
+            try:
+                os.remove(self.path_for(job) + ".part")
+            except OSError:
+                pass
+        job.finished_at = time.time()
+        self.__save(job)
+
+    def get(self, job_id):
+        """The ReportJob for `job_id`, from memory or from another worker's metadata; None if unknown"""
+        if not job_id or not all(c in '0123456789abcdef' for c in job_id):
+            return None
+        job = self.__jobs.get(job_id)
+        if job is not None and job.state in ("queued", "running"):
+            return job
+        try:
+            with open(self.__meta_path(job_id), 'r', encoding='utf-8') as meta:
+                return ReportJob.from_dict(json.load(meta))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def __abandon(self, job, now):
+        """Mark a job no worker is running anymore as failed and drop its partial file"""
+        print(f"Report {job.id} was left {job.state} since {time.ctime(job.created_at)}; marking it failed")
+        job.state = "failed"
+        job.error = "The worker generating this report stopped before it finished"
+        job.finished_at = now
+        self.__save(job)
+        try:
+            os.remove(self.path_for(job) + ".part")
+        except OSError:
+            pass
+        with self.__lock:
+            self.__failed += 1
+
+    def expire(self, now=None):
+        """
+        Delete finished reports older than the TTL and fail unfinished ones
+        older than the stale TTL; returns how many reports were removed
+        """
+        now = now or time.time()
+        removed = 0
+        try:
+            names = os.listdir(self.report_dir)
+        except FileNotFoundError:
+            return 0
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            job = self.get(name[:-5])
+            if job is None:
+                continue
+            if job.finished_at is None:
+                # Jobs this process is still running are left alone
+                if job.id not in self.__jobs and now - (job.created_at or 0) >= self.stale_ttl:
+                    self.__abandon(job, now)
+                continue
+            if now - job.finished_at < self.ttl:
+                continue
+            for path in (self.path_for(job), self.__meta_path(job.id)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            with self.__lock:
+                self.__jobs.pop(job.id, None)
+                self.__expired += 1
+            removed += 1
+        return removed
+
+    def stats(self):
+        with self.__lock:
+            return {
+                'report_dir': self.report_dir,
+                'workers': self.max_workers,
+                'ttl_seconds': self.ttl,
+                'stale_seconds': self.stale_ttl,
+                'active': sorted(job_id for job_id, job in self.__jobs.items() if job.state in ("queued", "running")),
+                'completed': self.__completed,
+                'failed': self.__failed,
+                'expired': self.__expired
+            }
+
+# Shared by the utilities routes
+report_jobs = ReportJobManager()
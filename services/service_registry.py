@@ -0,0 +1,124 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+# Encapsulation: one factory, lock and instance per registered service
+class _ServiceEntry:
+    def __init__(self, factory, eager):
+        self.factory = factory
+        self.eager = eager
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.instance = None
+        self.state = "cold"
+        self.error = None
+        self.pid = os.getpid()
+        self.start_seconds = None
+        self.started_by = None
+
+class ServiceRegistry:
+    """
+    Lazily started application services (databases, mail, geocoder, models).
+
+    A service is built by its factory the first time it is used, at most
+    once per process; services registered with eager=True are also started
+    by start_eager(), which the gunicorn post_worker_init hook calls so a
+    worker warms them up after the fork instead of the master importing
+    everything before it. Instances built in another process (a preloading
+    master) are discarded and rebuilt, as their threads and connections do
+    not survive fork. Boot phases and service start times are kept for
+    timings().
+    """
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._boot = {}
+        self._boot_pid = os.getpid()
+
+    def register(self, name, factory, eager=False):
+        with self._lock:
+            self._entries[name] = _ServiceEntry(factory, eager)
+
+    def set_eager(self, name, eager=True):
+        if name not in self._entries:
+            return False
+        self._entries[name].eager = eager
+        return True
+
+    def _entry(self, name):
+        entry = self._entries[name]
+        if entry.pid != os.getpid():
+            with entry.lock:
+                if entry.pid != os.getpid():
+                    entry.reset()
+        return entry
+
+    def get(self, name, started_by="first use"):
+        """Return the service, building it on first use in this process."""
+        entry = self._entry(name)
+        if entry.state == "ready":
+            return entry.instance
+        with entry.lock:
+            if entry.state != "ready":
+                started = time.perf_counter()
+                try:
+                    entry.instance = entry.factory()
+                    entry.state = "ready"
+                    entry.error = None
+                except Exception as e:
+                    entry.state = "failed"
+                    entry.error = str(e)
+                    raise
+                finally:
+                    entry.start_seconds = round(time.perf_counter() - started, 3)
+                    entry.started_by = started_by
+        return entry.instance
+
+    def is_started(self, name):
+        return name in self._entries and self._entry(name).state == "ready"
+
+    def start_eager(self):
+        """Start every eager service not yet running here; returns the names started."""
+        started = []
+        for name, entry in list(self._entries.items()):
+            if entry.eager and not self.is_started(name):
+                try:
+                    self.get(name, started_by="post-fork")
+                    started.append(name)
+                except Exception as e:
+                    print(f"Error starting service {name}: {e}")
+        return started
+
+    @contextmanager
+    def boot_phase(self, name):
+        """Time one step of building the app."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._boot[name] = round(time.perf_counter() - started, 3)
+
+    def timings(self):
+        """Boot phase durations and, per service, its state and start time in this process."""
+        services = {}
+        for name in self._entries:
+            entry = self._entry(name)
+            services[name] = {
+                'state': entry.state,
+                'eager': entry.eager,
+                'start_seconds': entry.start_seconds,
+                'started_by': entry.started_by,
+                'error': entry.error
+            }
+        return {
+            'pid': os.getpid(),
+            'boot_pid': self._boot_pid,
+            'boot': dict(self._boot),
+            'boot_seconds': round(sum(self._boot.values()), 3),
+            'services': services,
+            'services_started_seconds': round(sum(s['start_seconds'] or 0 for s in services.values()
+                                                  if s['state'] == 'ready'), 3)
+        }
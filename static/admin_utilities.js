@@ -310,6 +310,24 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
     
+    // Poll a queued report until it is ready, then download it
+    function waitForReport(statusLink, downloadLink, submitBtn) {
+        return fetch(statusLink)
+            .then(response => response.json())
+            .then(job => {
+                if (job.state === 'done') {
+                    window.location.href = downloadLink;
+                    return;
+                }
+                if (job.state === 'failed' || job.error) {
+                    throw new Error(job.error || 'Report generation failed');
+                }
+                submitBtn.textContent = `Generating... ${job.progress}%`;
+                return new Promise(resolve => setTimeout(resolve, 1000))
+                    .then(() => waitForReport(statusLink, downloadLink, submitBtn));
+            });
+    }
+    
     reportForm.addEventListener('submit', function(e) {
         e.preventDefault();
         
@@ -326,16 +344,15 @@ document.addEventListener('DOMContentLoaded', function() {
         })
         .then(response => response.json())
         .then(data => {
-            if (data.status === 'success') {
-                alert(data.message);
-                closeModal();
-            } else {
-                alert('Error: ' + data.message);
+            if (data.status !== 'success') {
+                throw new Error(data.message);
             }
+            return waitForReport(data.status_link, data.download_link, submitBtn)
+                .then(() => { reportModal.style.display = 'none'; });
         })
         .catch(error => {
             console.error('Error generating report:', error);
-            alert('An error occurred while generating the report. Please try again.');
+            alert('An error occurred while generating the report: ' + error.message);
         })
         .finally(() => {
             submitBtn.textContent = originalText;
@@ -345,6 +362,52 @@ document.addEventListener('DOMContentLoaded', function() {
     
     initCharts();
     
+    // Detail tables: append the next page from the server using the keyset cursor
+    const detailColumns = {
+        sales: ['date', 'product', 'category', 'quantity', 'revenue', 'cost', 'profit'],
+        vehicles: ['id', 'type', 'brand', 'model', 'status', 'distance', 'efficiency', 'last_maintenance'],
+        employees: ['id', 'name', 'position', 'department', 'performance', 'tasks_completed', 'efficiency', 'status']
+    };
+    const currencyColumns = ['revenue', 'cost', 'profit'];
+    
+    document.querySelectorAll('.load-more-btn').forEach(button => {
+        button.addEventListener('click', function() {
+            const table = this.dataset.table;
+            const tbody = this.parentElement.querySelector('tbody');
+            this.disabled = true;
+            
+            fetch(`/api/utilities/detail/${table}?cursor=${encodeURIComponent(this.dataset.cursor)}`)
+                .then(response => response.json())
+                .then(page => {
+                    page.rows.forEach(row => {
+                        const tr = document.createElement('tr');
+                        detailColumns[table].forEach(column => {
+                            const td = document.createElement('td');
+                            const value = row[column];
+                            if (typeof value === 'number') {
+                                td.textContent = (currencyColumns.includes(column) ? '$' : '') + value.toLocaleString();
+                            } else {
+                                td.textContent = value;
+                            }
+                            tr.appendChild(td);
+                        });
+                        tbody.appendChild(tr);
+                    });
+                    
+                    if (page.next_cursor) {
+                        this.dataset.cursor = page.next_cursor;
+                        this.disabled = false;
+                    } else {
+                        this.remove();
+                    }
+                })
+                .catch(error => {
+                    console.error(`Error loading more ${table} rows:`, error);
+                    this.disabled = false;
+                });
+        });
+    });
+    
     searchInput.addEventListener('input', function() {
         const searchTerm = this.value.toLowerCase();
         
@@ -28,8 +28,11 @@ function activateSection(section) {
     }
 }
 
-// Load user activities function
-function loadUserActivities() {
+// Cursor for the next (older) page of activities, or null when there are no more
+let activityNextCursor = null;
+
+// Load user activities function; pass a cursor to append the next page
+function loadUserActivities(before = null) {
     const activityTimeline = document.getElementById('activity-timeline');
     const loadingMessage = document.getElementById('activity-loading');
     
@@ -40,20 +43,22 @@ function loadUserActivities() {
         loadingMessage.style.display = 'block';
     }
     
-    fetch('/api/user-activities')
+    const url = before ? `/api/user-activities?before=${encodeURIComponent(before)}` : '/api/user-activities';
+    fetch(url)
         .then(response => response.json())
         .then(data => {
             if (data.error) {
                 console.error('Error fetching activities:', data.error);
-                displayNoActivities();
+                if (!before) displayNoActivities(); else updateLoadMoreButton();
                 return;
             }
             
-            displayActivities(data.activities);
+            activityNextCursor = data.next_cursor || null;
+            displayActivities(data.activities, Boolean(before));
         })
         .catch(error => {
             console.error('Error fetching user activities:', error);
-            displayNoActivities();
+            if (!before) displayNoActivities(); else updateLoadMoreButton();
         })
         .finally(() => {
             // Hide loading message
@@ -63,20 +68,39 @@ function loadUserActivities() {
         });
 }
 
-function displayActivities(activities) {
+function updateLoadMoreButton() {
     const activityTimeline = document.getElementById('activity-timeline');
-    if (!activityTimeline) return;
+    const existing = document.getElementById('activity-load-more');
+    if (existing) existing.remove();
+    if (!activityTimeline || !activityNextCursor) return;
     
-    // Clear existing content except loading message
-    const loadingMessage = document.getElementById('activity-loading');
-    activityTimeline.innerHTML = '';
-    if (loadingMessage) {
-        activityTimeline.appendChild(loadingMessage);
-    }
+    const loadMoreButton = document.createElement('button');
+    loadMoreButton.id = 'activity-load-more';
+    loadMoreButton.className = 'timeline-btn';
+    loadMoreButton.textContent = 'Load older activity';
+    loadMoreButton.addEventListener('click', () => {
+        loadMoreButton.disabled = true;
+        loadUserActivities(activityNextCursor);
+    });
+    activityTimeline.appendChild(loadMoreButton);
+}
+
+function displayActivities(activities, append = false) {
+    const activityTimeline = document.getElementById('activity-timeline');
+    if (!activityTimeline) return;
     
-    if (!activities || activities.length === 0) {
-        displayNoActivities();
-        return;
+    if (!append) {
+        // Clear existing content except loading message
+        const loadingMessage = document.getElementById('activity-loading');
+        activityTimeline.innerHTML = '';
+        if (loadingMessage) {
+            activityTimeline.appendChild(loadingMessage);
+        }
+        
+        if (!activities || activities.length === 0) {
+            displayNoActivities();
+            return;
+        }
     }
     
     activities.forEach((activity, index) => {
@@ -115,6 +139,8 @@ function displayActivities(activities) {
             timelineItem.style.animation = 'slideInUp 0.5s ease-out forwards';
         }, index * 100);
     });
+    
+    updateLoadMoreButton();
 }
 
 function displayNoActivities() {
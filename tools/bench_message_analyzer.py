@@ -0,0 +1,53 @@
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.hexabot import HexaBot, ProfanityFilter, LanguageDetector
+
+MESSAGES = [
+    "Hello",
+    "How can I track my shipment?",
+    "What services do you offer for motorcycle deliveries in major cities?",
+    "Paano ko masusubaybayan ang aking padala?",
+    "thanks for the help",
+    "What is the weather like in Manila tomorrow afternoon?",
+    "Do you have same-day delivery for a small parcel going to Quezon City, and how much would a truck cost?"
+]
+
+def legacy_flags(message, profanity, tagalog, allowed, patterns):
+    """The per-keyword scans HexaBot ran before the shared analyzer"""
+    text = message.lower()
+    has_profanity = any(re.search(rf"\b{re.escape(word)}\b", text) for word in profanity)
+    lang = "tl" if any(word in text for word in tagalog) else "en"
+    normalized = text.strip(" ?!.")
+    pattern = next((name for name, keywords in patterns.items()
+                    if any(normalized.startswith(word) or normalized == word for word in keywords)), None)
+    about = any(word in normalized for word in allowed)
+    return has_profanity, lang, pattern, about
+
+def analyzer_flags(bot, message):
+    analysis = bot._analyze(message.lower().strip(" ?!."))
+    return (analysis.has("profanity"), "tl" if analysis.has("tagalog") else "en",
+            analysis.leading(("greetings", "thanks", "goodbye")), analysis.has("allowed"))
+
+def bench_message_analyzer(number=2000):
+    """Per-message cost of the old keyword scans against one pass of the shared analyzer"""
+    bot = HexaBot()
+    profanity = ProfanityFilter().terms()
+    tagalog = LanguageDetector().terms()
+    allowed = bot._HexaBot__allowed_keywords
+    patterns = bot._HexaBot__conversation_patterns
+
+    print(f"{'message':<42}{'legacy us':>12}{'analyzer us':>14}{'speedup':>10}")
+    for message in MESSAGES:
+        legacy = timeit.timeit(lambda: legacy_flags(message, profanity, tagalog, allowed, patterns), number=number)
+        single = timeit.timeit(lambda: analyzer_flags(bot, message), number=number)
+        legacy_us, single_us = legacy / number * 1e6, single / number * 1e6
+        label = message if len(message) <= 40 else message[:37] + "..."
+        print(f"{label:<42}{legacy_us:>12.1f}{single_us:>14.1f}{legacy_us / single_us:>9.1f}x")
+
+if __name__ == "__main__":
+    bench_message_analyzer(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,54 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.hexabot import HexaBot, Translator, TranslationCache
+
+def build_translation_catalog(catalog_path=None, source="en", target="tl"):
+    """
+    Pre-translate every FAQ sentence and canned answer into a JSON catalog
+    that Translator loads at startup. Hand-written Tagalog answers are used
+    as-is; the rest go through LIBRETRANSLATE_URL. Entries that fail to
+    translate keep their previous catalog value, if any.
+    """
+    if catalog_path is None:
+        catalog_path = os.getenv("HEXABOT_TRANSLATION_CATALOG", os.path.join("hexahaul_db", "translation_catalog.json"))
+    pair = f"{source}:{target}"
+
+    try:
+        with open(catalog_path, "r", encoding="utf-8") as file:
+            catalog = json.load(file)
+    except FileNotFoundError:
+        catalog = {}
+    previous = catalog.get(pair, {})
+
+    # No cache and no catalog, so every text really goes to the endpoint
+    translator = Translator(cache=TranslationCache(db_path=""), catalog_path="")
+    entries, missing = {}, []
+    for text, known in HexaBot().translation_sources().items():
+        translation = known or translator.translate(text, source, target)
+        if translation == text:
+            translation = previous.get(text)
+        if translation:
+            entries[text] = translation
+        else:
+            missing.append(text)
+
+    catalog[pair] = entries
+    directory = os.path.dirname(catalog_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = catalog_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(catalog, file, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, catalog_path)
+
+    print(f"Wrote {len(entries)} {pair} translations to {catalog_path} via {translator.endpoint}")
+    for text in missing:
+        print(f"  not translated: {text}")
+    return entries, missing
+
+if __name__ == "__main__":
+    build_translation_catalog(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import statistics
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.model_registry import QA_MODEL_NAME, current_rss_mb
+from services.fast_qa import load_fast_qa_pipeline, configure_torch_threads
+
+def token_f1(prediction, reference):
+    """SQuAD-style token overlap F1 between two answer strings"""
+    pred_tokens = prediction.lower().split()
+    ref_tokens = reference.lower().split()
+    if not pred_tokens or not ref_tokens:
+        return float(pred_tokens == ref_tokens)
+    common = sum((Counter(pred_tokens) & Counter(ref_tokens)).values())
+    if common == 0:
+        return 0.0
+    precision = common / len(pred_tokens)
+    recall = common / len(ref_tokens)
+    return 2 * precision * recall / (precision + recall)
+
+def time_answers(qa_pipeline, questions, context, repeats):
+    """Answer each question `repeats` times; returns (answers, per-call latencies in ms)"""
+    answers, latencies = {}, []
+    for question in questions:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            result = qa_pipeline(question=question, context=context)
+            latencies.append((time.perf_counter() - started) * 1000)
+        answers[question] = result['answer']
+    return answers, latencies
+
+def compare_qa_inference(repeats=20):
+    """
+    Compare the default transformers pipeline with the quantized fast
+    inference mode on HexaBot's quick-reply questions
+    """
+    from transformers import pipeline
+    from services.hexabot import HexaBot
+
+    bot = HexaBot()
+    questions = bot.quick_reply_questions
+    context = bot.faq_context
+    configure_torch_threads()
+
+    rss_start = current_rss_mb()
+    baseline = pipeline("question-answering", model=QA_MODEL_NAME)
+    rss_baseline = current_rss_mb()
+    fast = load_fast_qa_pipeline(QA_MODEL_NAME)
+    rss_fast = current_rss_mb()
+
+    # One untimed pass each so lazy initialisation does not skew the first sample
+    time_answers(baseline, questions, context, 1)
+    time_answers(fast, questions, context, 1)
+    base_answers, base_latencies = time_answers(baseline, questions, context, repeats)
+    fast_answers, fast_latencies = time_answers(fast, questions, context, repeats)
+
+    exact = sum(fast_answers[q].strip() == base_answers[q].strip() for q in questions) / len(questions)
+    f1 = statistics.mean(token_f1(fast_answers[q], base_answers[q]) for q in questions)
+
+    print(f"Model: {QA_MODEL_NAME}  questions: {len(questions)}  repeats: {repeats}")
+    print(f"{'mode':<12}{'median ms':>12}{'p90 ms':>10}{'RSS +MB':>10}")
+    for name, latencies, rss_delta in (
+        ("pipeline", base_latencies, (rss_baseline or 0) - (rss_start or 0)),
+        ("fast-int8", fast_latencies, (rss_fast or 0) - (rss_baseline or 0))
+    ):
+        p90 = statistics.quantiles(latencies, n=10)[-1] if len(latencies) > 1 else latencies[0]
+        print(f"{name:<12}{statistics.median(latencies):>12.1f}{p90:>10.1f}{rss_delta:>10.1f}")
+    print(f"Exact match vs pipeline: {exact:.0%}  token F1: {f1:.3f}")
+    for question in questions:
+        if fast_answers[question].strip() != base_answers[question].strip():
+            print(f"  differs: {question!r}: {base_answers[question]!r} -> {fast_answers[question]!r}")
+
+if __name__ == "__main__":
+    compare_qa_inference(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,127 @@
+import os
+import re
+import sys
+import sqlite3
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.sqlite_engine import PROJECT_ROOT, SQLiteSchemaError, apply_pragmas, check_columns, store_path
+from models.utilities_database import UTILITIES_SALES_TABLE, UTILITIES_SALES_COLUMNS
+
+# The files the models open when SQLITE_STORE is not set
+LOCAL_DATABASES = [
+    os.path.join(PROJECT_ROOT, 'vehicles.db'),
+    os.path.join(PROJECT_ROOT, 'employees.db'),
+    os.path.join(PROJECT_ROOT, 'hexaboxes.db'),
+    os.path.join(PROJECT_ROOT, 'database', 'hexahaul_sales.db'),
+    os.path.join(PROJECT_ROOT, 'database', 'hexahaul.db'),
+    os.path.join(PROJECT_ROOT, 'database', 'products.db'),
+    os.path.join(PROJECT_ROOT, 'database', 'salary.db'),
+    os.path.join(PROJECT_ROOT, 'hexahaul_db', 'hexahaul.db')
+]
+
+def _columns(conn, schema, table):
+    return [row[1] for row in conn.execute(f'PRAGMA {schema}.table_info("{table}")')]
+
+def _target_table(table, columns):
+    # UtilitiesDatabase used to create its table under the name "sales" too
+    if table == 'sales' and set(UTILITIES_SALES_COLUMNS) <= set(columns):
+        return UTILITIES_SALES_TABLE
+    return table
+
+def _plan(paths):
+    """
+    {store table: (source path, source table, create sql)} for every table
+    of `paths`. A table name found in two files is a collision: an empty
+    copy with the same name is left behind (noted, as it holds nothing),
+    anything else raises SQLiteSchemaError, as only one could be kept.
+    """
+    plan, rows = {}, {}
+    for path in paths:
+        conn = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+        try:
+            tables = conn.execute("SELECT name, sql FROM sqlite_master "
+                                  "WHERE type = 'table' AND name NOT LIKE 'sqlite_%'").fetchall()
+            for table, create_sql in tables:
+                columns = _columns(conn, 'main', table)
+                target = _target_table(table, columns)
+                has_rows = conn.execute(f'SELECT 1 FROM "{table}" LIMIT 1').fetchone() is not None
+                if target != table:
+                    create_sql = re.sub(r'^(CREATE TABLE\s+)["`\[]?' + re.escape(table) + r'["`\]]?',
+                                        lambda match: match.group(1) + target, create_sql, count=1)
+                if target in plan:
+                    other_path, _, _, other_columns = plan[target]
+                    if has_rows and rows[target]:
+                        raise SQLiteSchemaError(f"Table {target} has rows in both {other_path} and {path}; "
+                                                f"rename one of them before consolidating")
+                    if columns != other_columns and not (has_rows or rows[target]):
+                        raise SQLiteSchemaError(f"Table {target} has different columns in {other_path} and {path}")
+                    if not has_rows:
+                        print(f"  {target} in {path} left out: empty, and {other_path} has one too")
+                        continue
+                    print(f"  {target} in {other_path} left out: empty, and {path} has one too")
+                plan[target] = (path, table, create_sql, columns)
+                rows[target] = has_rows
+        finally:
+            conn.close()
+    return {target: entry[:3] for target, entry in plan.items()}
+
+def consolidate_sqlite(store=None, sources=None):
+    """
+    Copy every table of the per-feature SQLite files into one store file
+    (SQLITE_STORE), so the app can run with all its tables in a single WAL
+    database. Tables missing from the store are created from the source
+    schema; rows are only copied into tables that are still empty, so
+    running it again never duplicates data. Tables whose name clashes
+    across files (see _plan) or with a store table of other columns raise
+    SQLiteSchemaError before anything is copied. Returns {table: rows copied}.
+    """
+    store = store or store_path()
+    if not store:
+        raise ValueError("Pass a store path or set SQLITE_STORE")
+    os.makedirs(os.path.dirname(os.path.abspath(store)), exist_ok=True)
+
+    paths = [path for path in sources or LOCAL_DATABASES
+             if os.path.exists(path) and os.path.abspath(path) != os.path.abspath(store)]
+    plan = _plan(paths)
+
+    copied = {}
+    conn = sqlite3.connect(store)
+    try:
+        apply_pragmas(conn)
+        for target, (path, table, create_sql) in plan.items():
+            existing = _columns(conn, 'main', target)
+            if existing:
+                source = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+                try:
+                    check_columns(target, _columns(source, 'main', table), set(existing))
+                finally:
+                    source.close()
+
+        for target, (path, table, create_sql) in plan.items():
+            conn.execute("ATTACH DATABASE ? AS source", (os.path.abspath(path),))
+            try:
+                if not _columns(conn, 'main', target):
+                    # Unqualified CREATE TABLE statements create in main
+                    conn.execute(create_sql)
+                if conn.execute(f'SELECT 1 FROM main."{target}" LIMIT 1').fetchone():
+                    print(f"  {target}: store already has rows, left as is")
+                    copied[target] = 0
+                    continue
+                columns = [name for name in _columns(conn, 'source', table) if name in _columns(conn, 'main', target)]
+                column_list = ", ".join(f'"{name}"' for name in columns)
+                cursor = conn.execute(f'INSERT INTO main."{target}" ({column_list}) '
+                                      f'SELECT {column_list} FROM source."{table}"')
+                copied[target] = cursor.rowcount
+                print(f"  {target}: copied {cursor.rowcount} rows from {os.path.relpath(path, PROJECT_ROOT)}")
+                conn.commit()
+            finally:
+                conn.execute("DETACH DATABASE source")
+    finally:
+        conn.close()
+
+    print(f"Consolidated {len(copied)} tables into {store}")
+    return copied
+
+if __name__ == "__main__":
+    consolidate_sqlite(sys.argv[1] if len(sys.argv) > 1 else None)
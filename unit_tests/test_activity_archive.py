@@ -0,0 +1,86 @@
+import os
+import csv
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from models.activity_archive import ActivityArchive
+from models.activity_database import ActivityDatabase
+from models.activity_feed import CsvActivityFeed, decode_cursor
+from utils.bloom import BloomFilter
+
+HEADER = ['id', 'Username', 'Email', 'Activity_Type', 'Activity_Description', 'Timestamp', 'IP_Address', 'User_Agent']
+
+class TestActivityArchive(unittest.TestCase):
+
+    def setUp(self):
+        """Three months of activity, the last one still current."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.csv_path = os.path.join(self.tmpdir.name, 'hh_activity.csv')
+        with open(self.csv_path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(HEADER)
+            writer.writerow(['1', 'alice', 'alice@example.com', 'LOGIN', 'in', '4/02/2025 09:00', '', 'UA'])
+            writer.writerow(['2', 'bob', 'bob@example.com', 'LOGIN', 'in', '5/03/2025 09:00', '', 'UA'])
+            writer.writerow(['alice', 'alice@example.com', 'LOGOUT', 'out', '2025-05-20 10:00:00', '', 'UA'])
+            writer.writerow(['alice', 'alice@example.com', 'LOGIN', 'in', '2025-06-02 08:00:00', '', 'UA'])
+        self.db = ActivityDatabase(self.csv_path, write_behind=False)
+        self.now = datetime(2025, 6, 15)
+
+    def test_compaction_keeps_only_current_month_hot(self):
+        """Completed months move to segments; reads still see every row in order."""
+        summary = self.db.compact(now=self.now)
+        self.assertEqual(summary['archived_rows'], 3)
+        self.assertEqual(sorted(summary['segments_written']), ['2025-04', '2025-05'])
+        with open(self.csv_path, newline='', encoding='utf-8') as file:
+            self.assertEqual(len(list(csv.reader(file))), 2)
+
+        rows = self.db.get_user_activities('alice', 'alice@example.com', limit=10)
+        self.assertEqual([row['Timestamp'] for row in rows],
+                         ['2025-06-02 08:00:00', '2025-05-20 10:00:00', '4/02/2025 09:00'])
+
+    def test_csv_feed_continues_into_the_archive(self):
+        """After compaction the sidebar's CSV feed pages from the hot rows into archived months."""
+        self.db.compact(now=self.now)
+        feed = CsvActivityFeed(self.csv_path, self.db.archive)
+        first, cursor = feed.page('alice', 'alice@example.com', limit=2)
+        self.assertEqual([a['timestamp'] for a in first], ['2025-06-02 08:00:00', '2025-05-20 10:00:00'])
+        second, cursor = feed.page('alice', 'alice@example.com', before=decode_cursor(cursor)[1:], limit=2)
+        self.assertEqual([a['timestamp'] for a in second], ['4/02/2025 09:00'])
+        self.assertIsNone(cursor)
+
+    def test_readers_skip_segments_by_time_and_user(self):
+        """Segments outside the window or without the user are never opened."""
+        self.db.compact(now=self.now)
+        with patch.object(ActivityArchive, 'load_segment', wraps=self.db.archive.load_segment) as load:
+            rows = list(self.db.archive.iter_rows('bob', 'bob@example.com', since=datetime(2025, 5, 1)))
+            self.assertEqual([row['id'] for row in rows], ['2'])
+            self.assertEqual([call.args[0]['month'] for call in load.call_args_list], ['2025-05'])
+            load.reset_mock()
+            list(self.db.archive.iter_rows('nobody', 'nobody@example.com'))
+            load.assert_not_called()
+
+    def test_retention_drops_old_segments_and_recompaction_merges(self):
+        """Retention removes whole months; compacting a month twice merges it."""
+        self.db.compact(now=self.now)
+        self.db.log_activity('bob', 'bob@example.com', 'LOGOUT', 'late row', '', '')
+        with open(self.csv_path, 'a', newline='', encoding='utf-8') as file:
+            csv.writer(file).writerow(['carol', 'carol@example.com', 'LOGIN', 'in', '2025-05-31 23:59:00', '', 'UA'])
+        self.db.archive.retention_months = 1
+        summary = self.db.compact(now=self.now)
+        self.assertEqual(summary['segments_dropped'], ['2025-04'])
+        months = {segment['month']: segment['rows'] for segment in self.db.archive.manifest()['segments']}
+        self.assertEqual(months, {'2025-05': 3})
+
+    def test_bloom_filter_round_trip(self):
+        """Serialized filters keep their members."""
+        bloom = BloomFilter.for_capacity(100)
+        for i in range(100):
+            bloom.add(f"user{i}")
+        restored = BloomFilter.from_dict(bloom.to_dict())
+        self.assertTrue(all(f"user{i}" in restored for i in range(100)))
+        self.assertLess(sum(f"other{i}" in restored for i in range(1000)), 50)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from models.activity_feed import ActivityFeed, CsvActivityFeed, MySQLActivityFeed, decode_cursor, migrate
+
+CSV_CONTENT = (
+    "id,Username,Email,Activity_Type,Activity_Description,Timestamp,IP_Address,User_Agent\n"
+    "1,alice,alice@example.com,LOGIN,User logged in successfully,5/26/2025 15:18,127.0.0.1,UA\n"
+    "2,bob,bob@example.com,LOGIN,User logged in successfully,5/27/2025 09:00,127.0.0.1,UA\n"
+    "3,alice,alice@example.com,LOGOUT,User logged out,5/27/2025 10:00,127.0.0.1,UA\n"
+    # log_activity writes rows without the id column
+    "alice,alice@example.com,LOGIN,User logged in successfully,2025-06-08 23:32:58,127.0.0.1,UA\n"
+    "alice,alice@example.com,LOGOUT,User logged out,2025-06-09 08:00:00,127.0.0.1,UA\n"
+)
+
+class TestActivityFeed(unittest.TestCase):
+
+    def setUp(self):
+        """Write a small activity CSV mixing both timestamp formats."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.csv_path = os.path.join(self.tmpdir.name, 'hh_activity.csv')
+        with open(self.csv_path, 'w', encoding='utf-8') as file:
+            file.write(CSV_CONTENT)
+
+    def test_csv_pages_follow_the_cursor(self):
+        """Pages are newest first, do not overlap and end with no cursor."""
+        feed = CsvActivityFeed(self.csv_path)
+        first, cursor = feed.page('alice', 'alice@example.com', limit=3)
+        self.assertEqual([a['timestamp'] for a in first],
+                         ['2025-06-09 08:00:00', '2025-06-08 23:32:58', '5/27/2025 10:00'])
+        source, ts, row_no = decode_cursor(cursor)
+        second, cursor = feed.page('alice', 'alice@example.com', before=(ts, row_no), limit=3)
+        self.assertEqual([a['timestamp'] for a in second], ['5/26/2025 15:18'])
+        self.assertIsNone(cursor)
+
+    def test_mysql_page_uses_keyset_union(self):
+        """Each identifier gets its own indexed range; the cursor comes from the last row shown."""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [
+            {'id': 9, 'ts': 1749513600, 'Timestamp': '2025-06-10 00:00:00'},
+            {'id': 7, 'ts': 1749427200, 'Timestamp': '2025-06-09 00:00:00'},
+        ]
+        cursor.fetchone.return_value = {'found': 1}
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+        feed = MySQLActivityFeed(MagicMock(return_value=conn))
+
+        activities, next_cursor = feed.page('alice', 'alice@example.com', before=(1749600000, 12), limit=1)
+        query, params = cursor.execute.call_args[0]
+        self.assertIn('UNION', query)
+        self.assertNotIn('STR_TO_DATE', query)
+        self.assertEqual(params, ('alice', 1749600000, 1749600000, 12, 2,
+                                  'alice@example.com', 1749600000, 1749600000, 12, 2, 2))
+        self.assertEqual(len(activities), 1)
+        self.assertEqual(activities[0]['date'], '2025-06-10')
+        self.assertEqual(next_cursor, 'm:1749513600:9')
+        conn.close.assert_called_once()
+
+    def test_mysql_page_before_migration_parses_timestamps(self):
+        """Without the ts column the page is computed from Timestamp; the column is only looked up once."""
+        cursor = MagicMock()
+        cursor.fetchone.return_value = {'found': 0}
+        cursor.fetchall.return_value = [{'id': 3, 'ts': 1748340000, 'Timestamp': '5/27/2025 10:00'}]
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+        feed = MySQLActivityFeed(MagicMock(return_value=conn))
+
+        for _ in range(2):
+            activities, next_cursor = feed.page('alice', None)
+        queries = [call[0][0] for call in cursor.execute.call_args_list]
+        self.assertEqual(sum('information_schema' in query for query in queries), 1)
+        self.assertIn('STR_TO_DATE', queries[-1])
+        self.assertIn('HAVING ts IS NOT NULL', queries[-1])
+        self.assertNotIn("'%s'", queries[-1])
+        self.assertEqual(activities[0]['date'], '2025-05-27')
+        self.assertIsNone(next_cursor)
+
+    def test_falls_back_to_csv_when_mysql_fails(self):
+        """A MySQL error on the first page is served from the CSV instead."""
+        feed = ActivityFeed(MagicMock(side_effect=Exception("down")), self.csv_path)
+        activities, cursor = feed.page('bob', 'bob@example.com')
+        self.assertEqual([a['source'] for a in activities], ['csv'])
+        self.assertIsNone(cursor)
+        with self.assertRaises(ValueError):
+            feed.page('bob', 'bob@example.com', cursor='garbage')
+
+    def test_migrate_backfills_both_formats(self):
+        """The migration parses both layouts, installs the ts triggers and leaves unparseable rows NULL."""
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [
+            [('id', 'int'), ('Username', 'text'), ('Email', 'text'), ('ts', 'bigint')],
+            [('PRIMARY',)],
+            [('hh_activity_ts_update',)],
+            [(1, '5/26/2025 15:18'), (2, '2025-06-08 23:32:58'), (3, 'not a date')],
+            [],
+        ]
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+
+        self.assertEqual(migrate(MagicMock(return_value=conn)), 2)
+        executed = [call[0][0] for call in cursor.execute.call_args_list]
+        self.assertIn("CREATE INDEX idx_hh_activity_username_ts ON hh_activity (Username(191), ts)", executed)
+        self.assertFalse(any('ALTER TABLE' in sql for sql in executed))
+        created = [sql for sql in executed if sql.startswith('CREATE TRIGGER')]
+        self.assertEqual(len(created), 1)
+        self.assertTrue(created[0].startswith('CREATE TRIGGER hh_activity_ts_insert BEFORE INSERT'))
+        self.assertIn("UPDATE hh_activity SET ts = NULL WHERE ts = 0", executed)
+        values = cursor.executemany.call_args[0][1]
+        self.assertEqual(values, [(1748272680, 1), (1749425578, 2)])
+
+if __name__ == '__main__':
+    unittest.main()
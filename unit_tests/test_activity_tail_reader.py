@@ -0,0 +1,54 @@
+import os
+import csv
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from models.activity_database import ActivityDatabase
+
+HEADER = "id,Username,Email,Activity_Type,Activity_Description,Timestamp,IP_Address,User_Agent\n"
+
+class TestActivityTailReader(unittest.TestCase):
+
+    def setUp(self):
+        """An activity log with old imported rows followed by log_activity rows."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.csv_path = os.path.join(self.tmpdir.name, 'hh_activity.csv')
+        now = datetime.now()
+        with open(self.csv_path, 'w', newline='', encoding='utf-8') as file:
+            file.write(HEADER)
+            file.write("1,alice,alice@example.com,LOGIN,User logged in successfully,5/26/2020 15:18,127.0.0.1,UA\n")
+            file.write("2,bob,bob@example.com,LOGIN,User logged in successfully,5/26/2020 16:00,127.0.0.1,UA\n")
+            writer = csv.writer(file)
+            for day in range(10, 0, -1):
+                stamp = (now - timedelta(days=day)).strftime('%Y-%m-%d %H:%M:%S')
+                writer.writerow(['alice', 'alice@example.com', 'LOGIN' if day % 2 else 'LOGOUT', 'x', stamp, '', 'UA, "quoted"'])
+        self.db = ActivityDatabase(self.csv_path, write_behind=False)
+
+    def test_newest_first_with_limit(self):
+        """The last appended rows come back first and only `limit` are read."""
+        rows = self.db.get_user_activities('alice', 'alice@example.com', limit=3)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['User_Agent'], 'UA, "quoted"')
+        self.assertGreater(rows[0]['Timestamp'], rows[1]['Timestamp'])
+        self.assertEqual(self.db.reader.stats()['indexed_offsets'], 3)
+
+    def test_login_history_and_recent_window(self):
+        """Type filters and the day cutoff both stop the scan early."""
+        logins = self.db.get_login_history('alice', 'alice@example.com', limit=10)
+        self.assertEqual(len(logins), 6)
+        self.assertTrue(all(row['Activity_Type'] == 'LOGIN' for row in logins))
+        self.assertEqual(logins[-1]['id'], '1')
+        recent = self.db.get_recent_activities('alice', 'alice@example.com', days=5, limit=20)
+        self.assertEqual(len(recent), 4)
+
+    def test_appended_rows_extend_the_index(self):
+        """Rows appended after a query are picked up from the tail."""
+        self.db.get_user_activities('bob', 'bob@example.com', limit=5)
+        self.db.log_activity('bob', 'bob@example.com', 'LOGOUT', 'User logged out')
+        rows = self.db.get_user_activities('bob', 'bob@example.com', limit=5)
+        self.assertEqual([row['Activity_Type'] for row in rows], ['LOGOUT', 'LOGIN'])
+        self.assertEqual(len(self.db.get_user_activities(limit=100)), 13)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import csv
+import tempfile
+import unittest
+from unittest.mock import patch
+from models.activity_database import ActivityDatabase, ActivityWriter
+
+class TestActivityWriter(unittest.TestCase):
+
+    def setUp(self):
+        """Log into a throwaway activity CSV."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.csv_path = os.path.join(self.tmpdir.name, 'hh_activity.csv')
+
+    def read_rows(self):
+        with open(self.csv_path, newline='', encoding='utf-8') as file:
+            return list(csv.reader(file))[1:]
+
+    def test_rows_are_written_in_one_batch_on_flush(self):
+        """Queued rows are appended together once flushed."""
+        db = ActivityDatabase(self.csv_path, write_behind=True)
+        db.writer.flush_interval = 60
+        self.addCleanup(db.writer.close)
+        for i in range(5):
+            self.assertTrue(db.log_activity(f'user{i}', f'user{i}@example.com', 'LOGIN', 'User logged in successfully'))
+        self.assertTrue(db.flush())
+        self.assertEqual([row[0] for row in self.read_rows()], [f'user{i}' for i in range(5)])
+        stats = db.writer_stats()
+        self.assertEqual(stats['written'], 5)
+        self.assertEqual(stats['batches'], 1)
+        self.assertEqual(stats['queue_depth'], 0)
+
+    def test_full_queue_drops_and_counts(self):
+        """A full queue rejects rows instead of blocking the request."""
+        writer = ActivityWriter(self.csv_path, batch_size=100, flush_interval=60, max_queue=2)
+        self.addCleanup(writer.close)
+        # Keep the drainer stopped so nothing makes room in the queue
+        with patch.object(writer, '_ensure_started'):
+            results = [writer.enqueue(['u', 'e', 'LOGIN', 'd', 't', '', '']) for _ in range(5)]
+        self.assertEqual(results, [True, True, False, False, False])
+        stats = writer.stats()
+        self.assertEqual(stats['dropped'], 3)
+        self.assertEqual(stats['queue_depth'], 2)
+
+    def test_close_flushes_pending_rows(self):
+        """Shutdown writes whatever is still queued."""
+        db = ActivityDatabase(self.csv_path, write_behind=True)
+        db.writer.flush_interval = 60
+        db.log_activity('alice', 'alice@example.com', 'LOGOUT', 'User logged out')
+        db.writer.close()
+        self.assertEqual(self.read_rows()[0][:3], ['alice', 'alice@example.com', 'LOGOUT'])
+        self.assertFalse(db.log_activity('bob', 'bob@example.com', 'LOGIN', 'late'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,24 @@
+import os
+import atexit
+import shutil
+import tempfile
 import unittest
-from app import app
+from unittest.mock import patch
+# Don't start the background QA model download while importing the app
+os.environ.setdefault("QA_WARMUP", "0")
+# The app's SQLite tables go to a throwaway store rather than the .db files in the tree
+TEST_STORE = os.path.join(tempfile.gettempdir(), f"hexahaul-tests-{os.getpid()}", "hexahaul.db")
+TEST_DATABASES = {'SQLITE_STORE': TEST_STORE, 'SEED_MANIFEST': TEST_STORE + '.manifest.json'}
+atexit.register(shutil.rmtree, os.path.dirname(TEST_STORE), True)
+with patch.dict(os.environ, TEST_DATABASES):
+    from app import app
 from flask import json
 
 class TestApp(unittest.TestCase):
     def setUp(self):
+        patcher = patch.dict(os.environ, TEST_DATABASES)
+        patcher.start()
+        self.addCleanup(patcher.stop)
         # Set up test client for Flask app
         self.app = app.test_client()
         self.app.testing = True
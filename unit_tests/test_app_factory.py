@@ -0,0 +1,78 @@
+import os
+import atexit
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+os.environ.setdefault("QA_WARMUP", "0")
+# The app's SQLite tables go to a throwaway store rather than the .db files in the tree
+TEST_STORE = os.path.join(tempfile.gettempdir(), f"hexahaul-tests-{os.getpid()}", "hexahaul.db")
+TEST_DATABASES = {'SQLITE_STORE': TEST_STORE, 'SEED_MANIFEST': TEST_STORE + '.manifest.json'}
+atexit.register(shutil.rmtree, os.path.dirname(TEST_STORE), True)
+with patch.dict(os.environ, TEST_DATABASES):
+    import app as app_module
+from services.service_registry import ServiceRegistry
+
+class TestAppFactory(unittest.TestCase):
+
+    def setUp(self):
+        """Services started by the tests open the throwaway store too."""
+        patcher = patch.dict(os.environ, TEST_DATABASES)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_factory_defers_services_until_first_use(self):
+        """create_app() builds no database; a service starts once, on first use."""
+        vehicle_db = MagicMock(name='VehicleDatabase')
+        with patch.object(app_module, 'VehicleDatabase', vehicle_db):
+            flask_app = app_module.create_app({'TESTING': True, 'QA_WARMUP': False})
+            instance = flask_app.extensions['hexahaul']
+            vehicle_db.assert_not_called()
+            self.assertIs(instance.vehicle_db, instance.vehicle_db)
+            vehicle_db.assert_called_once_with()
+        timings = instance.startup_timings()
+        self.assertEqual(set(timings['boot']), {'flask', 'mysql_pool', 'services', 'routes', 'blueprints'})
+        self.assertEqual(timings['services']['vehicle_db']['state'], 'ready')
+        self.assertEqual(timings['services']['employee_db']['state'], 'cold')
+        self.assertTrue(flask_app.config['TESTING'])
+
+    def test_sales_routes_share_one_sales_database(self):
+        """The admin sales routes use the app's SalesDatabase instead of building one per request."""
+        sales_db = MagicMock(name='SalesDatabase')
+        with patch.object(app_module, 'SalesDatabase', sales_db):
+            flask_app = app_module.create_app({'TESTING': True, 'QA_WARMUP': False})
+            client = flask_app.test_client()
+            with client.session_transaction() as flask_session:
+                flask_session['admin_id'] = 1
+            for sale_id in (1, 2):
+                client.post('/admin/sales/delete', data={'sale_id': sale_id})
+        sales_db.assert_called_once_with()
+        self.assertEqual(sales_db.return_value.delete_sale.call_count, 2)
+
+    def test_eager_services_start_after_fork(self):
+        """start_eager() starts only eager services, and instances from another pid are rebuilt."""
+        registry = ServiceRegistry()
+        registry.register('eager', lambda: object(), eager=True)
+        registry.register('lazy', lambda: object())
+        self.assertEqual(registry.start_eager(), ['eager'])
+        self.assertEqual(registry.start_eager(), [])
+        self.assertFalse(registry.is_started('lazy'))
+        parent_instance = registry.get('eager')
+        with patch('services.service_registry.os.getpid', return_value=os.getpid() + 1):
+            self.assertFalse(registry.is_started('eager'))
+            self.assertEqual(registry.start_eager(), ['eager'])
+            self.assertIsNot(registry.get('eager'), parent_instance)
+            self.assertEqual(registry.timings()['services']['eager']['started_by'], 'post-fork')
+
+    def test_startup_timings_endpoint_requires_admin(self):
+        """/api/admin/startup-timings is admin-only and reports the boot breakdown."""
+        client = app_module.app.test_client()
+        self.assertEqual(client.get('/api/admin/startup-timings').status_code, 401)
+        with client.session_transaction() as flask_session:
+            flask_session['admin_id'] = 1
+        timings = client.get('/api/admin/startup-timings').get_json()
+        self.assertIn('routes', timings['boot'])
+        self.assertIn('qa_model', timings['services'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, Float, select, func
+from models.bulk_loader import BulkCsvLoader
+
+def item_rows(chunk):
+    """Vectorized transform used by the tests: upper-cases names and doubles prices."""
+    return pd.DataFrame({
+        'code': chunk['Code'],
+        'name': chunk['Name'].str.upper(),
+        'price': chunk['Price'] * 2,
+        'ignored': 1
+    }, index=chunk.index)
+
+class TestBulkCsvLoader(unittest.TestCase):
+
+    def setUp(self):
+        """A temporary SQLite table, seed CSV and manifest."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.tmpdir.name, 'items.db')}")
+        self.addCleanup(self.engine.dispose)
+        self.table = Table('items', MetaData(),
+                           Column('id', Integer, primary_key=True, autoincrement=True),
+                           Column('code', String, unique=True),
+                           Column('name', String),
+                           Column('price', Float))
+        self.table.metadata.create_all(self.engine)
+        self.csv_path = os.path.join(self.tmpdir.name, 'items.csv')
+        self.write_csv(250)
+        self.manifest = os.path.join(self.tmpdir.name, 'manifest.json')
+        self.calls = 0
+
+    def write_csv(self, rows, duplicate=False):
+        codes = [f"C{n}" for n in range(rows)]
+        if duplicate:
+            codes[-1] = codes[0]
+        pd.DataFrame({'Code': codes, 'Name': [f"item {n}" for n in range(rows)],
+                      'Price': [n * 0.5 for n in range(rows)]}).to_csv(self.csv_path, index=False)
+
+    def loader(self):
+        return BulkCsvLoader(self.engine, manifest_path=self.manifest, chunksize=100)
+
+    def transform(self, chunk):
+        self.calls += 1
+        return item_rows(chunk)
+
+    def count(self):
+        with self.engine.connect() as conn:
+            return conn.execute(select(func.count()).select_from(self.table)).scalar()
+
+    def test_loads_in_chunks_and_applies_the_transform(self):
+        """Every row is inserted, one transform call per chunk, unknown columns dropped."""
+        self.assertEqual(self.loader().load(self.table, self.csv_path, self.transform, dtype={'Code': str}), 250)
+        self.assertEqual((self.calls, self.count()), (3, 250))
+        with self.engine.connect() as conn:
+            row = conn.execute(select(self.table).where(self.table.c.code == 'C7')).one()
+        self.assertEqual((row.name, row.price), ('ITEM 7', 7.0))
+        self.assertEqual(self.loader().manifest_entry(self.table)['rows'], 250)
+
+    def test_unchanged_seed_is_skipped_on_restart(self):
+        """A second load of the same CSV neither reads it nor inserts anything."""
+        self.loader().load(self.table, self.csv_path, self.transform)
+        self.calls = 0
+        self.assertEqual(self.loader().load(self.table, self.csv_path, self.transform), 0)
+        self.assertEqual((self.calls, self.count()), (0, 250))
+
+    def test_changed_seed_is_only_reloaded_on_replace(self):
+        """A new seed over existing rows is not recorded as loaded, and reloaded only with replace=True."""
+        self.loader().load(self.table, self.csv_path, self.transform)
+        loaded = self.loader().manifest_entry(self.table)
+        self.write_csv(120, duplicate=True)
+        self.assertEqual(self.loader().load(self.table, self.csv_path, self.transform), 0)
+        self.assertEqual(self.count(), 250)
+        self.assertEqual(self.loader().manifest_entry(self.table)['sha256'], loaded['sha256'])
+        # The duplicate code is skipped by INSERT OR IGNORE rather than failing the chunk
+        self.assertEqual(self.loader().load(self.table, self.csv_path, self.transform, replace=True), 119)
+        self.assertEqual(self.count(), 119)
+
+    def test_interrupted_seed_is_reloaded_on_restart(self):
+        """A load that dies between chunks leaves an incomplete entry, and the next one starts over."""
+        def failing(chunk):
+            if self.calls == 1:
+                raise RuntimeError("killed")
+            return self.transform(chunk)
+        with self.assertRaises(RuntimeError):
+            self.loader().load(self.table, self.csv_path, failing)
+        self.assertEqual(self.count(), 100)
+        self.assertFalse(self.loader().manifest_entry(self.table)['complete'])
+        self.assertEqual(self.loader().load(self.table, self.csv_path, self.transform), 250)
+        self.assertEqual(self.count(), 250)
+        self.assertTrue(self.loader().manifest_entry(self.table)['complete'])
+
+    def test_rows_without_a_manifest_entry_are_not_recorded(self):
+        """Rows the manifest never saw loaded are left alone and not marked as this seed's load."""
+        with self.engine.begin() as conn:
+            conn.execute(self.table.insert(), [{'code': 'X1', 'name': 'x', 'price': 1.0}])
+        self.assertEqual(self.loader().load(self.table, self.csv_path, self.transform), 0)
+        self.assertEqual((self.calls, self.count()), (0, 1))
+        self.assertIsNone(self.loader().manifest_entry(self.table))
+
+    def test_missing_csv_returns_none(self):
+        """A seed that does not exist reports None so callers can fall back."""
+        self.assertIsNone(self.loader().load(self.table, os.path.join(self.tmpdir.name, 'nope.csv'), item_rows))
+
+if __name__ == '__main__':
+    unittest.main()
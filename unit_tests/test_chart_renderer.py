@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import time
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+from models.analytics_backend import (employee_status_counts, vehicle_deployment_counts, plot_vehicles_deployed,
+                                      employee_chart_data, vehicle_chart_data)
+from services.chart_renderer import ChartRenderer
+
+BIOGRAPHY = "Employee Id,First Name,Job Title,Department\n1,Ana,Delivery Driver,Dispatch\n2,Ben,Dispatcher,Dispatch\n3,Cy,Delivery Driver,Fleet\n"
+VEHICLES = "Employee Id,unit_name\n1,Truck A\n3,Truck B\n9,Truck C\n"
+
+class TestChartRenderer(unittest.TestCase):
+
+    def setUp(self):
+        """A temporary data file and a renderer whose pool is a thread pool counting renders."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.data_path = os.path.join(self.tmpdir.name, 'data.csv')
+        with open(self.data_path, 'w') as file:
+            file.write("v1")
+        self.renders = 0
+        self.gate = threading.Event()
+        self.gate.set()
+
+        def render(data):
+            self.gate.wait(5)
+            self.renders += 1
+            return data.encode()
+
+        self.loads = 0
+
+        def load(connection_factory):
+            self.loads += 1
+            with open(self.data_path) as file:
+                return file.read()
+
+        self.renderer = ChartRenderer(charts={'demo': (render, load)},
+                                      executor_factory=lambda: ThreadPoolExecutor(max_workers=1),
+                                      connection_factory=lambda: None, data_ttl=0)
+
+    def touch(self, content):
+        with open(self.data_path, 'w') as file:
+            file.write(content)
+        stamp = time.time() + 10
+        os.utime(self.data_path, (stamp, stamp))
+
+    def test_cached_until_data_changes(self):
+        """Repeat requests reuse the PNG and its ETag while the data is unchanged."""
+        first = self.renderer.get('demo')
+        second = self.renderer.get('demo')
+        self.assertIs(first, second)
+        self.assertEqual(first.png, b"v1")
+        self.assertEqual(self.renders, 1)
+
+    def test_chart_data_is_loaded_once_per_data_ttl(self):
+        """Within data_ttl requests reuse the loaded data instead of querying again."""
+        renderer = ChartRenderer(charts=self.renderer.charts,
+                                 executor_factory=lambda: ThreadPoolExecutor(max_workers=1),
+                                 connection_factory=lambda: None, data_ttl=60)
+        first = renderer.get('demo')
+        self.touch("v2")
+        self.assertIs(renderer.get('demo'), first)
+        self.assertEqual(self.loads, 1)
+
+    def test_stale_while_revalidate(self):
+        """After a data change the old PNG is served until the new render lands."""
+        old = self.renderer.get('demo')
+        self.gate.clear()
+        self.touch("v2")
+        self.assertIs(self.renderer.get('demo'), old)
+        self.assertEqual(self.renderer.stats()['rendering'], ['demo'])
+        self.gate.set()
+        deadline = time.time() + 5
+        while self.renderer.stats()['rendering'] and time.time() < deadline:
+            time.sleep(0.01)
+        fresh = self.renderer.get('demo')
+        self.assertEqual(fresh.png, b"v2")
+        self.assertNotEqual(fresh.etag, old.etag)
+        self.assertEqual(self.renderer.stats()['stale_served'], 1)
+
+    def test_charts_use_real_data(self):
+        """Vehicles with a rostered driver count as deployed; departments feed the pie."""
+        biography = os.path.join(self.tmpdir.name, 'bio.csv')
+        vehicles = os.path.join(self.tmpdir.name, 'vehicles.csv')
+        with open(biography, 'w') as file:
+            file.write(BIOGRAPHY)
+        with open(vehicles, 'w') as file:
+            file.write(VEHICLES)
+        self.assertEqual(vehicle_deployment_counts(vehicles, biography), (2, 1))
+        title, labels, sizes = employee_status_counts(biography)
+        self.assertEqual((title, labels, sizes), ('Employees by Department', ['Dispatch', 'Fleet'], [2, 1]))
+        self.assertTrue(plot_vehicles_deployed(vehicle_csv=vehicles, biography_csv=biography).startswith(b'\x89PNG'))
+
+    def test_charts_follow_the_live_tables(self):
+        """Chart data comes from hh_vehicle/hh_employee_biography, so admin edits change the ETag."""
+        db_path = os.path.join(self.tmpdir.name, 'live.db')
+        conn = sqlite3.connect(db_path)
+        conn.executescript("""
+            CREATE TABLE hh_employee_biography (employee_id INTEGER PRIMARY KEY, job_title TEXT, department TEXT);
+            CREATE TABLE hh_vehicle (id INTEGER PRIMARY KEY, employee_id INTEGER, unit_name TEXT);
+            INSERT INTO hh_employee_biography VALUES (1, 'Delivery Driver', 'Dispatch'), (2, 'Dispatcher', 'Dispatch');
+            INSERT INTO hh_vehicle (employee_id, unit_name) VALUES (1, 'Truck A'), (9, 'Truck B');
+        """)
+        conn.commit()
+        factory = lambda: sqlite3.connect(db_path)
+        self.assertEqual(vehicle_chart_data(factory), (1, 1))
+        self.assertEqual(employee_chart_data(factory), ('Employees by Department', ['Dispatch'], [2]))
+
+        renderer = ChartRenderer(charts={'vehicles': (lambda data: repr(data).encode(), vehicle_chart_data)},
+                                 executor_factory=lambda: ThreadPoolExecutor(max_workers=1),
+                                 connection_factory=factory, data_ttl=0)
+        before = renderer.get('vehicles')
+        conn.execute("UPDATE hh_vehicle SET employee_id = 2 WHERE unit_name = 'Truck B'")
+        conn.execute("UPDATE hh_employee_biography SET job_title = 'Driver' WHERE employee_id = 2")
+        conn.commit()
+        conn.close()
+        version = renderer.data_version('vehicles')[0]
+        self.assertNotEqual(version, before.version)
+
+    def test_chart_data_falls_back_to_seed_csvs(self):
+        """Without MySQL the charts are drawn from the seed CSVs."""
+        biography = os.path.join(self.tmpdir.name, 'bio.csv')
+        vehicles = os.path.join(self.tmpdir.name, 'vehicles.csv')
+        with open(biography, 'w') as file:
+            file.write(BIOGRAPHY)
+        with open(vehicles, 'w') as file:
+            file.write(VEHICLES)
+        down = MagicMock(side_effect=ConnectionError("down"))
+        self.assertEqual(vehicle_chart_data(down, vehicles, biography), (2, 1))
+        self.assertEqual(employee_chart_data(down, biography)[1], ['Dispatch', 'Fleet'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import re
+import tempfile
+import unittest
+import warnings
+import torch
+from transformers import DistilBertConfig, DistilBertForQuestionAnswering, DistilBertTokenizerFast, pipeline
+from services.fast_qa import FastQAPipeline
+
+CONTEXT = ("HexaHaul is a logistics company founded by six people. We provide truck, motorcycle, and car deliveries. "
+           "For support, contact us at hexahaulprojects@gmail.com or call 123-456-7890.")
+QUESTIONS = ["What is HexaHaul?", "Who founded HexaHaul?", "How do I contact support?", "What deliveries do you provide?"]
+
+class TestFastQAPipeline(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """A tiny randomly initialised DistilBERT with a vocabulary built from the test text."""
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        words = sorted(set(re.findall(r"[a-z0-9]+", (CONTEXT + " ".join(QUESTIONS)).lower())))
+        vocab_path = os.path.join(cls.tmpdir.name, 'vocab.txt')
+        with open(vocab_path, 'w', encoding='utf-8') as file:
+            file.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", ".", ",", "?", "-", "@"] + words))
+        cls.tokenizer = DistilBertTokenizerFast(vocab_file=vocab_path)
+        torch.manual_seed(0)
+        config = DistilBertConfig(vocab_size=cls.tokenizer.vocab_size, dim=32, hidden_dim=64, n_layers=2, n_heads=2)
+        cls.model = DistilBertForQuestionAnswering(config).eval()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def test_matches_transformers_pipeline(self):
+        """Answers agree with the stock question-answering pipeline."""
+        reference = pipeline("question-answering", model=self.model, tokenizer=self.tokenizer)
+        fast = FastQAPipeline(self.model, self.tokenizer)
+        for question in QUESTIONS:
+            self.assertEqual(fast(question=question, context=CONTEXT)['answer'], reference(question=question, context=CONTEXT)['answer'])
+
+    def test_batch_matches_single_and_encodes_context_once(self):
+        """A padded batch gives the same answers, and the context is tokenized once."""
+        fast = FastQAPipeline(self.model, self.tokenizer)
+        singles = [fast(question=q, context=CONTEXT)['answer'] for q in QUESTIONS]
+        batch = fast(question=QUESTIONS, context=[CONTEXT] * len(QUESTIONS), batch_size=len(QUESTIONS))
+        self.assertEqual([result['answer'] for result in batch], singles)
+        self.assertEqual(fast._contexts.stats()['size'], 1)
+
+    def test_quantized_model_answers_from_context(self):
+        """The int8 dynamically quantized model still returns spans of the context."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            quantized = torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        fast = FastQAPipeline(quantized, self.tokenizer)
+        for result in fast(question=QUESTIONS, context=CONTEXT):
+            self.assertEqual(CONTEXT[result['start']:result['end']], result['answer'])
+            self.assertGreaterEqual(result['score'], 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import atexit
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from services.geocoder import ReverseGeocoder, UNKNOWN_LOCATION
+
+# The app's SQLite tables go to a throwaway store rather than the .db files in the tree
+TEST_STORE = os.path.join(tempfile.gettempdir(), f"hexahaul-tests-{os.getpid()}", "hexahaul.db")
+TEST_DATABASES = {'SQLITE_STORE': TEST_STORE, 'SEED_MANIFEST': TEST_STORE + '.manifest.json'}
+atexit.register(shutil.rmtree, os.path.dirname(TEST_STORE), True)
+
+class TestReverseGeocoder(unittest.TestCase):
+
+    def setUp(self):
+        """Point the persistent cache at a throwaway SQLite file."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.db_path = os.path.join(self.tmpdir.name, 'geocode_cache.db')
+        self.geocoder = ReverseGeocoder(db_path=self.db_path, precision=3, resolver='nominatim')
+
+    def test_branch_coordinates_use_gazetteer(self):
+        """Branch locations resolve without any network call."""
+        with patch.object(ReverseGeocoder, 'fetch_remote') as fetch:
+            self.assertEqual(self.geocoder.reverse_geocode(14.599500, 120.984200), 'Manila')
+            fetch.assert_not_called()
+
+    def test_result_persists_across_instances(self):
+        """A resolved place is served from SQLite by a fresh geocoder."""
+        with patch.object(ReverseGeocoder, 'fetch_remote', return_value='Pasig') as fetch:
+            self.geocoder.reverse_geocode(14.585361, 121.066905)
+            other = ReverseGeocoder(db_path=self.db_path, precision=3, resolver='nominatim')
+            self.assertEqual(other.reverse_geocode(14.5854, 121.0669), 'Pasig')
+            self.assertEqual(fetch.call_count, 1)
+
+    def test_failures_are_not_cached(self):
+        """Unknown Location is returned but a later lookup retries."""
+        with patch.object(ReverseGeocoder, 'fetch_remote', return_value=None) as fetch:
+            self.assertEqual(self.geocoder.reverse_geocode(10.0, 120.0), UNKNOWN_LOCATION)
+            self.geocoder.reverse_geocode(10.0, 120.0)
+            self.assertEqual(fetch.call_count, 2)
+
+    def test_resolve_many_fills_misses_and_prewarm_skips_cached(self):
+        """Batch lookups keep order; prewarm only fetches uncached points."""
+        with patch.object(ReverseGeocoder, 'fetch_remote', side_effect=lambda lat, lon: f"{lat},{lon}") as fetch:
+            places = self.geocoder.reverse_geocode_many([(1.0, 2.0), (3.0, 4.0)])
+            self.assertEqual(places, ['1.0,2.0', '3.0,4.0'])
+            status = self.geocoder.prewarm([(1.0, 2.0), (5.0, 6.0), (5.0, 6.0), (None, None)])
+            self.assertEqual(status['total'], 1)
+            self.assertEqual(fetch.call_count, 3)
+
+    def test_prewarm_rate_limit_is_positive_and_capped(self):
+        """A prewarm never runs unthrottled or faster than one request per second."""
+        self.assertEqual(ReverseGeocoder.check_rate_limit('5'), 1.0)
+        self.assertEqual(ReverseGeocoder.check_rate_limit(0.5), 0.5)
+        for bad in (0, -1, 'fast', float('nan'), None):
+            with self.assertRaises((TypeError, ValueError)):
+                ReverseGeocoder.check_rate_limit(bad)
+        with self.assertRaises(ValueError):
+            self.geocoder.prewarm([(1.0, 2.0)], rate_limit=0)
+
+    def test_offline_resolver_never_calls_nominatim(self):
+        """The default offline resolver answers from the bundled localities."""
+        geocoder = ReverseGeocoder(db_path=self.db_path, resolver='offline', fallback='none')
+        with patch.object(ReverseGeocoder, 'fetch_remote') as fetch:
+            self.assertEqual(geocoder.reverse_geocode(14.5547, 121.0244), 'Makati')
+            self.assertEqual(geocoder.reverse_geocode_many([(14.5764, 121.0851), (0.0, 0.0)]),
+                             ['Pasig', UNKNOWN_LOCATION])
+            self.assertFalse(geocoder.start_prewarm(lambda: None))
+            fetch.assert_not_called()
+
+    def test_offline_misses_fall_back_when_configured(self):
+        """Points far from every locality go to Nominatim with GEOCODE_FALLBACK=nominatim."""
+        geocoder = ReverseGeocoder(db_path=self.db_path, resolver='offline', fallback='nominatim')
+        with patch.object(ReverseGeocoder, 'fetch_remote', return_value='Open Sea') as fetch:
+            self.assertEqual(geocoder.reverse_geocode_many([(14.6760, 121.0437), (0.0, 0.0)]),
+                             ['Quezon City', 'Open Sea'])
+            self.assertEqual(fetch.call_count, 1)
+
+class TestGeocodePrewarmEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch.dict(os.environ, TEST_DATABASES)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_invalid_rate_limit_is_rejected(self):
+        """POSTing a zero, negative or non-numeric rate_limit answers 400 and starts nothing."""
+        os.environ.setdefault("QA_WARMUP", "0")
+        import app as app_module
+        client = app_module.app.test_client()
+        with client.session_transaction() as flask_session:
+            flask_session['admin_id'] = 1
+        with patch.object(ReverseGeocoder, 'start_prewarm') as start:
+            for bad in (0, -2, 'fast'):
+                response = client.post('/api/utilities/geocode-prewarm', json={'rate_limit': bad})
+                self.assertEqual(response.status_code, 400)
+            start.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
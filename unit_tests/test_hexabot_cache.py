@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from services.hexabot import HexaBot, AnswerCache
+from services.model_registry import ModelNotReady
+
+class TestHexaBotAnswerCache(unittest.TestCase):
+
+    def setUp(self):
+        """Swap the QA model for a mock so no inference runs."""
+        self.qa = MagicMock(return_value={"answer": "hexahaulprojects@gmail.com"})
+        patcher = patch('services.hexabot.model_registry.get', return_value=self.qa)
+        self.get_model = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_repeat_question_skips_inference(self):
+        """Variants of the same question share one cached answer."""
+        bot = HexaBot()
+        first = bot.process_message("What is the support email?", "en")
+        second = bot.process_message("what is the  SUPPORT email", "en")
+        self.assertEqual(first, second)
+        self.assertEqual(self.qa.call_count, 1)
+        stats = bot.cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_languages_are_cached_separately(self):
+        """The Tagalog answer is not served to English askers and vice versa."""
+        bot = HexaBot()
+        with patch.object(HexaBot, '_translate', return_value="isinalin"):
+            self.assertEqual(bot.process_message("What is the support email?", "tl"), "isinalin")
+        self.assertEqual(bot.process_message("What is the support email?", "en"), "hexahaulprojects@gmail.com")
+        self.assertEqual(self.qa.call_count, 2)
+
+    def test_warming_up_is_not_cached(self):
+        """ModelNotReady propagates and the next call still runs the model."""
+        bot = HexaBot()
+        self.get_model.side_effect = [ModelNotReady("qa"), self.qa]
+        with self.assertRaises(ModelNotReady):
+            bot.process_message("What is the support email?", "en")
+        self.assertEqual(bot.process_message("What is the support email?", "en"), "hexahaulprojects@gmail.com")
+
+    def test_answers_persist_across_restarts(self):
+        """With a database path, a new cache starts with earlier answers."""
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        db_path = os.path.join(tmpdir.name, 'answers.db')
+        cache = AnswerCache(maxsize=10, ttl=60, db_path=db_path)
+        key = cache.key("Track my parcel?", "en", "v1")
+        cache.set(key, "Use the tracking page.")
+        restarted = AnswerCache(maxsize=10, ttl=60, db_path=db_path)
+        self.assertEqual(restarted.get(key), "Use the tracking page.")
+        self.assertIsNone(restarted.get(restarted.key("Track my parcel?", "en", "v2")))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import atexit
+import shutil
+import sys
+import json
+import tempfile
+import unittest
+import subprocess
+from unittest.mock import patch
+from utils.lazy_import import lazy_import
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('torch', 'transformers', 'matplotlib', 'pandas')
+IMPORT_BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", 1.5))
+
+# The app's SQLite tables go to a throwaway store rather than the .db files in the tree
+TEST_STORE = os.path.join(tempfile.gettempdir(), f"hexahaul-tests-{os.getpid()}", "hexahaul.db")
+TEST_DATABASES = {'SQLITE_STORE': TEST_STORE, 'SEED_MANIFEST': TEST_STORE + '.manifest.json'}
+atexit.register(shutil.rmtree, os.path.dirname(TEST_STORE), True)
+
+# Imports the web entry point in a fresh interpreter, serves the static pages,
+# and reports the import time and which heavy modules got loaded
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app
+elapsed = time.perf_counter() - started
+client = app.app.test_client()
+statuses = [client.get(path).status_code for path in ('/index', '/services', '/FAQ')]
+print(json.dumps({'seconds': elapsed, 'statuses': statuses,
+                  'loaded': [name for name in %r if name in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+class TestImportBudget(unittest.TestCase):
+
+    def probe(self):
+        env = dict(os.environ, QA_WARMUP="0", **TEST_DATABASES)
+        result = subprocess.run([sys.executable, "-c", PROBE], cwd=PROJECT_ROOT, env=env,
+                                capture_output=True, text=True, timeout=120)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def test_importing_the_app_stays_light(self):
+        """Importing app.py and serving static pages loads no heavy module and fits the budget."""
+        # The best of a few runs, so a cold disk cache does not fail the build
+        runs = [self.probe() for _ in range(3)]
+        self.assertEqual(runs[0]['statuses'], [200, 200, 200])
+        self.assertEqual(runs[0]['loaded'], [])
+        self.assertLess(min(run['seconds'] for run in runs), IMPORT_BUDGET_SECONDS)
+
+    def test_lazy_module_loads_on_first_use(self):
+        """A lazy module imports on first attribute access and can be patched through."""
+        colorsys = lazy_import('colorsys')
+        sys.modules.pop('colorsys', None)
+        self.assertFalse(colorsys.is_loaded())
+        self.assertEqual(colorsys.rgb_to_hsv(1, 0, 0), (0.0, 1.0, 1))
+        self.assertTrue(colorsys.is_loaded())
+        with patch.object(colorsys, 'rgb_to_hsv', return_value='patched'):
+            self.assertEqual(sys.modules['colorsys'].rgb_to_hsv(0, 0, 0), 'patched')
+        self.assertEqual(colorsys.rgb_to_hsv(1, 0, 0), (0.0, 1.0, 1))
+        self.assertIs(lazy_import('xml').dom, sys.modules['xml.dom'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import threading
+import unittest
+from services.hexabot import InferenceBatcher
+from services.model_registry import ModelNotReady
+
+class FakePipeline:
+    """Answers with the question text and records each batch size."""
+    def __init__(self):
+        self.batch_sizes = []
+        self.gate = threading.Event()
+
+    def __call__(self, question, context, batch_size=None):
+        self.gate.wait(5)
+        self.batch_sizes.append(len(question))
+        results = [{"answer": q.upper()} for q in question]
+        return results[0] if len(results) == 1 else results
+
+class TestInferenceBatcher(unittest.TestCase):
+
+    def test_concurrent_requests_share_a_forward_pass(self):
+        """Requests queued while the worker is busy are answered in one batch."""
+        model = FakePipeline()
+        batcher = InferenceBatcher(lambda: model, max_batch_size=4, max_wait_ms=50)
+        first = batcher.submit("q0", "ctx")
+        futures = [batcher.submit(f"q{i}", "ctx") for i in range(1, 5)]
+        model.gate.set()
+        self.assertEqual(first.result(5), {"answer": "Q0"})
+        self.assertEqual([f.result(5)["answer"] for f in futures], ["Q1", "Q2", "Q3", "Q4"])
+        self.assertEqual(sum(model.batch_sizes), 5)
+        self.assertIn(4, model.batch_sizes)
+        stats = batcher.stats()
+        self.assertEqual(stats['items'], 5)
+        self.assertGreater(stats['avg_batch_fill'], 0.5)
+
+    def test_errors_reach_every_caller(self):
+        """A failing forward pass fails each future in the batch."""
+        def broken(question, context, batch_size=None):
+            raise RuntimeError("boom")
+        batcher = InferenceBatcher(lambda: broken, max_batch_size=2, max_wait_ms=20)
+        futures = [batcher.submit("a", "ctx"), batcher.submit("b", "ctx")]
+        for future in futures:
+            with self.assertRaises(RuntimeError):
+                future.result(5)
+        self.assertGreaterEqual(batcher.stats()['errors'], 1)
+
+    def test_model_not_ready_fails_fast(self):
+        """Nothing is queued while the model is warming up."""
+        def not_ready():
+            raise ModelNotReady("qa")
+        batcher = InferenceBatcher(not_ready)
+        with self.assertRaises(ModelNotReady):
+            batcher.infer("q", "ctx")
+        self.assertEqual(batcher.stats()['queue_depth'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from services import hexabot
+from services.inference_sidecar import InferenceSidecar, SidecarClient, SidecarUnavailable
+from services.model_registry import ModelNotReady
+
+class EchoPipeline:
+    """Answers with the question text, upper-cased, and records the contexts it saw."""
+    def __init__(self):
+        self.contexts = []
+
+    def __call__(self, question, context, batch_size=None):
+        self.contexts.extend(context)
+        results = [{"answer": q.upper(), "score": 0.9, "start": 0, "end": len(q)} for q in question]
+        return results[0] if len(results) == 1 else results
+
+class TestInferenceSidecar(unittest.TestCase):
+
+    def setUp(self):
+        """A sidecar serving a fake model on a temporary Unix socket."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.socket_path = os.path.join(self.tmpdir.name, 'inference.sock')
+        self.model = EchoPipeline()
+        self.ready = True
+
+        def model_getter():
+            if not self.ready:
+                raise ModelNotReady("qa")
+            return self.model
+
+        self.sidecar = InferenceSidecar(self.socket_path, model_getter=model_getter)
+        self.sidecar.start()
+        self.addCleanup(self.sidecar.shutdown)
+
+    def test_round_trip_and_health(self):
+        """Answers come back in pipeline form and the sidecar reports latency."""
+        client = SidecarClient(self.socket_path, timeout=5)
+        self.assertEqual(client.infer("where is my parcel", "ctx")["answer"], "WHERE IS MY PARCEL")
+        self.assertEqual(client.infer("hello", "ctx")["end"], 5)
+        health = client.health()
+        self.assertEqual(health["requests"], 2)
+        self.assertIsNotNone(health["latency_ms"]["p95"])
+        self.assertEqual(health["batching"]["items"], 2)
+
+    def test_context_is_sent_once_per_connection(self):
+        """A restarted sidecar asks for the context again and the client resends it."""
+        client = SidecarClient(self.socket_path, timeout=5)
+        client.infer("one", "long faq context")
+        self.sidecar._InferenceSidecar__contexts.clear()
+        self.assertEqual(client.infer("two", "long faq context")["answer"], "TWO")
+        self.assertEqual(self.model.contexts, ["long faq context", "long faq context"])
+
+    def test_warming_up_raises_model_not_ready(self):
+        """A sidecar still loading the model maps to ModelNotReady in the worker."""
+        self.ready = False
+        with self.assertRaises(ModelNotReady):
+            SidecarClient(self.socket_path, timeout=5).infer("hi", "ctx")
+
+    def test_missing_sidecar_falls_back_in_process(self):
+        """HexaBot infers in-process when the socket is unreachable."""
+        client = SidecarClient(os.path.join(self.tmpdir.name, 'missing.sock'), timeout=1, retry_seconds=60)
+        with self.assertRaises(SidecarUnavailable):
+            client.infer("hi", "ctx")
+        with patch.object(hexabot, 'qa_sidecar', client), \
+                patch.object(hexabot.qa_batcher, 'infer', return_value={"answer": "local"}) as local:
+            self.assertEqual(hexabot.infer_qa("hi", "ctx"), {"answer": "local"})
+        local.assert_called_once_with("hi", "ctx")
+        self.assertEqual(client.stats()["unavailable"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
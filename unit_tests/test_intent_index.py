@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from services.hexabot import HexaBot, IntentIndex
+
+class TestIntentIndex(unittest.TestCase):
+
+    def setUp(self):
+        """Swap the QA model for a mock so any inference is visible."""
+        self.qa = MagicMock(return_value={"answer": "hexahaulprojects@gmail.com"})
+        patcher = patch('services.hexabot.model_registry.get', return_value=self.qa)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_scores_rank_the_closest_text(self):
+        """Cosine scores put the paraphrased entry first and ignore unrelated text."""
+        index = IntentIndex(threshold=0.5)
+        index.add("quick_reply", "track", "how can i track my shipment")
+        index.add("quick_reply", "contact", "how do i contact support")
+        index.build()
+        scores = index.scores("how do i track my shipment")
+        self.assertGreater(scores[0], scores[1])
+        self.assertEqual(index.match("how do i track my shipment")[:2], ("quick_reply", "track"))
+        self.assertIsNone(index.match("what is the weather in tokyo"))
+        self.assertAlmostEqual(index.stats()['hit_rate'], 0.5)
+
+    def test_paraphrase_skips_the_model(self):
+        """A reworded quick reply gets its canned answer without inference."""
+        bot = HexaBot()
+        answer = bot.process_message("How do I track my package?", "en")
+        self.assertIn("tracking page", answer)
+        self.assertIn("123-456-7890", bot.process_message("How to contact support", "en"))
+        self.qa.assert_not_called()
+        stats = bot.intent_stats()
+        self.assertEqual(stats['hits_by_kind'], {'quick_reply': 2})
+        self.assertEqual(stats['hit_rate'], 1.0)
+
+    def test_close_but_different_questions_do_not_match(self):
+        """Questions that share words with an intent but ask something else are not given its answer."""
+        bot = HexaBot()
+        for question in ("is hexahaul safe", "is my package safe", "is my parcel lost", "is hexahaul reliable",
+                         "who owns hexahaul", "hi there", "yo what's up", "ty so much"):
+            with self.subTest(question=question):
+                self.assertIsNone(bot._HexaBot__intent_index.match(question))
+        self.assertNotIn("team of six", bot.process_message("Is HexaHaul safe?", "en"))
+
+    def test_margin_over_the_next_intent_is_required(self):
+        """A text that scores as well against two intents matches neither."""
+        index = IntentIndex(threshold=0.3, margin=0.15)
+        index.add("quick_reply", "track", "track my parcel")
+        index.add("quick_reply", "lost", "lost my parcel")
+        index.build()
+        self.assertIsNone(index.match("my parcel"))
+        self.assertEqual(index.match("track my parcel")[:2], ("quick_reply", "track"))
+
+    def test_low_confidence_reaches_the_model(self):
+        """Questions below the threshold still go to the QA pipeline."""
+        bot = HexaBot()
+        self.assertEqual(bot.process_message("What is the support email?", "en"), "hexahaulprojects@gmail.com")
+        self.assertEqual(self.qa.call_count, 1)
+        self.assertEqual(bot.intent_stats()['hit_rate'], 0.0)
+
+    def test_threshold_is_configurable(self):
+        """Raising HEXABOT_INTENT_THRESHOLD sends paraphrases to the model."""
+        with patch.dict('os.environ', {'HEXABOT_INTENT_THRESHOLD': '1.01'}):
+            bot = HexaBot()
+        bot.process_message("How do I track my package?", "en")
+        self.assertEqual(self.qa.call_count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+import numpy as np
+from services.locality_index import LocalityIndex, get_default_index, LON_SCALE
+
+class TestLocalityIndex(unittest.TestCase):
+
+    def setUp(self):
+        """Random centroids so the tree can be checked against brute force."""
+        rng = np.random.default_rng(7)
+        self.lats = rng.uniform(5.0, 20.0, 300)
+        self.lons = rng.uniform(117.0, 127.0, 300)
+        self.names = [f"place-{i}" for i in range(300)]
+        self.index = LocalityIndex(self.names, self.lats, self.lons)
+        self.queries = np.column_stack([rng.uniform(5.0, 20.0, 200), rng.uniform(117.0, 127.0, 200)])
+
+    def brute_force(self, lat, lon):
+        squared = ((self.lons - lon) * LON_SCALE) ** 2 + (self.lats - lat) ** 2
+        return self.names[int(squared.argmin())]
+
+    def test_tree_matches_brute_force(self):
+        """The k-d tree walk must always find the true nearest centroid."""
+        for lat, lon in self.queries:
+            self.assertEqual(self.index.nearest(lat, lon)[0], self.brute_force(lat, lon))
+
+    def test_batch_matches_single_queries(self):
+        """nearest_many agrees with nearest for every point, including across chunks."""
+        names, distances = self.index.nearest_many(self.queries[:, 0], self.queries[:, 1], chunk_size=64)
+        for (lat, lon), name, distance in zip(self.queries, names, distances):
+            single_name, single_distance = self.index.nearest(lat, lon)
+            self.assertEqual(name, single_name)
+            self.assertAlmostEqual(distance, single_distance, places=6)
+
+    def test_bundled_dataset_resolves_branches(self):
+        """The shipped dataset maps every branch to its own city."""
+        index = get_default_index()
+        self.assertEqual(index.nearest(14.4793, 121.0198)[0], 'Parañaque')
+        self.assertEqual(index.nearest(14.6507, 120.9667)[0], 'Caloocan')
+        self.assertEqual(index.nearest(14.6760, 121.0437)[0], 'Quezon City')
+        self.assertEqual(index.nearest(14.5995, 120.9842)[0], 'Manila')
+
+if __name__ == '__main__':
+    unittest.main()
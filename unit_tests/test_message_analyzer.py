@@ -0,0 +1,37 @@
+import unittest
+from unittest.mock import patch
+from services.hexabot import HexaBot, MessageAnalyzer, ProfanityFilter, LanguageDetector
+
+class TestMessageAnalyzer(unittest.TestCase):
+
+    def test_one_pass_reports_every_category(self):
+        """Hits from all categories come back in text order."""
+        analyzer = MessageAnalyzer().add("rude", ["tangina", "tanginamo"]).add("topic", ["track"], whole_word=False).add("hello", ["good morning"])
+        analysis = analyzer.analyze("Good  morning, tanginamo tracking")
+        self.assertEqual(analysis.hits, [("hello", "good morning", 0), ("rude", "tanginamo", 15), ("topic", "track", 25)])
+        self.assertEqual(analysis.leading(["hello"]), "hello")
+        self.assertIsNone(analysis.leading(["rude"]))
+
+    def test_whole_words_only_unless_prefix(self):
+        """Whole-word terms ignore longer words; prefix terms accept them."""
+        analyzer = MessageAnalyzer().add("greetings", ["hi"]).add("tagalog", ["ng", "at"]).add("allowed", ["car"], whole_word=False)
+        analysis = analyzer.analyze("hire a cargo van tonight")
+        self.assertEqual(analysis.hits, [("allowed", "car", 7)])
+
+    def test_features_work_standalone(self):
+        """ProfanityFilter and LanguageDetector build their own analyzer when none is passed."""
+        self.assertIsNotNone(ProfanityFilter().process("you bastard!"))
+        self.assertIsNone(ProfanityFilter().process("bastardization of logistics"))
+        self.assertEqual(LanguageDetector().detect_language("saan ang parcel ko"), "tl")
+        self.assertEqual(LanguageDetector().detect_language("tracking my package"), "en")
+
+    def test_hexabot_analyzes_each_message_once(self):
+        """process_message runs the shared analyzer a single time per message."""
+        bot = HexaBot()
+        with patch.object(MessageAnalyzer, 'analyze', wraps=bot._analyzer.analyze) as analyze:
+            self.assertIn("HexaBot", bot.process_message("hello there", "en"))
+            self.assertIn("don't have an answer", bot.process_message("hire me as a chef", "en"))
+        self.assertEqual(analyze.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
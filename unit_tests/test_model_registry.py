@@ -0,0 +1,57 @@
+import threading
+import unittest
+from services.model_registry import ModelRegistry, ModelNotReady
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        """A registry whose loader blocks until the test releases it."""
+        self.release = threading.Event()
+        self.calls = 0
+
+        def loader():
+            self.calls += 1
+            self.release.wait(5)
+            return "model"
+
+        self.registry = ModelRegistry()
+        self.registry.register("qa", loader)
+
+    def test_get_without_wait_reports_warming_up(self):
+        """Non-blocking callers get ModelNotReady while the warmup thread runs."""
+        self.assertTrue(self.registry.warmup("qa"))
+        self.assertFalse(self.registry.warmup("qa"))
+        with self.assertRaises(ModelNotReady):
+            self.registry.get("qa", wait=False)
+        self.assertEqual(self.registry.status("qa")['state'], "loading")
+        self.release.set()
+        self.assertEqual(self.registry.get("qa"), "model")
+        self.assertEqual(self.calls, 1)
+
+    def test_status_reports_load_time(self):
+        """A finished load records how long it took."""
+        self.release.set()
+        self.assertEqual(self.registry.get("qa"), "model")
+        status = self.registry.status("qa")
+        self.assertEqual(status['state'], "ready")
+        self.assertIsNotNone(status['load_seconds'])
+
+    def test_failed_load_can_be_retried(self):
+        """A loader error is reported and the next get() tries again."""
+        registry = ModelRegistry()
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise OSError("offline")
+            return "model"
+
+        registry.register("qa", flaky)
+        with self.assertRaises(RuntimeError):
+            registry.get("qa")
+        self.assertEqual(registry.status("qa")['error'], "offline")
+        self.assertEqual(registry.get("qa"), "model")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from models.mysql_pool import MySQLConnectionPool, PoolTimeoutError
+
+class TestMySQLConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        """Create a pool whose connections are fake mysql.connector objects."""
+        patcher = patch('models.mysql_pool.mysql.connector.connect',
+                        side_effect=lambda **kwargs: MagicMock(in_transaction=False))
+        self.connect = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pool = MySQLConnectionPool({'host': 'localhost'}, pool_size=2, max_overflow=1, timeout=0.05)
+
+    def test_close_returns_connection_to_pool(self):
+        """Closing a pooled connection should keep it warm for the next checkout."""
+        conn = self.pool.acquire()
+        raw = conn.raw
+        conn.close()
+        again = self.pool.acquire()
+        self.assertIs(again.raw, raw)
+        self.assertEqual(self.connect.call_count, 1)
+        raw.close.assert_not_called()
+
+    def test_overflow_connections_are_closed_on_release(self):
+        """Connections beyond pool_size are closed instead of kept idle."""
+        conns = [self.pool.acquire() for _ in range(3)]
+        for conn in conns:
+            conn.close()
+        stats = self.pool.stats()
+        self.assertEqual(stats['idle'], 2)
+        self.assertEqual(stats['total'], 2)
+        conns[2].raw.close.assert_called_once()
+
+    def test_exhausted_pool_times_out(self):
+        """Waiting on a full pool should raise and be counted in the stats."""
+        held = [self.pool.acquire() for _ in range(3)]
+        with self.assertRaises(PoolTimeoutError):
+            self.pool.acquire()
+        stats = self.pool.stats()
+        self.assertEqual(stats['waits'], 1)
+        self.assertEqual(stats['timeouts'], 1)
+        self.assertEqual(stats['checked_out'], 3)
+        for conn in held:
+            conn.close()
+
+    def test_failed_ping_replaces_connection(self):
+        """A dead idle connection is discarded and a fresh one is opened."""
+        conn = self.pool.acquire()
+        conn.raw.ping.side_effect = Exception("gone away")
+        conn.close()
+        fresh = self.pool.acquire()
+        self.assertIsNot(fresh.raw, conn.raw)
+        self.assertEqual(self.pool.stats()['invalidated'], 1)
+
+    def test_uncommitted_work_is_rolled_back_on_release(self):
+        """Returning a connection mid-transaction must not leak the transaction."""
+        conn = self.pool.acquire()
+        conn.raw.in_transaction = True
+        conn.close()
+        conn.raw.rollback.assert_called_once()
+
+    def test_closing_a_stale_checkout_is_a_no_op(self):
+        """A second close() after the connection was re-acquired must not hand it out twice."""
+        first = self.pool.acquire()
+        first.close()
+        second = self.pool.acquire()
+        self.assertIs(second.raw, first.raw)
+        first.close()
+        third = self.pool.acquire()
+        self.assertIsNot(third.raw, second.raw)
+        self.assertEqual(self.pool.stats()['checked_out'], 2)
+        with self.assertRaises(RuntimeError):
+            first.cursor()
+        second.cursor()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import atexit
+import shutil
+import json
+import time
+import zipfile
+import tempfile
+import unittest
+from unittest.mock import patch
+from xml.etree import ElementTree
+os.environ.setdefault("QA_WARMUP", "0")
+# The app's SQLite tables go to a throwaway store rather than the .db files in the tree
+TEST_STORE = os.path.join(tempfile.gettempdir(), f"hexahaul-tests-{os.getpid()}", "hexahaul.db")
+TEST_DATABASES = {'SQLITE_STORE': TEST_STORE, 'SEED_MANIFEST': TEST_STORE + '.manifest.json'}
+atexit.register(shutil.rmtree, os.path.dirname(TEST_STORE), True)
+with patch.dict(os.environ, TEST_DATABASES):
+    import app as app_module
+from services.report_jobs import ReportJob, ReportJobManager
+
+class FakeSource:
+    """Two report sections whose rows are generated on the fly."""
+    def __init__(self, rows=2500):
+        self.rows = rows
+
+    def report_sections(self, report_type):
+        if report_type not in ('sales', 'comprehensive'):
+            raise ValueError(f"Unknown report type: {report_type}")
+        sections = [('sales', 'Sales', ('Date', 'Product', 'Revenue'))]
+        if report_type == 'comprehensive':
+            sections.append(('vehicles', 'Vehicles & Fleet', ('ID', 'Brand')))
+        return sections
+
+    def count_report_rows(self, section, time_range, start_date=None, end_date=None):
+        return self.rows if section == 'sales' else 2
+
+    def iter_report_rows(self, section, time_range, start_date=None, end_date=None):
+        if section == 'sales':
+            return (('2024-01-12', f'Item <{n}>', n * 1.5) for n in range(self.rows))
+        return iter([(1, 'Honda'), (2, None)])
+
+class TestReportJobs(unittest.TestCase):
+
+    def setUp(self):
+        """A job manager writing into a temporary report directory."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        patcher = patch.dict(os.environ, TEST_DATABASES)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manager = ReportJobManager(report_dir=self.tmpdir.name, source=lambda: FakeSource(), max_workers=1,
+                                        ttl=60, progress_every=100)
+
+    def wait(self, job):
+        deadline = time.time() + 10
+        while self.manager.get(job.id).state in ('queued', 'running') and time.time() < deadline:
+            time.sleep(0.01)
+        return self.manager.get(job.id)
+
+    def test_csv_report_streams_every_row(self):
+        """A finished CSV job reports 100% and holds the header plus every row."""
+        job = self.wait(self.manager.submit('sales', 'month', 'csv'))
+        self.assertEqual((job.state, job.progress(), job.rows_written, job.total_rows), ('done', 100, 2500, 2500))
+        with open(self.manager.path_for(job), encoding='utf-8') as report:
+            lines = report.read().splitlines()
+        self.assertEqual(lines[0], 'Date,Product,Revenue')
+        self.assertEqual(len(lines), 2501)
+
+    def test_xlsx_report_has_a_sheet_per_section(self):
+        """The XLSX writer produces a well-formed workbook with escaped text."""
+        job = self.wait(self.manager.submit('comprehensive', 'year', 'excel'))
+        self.assertEqual(job.state, 'done')
+        with zipfile.ZipFile(self.manager.path_for(job)) as workbook:
+            names = [sheet.get('name') for sheet in ElementTree.fromstring(workbook.read('xl/workbook.xml')).iter()
+                     if sheet.tag.endswith('}sheet')]
+            self.assertEqual(names, ['Sales', 'Vehicles & Fleet'])
+            sales = ElementTree.fromstring(workbook.read('xl/worksheets/sheet1.xml'))
+            rows = [row for row in sales.iter() if row.tag.endswith('}row')]
+            self.assertEqual(len(rows), 2501)
+            self.assertIn(b'Item &lt;7&gt;', workbook.read('xl/worksheets/sheet1.xml'))
+
+    def test_unknown_requests_are_rejected_and_old_reports_expire(self):
+        """Bad types or formats fail fast; reports past the TTL are deleted."""
+        with self.assertRaises(ValueError):
+            self.manager.submit('sales', 'month', 'pdf')
+        with self.assertRaises(ValueError):
+            self.manager.submit('payroll', 'month', 'csv')
+        job = self.wait(self.manager.submit('sales', 'week', 'csv'))
+        self.assertEqual(self.manager.expire(now=time.time() + 30), 0)
+        self.assertEqual(self.manager.expire(now=time.time() + 120), 1)
+        self.assertIsNone(self.manager.get(job.id))
+        self.assertFalse(os.path.exists(self.manager.path_for(job)))
+
+    def test_jobs_left_unfinished_by_a_dead_worker_are_failed(self):
+        """A queued or running job nobody is running fails after the stale TTL, and its files are cleaned up."""
+        job = ReportJob('sales', 'month', 'csv')
+        job.state = "running"
+        job.created_at = time.time() - 2 * self.manager.stale_ttl
+        with open(os.path.join(self.tmpdir.name, f"{job.id}.json"), 'w', encoding='utf-8') as meta:
+            json.dump(job.to_dict(), meta)
+        part_path = self.manager.path_for(job) + ".part"
+        with open(part_path, 'w', encoding='utf-8') as part:
+            part.write("Date,Product")
+        self.assertEqual(self.manager.expire(), 0)
+        stale = self.manager.get(job.id)
+        self.assertEqual(stale.state, "failed")
+        self.assertIsNotNone(stale.error)
+        self.assertFalse(os.path.exists(part_path))
+        self.assertEqual(self.manager.expire(now=time.time() + 120), 1)
+        self.assertIsNone(self.manager.get(job.id))
+
+    def test_download_supports_range_requests(self):
+        """/reports/<id> serves the finished file and honours Range headers."""
+        job = self.wait(self.manager.submit('sales', 'month', 'csv'))
+        client = app_module.app.test_client()
+        with patch.object(app_module, 'report_jobs', self.manager):
+            self.assertEqual(client.get(f'/reports/{job.id}').status_code, 302)
+            with client.session_transaction() as flask_session:
+                flask_session['admin_id'] = 1
+            full = client.get(f'/reports/{job.id}')
+            self.assertEqual(full.status_code, 200)
+            partial = client.get(f'/reports/{job.id}', headers={'Range': 'bytes=0-3'})
+            self.assertEqual((partial.status_code, partial.data), (206, b'Date'))
+            status = client.get(f'/api/utilities/reports/{job.id}').get_json()
+            self.assertEqual(status['state'], 'done')
+            self.assertEqual(client.get('/reports/0123abcd').status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from models.sales_database import SalesDatabase
+from models.sales_rollup import SalesRollup
+
+class TestSalesRollup(unittest.TestCase):
+
+    def setUp(self):
+        """A sales database loaded from hh_sales.csv in a temporary directory."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.db_path = os.path.join(self.tmpdir.name, 'sales.db')
+        self.sales_db = SalesDatabase(self.db_path)
+        self.addCleanup(self.sales_db.engine.dispose)
+
+    def rollups(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT grain, bucket, ROUND(revenue, 4), ROUND(cost, 4), ROUND(profit, 4), sale_count "
+                                "FROM sales_rollups ORDER BY grain, bucket").fetchall()
+        finally:
+            conn.close()
+
+    def rebuilt(self):
+        """The rollups recomputed from scratch, for comparison with the incremental ones."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            SalesRollup().rebuild(conn.execute)
+            return conn.execute("SELECT grain, bucket, ROUND(revenue, 4), ROUND(cost, 4), ROUND(profit, 4), sale_count "
+                                "FROM sales_rollups ORDER BY grain, bucket").fetchall()
+        finally:
+            conn.close()
+
+    def test_rollups_match_sales_totals(self):
+        """Each grain sums to the sales table's revenue and row count."""
+        stats = self.sales_db.get_sales_stats()
+        for grain in ('day', 'week', 'month'):
+            rows = [row for row in self.rollups() if row[0] == grain]
+            self.assertEqual(sum(row[5] for row in rows), stats['total_sales'])
+            self.assertAlmostEqual(sum(row[2] for row in rows), stats['total_revenue'], places=2)
+
+    def test_incremental_updates_match_a_rebuild(self):
+        """Adding, moving and deleting sales keeps every bucket equal to a full recompute."""
+        sale_id = self.sales_db.add_sale(order_item_id='TEST1', payment_type='CASH', order_date='2024-01-14',
+                                         order_item_quantity=2, order_item_total=120.0, order_profit_per_order=30.0,
+                                         sales_per_customer=99.0)
+        self.assertEqual(self.rollups(), self.rebuilt())
+        self.sales_db.update_sale(sale_id, order_date='2023-12-31', order_item_total=80.0, order_profit_per_order=20.0)
+        self.assertEqual(self.rollups(), self.rebuilt())
+        self.sales_db.delete_sale(sale_id)
+        self.assertEqual(self.rollups(), self.rebuilt())
+
+    def test_series_is_zero_filled_and_ends_at_latest_sale(self):
+        """A chart range returns one point per bucket, ending at the newest sale."""
+        self.sales_db.add_sale(order_item_id='TEST2', order_date='2030-03-05', order_item_total=10.0, order_profit_per_order=4.0)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            labels, revenue, cost, profit = SalesRollup().series(conn.execute, 'week')
+        finally:
+            conn.close()
+        self.assertEqual(labels, ['Wed', 'Thu', 'Fri', 'Sat', 'Sun', 'Mon', 'Tue'])
+        self.assertEqual((revenue, cost, profit), ([0] * 6 + [10], [0] * 6 + [6], [0] * 6 + [4]))
+
+if __name__ == '__main__':
+    unittest.main()
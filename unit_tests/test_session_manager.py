@@ -0,0 +1,100 @@
+import os
+import tempfile
+import threading
+import unittest
+from flask import Flask
+from models.session_manager import SessionManager, session_manager
+from models.vehicle_database import VehicleDatabase, Vehicle
+from models.employee_database import EmployeeDatabase
+from models.hexaboxes_database import HexaBoxesDatabase
+from models.customers_database import CustomerDatabase
+from models.products_database import ProductsDatabase
+from models.salary_database import SalaryDatabase
+from models.sales_database import SalesDatabase
+
+class TestSessionManager(unittest.TestCase):
+
+    def setUp(self):
+        """A vehicles database in a temporary directory and an app tearing sessions down."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.db = VehicleDatabase(os.path.join(self.tmpdir.name, 'vehicles.db'))
+        self.addCleanup(self.db.engine.dispose)
+        self.app = Flask(__name__)
+        session_manager.init_app(self.app)
+
+    def test_one_session_per_request_per_database(self):
+        """Nested connect() calls share a session that closes when the last holder disconnects."""
+        before = session_manager.stats()
+        with self.app.test_request_context():
+            outer = self.db.connect()
+            vehicles = self.db.get_all_vehicles()
+            self.assertIs(self.db.connect(), outer)
+            self.db.disconnect()
+            self.assertTrue(outer.in_transaction())
+            self.db.disconnect(outer)
+            self.assertFalse(outer.in_transaction())
+        after = session_manager.stats()
+        self.assertTrue(vehicles)
+        self.assertEqual(after['opened'] - before['opened'], 1)
+        self.assertEqual(after['leaks'], before['leaks'])
+        self.assertEqual(after['open'], before['open'])
+
+    def test_teardown_closes_and_counts_leaks(self):
+        """A session never given back is rolled back and counted when the app context ends."""
+        before = session_manager.stats()['leaks_by_database'].get(self.db.session_name, 0)
+        with self.app.app_context():
+            session = self.db.connect()
+            session.add(Vehicle(unit_brand='Leaky', unit_model='Van'))
+        stats = session_manager.stats()
+        self.assertEqual(stats['leaks_by_database'][self.db.session_name], before + 1)
+        self.assertGreaterEqual(stats['uncommitted_at_close'][self.db.session_name], 1)
+        self.assertFalse(session.in_transaction())
+        with self.app.app_context():
+            self.assertEqual(self.db.connect().query(Vehicle).filter_by(unit_brand='Leaky').count(), 0)
+            self.db.disconnect()
+
+    def test_threads_outside_requests_get_their_own_sessions(self):
+        """Outside a request each thread has its own session for a database."""
+        manager = SessionManager()
+        manager.register('vehicles', self.db.session_factory)
+        sessions = []
+
+        def worker():
+            sessions.append(manager.connect('vehicles'))
+            manager.disconnect('vehicles')
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        mine = manager.connect('vehicles')
+        self.assertIsNot(mine, sessions[0])
+        manager.disconnect('vehicles', mine)
+        self.assertEqual(manager.stats()['open'], 0)
+        self.assertEqual(manager.stats()['checkouts'], 2)
+
+class TestDatabasesUseSessionManager(unittest.TestCase):
+
+    def test_every_database_builds_and_hands_out_sessions(self):
+        """Each *Database constructs against a fresh file and round-trips a managed session."""
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        app = Flask(__name__)
+        session_manager.init_app(app)
+        for database_class in (VehicleDatabase, EmployeeDatabase, HexaBoxesDatabase, CustomerDatabase,
+                               ProductsDatabase, SalaryDatabase, SalesDatabase):
+            with self.subTest(database=database_class.__name__):
+                db = database_class(os.path.join(tmpdir.name, f"{database_class.__name__}.db"))
+                self.addCleanup(db.engine.dispose)
+                before = session_manager.stats()
+                with app.app_context():
+                    session = db.connect()
+                    self.assertIs(db.connect(), session)
+                    db.disconnect(session)
+                    db.disconnect(session)
+                after = session_manager.stats()
+                self.assertEqual(after['opened'] - before['opened'], 1)
+                self.assertEqual(after['leaks'], before['leaks'])
+
+if __name__ == '__main__':
+    unittest.main()
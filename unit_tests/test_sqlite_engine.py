@@ -0,0 +1,130 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from sqlalchemy import text
+from models.sqlite_engine import create_sqlite_engine, storage_path, SQLiteSchemaError
+from models.sales_database import SalesDatabase
+from models.utilities_database import UtilitiesDatabase
+from tools.consolidate_sqlite import consolidate_sqlite
+
+class TestSQLiteEngine(unittest.TestCase):
+
+    def setUp(self):
+        """A temporary directory for the database files."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_engines_are_shared_and_tuned(self):
+        """One engine per file, whose connections run in WAL with the tuned pragmas."""
+        engine = create_sqlite_engine(self.path('tuned.db'))
+        self.addCleanup(engine.dispose)
+        self.assertIs(create_sqlite_engine(self.path('tuned.db')), engine)
+        with engine.connect() as conn:
+            pragmas = [conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+                       for name in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size')]
+        self.assertEqual(pragmas, ['wal', 1, 5000, -16384, 256 * 1024 * 1024])
+
+    def test_readers_do_not_block_the_writer(self):
+        """A long read transaction neither blocks a commit nor sees it until it ends."""
+        engine = create_sqlite_engine(self.path('wal.db'))
+        self.addCleanup(engine.dispose)
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+            conn.execute(text("INSERT INTO items VALUES (1)"))
+        reader = engine.connect()
+        self.addCleanup(reader.close)
+        reader.exec_driver_sql("BEGIN")
+        self.assertEqual(reader.exec_driver_sql("SELECT COUNT(*) FROM items").scalar(), 1)
+        # In rollback-journal mode this commit would fail with "database is locked"
+        writer = sqlite3.connect(self.path('wal.db'), timeout=0.1)
+        writer.execute("INSERT INTO items VALUES (2)")
+        writer.commit()
+        writer.close()
+        self.assertEqual(reader.exec_driver_sql("SELECT COUNT(*) FROM items").scalar(), 1)
+        reader.exec_driver_sql("COMMIT")
+        self.assertEqual(reader.exec_driver_sql("SELECT COUNT(*) FROM items").scalar(), 2)
+
+    def test_consolidated_store(self):
+        """With SQLITE_STORE every database maps to one file, and existing rows can be copied in once."""
+        for name, table in (('vehicles.db', 'vehicles'), ('employees.db', 'employees')):
+            conn = sqlite3.connect(self.path(name))
+            conn.execute(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, name TEXT)")
+            conn.executemany(f"INSERT INTO {table} (name) VALUES (?)", [('a',), ('b',)])
+            conn.commit()
+            conn.close()
+        store = self.path('store.db')
+        sources = [self.path('vehicles.db'), self.path('employees.db')]
+        self.assertEqual(consolidate_sqlite(store, sources), {'vehicles': 2, 'employees': 2})
+        self.assertEqual(consolidate_sqlite(store, sources), {'vehicles': 0, 'employees': 0})
+
+        with patch.dict(os.environ, {'SQLITE_STORE': store}):
+            self.assertEqual(storage_path(self.path('vehicles.db')), store)
+            engine = create_sqlite_engine(self.path('vehicles.db'))
+            self.addCleanup(engine.dispose)
+            self.assertIs(create_sqlite_engine(self.path('employees.db')), engine)
+            with engine.connect() as conn:
+                self.assertEqual(conn.execute(text("SELECT COUNT(*) FROM vehicles")).scalar(), 2)
+                self.assertEqual(conn.execute(text("SELECT COUNT(*) FROM employees")).scalar(), 2)
+
+    def make_db(self, name, table, columns, rows=0):
+        conn = sqlite3.connect(self.path(name))
+        conn.execute(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, {columns})")
+        conn.executemany(f"INSERT INTO {table} (id) VALUES (?)", [(i,) for i in range(1, rows + 1)])
+        conn.commit()
+        conn.close()
+        return self.path(name)
+
+    def test_consolidate_refuses_clashing_tables(self):
+        """Two files with rows in a table of the same name raise before anything is copied."""
+        sources = [self.make_db('a.db', 'sales', 'total REAL', rows=2),
+                   self.make_db('b.db', 'sales', 'revenue REAL', rows=1)]
+        store = self.path('store.db')
+        with self.assertRaises(SQLiteSchemaError):
+            consolidate_sqlite(store, sources)
+        self.assertFalse(os.path.exists(store))
+
+    def test_consolidate_leaves_out_an_empty_duplicate(self):
+        """An empty table shadowed by one with rows is left behind; the rows are kept."""
+        sources = [self.make_db('empty.db', 'sales', 'total REAL'),
+                   self.make_db('full.db', 'sales', 'amount REAL', rows=3)]
+        store = self.path('store.db')
+        self.assertEqual(consolidate_sqlite(store, sources), {'sales': 3})
+        conn = sqlite3.connect(store)
+        self.assertIn('amount', {row[1] for row in conn.execute("PRAGMA table_info(sales)")})
+        conn.close()
+
+    def test_store_shared_by_sales_and_utilities(self):
+        """Under SQLITE_STORE both sales tables coexist and utilities reads its sources through main."""
+        store = self.path('store.db')
+        with patch.dict(os.environ, {'SQLITE_STORE': store}):
+            sales = SalesDatabase(self.path('sales.db'))
+            self.addCleanup(sales.engine.dispose)
+            utilities = UtilitiesDatabase(self.path('utilities.db'),
+                                          sources={'sales_db': self.path('sales.db')})
+            self.addCleanup(utilities.pool.close_all)
+            self.assertEqual(utilities.main_aliases, {'sales_db'})
+            self.assertEqual(utilities.pool.attach, {})
+            conn = utilities.get_connection()
+            try:
+                self.assertEqual(conn.execute("PRAGMA database_list").fetchall()[-1][1], 'main')
+                conn.execute(utilities.sql("SELECT COUNT(*) FROM sales_db.sales")).fetchone()
+            finally:
+                conn.close()
+        conn = sqlite3.connect(store)
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        conn.close()
+        self.assertTrue({'sales', 'utilities_sales'} <= tables)
+
+    def test_create_tables_refuses_a_clashing_table(self):
+        """A model whose table name is already taken by other columns raises instead of reusing it."""
+        self.make_db('clash.db', 'sales', 'revenue REAL')
+        with self.assertRaises(SQLiteSchemaError):
+            SalesDatabase(self.path('clash.db'))
+
+if __name__ == '__main__':
+    unittest.main()
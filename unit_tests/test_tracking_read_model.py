@@ -0,0 +1,76 @@
+import unittest
+from unittest.mock import MagicMock
+from models.tracking_read_model import TrackingReadModel
+
+ORDER_ROW = {
+    'order_item_id': 'CR1234567',
+    'delivery_status': 'Shipping on time',
+    'origin_branch': 'Manila',
+    'branch_latitude': '14.599500',
+    'branch_longitude': '120.984200',
+    'customer_latitude': '14.585361',
+    'customer_longitude': '121.066905',
+    'driver_id': 205,
+    'order_date': '2025-06-01',
+    'product_name': ' Smart Watch ',
+    'employee_id': 205,
+    'first_name': 'Juan',
+    'last_name': 'Dela Cruz',
+    'gender': 'Male',
+    'age': '31',
+    'birth_date': '1994-02-11',
+    'contact_number': '09171234567'
+}
+
+class TestTrackingReadModel(unittest.TestCase):
+
+    def setUp(self):
+        """Build a read model on top of a fake MySQL connection."""
+        self.cursor = MagicMock()
+        self.cursor.fetchone.return_value = dict(ORDER_ROW)
+        self.conn = MagicMock()
+        self.conn.cursor.return_value = self.cursor
+        self.factory = MagicMock(return_value=self.conn)
+        self.read_model = TrackingReadModel(self.factory, ttl=60, maxsize=10)
+
+    def test_single_query_builds_order_and_courier(self):
+        """One joined query should fill both the order and the courier view."""
+        view = self.read_model.get('CR1234567')
+        self.assertEqual(self.cursor.execute.call_count, 1)
+        self.assertEqual(view['order']['productName'], 'Smart Watch')
+        self.assertEqual(view['order']['expectedDeliveryDate'], '2025-06-06')
+        self.assertEqual(view['courier']['first_name'], 'Juan')
+        self.conn.close.assert_called_once()
+
+    def test_repeat_lookup_is_a_cache_hit(self):
+        """A second lookup for the same tracking ID must not touch MySQL."""
+        self.read_model.get('CR1234567')
+        self.read_model.get('CR1234567')
+        self.assertEqual(self.factory.call_count, 1)
+        self.assertEqual(self.read_model.stats()['hits'], 1)
+
+    def test_invalidate_forces_reload(self):
+        """Invalidating a tracking ID should reload it on the next lookup."""
+        self.read_model.get('CR1234567')
+        self.read_model.invalidate('CR1234567')
+        self.read_model.get('CR1234567')
+        self.assertEqual(self.factory.call_count, 2)
+
+    def test_unknown_id_is_cached_as_missing(self):
+        """Unknown IDs return None and are briefly cached."""
+        self.cursor.fetchone.return_value = None
+        self.assertFalse(self.read_model.exists('NOPE'))
+        self.assertFalse(self.read_model.exists('NOPE'))
+        self.assertEqual(self.factory.call_count, 1)
+
+    def test_unknown_id_expires_after_miss_ttl(self):
+        """A miss must not outlive the short miss TTL, so new orders show up in every worker."""
+        read_model = TrackingReadModel(self.factory, ttl=60, maxsize=10, miss_ttl=0)
+        self.cursor.fetchone.return_value = None
+        self.assertFalse(read_model.exists('CR1234567'))
+        self.cursor.fetchone.return_value = dict(ORDER_ROW)
+        self.assertTrue(read_model.exists('CR1234567'))
+        self.assertEqual(self.factory.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import json
+import time
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from services.hexabot import Translator, TranslationCache
+
+def libretranslate_response(text="isinalin"):
+    response = MagicMock(status_code=200)
+    response.json.return_value = {"translatedText": text}
+    return response
+
+class TestTranslator(unittest.TestCase):
+
+    def setUp(self):
+        """Each test gets its own cache database and catalog path."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.db_path = os.path.join(self.tmpdir.name, 'translations.db')
+        self.catalog_path = os.path.join(self.tmpdir.name, 'catalog.json')
+
+    def translator(self, **kwargs):
+        kwargs.setdefault('cache', TranslationCache(db_path=self.db_path))
+        kwargs.setdefault('catalog_path', self.catalog_path)
+        return Translator(**kwargs)
+
+    @patch('services.hexabot.requests.post', return_value=libretranslate_response())
+    def test_translations_are_cached_and_persisted(self, post):
+        """A repeated text skips the endpoint, also after a restart."""
+        self.assertEqual(self.translator().translate("Hello", "en", "tl"), "isinalin")
+        translator = self.translator()
+        self.assertEqual(translator.translate("Hello", "en", "tl"), "isinalin")
+        self.assertEqual(translator.translate("Hello", "en", "en"), "Hello")
+        self.assertEqual(post.call_count, 1)
+
+    @patch('services.hexabot.requests.post')
+    def test_catalog_answers_without_a_request(self, post):
+        """Texts from the pre-translated catalog never reach the endpoint."""
+        with open(self.catalog_path, 'w', encoding='utf-8') as file:
+            json.dump({"en:tl": {"We deliver.": "Naghahatid kami."}}, file)
+        translator = self.translator()
+        self.assertEqual(translator.translate_within("We deliver.", "en", "tl"), "Naghahatid kami.")
+        post.assert_not_called()
+        self.assertEqual(translator.stats()['cache']['catalog_entries'], 1)
+
+    def test_endpoint_is_configurable(self):
+        """LIBRETRANSLATE_URL points requests at a local stand-in."""
+        with patch.dict('os.environ', {'LIBRETRANSLATE_URL': 'http://localhost:5000/translate'}), \
+                patch('services.hexabot.requests.post', return_value=libretranslate_response()) as post:
+            self.translator().translate("Hello", "en", "tl")
+        self.assertEqual(post.call_args[0][0], 'http://localhost:5000/translate')
+
+    def test_budget_returns_english_and_fills_cache_later(self):
+        """A slow endpoint misses the budget; its answer is cached for the next call."""
+        def slow_post(*args, **kwargs):
+            time.sleep(0.3)
+            return libretranslate_response()
+        with patch('services.hexabot.requests.post', side_effect=slow_post) as post:
+            translator = self.translator(budget_ms=20)
+            self.assertEqual(translator.translate_within("Hello", "en", "tl"), "Hello")
+            self.assertEqual(translator.translate_within("Hello", "en", "tl"), "Hello")
+            deadline = time.time() + 5
+            while translator.stats()['in_flight'] and time.time() < deadline:
+                time.sleep(0.02)
+            self.assertEqual(translator.translate_within("Hello", "en", "tl"), "isinalin")
+        self.assertEqual(post.call_count, 1)
+        self.assertEqual(translator.stats()['budget_misses'], 2)
+
+    @patch('services.hexabot.requests.post', side_effect=ConnectionError("offline"))
+    def test_failures_fall_back_to_source_text(self, post):
+        """An unreachable endpoint returns the English text and caches nothing."""
+        translator = self.translator()
+        self.assertEqual(translator.translate("Hello", "en", "tl"), "Hello")
+        self.assertEqual(translator.translate("Hello", "en", "tl"), "Hello")
+        self.assertEqual(post.call_count, 2)
+        self.assertEqual(translator.stats()['remote_failures'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from models.utilities_database import UtilitiesDatabase
+
+class TestUtilitiesDatabase(unittest.TestCase):
+
+    def setUp(self):
+        """Small copies of the sales, product, vehicle, employee and salary databases."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        sources = {alias: os.path.join(self.tmpdir.name, alias + '.db')
+                   for alias in ('sales_db', 'products_db', 'vehicles_db', 'employees_db', 'salary_db')}
+        self.create(sources['sales_db'],
+                    "CREATE TABLE sales (id INTEGER PRIMARY KEY, order_item_id TEXT, order_date DATE, order_item_quantity INTEGER, "
+                    "order_item_total FLOAT, order_profit_per_order FLOAT)",
+                    "INSERT INTO sales VALUES (?, ?, ?, ?, ?, ?)",
+                    [(1, 'A1', '2024-01-10', 2, 100.0, 40.0), (2, 'A1', '2024-01-12', 1, 50.0, 20.0),
+                     (3, 'B2', '2024-01-12', 3, 90.0, 30.0), (4, 'B2', '2023-06-01', 1, 10.0, 5.0)])
+        self.create(sources['products_db'],
+                    "CREATE TABLE products (id INTEGER PRIMARY KEY, product_name TEXT, order_item_id TEXT, product_category_name TEXT)",
+                    "INSERT INTO products VALUES (?, ?, ?, ?)",
+                    [(1, 'Smart watch', 'A1', 'Electronics'), (2, 'Smart watch', 'A1', 'Electronics'), (3, 'Tent', 'B2', 'Outdoors')])
+        self.create(sources['vehicles_db'],
+                    "CREATE TABLE vehicles (id INTEGER PRIMARY KEY, unit_brand TEXT, unit_model TEXT, unit_type TEXT, distance INTEGER, status TEXT)",
+                    "INSERT INTO vehicles VALUES (?, ?, ?, ?, ?, ?)",
+                    [(1, 'Honda', 'Civic', 'Sedan', 4000, 'Available'), (2, 'Isuzu', 'Elf', 'Truck', 60000, 'In Use')])
+        self.create(sources['employees_db'],
+                    "CREATE TABLE employees (id INTEGER PRIMARY KEY, employee_id INTEGER UNIQUE, full_name TEXT, role TEXT, department TEXT, status TEXT)",
+                    "INSERT INTO employees VALUES (?, ?, ?, ?, ?, ?)",
+                    [(1, 7, 'Ana Cruz', 'Driver', 'Delivery', 'Active'), (2, 9, 'Ben Reyes', 'Dispatcher', 'Operations', 'Active')])
+        self.create(sources['salary_db'],
+                    "CREATE TABLE employee_salaries (id INTEGER PRIMARY KEY, employee_id INTEGER, performance_rating INTEGER)",
+                    "INSERT INTO employee_salaries VALUES (?, ?, ?)",
+                    [(1, 7, 5)])
+        self.db = UtilitiesDatabase(os.path.join(self.tmpdir.name, 'hexahaul.db'), sources=sources, pool_size=2)
+        self.addCleanup(self.db.pool.close_all)
+
+    def create(self, path, schema, insert, rows):
+        conn = sqlite3.connect(path)
+        conn.execute(schema)
+        conn.executemany(insert, rows)
+        conn.commit()
+        conn.close()
+
+    def test_sales_pages_follow_the_cursor(self):
+        """Sales come newest first within the range ending at the latest sale, page by page."""
+        first = self.db.get_detail_page('sales', limit=2)
+        self.assertEqual([row['quantity'] for row in first['rows']], [3, 1])
+        self.assertEqual(first['rows'][0], {'date': '2024-01-12', 'product': 'Tent', 'category': 'Outdoors', 'quantity': 3,
+                                            'revenue': 90, 'cost': 60, 'profit': 30})
+        second = self.db.get_detail_page('sales', limit=2, cursor=first['next_cursor'])
+        self.assertEqual([row['date'] for row in second['rows']], ['2024-01-10'])
+        self.assertIsNone(second['next_cursor'])
+        self.assertEqual(len(self.db.get_sales_detail_data(time_range='year')), 4)
+
+    def test_vehicle_and_employee_rows(self):
+        """Detail rows come from the fleet and roster, with efficiency derived in SQL."""
+        vehicles = self.db.get_vehicle_detail_data()
+        self.assertEqual([(row['id'], row['efficiency']) for row in vehicles], [('V001', 'Excellent'), ('V002', 'Poor')])
+        employees = self.db.get_detail_page('employees', limit=1)
+        self.assertEqual(employees['rows'][0]['performance'], '5/5')
+        self.assertEqual(employees['rows'][0]['efficiency'], 'High')
+        rest = self.db.get_detail_page('employees', limit=1, cursor=employees['next_cursor'])
+        self.assertEqual(rest['rows'][0]['name'], 'Ben Reyes')
+        self.assertEqual(rest['rows'][0]['performance'], 'N/A')
+        with self.assertRaises(ValueError):
+            self.db.get_detail_page('customers')
+
+    def test_connections_are_reused_in_wal_mode(self):
+        """close() returns connections to the pool instead of opening new ones per query."""
+        for _ in range(5):
+            self.db.get_employee_detail_data()
+        stats = self.db.stats()
+        self.assertEqual(stats['created'], 1)
+        self.assertEqual(stats['in_use'], 0)
+        conn = self.db.get_connection()
+        try:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+        finally:
+            conn.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,5 @@
 from .utilities import Utilities
+from .cache import TTLCache, MISSING
+from .bloom import BloomFilter
 
 # this allows imports like: from utils import Utilities
\ No newline at end of file
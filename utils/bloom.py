@@ -0,0 +1,44 @@
+import base64
+import hashlib
+import math
+
+# Fixed-size Bloom filter that serializes to a small JSON-friendly dict
+class BloomFilter:
+    def __init__(self, size_bits: int, hash_count: int, bits: bytes = None):
+        self.size_bits = max(8, int(size_bits))
+        self.hash_count = max(1, int(hash_count))
+        self.bits = bytearray(bits) if bits is not None else bytearray((self.size_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float = 0.01):
+        """Size the filter for `capacity` items at the given false positive rate"""
+        capacity = max(1, capacity)
+        size_bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        hash_count = max(1, round(size_bits / capacity * math.log(2)))
+        return cls(size_bits, hash_count)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        # Double hashing: h1 + i * h2 gives k independent-enough positions
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size_bits
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def to_dict(self):
+        return {
+            'size_bits': self.size_bits,
+            'hash_count': self.hash_count,
+            'bits': base64.b64encode(bytes(self.bits)).decode('ascii')
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['size_bits'], data['hash_count'], base64.b64decode(data['bits']))
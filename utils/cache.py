@@ -0,0 +1,71 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Sentinel returned by TTLCache.get() when a key is absent or expired,
+# so that None can be cached as a legitimate value.
+MISSING = object()
+
+# In-process LRU cache with optional per-entry expiry
+class TTLCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.__data = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__expirations = 0
+
+    def get(self, key, default=MISSING):
+        """Return the cached value and mark it most recently used"""
+        with self.__lock:
+            entry = self.__data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self.__data.move_to_end(key)
+                    self.__hits += 1
+                    return value
+                del self.__data[key]
+                self.__expirations += 1
+            self.__misses += 1
+            return default
+
+    def set(self, key, value, ttl: float = None):
+        """Store a value, evicting the least recently used entry when full"""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self.__lock:
+            self.__data[key] = (value, expires_at)
+            self.__data.move_to_end(key)
+            while len(self.__data) > self.maxsize:
+                self.__data.popitem(last=False)
+                self.__evictions += 1
+
+    def pop(self, key, default=None):
+        with self.__lock:
+            entry = self.__data.pop(key, None)
+            return entry[0] if entry is not None else default
+
+    def clear(self):
+        with self.__lock:
+            self.__data.clear()
+
+    def __len__(self):
+        return len(self.__data)
+
+    def stats(self):
+        with self.__lock:
+            lookups = self.__hits + self.__misses
+            return {
+                'size': len(self.__data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.__hits,
+                'misses': self.__misses,
+                'hit_rate': round(self.__hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.__evictions,
+                'expirations': self.__expirations
+            }
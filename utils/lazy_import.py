@@ -0,0 +1,59 @@
+import importlib
+import threading
+
+# Encapsulation: stands in for a module until one of its attributes is used
+class LazyModule:
+    """
+    Module placeholder that imports the real module on first attribute access.
+
+    Lets `pd = lazy_import('pandas')` sit at the top of a module like a
+    normal import while pandas is only loaded by the code paths that use it
+    (CSV seeding, reports), so importing the web app stays cheap. Attribute
+    writes go to the real module, so unittest.mock.patch works through it,
+    and submodules resolve like `import package.sub` would
+    (lazy_import('mysql').connector).
+    """
+    def __init__(self, name):
+        object.__setattr__(self, '_LazyModule__name', name)
+        object.__setattr__(self, '_LazyModule__module', None)
+        object.__setattr__(self, '_LazyModule__lock', threading.Lock())
+
+    def _load(self):
+        module = self.__module
+        if module is None:
+            with self.__lock:
+                if self.__module is None:
+                    object.__setattr__(self, '_LazyModule__module', importlib.import_module(self.__name))
+                module = self.__module
+        return module
+
+    def is_loaded(self):
+        return self.__module is not None
+
+    def __getattr__(self, attr):
+        module = self._load()
+        try:
+            return getattr(module, attr)
+        except AttributeError:
+            try:
+                return importlib.import_module(f"{self.__name}.{attr}")
+            except ImportError:
+                raise AttributeError(f"module '{self.__name}' has no attribute '{attr}'") from None
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__module is not None else 'not loaded'
+        return f"<lazy module '{self.__name}' ({state})>"
+
+
+def lazy_import(name):
+    """A LazyModule for `name`, imported when first used"""
+    return LazyModule(name)